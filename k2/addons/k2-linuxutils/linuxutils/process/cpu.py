@@ -9,6 +9,7 @@ from zaf.messages.decorator import callback_dispatcher
 
 from k2.cmd.run import RUN_COMMAND
 from k2.sut import SUT, SUT_RESET_DONE
+from linuxutils.sampler import ProcSampler
 from linuxutils.system.cpu import CPU_USAGE_MONITOR_ENABLED
 from monitor import MONITOR_ENDPOINT, PERFORM_MEASUREMENT
 
@@ -69,9 +70,12 @@ class ProcStatusCollector(object):
                 r'(?P<cnswap>\S+)\s+'
                 r'(?P<exit_signal>\S+)'))
 
-    def collect(self, pid):
+    def collect(self, pid, sample=None):
         try:
-            data = self._exec.send_line('cat /proc/{pid}/stat'.format(pid=pid), timeout=5)
+            if sample is not None:
+                data = sample.processes[pid].stat
+            else:
+                data = self._exec.send_line('cat /proc/{pid}/stat'.format(pid=pid), timeout=5)
         except Exception as e:
             raise ProcCpuMonitorError(
                 'Could not collect status data for process with PID {pid}'.format(pid=pid)) from e
@@ -101,12 +105,12 @@ class ProcCpuUsage(object):
         self._last_system_cpu_ticks = defaultdict(lambda: 0)
         self._last_proc_cpu_ticks = defaultdict(lambda: {'utime': 0, 'stime': 0, 'cutime': 0, 'cstime': 0})
 
-    def collect(self, pid):
-        system_cpu_ticks = sum(self._system_cpu_ticks_collector.collect().values())
+    def collect(self, pid, sample=None):
+        system_cpu_ticks = sum(self._system_cpu_ticks_collector.collect(sample=sample).values())
         total_ticks = system_cpu_ticks - self._last_system_cpu_ticks[pid]
         self._last_system_cpu_ticks[pid] = system_cpu_ticks
 
-        proc_status = self._proc_status_collector.collect(pid)
+        proc_status = self._proc_status_collector.collect(pid, sample=sample)
         current_proc_cpu_ticks = Counter(
             {
                 'utime': proc_status['utime'],
@@ -140,15 +144,20 @@ class MultiProcCpuUsage(object):
         self._proc_pid_collector = proc_pid_collector
         self._proc_cpu_usage_collector = proc_cpu_usage_collector
 
-    def collect(self, patterns):
+    def collect(self, patterns, sample=None):
         pids = OrderedDict()
         for entity, patterns in patterns.items():
-            pids[entity] = self._proc_pid_collector.collect(patterns)
+            pids[entity] = self._proc_pid_collector.collect(patterns, sample=sample)
 
+        # The usage is relative to the previous collect of the PID, so a PID that
+        # matches the patterns of several entities is only collected once.
+        usages = {}
         metrics = {}
         for entity, pids in pids.items():
             for pid in pids:
-                for name, value in self._proc_cpu_usage_collector.collect(pid).items():
+                if pid not in usages:
+                    usages[pid] = self._proc_cpu_usage_collector.collect(pid, sample=sample)
+                for name, value in usages[pid].items():
                     metric_name = 'proc.cpu.{entity}.{name}.{pid}'.format(
                         entity=entity, name=name, pid=pid)
                     metrics[metric_name] = value
@@ -225,10 +234,12 @@ class ProcCpuUsageMonitor(AbstractExtension):
         self._reset_count = 0
 
     @callback_dispatcher([PERFORM_MEASUREMENT], [MONITOR_ENDPOINT], entity_option_id=SUT)
+    @requires(sampler=ProcSampler, scope='session')
     @requires(multi_proc_cpu_usage=MultiProcCpuUsage, scope='dispatcher')
     @requires(create_metric='CreateSeriesMetric', scope='dispatcher')
-    def handle_collect_cpu_usage(self, message, multi_proc_cpu_usage, create_metric):
-        for metric_name, value in multi_proc_cpu_usage.collect(self._patterns).items():
+    def handle_collect_cpu_usage(self, message, sampler, multi_proc_cpu_usage, create_metric):
+        sample = sampler.sample(message, include_processes=True)
+        for metric_name, value in multi_proc_cpu_usage.collect(self._patterns, sample).items():
             # Skip creating metrics for the first measurement as it contains all since the system was started.
             if not self._first_iteration:
                 create_metric(
@@ -9,6 +9,7 @@ from zaf.messages.decorator import callback_dispatcher
 
 from k2.cmd.run import RUN_COMMAND
 from k2.sut import SUT, SUT_RESET_DONE
+from linuxutils.sampler import ProcSampler
 from monitor import MONITOR_ENDPOINT, PERFORM_MEASUREMENT
 
 logger = logging.getLogger(get_logger_name('k2', 'monitor', 'process'))
@@ -44,9 +45,12 @@ class ProcMemoryUsageCollector(object):
                 r'(?P<data>\S+)\s+'
                 r'(?P<dt>\S+)'))
 
-    def collect(self, pid):
+    def collect(self, pid, sample=None):
         try:
-            data = self._exec.send_line('cat /proc/{pid}/statm'.format(pid=pid), timeout=5)
+            if sample is not None:
+                data = sample.processes[pid].statm
+            else:
+                data = self._exec.send_line('cat /proc/{pid}/statm'.format(pid=pid), timeout=5)
         except Exception as e:
             raise ProcMemoryMonitorError(
                 'Could not collect memory stats for process with PID {pid}'.format(pid=pid)) from e
@@ -68,15 +72,16 @@ class MultiProcMemoryUsage(object):
         self._proc_pid_collector = proc_pid_collector
         self._proc_memory_usage_collector = proc_memory_usage_collector
 
-    def collect(self, patterns):
+    def collect(self, patterns, sample=None):
         pids = OrderedDict()
         for entity, patterns in patterns.items():
-            pids[entity] = self._proc_pid_collector.collect(patterns)
+            pids[entity] = self._proc_pid_collector.collect(patterns, sample=sample)
 
         metrics = {}
         for entity, pids in pids.items():
             for pid in pids:
-                for name, value in self._proc_memory_usage_collector.collect(pid).items():
+                for name, value in self._proc_memory_usage_collector.collect(
+                        pid, sample=sample).items():
                     metric_name = 'proc.memory.{entity}.{name}.{pid}'.format(
                         entity=entity, name=name, pid=pid)
                     if 'resident' in metric_name or 'size' in metric_name:
@@ -147,10 +152,12 @@ class ProcMemoryUsageMonitor(AbstractExtension):
                 key=lambda item: item[0]))
 
     @callback_dispatcher([PERFORM_MEASUREMENT], [MONITOR_ENDPOINT], entity_option_id=SUT)
+    @requires(sampler=ProcSampler, scope='session')
     @requires(multi_proc_memory_usage=MultiProcMemoryUsage, scope='dispatcher')
     @requires(create_metric='CreateSeriesMetric', scope='dispatcher')
-    def handle_collect_cpu_usage(self, message, multi_proc_memory_usage, create_metric):
-        for metric_name, value in multi_proc_memory_usage.collect(self._patterns).items():
+    def handle_collect_cpu_usage(self, message, sampler, multi_proc_memory_usage, create_metric):
+        sample = sampler.sample(message, include_processes=True)
+        for metric_name, value in multi_proc_memory_usage.collect(self._patterns, sample).items():
             create_metric(
                 '{metric_name}.{reset_count}'.format(
                     metric_name=metric_name, reset_count=self._reset_count), value)
@@ -34,12 +34,13 @@ class ProcPidCollector(object):
         self._matcher = re.compile(
             r'^\s*(?P<pid>\d+)\s+\S+\s+\S+\s+\S+\s+(?P<command>.+)', flags=re.MULTILINE)
 
-    def collect(self, patterns):
+    def collect(self, patterns, sample=None):
         """
         Collect the PIDs of a collection of processes.
 
         Runs ps and parses the output using the provided list of regular expressions.
         Exclude patterns can be provided by prefixing the entry with !.
+        If a ProcSample with processes is given, its processes are used instead of running ps.
 
         A process in included in the PIDs list if:
         * Any of the include patterns.
@@ -57,8 +58,11 @@ class ProcPidCollector(object):
         pids = set()
 
         try:
-            data = self._exec.send_line('ps ww', timeout=5)
-            for pid, command in self._matcher.findall(data):
+            if sample is not None:
+                processes = sample.commands()
+            else:
+                processes = self._matcher.findall(self._exec.send_line('ps ww', timeout=5))
+            for pid, command in processes:
                 if (any({pattern_matches(pattern, command) for pattern in positive_patterns})
                         and not any({pattern_matches(pattern, command)
                                      for pattern in negative_patterns})):
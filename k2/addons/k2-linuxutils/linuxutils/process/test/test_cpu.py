@@ -7,6 +7,7 @@ from zaf.config.manager import ConfigManager
 from zaf.messages.message import EndpointId
 
 from k2.sut import SUT, SUT_RESET_DONE
+from linuxutils.test.utils import sample_output
 from monitor import MONITOR_ENDPOINT, PERFORM_MEASUREMENT
 
 from ..cpu import PROC_CPU_USAGE_MONITOR_IDS, PROC_CPU_USAGE_MONITOR_PATTERNS, \
@@ -107,8 +108,8 @@ class TestProcCpuUsage(TestCase):
 
     def test_collects_a_measurement_when_collect_is_called(self):
         self.collector.collect(1)
-        self.system_cpu_ticks_collector.collect.assert_called_once_with()
-        self.proc_status_collector.collect.assert_called_once_with(1)
+        self.system_cpu_ticks_collector.collect.assert_called_once_with(sample=None)
+        self.proc_status_collector.collect.assert_called_once_with(1, sample=None)
 
     def test_collect_zero_measurement(self):
         data = self.collector.collect(1)
@@ -172,24 +173,11 @@ class TestProcCpuUsageMonitor(TestCase):
     def test_perform_measurement(self):
         with _create_harness() as harness:
             harness.exec.send_line = MagicMock(
-                side_effect=[
-                    (
-                        '1 (mtdblock2) S -1 2 3 4 5 6 7 8 9 10 10 20 30 40 15 16 17 '
-                        '18 19 20 21 22 23 24 25 26 27 28 29 30 31 32 33 34 35 36 37 '
-                        '38 39 40 41 42 43 44'),
-                    (
-                        '1 (mtdblock2) S -1 2 3 4 5 6 7 8 9 10 40 60 80 100 15 16 17 '
-                        '18 19 20 21 22 23 24 25 26 27 28 29 30 31 32 33 34 35 36 37 '
-                        '38 39 40 41 42 43 44'),
-                    (
-                        '1 (mtdblock2) S -1 2 3 4 5 6 7 8 9 10 80 110 140 170 15 16 17 '
-                        '18 19 20 21 22 23 24 25 26 27 28 29 30 31 32 33 34 35 36 37 '
-                        '38 39 40 41 42 43 44'),
-                    (
-                        '1 (mtdblock2) S -1 2 3 4 5 6 7 8 9 10 130 170 210 250 15 16 17 '
-                        '18 19 20 21 22 23 24 25 26 27 28 29 30 31 32 33 34 35 36 37 '
-                        '38 39 40 41 42 43 44'),
-                ])
+                return_value=sample_output(
+                    processes=[
+                        (1, _proc_stat(1, '10 20 30 40'), '0 0 0 0 0 0 0', 'mtdblock2'),
+                        (2, _proc_stat(2, '40 60 80 100'), '0 0 0 0 0 0 0', 'mtdblock2'),
+                    ]))
             harness.proc_pid_collector.collect = MagicMock(return_value=[1, 2])
             harness.system_cpu_ticks_collector.collect = MagicMock(
                 side_effect=[
@@ -203,16 +191,6 @@ class TestProcCpuUsageMonitor(TestCase):
                         'system': 200,
                         'idle': 120
                     }),
-                    Counter({
-                        'user': 80,
-                        'system': 200,
-                        'idle': 120
-                    }),
-                    Counter({
-                        'user': 120,
-                        'system': 300,
-                        'idle': 180
-                    }),
                 ])
             harness.extension._first_iteration = False
             request = harness.send_request(PERFORM_MEASUREMENT, MONITOR_ENDPOINT, data=None)
@@ -226,14 +204,14 @@ class TestProcCpuUsageMonitor(TestCase):
             harness.create_series_metric.assert_any_call('proc.cpu.mymonitor.stime.2.0', 15.0)
             harness.create_series_metric.assert_any_call('proc.cpu.mymonitor.cutime.2.0', 20.0)
             harness.create_series_metric.assert_any_call('proc.cpu.mymonitor.cstime.2.0', 25.0)
-            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.utime.1.0', 35.0)
-            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.stime.1.0', 45.0)
-            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.cutime.1.0', 55.0)
-            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.cstime.1.0', 65.0)
-            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.utime.2.0', 45.0)
-            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.stime.2.0', 55.0)
-            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.cutime.2.0', 65.0)
-            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.cstime.2.0', 75.0)
+            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.utime.1.0', 5.0)
+            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.stime.1.0', 10.0)
+            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.cutime.1.0', 15.0)
+            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.cstime.1.0', 20.0)
+            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.utime.2.0', 10.0)
+            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.stime.2.0', 15.0)
+            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.cutime.2.0', 20.0)
+            harness.create_series_metric.assert_any_call('proc.cpu.myothermonitor.cstime.2.0', 25.0)
 
     def test_reset_count_is_incremented_on_reset_done(self):
         with _create_harness() as harness:
@@ -248,6 +226,13 @@ class TestProcCpuUsageMonitor(TestCase):
         assert harness.extension._first_iteration is True
 
 
+def _proc_stat(pid, cpu_ticks):
+    return (
+        '{pid} (mtdblock2) S -1 2 3 4 5 6 7 8 9 10 {cpu_ticks} 15 16 17 18 19 20 21 22 23 24 '
+        '25 26 27 28 29 30 31 32 33 34 35 36 37 38 39 40 41 42 43 44').format(
+            pid=pid, cpu_ticks=cpu_ticks)
+
+
 def _create_harness():
     config = ConfigManager()
     entity = 'mysut'
@@ -6,6 +6,7 @@ from zaf.config.manager import ConfigManager
 
 from k2 import EndpointId
 from k2.sut import SUT, SUT_RESET_DONE
+from linuxutils.test.utils import sample_output
 from monitor import MONITOR_ENDPOINT, PERFORM_MEASUREMENT
 
 from ..mem import PROC_MEMORY_USAGE_MONITOR_IDS, PROC_MEMORY_USAGE_MONITOR_PATTERNS, \
@@ -58,25 +59,26 @@ class TestProcMemoryUsageMonitor(TestCase):
     def test_perform_measurement(self):
         with _create_harness() as harness:
             harness.exec.send_line = MagicMock(
-                side_effect=[
-                    '1 2 3 4 5 6 7',
-                    '2 3 4 5 6 7 8',
-                    '3 4 5 6 7 8 9',
-                    '4 5 6 7 8 9 10',
-                ])
-            harness.proc_pid_collector.collect = MagicMock(return_value=[1, 2])
+                return_value=sample_output(
+                    processes=[
+                        (1, '1 (init) S', '1 2 3 4 5 6 7', 'init'),
+                        (2, '2 (init) S', '2 3 4 5 6 7 8', 'init'),
+                        (3, '3 (init) S', '3 4 5 6 7 8 9', 'init'),
+                        (4, '4 (init) S', '4 5 6 7 8 9 10', 'init'),
+                    ]))
+            harness.proc_pid_collector.collect = MagicMock(side_effect=[[1, 2], [3, 4]])
             request = harness.send_request(PERFORM_MEASUREMENT, MONITOR_ENDPOINT, data=None)
             request.wait()[0].result()
             harness.create_series_metric.assert_any_call('proc.memory.mymonitor.size.1.0', 4)
             harness.create_series_metric.assert_any_call('proc.memory.mymonitor.resident.1.0', 8)
             harness.create_series_metric.assert_any_call('proc.memory.mymonitor.size.2.0', 8)
             harness.create_series_metric.assert_any_call('proc.memory.mymonitor.resident.2.0', 12)
-            harness.create_series_metric.assert_any_call('proc.memory.myothermonitor.size.1.0', 12)
+            harness.create_series_metric.assert_any_call('proc.memory.myothermonitor.size.3.0', 12)
             harness.create_series_metric.assert_any_call(
-                'proc.memory.myothermonitor.resident.1.0', 16)
-            harness.create_series_metric.assert_any_call('proc.memory.myothermonitor.size.2.0', 16)
+                'proc.memory.myothermonitor.resident.3.0', 16)
+            harness.create_series_metric.assert_any_call('proc.memory.myothermonitor.size.4.0', 16)
             harness.create_series_metric.assert_any_call(
-                'proc.memory.myothermonitor.resident.2.0', 20)
+                'proc.memory.myothermonitor.resident.4.0', 20)
 
     def test_reset_count_is_incremented_on_reset_done(self):
         with _create_harness() as harness:
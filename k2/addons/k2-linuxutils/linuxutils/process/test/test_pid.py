@@ -8,6 +8,8 @@ from healthcheck import HEALTH_CHECK_ENDPOINT, PERFORM_HEALTH_CHECK, HealthCheck
 from k2.sut import SUT
 from linuxutils.process.pid import HEALTHCHECK_PROC_IDS, HEALTHCHECK_PROC_PATTERNS, \
     SUT_HEALTHCHECK_PROC_IDS
+from linuxutils.sampler import parse_sample
+from linuxutils.test.utils import sample_output
 
 from ..pid import PidMonitorError, ProcMonitoringHealthCheck, ProcPidCollector
 
@@ -71,6 +73,18 @@ class TestProcPidCollector(TestCase):
         self.exec.send_line.assert_called_once_with('ps ww', timeout=5)
         assert data == {3}
 
+    def test_processes_are_taken_from_sample_if_given(self):
+        sample = parse_sample(
+            sample_output(
+                processes=[
+                    (1, '1 (init) S', '1 2 3 4 5 6 7', 'init'),
+                    (2, '2 (sleep) S', '1 2 3 4 5 6 7', 'sleep 10'),
+                    (3, '3 (kthreadd) S', '0 0 0 0 0 0 0', ''),
+                ]), True)
+        data = self.collector.collect(['sle.*', r'\[kthread'], sample=sample)
+        self.exec.send_line.assert_not_called()
+        assert data == {2, 3}
+
 
 class TestProcMonitoringHealthCheck(TestCase):
 
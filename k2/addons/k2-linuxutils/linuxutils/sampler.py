@@ -0,0 +1,175 @@
+"""
+Collects everything the Linux monitors need from /proc with one command.
+
+Instead of each monitor running its own commands, one for each file and
+process that it reads, the ProcSampler reads /proc/stat, /proc/meminfo,
+/proc/net/dev, /proc/sys/fs/file-nr and, when asked to, the stat, statm and
+cmdline of all processes in one remote command. The output is framed with one
+header line per file and process and is split up in one pass.
+
+The cost of a sample is one round trip to the SUT regardless of the number of
+processes, which matters when the exec component talks to the SUT over serial.
+
+The monitors require the ProcSampler on session scope, so all monitors of a SUT
+get the same sampler. The monitors that handle the same PERFORM_MEASUREMENT
+request share a sample, so each measurement only runs the command once (or
+twice if a monitor that needs the processes handles the request after one that
+didn't).
+"""
+
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+
+from zaf.component.decorator import component, requires
+from zaf.extensions.extension import get_logger_name
+
+logger = logging.getLogger(get_logger_name('k2', 'monitor', 'sampler'))
+logger.addHandler(logging.NullHandler())
+
+SAMPLE_TIMEOUT = 10
+
+SECTION_MARKER = '@@'
+
+SYSTEM_FILES = ('stat', 'meminfo', 'net/dev', 'sys/fs/file-nr')
+
+SYSTEM_COMMAND = (
+    'for f in {files}; do echo "{marker}$f"; cat /proc/$f; done 2>/dev/null').format(
+        files=' '.join(SYSTEM_FILES), marker=SECTION_MARKER)
+
+# The cmdline is printed on one line, with the arguments separated by spaces.
+# A process that exits while it is being read gives an incomplete section that is skipped.
+# The cmdline line of the last process may be missing as trailing whitespace can be stripped
+# from the output.
+PROCESSES_COMMAND = (
+    'for p in /proc/[0-9]*; do echo "{marker}${{p#/proc/}}"; cat $p/stat $p/statm; '
+    'tr "\\0\\n" "  " < $p/cmdline; echo; done 2>/dev/null').format(marker=SECTION_MARKER)
+
+
+class ProcSamplerError(Exception):
+    pass
+
+
+ProcessSample = namedtuple('ProcessSample', ['pid', 'command', 'stat', 'statm'])
+
+
+class ProcSample(object):
+    """The contents of the /proc files read by one sample."""
+
+    def __init__(self, files, processes=None):
+        """
+        Create a sample.
+
+        :param files: dict from the name of a file relative to /proc to its contents
+        :param processes: OrderedDict from PID to ProcessSample, None if not sampled
+        """
+        self._files = files
+        self.processes = processes
+
+    @property
+    def stat(self):
+        return self._files.get('stat', '')
+
+    @property
+    def meminfo(self):
+        return self._files.get('meminfo', '')
+
+    @property
+    def net_dev(self):
+        return self._files.get('net/dev', '')
+
+    @property
+    def file_nr(self):
+        return self._files.get('sys/fs/file-nr', '')
+
+    def commands(self):
+        """Return (pid, command) for all sampled processes, like the PID and COMMAND of ps."""
+        return [(process.pid, process.command) for process in self.processes.values()]
+
+
+def parse_sample(data, include_processes):
+    """
+    Split the output of the sample command into the files and the processes.
+
+    :param data: the output of the sample command
+    :param include_processes: if the processes were sampled
+    :return: a ProcSample
+    """
+    sections = []
+    for line in data.splitlines():
+        if line.startswith(SECTION_MARKER):
+            lines = []
+            sections.append((line[len(SECTION_MARKER):].strip(), lines))
+        elif sections:
+            lines.append(line)
+
+    files = {}
+    processes = OrderedDict() if include_processes else None
+    for name, lines in sections:
+        if name.isdigit():
+            if include_processes and len(lines) >= 2 and lines[1].strip():
+                pid = int(name)
+                stat, statm = lines[0], lines[1]
+                command = ' '.join(lines[2:]).strip() or _kernel_thread_name(stat)
+                processes[pid] = ProcessSample(pid, command, stat, statm)
+        else:
+            files[name] = '\n'.join(lines)
+    return ProcSample(files, processes)
+
+
+def _kernel_thread_name(stat):
+    # Processes without a cmdline are shown as [comm] by ps, comm is given in parentheses
+    # in the stat file and may itself contain parentheses.
+    return '[{comm}]'.format(comm=stat[stat.find('(') + 1:stat.rfind(')')])
+
+
+@component
+@requires(exec='Exec', can=['telnet'])
+class ProcSampler(object):
+    """Sample the /proc files of the SUT with one command."""
+
+    def __init__(self, exec):
+        self._exec = exec
+        self._samples = {}
+        self._samples_lock = threading.Lock()
+
+    def sample(self, message=None, include_processes=False):
+        """
+        Get a sample for a measurement.
+
+        Samples are shared between all calls on this sampler for the same PERFORM_MEASUREMENT
+        request.
+
+        :param message: the PERFORM_MEASUREMENT message that the sample is for,
+                        if None or without data a new sample is always collected
+        :param include_processes: if the processes should be sampled
+        :return: a ProcSample
+        """
+        if message is None or message.data is None:
+            return self.collect(include_processes)
+
+        # The lock is held while collecting, so that monitors that handle the request
+        # at the same time wait for the sample instead of collecting their own
+        key = (message.entity, message.data)
+        with self._samples_lock:
+            cached_key, sample = self._samples.get(message.entity, (None, None))
+            if cached_key != key or (sample.processes is None and include_processes):
+                sample = self.collect(include_processes)
+                self._samples[message.entity] = (key, sample)
+            return sample
+
+    def collect(self, include_processes=False):
+        command = SYSTEM_COMMAND
+        if include_processes:
+            command = '{system}; {processes}'.format(
+                system=SYSTEM_COMMAND, processes=PROCESSES_COMMAND)
+        try:
+            data = self._exec.send_line(command, timeout=SAMPLE_TIMEOUT)
+        except Exception as e:
+            raise ProcSamplerError('Could not collect /proc sample') from e
+
+        sample = parse_sample(data, include_processes)
+        if include_processes:
+            logger.debug(
+                'Sampled /proc with {count} processes'.format(count=len(sample.processes)))
+        return sample
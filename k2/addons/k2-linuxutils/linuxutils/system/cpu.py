@@ -9,6 +9,7 @@ from zaf.messages.decorator import callback_dispatcher
 
 from k2.cmd.run import RUN_COMMAND
 from k2.sut import SUT, SUT_RESET_DONE
+from linuxutils.sampler import ProcSampler
 from monitor import MONITOR_ENDPOINT, PERFORM_MEASUREMENT
 
 logger = logging.getLogger(get_logger_name('k2', 'monitor', 'cpu'))
@@ -28,11 +29,14 @@ class SystemCpuTicksCollector(object):
         self._exec = exec
         self._matcher = re.compile(r'cpu\s+(?P<user>\d+)\s+\d+\s+(?P<system>\d+)\s+(?P<idle>\d+)')
 
-    def collect(self):
-        try:
-            data = self._exec.send_line('cat /proc/stat', timeout=5)
-        except Exception as e:
-            raise SystemCpuMonitorError('Could not collect CPU ticks data') from e
+    def collect(self, sample=None):
+        if sample is not None:
+            data = sample.stat
+        else:
+            try:
+                data = self._exec.send_line('cat /proc/stat', timeout=5)
+            except Exception as e:
+                raise SystemCpuMonitorError('Could not collect CPU ticks data') from e
 
         match = self._matcher.search(data)
         if not match:
@@ -50,8 +54,8 @@ class SystemCpuUsage(object):
         self._last_cpu_ticks = {'user': 0, 'system': 0, 'idle': 0}
         self._collector = collector
 
-    def collect(self):
-        current_cpu_ticks = self._collector.collect()
+    def collect(self, sample=None):
+        current_cpu_ticks = self._collector.collect(sample=sample)
         difference = current_cpu_ticks.copy()
         difference.subtract(self._last_cpu_ticks)
         self._last_cpu_ticks = current_cpu_ticks
@@ -112,10 +116,11 @@ class SystemCpuUsageMonitor(AbstractExtension):
         self._first_iteration = True
 
     @callback_dispatcher([PERFORM_MEASUREMENT], [MONITOR_ENDPOINT], entity_option_id=SUT)
+    @requires(sampler=ProcSampler, scope='session')
     @requires(collector=SystemCpuUsage, scope='dispatcher')
     @requires(create_metric='CreateSeriesMetric', scope='dispatcher')
-    def handle_collect_cpu_usage(self, message, collector, create_metric):
-        for name, value in collector.collect().items():
+    def handle_collect_cpu_usage(self, message, sampler, collector, create_metric):
+        for name, value in collector.collect(sample=sampler.sample(message)).items():
             # Skip creating metrics for the first measurement as it contains all since the system was started.
             if not self._first_iteration:
                 create_metric('system.cpu.{name}'.format(name=name), value)
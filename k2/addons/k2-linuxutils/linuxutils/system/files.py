@@ -9,6 +9,7 @@ from zaf.messages.decorator import callback_dispatcher
 
 from k2.cmd.run import RUN_COMMAND
 from k2.sut import SUT
+from linuxutils.sampler import ProcSampler
 from monitor import MONITOR_ENDPOINT, PERFORM_MEASUREMENT
 
 logger = logging.getLogger(get_logger_name('k2', 'monitor', 'files'))
@@ -27,9 +28,12 @@ class SystemFilesCollector(object):
     def __init__(self, exec):
         self._exec = exec
 
-    def collect(self):
+    def collect(self, sample=None):
         try:
-            data = self._exec.send_line('cat /proc/sys/fs/file-nr', timeout=5)
+            if sample is not None:
+                data = sample.file_nr
+            else:
+                data = self._exec.send_line('cat /proc/sys/fs/file-nr', timeout=5)
             opened, _, max_allowed = tuple(re.split(r'\s+', data.strip()))
         except Exception as e:
             raise SystemFilesMonitorError('Could not collect file usage data') from e
@@ -73,8 +77,9 @@ class SystemFileUsageMonitor(AbstractExtension):
         self._entity = instances[SUT]
 
     @callback_dispatcher([PERFORM_MEASUREMENT], [MONITOR_ENDPOINT], entity_option_id=SUT)
+    @requires(sampler=ProcSampler, scope='session')
     @requires(collector=SystemFilesCollector, scope='dispatcher')
     @requires(create_metric='CreateSeriesMetric', scope='dispatcher')
-    def handle_collect_files_usage(self, message, collector, create_metric):
-        for name, value in collector.collect().items():
+    def handle_collect_files_usage(self, message, sampler, collector, create_metric):
+        for name, value in collector.collect(sample=sampler.sample(message)).items():
             create_metric('system.files.{name}'.format(name=name), value)
@@ -8,6 +8,7 @@ from zaf.messages.decorator import callback_dispatcher
 
 from k2.cmd.run import RUN_COMMAND
 from k2.sut import SUT
+from linuxutils.sampler import ProcSampler
 from monitor import MONITOR_ENDPOINT, PERFORM_MEASUREMENT
 
 logger = logging.getLogger(get_logger_name('k2', 'monitor', 'sysmem'))
@@ -29,11 +30,15 @@ class SystemMemoryUsageCollector(object):
             r'^MemFree:\s+(?P<free>\d+)|^Buffers:\s+(?P<buffers>\d+)|^Cached:\s+(?P<cached>\d+)',
             re.MULTILINE)
 
-    def collect(self):
-        try:
-            data = self._exec.send_line('cat /proc/meminfo', timeout=5)
-        except Exception as e:
-            raise SystemMemoryMonitorError('Could not collect system memory usage data') from e
+    def collect(self, sample=None):
+        if sample is not None:
+            data = sample.meminfo
+        else:
+            try:
+                data = self._exec.send_line('cat /proc/meminfo', timeout=5)
+            except Exception as e:
+                raise SystemMemoryMonitorError(
+                    'Could not collect system memory usage data') from e
 
         try:
             result = {
@@ -86,8 +91,9 @@ class SystemMemoryUsageMonitor(AbstractExtension):
         self._entity = instances[SUT]
 
     @callback_dispatcher([PERFORM_MEASUREMENT], [MONITOR_ENDPOINT], entity_option_id=SUT)
+    @requires(sampler=ProcSampler, scope='session')
     @requires(collector=SystemMemoryUsageCollector, scope='dispatcher')
     @requires(create_metric='CreateSeriesMetric', scope='dispatcher')
-    def handle_collect_system_memory_usage(self, message, collector, create_metric):
-        for name, value in collector.collect().items():
+    def handle_collect_system_memory_usage(self, message, sampler, collector, create_metric):
+        for name, value in collector.collect(sample=sampler.sample(message)).items():
             create_metric('system.memory.{name}'.format(name=name), value)
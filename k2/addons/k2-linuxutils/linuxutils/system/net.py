@@ -10,6 +10,7 @@ from zaf.messages.decorator import callback_dispatcher
 
 from k2.cmd.run import RUN_COMMAND
 from k2.sut import SUT, SUT_RESET_DONE
+from linuxutils.sampler import ProcSampler
 from monitor import MONITOR_ENDPOINT, PERFORM_MEASUREMENT
 
 logger = logging.getLogger(get_logger_name('k2', 'monitor', 'process'))
@@ -48,11 +49,14 @@ class SystemNetworkStatisticsCollector(object):
                 r'(?P<tx_carrier>\S+)\s+'
                 r'(?P<tx_compressed>\S+)'))
 
-    def collect(self):
-        try:
-            data = self._exec.send_line('cat /proc/net/dev', timeout=5)
-        except Exception as e:
-            raise SystemNetworkMonitorError('Could not collect network statistics') from e
+    def collect(self, sample=None):
+        if sample is not None:
+            data = sample.net_dev
+        else:
+            try:
+                data = self._exec.send_line('cat /proc/net/dev', timeout=5)
+            except Exception as e:
+                raise SystemNetworkMonitorError('Could not collect network statistics') from e
 
         matches = list(self._matcher.finditer(data))
 
@@ -76,8 +80,8 @@ class SystemNetworkStatistics(object):
         self._last_time = defaultdict(lambda: 0)
         self._collector = collector
 
-    def collect(self):
-        new_measurement = self._collector.collect()
+    def collect(self, sample=None):
+        new_measurement = self._collector.collect(sample=sample)
         current_time = time()
         result = {}
 
@@ -134,10 +138,13 @@ class SystemNetworkUsageMonitor(AbstractExtension):
         self._first_iteration = True
 
     @callback_dispatcher([PERFORM_MEASUREMENT], [MONITOR_ENDPOINT], entity_option_id=SUT)
+    @requires(sampler=ProcSampler, scope='session')
     @requires(system_network_statistics=SystemNetworkStatistics, scope='dispatcher')
     @requires(create_metric='CreateSeriesMetric', scope='dispatcher')
-    def handle_collect_cpu_usage(self, message, system_network_statistics, create_metric):
-        for interface, data in system_network_statistics.collect().items():
+    def handle_collect_cpu_usage(
+            self, message, sampler, system_network_statistics, create_metric):
+        sample = sampler.sample(message)
+        for interface, data in system_network_statistics.collect(sample=sample).items():
             if not self._first_iteration:
                 create_metric(
                     'system.network.{interface}.rx_kbps'.format(interface=interface),
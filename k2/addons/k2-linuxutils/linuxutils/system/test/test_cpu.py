@@ -7,6 +7,7 @@ from zaf.config.manager import ConfigManager
 from zaf.messages.message import EndpointId
 
 from k2.sut import SUT, SUT_RESET_DONE
+from linuxutils.test.utils import sample_output
 from monitor import MONITOR_ENDPOINT, PERFORM_MEASUREMENT
 
 from ..cpu import CPU_USAGE_MONITOR_ENABLED, SystemCpuMonitorError, SystemCpuTicksCollector, \
@@ -66,7 +67,7 @@ class TestSystemCpuUsage(TestCase):
 
     def test_collects_a_measurement_when_collect_is_called(self):
         self.collector.collect()
-        self.ticks_collector.collect.assert_called_once_with()
+        self.ticks_collector.collect.assert_called_once_with(sample=None)
 
     def test_collect_zero_measurement(self):
         data = self.collector.collect()
@@ -98,8 +99,8 @@ class TestSystemCpuUsageMonitor(TestCase):
         with _create_harness() as harness:
             harness.exec.send_line = MagicMock(
                 side_effect=[
-                    'cpu  200 0 300 500 7 1189 463640 0 0 0',
-                    'cpu  250 0 450 700 7 1189 463640 0 0 0'
+                    sample_output(stat='cpu  200 0 300 500 7 1189 463640 0 0 0'),
+                    sample_output(stat='cpu  250 0 450 700 7 1189 463640 0 0 0')
                 ])
             for _ in range(2):
                 request = harness.send_request(PERFORM_MEASUREMENT, MONITOR_ENDPOINT, data=None)
@@ -6,6 +6,7 @@ from zaf.config.manager import ConfigManager
 from zaf.messages.message import EndpointId
 
 from k2.sut import SUT, SUT_RESET_DONE
+from linuxutils.test.utils import sample_output
 from monitor import MONITOR_ENDPOINT, PERFORM_MEASUREMENT
 
 from ..files import FILES_MONITOR_ENABLED, SystemFilesCollector, SystemFilesMonitorError, \
@@ -47,10 +48,11 @@ class TestSystemFilesUsageMonitor(TestCase):
 
     def test_perform_measurement(self):
         with _create_harness() as harness:
-            harness.exec.send_line = MagicMock(side_effect=[
-                '123 0 234',
-                '125 0 239',
-            ])
+            harness.exec.send_line = MagicMock(
+                side_effect=[
+                    sample_output(file_nr='123 0 234'),
+                    sample_output(file_nr='125 0 239'),
+                ])
             for _ in range(2):
                 request = harness.send_request(PERFORM_MEASUREMENT, MONITOR_ENDPOINT, data=None)
                 request.wait()[0].result()
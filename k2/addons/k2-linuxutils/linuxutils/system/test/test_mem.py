@@ -5,6 +5,7 @@ from zaf.builtin.unittest.harness import ComponentMock, ExtensionTestHarness
 from zaf.config.manager import ConfigManager
 
 from k2.sut import SUT
+from linuxutils.test.utils import sample_output
 from monitor import MONITOR_ENDPOINT, PERFORM_MEASUREMENT
 
 from ..mem import SYSTEM_MEMORY_USAGE_MONITOR_ENABLED, SystemMemoryMonitorError, \
@@ -82,10 +83,11 @@ class TestSystemMemoryUsageMonitor(TestCase):
     def test_perform_measurement(self):
         with _create_harness() as harness:
             harness.exec.send_line = MagicMock(
-                return_value=(
-                    'MemFree:               1 kB\n'
-                    'Buffers:               2 kB\n'
-                    'Cached:                3 kB\n'))
+                return_value=sample_output(
+                    meminfo=(
+                        'MemFree:               1 kB\n'
+                        'Buffers:               2 kB\n'
+                        'Cached:                3 kB\n')))
             request = harness.send_request(PERFORM_MEASUREMENT, MONITOR_ENDPOINT, data=None)
             request.wait()[0].result()
             harness.create_series_metric.assert_any_call('system.memory.free', 1)
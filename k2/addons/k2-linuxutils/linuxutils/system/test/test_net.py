@@ -7,6 +7,7 @@ from zaf.messages.message import EndpointId
 
 import linuxutils.system.net  # noqa
 from k2.sut import SUT, SUT_RESET_DONE
+from linuxutils.test.utils import sample_output
 from monitor import MONITOR_ENDPOINT, PERFORM_MEASUREMENT
 
 from ..net import SYSTEM_NETWORK_USAGE_MONITOR_ENABLED, SystemNetworkMonitorError, \
@@ -105,7 +106,7 @@ class TestSystemNetworkStatistics(TestCase):
 
     def test_collects_a_measurement_when_collect_is_called(self):
         self.collector.collect()
-        self.system_network_statisitcs_collector.collect.assert_called_with()
+        self.system_network_statisitcs_collector.collect.assert_called_with(sample=None)
 
     def test_collect_zero_measurement(self):
         data = self.collector.collect()
@@ -170,18 +171,20 @@ class TestProcNetworkUsageMonitor(TestCase):
         with _create_harness() as harness:
             harness.exec.send_line = MagicMock(
                 side_effect=[
-                    (
-                        'Inter-|   Receive                                                |  Transmit\n'
-                        ' face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n'
-                        '    lo: 10240            0    0    0    0     0          0         0  30720            0    0    0    0     0       0          0\n'
-                        '  eth0: 20480            0    0    0    0     0          0         0  20480            0    0    0    0     0       0          0'
-                    ),
-                    (
-                        'Inter-|   Receive                                                |  Transmit\n'
-                        ' face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n'
-                        '    lo: 20480            0    0    0    0     0          0         0  30720            0    0    0    0     0       0          0\n'
-                        '  eth0: 30720            0    0    0    0     0          0         0  51200            0    0    0    0     0       0          0'
-                    ),
+                    sample_output(
+                        net_dev=(
+                            'Inter-|   Receive                                                |  Transmit\n'
+                            ' face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n'
+                            '    lo: 10240            0    0    0    0     0          0         0  30720            0    0    0    0     0       0          0\n'
+                            '  eth0: 20480            0    0    0    0     0          0         0  20480            0    0    0    0     0       0          0'
+                        )),
+                    sample_output(
+                        net_dev=(
+                            'Inter-|   Receive                                                |  Transmit\n'
+                            ' face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n'
+                            '    lo: 20480            0    0    0    0     0          0         0  30720            0    0    0    0     0       0          0\n'
+                            '  eth0: 30720            0    0    0    0     0          0         0  51200            0    0    0    0     0       0          0'
+                        )),
                 ])
             with patch('linuxutils.system.net.time', new=MagicMock(side_effect=[10, 20])):
                 harness.send_request(PERFORM_MEASUREMENT, MONITOR_ENDPOINT, data=None)
@@ -0,0 +1,158 @@
+import subprocess
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import MagicMock, Mock
+
+from zaf.builtin.unittest.harness import ComponentMock
+from zaf.component.decorator import component, requires
+from zaf.component.factory import Factory
+from zaf.component.manager import ComponentManager, create_registry
+
+from ..sampler import PROCESSES_COMMAND, SYSTEM_COMMAND, ProcSampler, ProcSamplerError, \
+    parse_sample
+from .utils import sample_output
+
+SLEEP_STAT = '12 (sleep) S 1 12 12 0 -1 4194560 100 0 0 0 1 2 0 0 20 0 1 0 300 1000 50'
+KTHREAD_STAT = '2 (kworker/0:1 (x)) I 0 0 0 0 -1 69238880 0 0 0 0 0 0 0 0 20 0 1 0 3 0 0'
+
+
+class TestParseSample(TestCase):
+
+    def test_files_are_split_into_sections(self):
+        sample = parse_sample(
+            sample_output(stat='cpu  1 2 3 4', meminfo='MemFree: 1 kB\nCached: 2 kB'), False)
+        self.assertEqual(sample.stat, 'cpu  1 2 3 4')
+        self.assertEqual(sample.meminfo, 'MemFree: 1 kB\nCached: 2 kB')
+        self.assertEqual(sample.net_dev, '')
+        self.assertIsNone(sample.processes)
+
+    def test_processes_are_parsed_with_commands_like_ps(self):
+        sample = parse_sample(
+            sample_output(
+                processes=[
+                    (12, SLEEP_STAT, '1 2 3 4 5 6 7', 'sleep 10 '),
+                    (2, KTHREAD_STAT, '0 0 0 0 0 0 0', ''),
+                ]), True)
+        self.assertEqual(sample.commands(), [(12, 'sleep 10'), (2, '[kworker/0:1 (x)]')])
+        self.assertEqual(sample.processes[12].stat, SLEEP_STAT)
+        self.assertEqual(sample.processes[12].statm, '1 2 3 4 5 6 7')
+
+    def test_incomplete_processes_are_skipped(self):
+        data = sample_output(processes=[(12, SLEEP_STAT, '1 2 3 4 5 6 7', 'sleep 10')])
+        sample = parse_sample(data + '\n@@13\n' + SLEEP_STAT, True)
+        self.assertEqual(list(sample.processes), [12])
+
+    def test_processes_with_empty_statm_are_skipped(self):
+        data = sample_output(processes=[(12, SLEEP_STAT, '1 2 3 4 5 6 7', 'sleep 10')])
+        sample = parse_sample(data + '\n@@13\n' + SLEEP_STAT + '\n\nsleep 20', True)
+        self.assertEqual(list(sample.processes), [12])
+
+
+class TestProcSampler(TestCase):
+
+    def setUp(self):
+        self.exec = MagicMock()
+        self.exec.send_line.return_value = sample_output(
+            stat='cpu  1 2 3 4', processes=[(12, SLEEP_STAT, '1 2 3 4 5 6 7', 'sleep 10')])
+        self.sampler = ProcSampler(self.exec)
+
+    def message(self, data, entity='mysut'):
+        return Mock(data=data, entity=entity)
+
+    def test_processes_are_only_sampled_if_asked_for(self):
+        self.sampler.sample()
+        self.assertNotIn(PROCESSES_COMMAND, self.exec.send_line.call_args[0][0])
+        self.sampler.sample(include_processes=True)
+        self.assertIn(PROCESSES_COMMAND, self.exec.send_line.call_args[0][0])
+
+    def test_sample_is_shared_for_the_same_measurement(self):
+        first = self.sampler.sample(self.message(1), include_processes=True)
+        second = self.sampler.sample(self.message(1))
+        self.assertIs(first, second)
+        self.exec.send_line.assert_called_once()
+
+    def test_sample_is_not_shared_between_samplers(self):
+        self.sampler.sample(self.message(1))
+        ProcSampler(self.exec).sample(self.message(1))
+        self.assertEqual(self.exec.send_line.call_count, 2)
+
+    def test_sample_is_not_shared_between_measurements_or_suts(self):
+        self.sampler.sample(self.message(1))
+        self.sampler.sample(self.message(2))
+        self.sampler.sample(self.message(2, entity='othersut'))
+        self.assertEqual(self.exec.send_line.call_count, 3)
+
+    def test_sample_is_not_shared_without_measurement_data(self):
+        self.sampler.sample(self.message(None))
+        self.sampler.sample(self.message(None))
+        self.assertEqual(self.exec.send_line.call_count, 2)
+
+    def test_processes_are_sampled_if_shared_sample_is_without_processes(self):
+        self.sampler.sample(self.message(1))
+        sample = self.sampler.sample(self.message(1), include_processes=True)
+        self.assertEqual(list(sample.processes), [12])
+        self.assertIs(self.sampler.sample(self.message(1)), sample)
+        self.assertEqual(self.exec.send_line.call_count, 2)
+
+    def test_raises_sampler_error_if_exec_raises(self):
+        self.exec.send_line.side_effect = Exception('remote peer said no')
+        with self.assertRaisesRegex(ProcSamplerError, 'Could not collect /proc sample'):
+            self.sampler.sample()
+
+
+class TestSharedProcSampler(TestCase):
+
+    def test_monitors_on_different_dispatchers_share_the_sample_of_a_measurement(self):
+        exec = Mock()
+
+        def send_line(line, timeout):
+            time.sleep(0.1)
+            return sample_output(stat='cpu  1 2 3 4')
+
+        exec.send_line.side_effect = send_line
+        manager = ComponentManager(create_registry())
+        component(name='Exec', can=['telnet'])(ComponentMock('Exec', exec), manager)
+        manager.register_component(ProcSampler)
+        factory = Factory(manager)
+        session_scope = factory.enter_scope('session')
+        message = Mock(data=1, entity='mysut')
+        samples = []
+
+        @requires(sampler=ProcSampler, scope='session')
+        def monitor(message, sampler):
+            samples.append(sampler.sample(message))
+
+        # Like the monitors, that are called from their own dispatcher threads
+        threads = [
+            threading.Thread(
+                target=factory.call,
+                args=(
+                    monitor,
+                    factory.enter_scope(
+                        'message', factory.enter_scope('dispatcher', session_scope)), message))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(samples), 2)
+        self.assertIs(samples[0], samples[1])
+        exec.send_line.assert_called_once()
+
+
+class TestSampleCommand(TestCase):
+
+    def test_command_samples_the_local_proc_filesystem(self):
+        command = '{system}; {processes}'.format(
+            system=SYSTEM_COMMAND, processes=PROCESSES_COMMAND)
+        output = subprocess.run(
+            ['sh', '-c', command], stdout=subprocess.PIPE, universal_newlines=True).stdout
+        sample = parse_sample(output, True)
+        self.assertRegex(sample.stat, r'^cpu\s+\d+')
+        self.assertIn('MemFree:', sample.meminfo)
+        self.assertIn('lo:', sample.net_dev)
+        self.assertIn(1, sample.processes)
+        self.assertTrue(all(command for pid, command in sample.commands()))
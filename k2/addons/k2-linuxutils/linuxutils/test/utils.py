@@ -0,0 +1,14 @@
+def sample_output(stat='', meminfo='', net_dev='', file_nr='', processes=()):
+    """
+    Create the output of the ProcSampler command.
+
+    :param processes: (pid, stat, statm, cmdline) for each process
+    """
+    lines = []
+    for name, data in (('stat', stat), ('meminfo', meminfo), ('net/dev', net_dev),
+                       ('sys/fs/file-nr', file_nr)):
+        lines.append('@@{name}'.format(name=name))
+        lines.extend(data.splitlines())
+    for pid, stat, statm, cmdline in processes:
+        lines.extend(['@@{pid}'.format(pid=pid), stat, statm, cmdline])
+    return '\n'.join(lines)
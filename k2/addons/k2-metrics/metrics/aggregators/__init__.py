@@ -25,6 +25,14 @@ TARGET_VALUE = ConfigOptionId(
 SERIES_AGGREGATOR_TYPE = ConfigOptionId(
     name='type',
     description='Type of aggregator',
-    option_type=Choice(['min', 'max', 'average']),
+    option_type=Choice(['min', 'max', 'average', 'sum', 'median', 'percentile', 'rate']),
+    at=SERIES_AGGREGATOR_IDS,
+)
+
+SERIES_AGGREGATOR_PERCENTILE = ConfigOptionId(
+    name='percentile',
+    description='The percentile to calculate, between 0 and 100, used by the percentile type',
+    option_type=float,
+    default=95.0,
     at=SERIES_AGGREGATOR_IDS,
 )
@@ -1,5 +1,3 @@
-import functools
-import itertools
 import logging
 
 from zaf.component.decorator import requires
@@ -8,9 +6,10 @@ from zaf.extensions.extension import AbstractExtension, FrameworkExtension, get_
 from zaf.messages.decorator import callback_dispatcher
 
 from metrics import GENERATE_METRICS_AGGREGATE
-from metrics.metrics import FlatMetricsNamespaceDataView
+from metrics.metrics import MetricSeries
 
-from . import SERIES_AGGREGATOR_IDS, SERIES_AGGREGATOR_TYPE, SOURCE_SERIES, TARGET_VALUE
+from . import SERIES_AGGREGATOR_IDS, SERIES_AGGREGATOR_PERCENTILE, SERIES_AGGREGATOR_TYPE, \
+    SOURCE_SERIES, TARGET_VALUE
 from ..messages import collect_metrics
 
 logger = logging.getLogger(get_logger_name('k2', 'metrics', 'aggregators', 'series'))
@@ -24,6 +23,7 @@ logger.addHandler(logging.NullHandler())
         ConfigOption(SOURCE_SERIES, required=True),
         ConfigOption(TARGET_VALUE, required=True),
         ConfigOption(SERIES_AGGREGATOR_TYPE, required=True),
+        ConfigOption(SERIES_AGGREGATOR_PERCENTILE, required=False),
     ],
     groups=['metrics'],
 )
@@ -35,6 +35,13 @@ class MetricsSeriesAggregator(AbstractExtension):
     * The minimum value of the series
     * The maximum value of the series
     * The average value of the series
+    * The sum of the series
+    * The median value of the series
+    * A percentile of the series
+    * The average rate of change per second of the series
+
+    If the source namespaces contain multiple series they are aggregated together.
+    Rates are calculated for each series separately, before they are aggregated.
 
     The resulting value is stored as a single value metric.
     If no aggregate can be produced, no result is stored.
@@ -45,27 +52,35 @@ class MetricsSeriesAggregator(AbstractExtension):
         self._source_series = config.get(SOURCE_SERIES)
         self._target_value = config.get(TARGET_VALUE)
         self._type = config.get(SERIES_AGGREGATOR_TYPE)
+        self._percentile = config.get(SERIES_AGGREGATOR_PERCENTILE)
 
     @callback_dispatcher([GENERATE_METRICS_AGGREGATE], optional=True)
     @requires(messagebus='MessageBus')
     @requires(create_single_value_metric='CreateSingleValueMetric')
     def handle_generate_metrics_report(self, message, messagebus, create_single_value_metric):
-        for series in self._source_series:
-            values = FlatMetricsNamespaceDataView(self._get_namespace(messagebus,
-                                                                      series)).get_data().values()
         operator = {
-            'min': functools.partial(self._aggregate, min),
-            'max': functools.partial(self._aggregate, max),
-            'average': functools.partial(self._aggregate, lambda seq: sum(seq) / len(seq))
+            'min': MetricSeries.min,
+            'max': MetricSeries.max,
+            'average': MetricSeries.mean,
+            'sum': MetricSeries.sum,
+            'median': lambda series: series.percentile(50),
+            'percentile': lambda series: series.percentile(self._percentile),
+            'rate': MetricSeries.mean,
         }[self._type]
-        value = operator(values)
-        if value:
+        value = self._aggregate(operator, messagebus)
+        if value is not None:
             create_single_value_metric(self._target_value, value)
 
-    def _aggregate(self, operator, seqs):
+    def _aggregate(self, operator, messagebus):
         try:
-            return operator(list(itertools.chain.from_iterable(seqs)))
-        except ValueError:
+            series = [
+                leaf.series for source_series in self._source_series
+                for leaf in self._get_namespace(messagebus, source_series).leaves()
+            ]
+            if self._type == 'rate':
+                series = [s.rates() for s in series]
+            return operator(MetricSeries.concatenate(series))
+        except (TypeError, ValueError):
             msg = 'Could not aggregate series: {series}'.format(series=self._source_series)
             logger.debug(msg, exc_info=True)
             logger.error(msg)
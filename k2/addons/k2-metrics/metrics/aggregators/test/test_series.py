@@ -7,17 +7,19 @@ from zaf.config.manager import ConfigManager
 from metrics import GENERATE_METRICS_AGGREGATE, METRICS_ENDPOINT
 
 from ...metrics import Metric, MetricsNamespace
-from ..series import SERIES_AGGREGATOR_IDS, SERIES_AGGREGATOR_TYPE, SOURCE_SERIES, TARGET_VALUE, \
-    MetricsSeriesAggregator
+from ..series import SERIES_AGGREGATOR_IDS, SERIES_AGGREGATOR_PERCENTILE, SERIES_AGGREGATOR_TYPE, \
+    SOURCE_SERIES, TARGET_VALUE, MetricsSeriesAggregator
 
 
 class TestMetricsSeriesAggregator(TestCase):
 
     @staticmethod
-    def _create_harness(source_series, target_value, type):
+    def _create_harness(source_series, target_value, type, percentile=None):
         config = ConfigManager()
         entity = 'myaggregator'
         config.set(SERIES_AGGREGATOR_IDS, [entity])
+        if percentile is not None:
+            config.set(SERIES_AGGREGATOR_PERCENTILE, percentile, entity=entity)
         config.set(SOURCE_SERIES, source_series, entity=entity)
         config.set(TARGET_VALUE, target_value, entity=entity)
         config.set(SERIES_AGGREGATOR_TYPE, type, entity=entity)
@@ -205,3 +207,81 @@ class TestMetricsSeriesAggregator(TestCase):
             harness.messagebus.send_request(GENERATE_METRICS_AGGREGATE)
 
         harness.create_single_value_metric.assert_called_once_with('data.stats.average', 5)
+
+    def test_minimum_aggregate_of_zero_is_stored(self):
+        namespace = MetricsNamespace()
+        namespace.data.values.store_series(Metric(1, 0))
+
+        with TestMetricsSeriesAggregator._create_harness(source_series=['data.values'],
+                                                         target_value='data.stats.minimum',
+                                                         type='min') as harness:
+            harness.extension._get_namespace = lambda a, b: namespace.data.values
+            harness.messagebus.send_request(GENERATE_METRICS_AGGREGATE)
+
+        harness.create_single_value_metric.assert_called_once_with('data.stats.minimum', 0)
+
+    def test_sum_aggregate_multiple_series(self):
+        namespace = MetricsNamespace()
+        namespace.data.some_values.store_series(Metric(1, 2))
+        namespace.data.some_values.store_series(Metric(1, 3))
+        namespace.data.some_other_values.store_series(Metric(1, 7.5))
+
+        with TestMetricsSeriesAggregator._create_harness(
+                source_series=['data'], target_value='data.stats.sum', type='sum') as harness:
+            harness.extension._get_namespace = lambda a, b: namespace.data
+            harness.messagebus.send_request(GENERATE_METRICS_AGGREGATE)
+
+        harness.create_single_value_metric.assert_called_once_with('data.stats.sum', 12.5)
+
+    def test_median_aggregate(self):
+        namespace = MetricsNamespace()
+        for value in [5, 1, 100, 3, 2]:
+            namespace.data.values.store_series(Metric(1, value))
+
+        with TestMetricsSeriesAggregator._create_harness(source_series=['data.values'],
+                                                         target_value='data.stats.median',
+                                                         type='median') as harness:
+            harness.extension._get_namespace = lambda a, b: namespace.data.values
+            harness.messagebus.send_request(GENERATE_METRICS_AGGREGATE)
+
+        harness.create_single_value_metric.assert_called_once_with('data.stats.median', 3)
+
+    def test_percentile_aggregate(self):
+        namespace = MetricsNamespace()
+        for value in range(101):
+            namespace.data.values.store_series(Metric(1, value))
+
+        with TestMetricsSeriesAggregator._create_harness(source_series=['data.values'],
+                                                         target_value='data.stats.p90',
+                                                         type='percentile',
+                                                         percentile=90) as harness:
+            harness.extension._get_namespace = lambda a, b: namespace.data.values
+            harness.messagebus.send_request(GENERATE_METRICS_AGGREGATE)
+
+        harness.create_single_value_metric.assert_called_once_with('data.stats.p90', 90)
+
+    def test_rate_aggregate_is_calculated_for_each_series(self):
+        namespace = MetricsNamespace()
+        namespace.data.some_values.store_series(Metric(0, 0))
+        namespace.data.some_values.store_series(Metric(2, 4))
+        namespace.data.some_other_values.store_series(Metric(1, 100))
+        namespace.data.some_other_values.store_series(Metric(2, 104))
+
+        with TestMetricsSeriesAggregator._create_harness(
+                source_series=['data'], target_value='data.stats.rate', type='rate') as harness:
+            harness.extension._get_namespace = lambda a, b: namespace.data
+            harness.messagebus.send_request(GENERATE_METRICS_AGGREGATE)
+
+        harness.create_single_value_metric.assert_called_once_with('data.stats.rate', 3)
+
+    def test_aggregate_of_values_that_are_not_numbers_is_not_stored(self):
+        namespace = MetricsNamespace()
+        namespace.data.values.store_series(Metric(1, 'a'))
+
+        with TestMetricsSeriesAggregator._create_harness(source_series=['data.values'],
+                                                         target_value='data.stats.average',
+                                                         type='average') as harness:
+            harness.extension._get_namespace = lambda a, b: namespace.data.values
+            harness.messagebus.send_request(GENERATE_METRICS_AGGREGATE)
+
+        harness.create_single_value_metric.assert_not_called()
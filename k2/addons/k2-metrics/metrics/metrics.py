@@ -51,8 +51,11 @@ stored metrics to the metric's log when the extension is destroyed.
 """
 
 import logging
+import numbers
 import re
+from array import array
 from collections import OrderedDict
+from decimal import Decimal
 from operator import attrgetter
 from pprint import saferepr
 
@@ -99,6 +102,235 @@ class Metric(DataDefinition):
             timestamp=self.timestamp, data=self.data, tags=self.tags)
 
 
+def _is_number(value):
+    return isinstance(value, (numbers.Real, Decimal)) and not isinstance(value, bool)
+
+
+class _Column(object):
+    """
+    A column of values in a MetricSeries.
+
+    The values are stored in a typed array as long as they are all integers, or all
+    real numbers, for example numpy scalars and Decimals. Booleans are not numbers here.
+    If any other value is stored the column falls back to a list.
+    """
+
+    def __init__(self):
+        self._values = array('q')
+
+    @property
+    def values(self):
+        return self._values
+
+    @property
+    def is_numeric(self):
+        return isinstance(self._values, array)
+
+    def append(self, value):
+        if isinstance(self._values, array):
+            if not _is_number(value):
+                self._values = self._values.tolist()
+            else:
+                if self._values.typecode == 'q' and not isinstance(value, numbers.Integral):
+                    self._values = array('d', self._values)
+                try:
+                    self._values.append(value)
+                    return
+                except OverflowError:
+                    self._values = self._values.tolist()
+        self._values.append(value)
+
+    def extend(self, values):
+        if isinstance(self._values, array) and isinstance(values, array):
+            if values.typecode == 'd' and self._values.typecode == 'q':
+                self._values = array('d', self._values)
+            if values.typecode == self._values.typecode:
+                self._values.extend(values)
+            else:
+                self._values.fromlist(values.tolist())
+        else:
+            for value in values:
+                self.append(value)
+
+    def as_numpy(self):
+        import numpy
+
+        if not self.is_numeric:
+            raise TypeError('Series contains values that are not numbers')
+        return numpy.array(self._values)
+
+
+class MetricSeries(object):
+    """
+    Columnar storage for the metrics in a series.
+
+    Timestamps and data are stored in separate columns, typed arrays when all
+    values are numbers, and each distinct collection of tags is only stored once.
+    Metric instances are only created when the series is iterated over.
+
+    The aggregations operate on whole columns and require that the data, and for
+    rates and downsampling the timestamps, are numbers. The aggregations of an
+    empty series are None.
+    """
+
+    def __init__(self):
+        self._timestamps = _Column()
+        self._data = _Column()
+        self._tags = array('l')
+        self._interned_tags = [None]
+        self._tag_indices = {None: 0}
+
+    @classmethod
+    def from_columns(cls, timestamps, data):
+        series = cls()
+        for timestamp, value in zip(timestamps, data):
+            series._timestamps.append(timestamp)
+            series._data.append(value)
+            series._tags.append(0)
+        return series
+
+    @classmethod
+    def concatenate(cls, series_list):
+        """Create a series with the metrics of all the given series, one series after another."""
+        result = cls()
+        for series in series_list:
+            tag_indices = [result._intern_tags(tags) for tags in series._interned_tags]
+            result._timestamps.extend(series.timestamps)
+            result._data.extend(series.data)
+            result._tags.extend(tag_indices[tag_index] for tag_index in series._tags)
+        return result
+
+    @property
+    def timestamps(self):
+        """The timestamps of the series, an array or list that must not be modified."""
+        return self._timestamps.values
+
+    @property
+    def data(self):
+        """The data of the series, an array or list that must not be modified."""
+        return self._data.values
+
+    def append(self, metric):
+        self._timestamps.append(metric.timestamp)
+        self._data.append(metric.data)
+        self._tags.append(
+            self._intern_tags(tuple(metric.tags) if metric.tags is not None else None))
+
+    def __len__(self):
+        return len(self._tags)
+
+    def __getitem__(self, index):
+        return Metric(self.timestamps[index], self.data[index], self._get_tags(self._tags[index]))
+
+    def __iter__(self):
+        for timestamp, data, tag_index in zip(self.timestamps, self.data, self._tags):
+            yield Metric(timestamp, data, self._get_tags(tag_index))
+
+    def get_data(self):
+        return [
+            OrderedDict(
+                [('timestamp', timestamp), ('data', data), ('tags', self._get_tags(tag_index))])
+            for timestamp, data, tag_index in zip(self.timestamps, self.data, self._tags)
+        ]
+
+    def min(self):
+        return self._aggregate(lambda values: values.min())
+
+    def max(self):
+        return self._aggregate(lambda values: values.max())
+
+    def sum(self):
+        return self._aggregate(lambda values: values.sum())
+
+    def mean(self):
+        return self._aggregate(lambda values: values.mean())
+
+    def percentile(self, percent):
+        """
+        Get a percentile of the data, interpolating between the closest values.
+
+        :param percent: the percentile to get, between 0 and 100
+        """
+        import numpy
+        return self._aggregate(lambda values: numpy.percentile(values, percent))
+
+    def rates(self):
+        """
+        Get the rate of change per second between each pair of consecutive metrics.
+
+        Pairs with the same timestamp are skipped.
+
+        :return: a MetricSeries with the rates at the timestamp of the later metric in each pair
+        """
+        import numpy
+
+        timestamps = self._timestamps.as_numpy()
+        data = self._data.as_numpy()
+        elapsed = numpy.diff(timestamps)
+        changed = elapsed != 0
+        rates = numpy.diff(data)[changed] / elapsed[changed]
+        return MetricSeries.from_columns(timestamps[1:][changed].tolist(), rates.tolist())
+
+    def downsample(self, interval, aggregate='mean'):
+        """
+        Combine the metrics in each interval of time into one metric.
+
+        :param interval: the length of the intervals, in the unit of the timestamps
+        :param aggregate: how to combine the data in an interval, one of 'mean', 'min',
+                          'max', 'sum' and 'count'
+        :return: a MetricSeries with one metric for each interval that contains any metrics,
+                 with the timestamp of the start of the interval
+        """
+        import numpy
+
+        if interval <= 0:
+            raise ValueError('Downsampling interval must be positive')
+        if len(self) == 0:
+            return MetricSeries()
+
+        timestamps = self._timestamps.as_numpy()
+        data = self._data.as_numpy()
+        if numpy.any(numpy.diff(timestamps) < 0):
+            order = numpy.argsort(timestamps, kind='stable')
+            timestamps = timestamps[order]
+            data = data[order]
+
+        buckets = numpy.floor((timestamps - timestamps[0]) / interval).astype(numpy.int64)
+        starts = numpy.concatenate(([0], numpy.flatnonzero(numpy.diff(buckets)) + 1))
+        counts = numpy.diff(numpy.append(starts, len(buckets)))
+        if aggregate == 'mean':
+            values = numpy.add.reduceat(data, starts) / counts
+        elif aggregate == 'min':
+            values = numpy.minimum.reduceat(data, starts)
+        elif aggregate == 'max':
+            values = numpy.maximum.reduceat(data, starts)
+        elif aggregate == 'sum':
+            values = numpy.add.reduceat(data, starts)
+        elif aggregate == 'count':
+            values = counts
+        else:
+            raise ValueError('Unknown aggregate: {aggregate}'.format(aggregate=aggregate))
+        return MetricSeries.from_columns(
+            (timestamps[0] + buckets[starts] * interval).tolist(), values.tolist())
+
+    def _aggregate(self, operator):
+        if len(self) == 0:
+            return None
+        return operator(self._data.as_numpy()).item()
+
+    def _intern_tags(self, tags):
+        tag_index = self._tag_indices.get(tags)
+        if tag_index is None:
+            tag_index = len(self._interned_tags)
+            self._interned_tags.append(tags)
+            self._tag_indices[tags] = tag_index
+        return tag_index
+
+    def _get_tags(self, tag_index):
+        tags = self._interned_tags[tag_index]
+        return list(tags) if tags is not None else None
+
+
 class MetricsNamespace(DataDefinition):
     """
     Storage for a collection of related metrics.
@@ -127,7 +359,8 @@ class MetricsNamespace(DataDefinition):
     named "system_memory" and two leafs, "used" and "free". Only leaf nodes may
     contain metrics.
 
-    Metrics are stored either as a series or as single-value.
+    Metrics are stored either as a series or as single-value. Series are stored
+    in a MetricSeries.
     """
 
     def __init__(self, parent=None, name=None):
@@ -148,6 +381,39 @@ class MetricsNamespace(DataDefinition):
     def name(self):
         return self._name
 
+    @property
+    def qualified_name(self):
+        names = []
+        node = self
+        while node is not None and node._name is not None:
+            names.append(node._name)
+            node = node._parent
+        return '.'.join(reversed(names))
+
+    @property
+    def series(self):
+        """
+        The metrics stored in this namespace as a MetricSeries.
+
+        A single-value metric gives a series with one metric and a namespace
+        without metrics gives an empty series.
+        """
+        if isinstance(self._metrics, MetricSeries):
+            return self._metrics
+        series = MetricSeries()
+        if self._metrics is not None:
+            series.append(self._metrics)
+        return series
+
+    def leaves(self):
+        """Yield all leaf namespaces that contain metrics, in the order they were created."""
+        if self.is_leaf:
+            if self._metrics is not None:
+                yield self
+        else:
+            for child in self._children.values():
+                yield from child.leaves()
+
     def __getattr__(self, name):
         if name not in self._children:
             namespace = MetricsNamespace(self, name)
@@ -177,9 +443,9 @@ class MetricsNamespace(DataDefinition):
         """
         Store a metric that is part of a series.
 
-        Metrics that are part of a series are contained in a list. The list is
-        created when the first metric in the series is stored. Subsequent metrics
-        are appended to the list.
+        Metrics that are part of a series are contained in a MetricSeries. The
+        series is created when the first metric in the series is stored.
+        Subsequent metrics are appended to the series.
 
         :param value: The Metric instance to store.
         """
@@ -187,7 +453,7 @@ class MetricsNamespace(DataDefinition):
             raise ValueError('Will not override single-value metric with a series')
         self._raise_if_not_leaf()
         if self._metrics is None:
-            self._metrics = []
+            self._metrics = MetricSeries()
         self._metrics.append(value)
 
     def store_single(self, value):
@@ -207,7 +473,11 @@ class MetricsNamespace(DataDefinition):
     def get_data(self):
         if not self.is_leaf:
             return OrderedDict(map(lambda child: (child._name, child.get_data()), self))
-        data = [data.get_data() for data in self]
+        if self._metrics is None:
+            return []
+        if self._is_single_value():
+            return self._metrics.get_data()
+        data = self._metrics.get_data()
         return data[0] if len(data) == 1 else data
 
     def _raise_if_not_leaf(self):
@@ -250,42 +520,17 @@ class FlatMetricsNamespaceDataView(DataDefinition):
         self._rename_to = rename_to
 
     def get_data(self):
-        import pandas
-
-        flat_data = pandas.json_normalize(self._namespace.get_data()).to_dict(orient='list')
-        flat_data = self._extend_keys_with_qualified_name(flat_data)
-
-        if self._key_filter is not None:
-            flat_data = {k: v for k, v in flat_data.items() if self._key_filter(k)}
-
-        flat_data = self._rename_keys(flat_data, self._rename_regex, self._rename_to)
-
-        # Single-value metrics are stored as {'namespace.nested_namespace.data': data}
-        result = {k.replace('.data', ''): v for k, v in flat_data.items() if k.endswith('.data')}
-
-        # Series metrics are stored as {'namespace.nested_namespace.data': [data1, data2, ...]}
-        result.update(
-            {
-                k: list(map(lambda metric: metric['data'], v[0]))
-                for k, v in flat_data.items() if isinstance(v[0], list)
-            })
+        result = {}
+        for leaf in self._namespace.leaves():
+            key = leaf.qualified_name
+            if self._key_filter is not None and not self._key_filter(key):
+                continue
+            if self._rename_regex is not None:
+                key = self._rename_regex.sub(self._rename_to, key)
+            result[key] = list(leaf.series.data)
 
         return OrderedDict(sorted(result.items(), key=lambda t: t[0]))
 
-    def _extend_keys_with_qualified_name(self, data):
-        node = self._namespace
-        prefix = ''
-        while node is not None and node._name is not None:
-            prefix = '.'.join((node._name, prefix))
-            node = node._parent
-        return {prefix + k: v for k, v in data.items()}
-
-    def _rename_keys(self, data, rename_regex, rename_to):
-        if rename_regex is not None:
-            return {rename_regex.sub(rename_to, k): v for k, v in data.items()}
-        else:
-            return data
-
 
 @FrameworkExtension(
     name='metrics',
@@ -82,6 +82,15 @@ GRAPH_HEIGHT = ConfigOptionId(
     option_type=int,
     at=GRAPH_REPORTER_ID)
 
+GRAPH_MAX_POINTS = ConfigOptionId(
+    name='maxpoints',
+    description=(
+        'Maximum number of points to plot for each series, '
+        'longer series are downsampled to the mean of evenly sized intervals'),
+    default=None,
+    option_type=int,
+    at=GRAPH_REPORTER_ID)
+
 
 @FrameworkExtension(
     name='metrics',
@@ -96,6 +105,7 @@ GRAPH_HEIGHT = ConfigOptionId(
         ConfigOption(GRAPH_YMAX, required=False),
         ConfigOption(GRAPH_WIDTH, required=False),
         ConfigOption(GRAPH_HEIGHT, required=False),
+        ConfigOption(GRAPH_MAX_POINTS, required=False),
     ],
     groups=['metrics'],
 )
@@ -113,6 +123,7 @@ class MetricsGraphReporter(AbstractMetricsReportExtension):
         self.ymax = config.get(GRAPH_YMAX)
         self.width = config.get(GRAPH_WIDTH)
         self.height = config.get(GRAPH_HEIGHT)
+        self.max_points = config.get(GRAPH_MAX_POINTS)
 
     def __str__(self):
         return 'MetricsGraphReporter({namespaces}) -> {filename}'.format(
@@ -129,8 +140,8 @@ class MetricsGraphReporter(AbstractMetricsReportExtension):
 
         self.bbox_extra_artists = []
         self.figure, self.axes = matplotlib.pyplot.subplots()
-        for data_frame in self._get_data_frames():
-            self._plot_from_data_frame(data_frame)
+        for label, series in self._get_series():
+            self._plot_series(label, series)
         self._resize_to_desired_resolution()
         self._adjust_axes()
         self._add_timestamp_formatting()
@@ -173,34 +184,37 @@ class MetricsGraphReporter(AbstractMetricsReportExtension):
             bbox_extra_artists=self.bbox_extra_artists,
             bbox_inches='tight')
 
-    def _plot_from_data_frame(self, data_frame):
-        plot = data_frame.plot.line(
-            ax=self.axes,
-            x=data_frame.columns[0],
-            y=data_frame.columns[1],
-            title=self.title,
-            legend=True)
-        plot.set_ylabel(self.ylabel)
-        plot.set_xlabel('')
-        legend = plot.legend(loc='upper left', bbox_to_anchor=(1.0, 0.5))
+    def _plot_series(self, label, series):
+        self.axes.plot(series.timestamps, series.data, label=label)
+        self.axes.set_title(self.title)
+        self.axes.set_ylabel(self.ylabel)
+        self.axes.set_xlabel('')
+        legend = self.axes.legend(loc='upper left', bbox_to_anchor=(1.0, 0.5))
         self.bbox_extra_artists.append(legend)
 
-    def _get_data_frames(self):
-        import pandas
-        data_frames = []
+    def _get_series(self):
+        result = []
         namespaces = self._get_namespaces()
 
         # The namespaces are sorted so that the labels retain the same order
         # and coloring each time they are generated.
         for namespace in sorted(namespaces):
-            metrics = namespaces[namespace].get_data()
-            if not metrics:
+            series = namespaces[namespace].series
+            if len(series) == 0:
                 continue
-            data_frame = pandas.DataFrame(metrics, columns=['timestamp', 'data'])
-            data_frame.columns = ['timestamp', namespace]
-            data_frames.append(data_frame)
+            result.append((namespace, self._downsample(series)))
+
+        return result
 
-        return data_frames
+    def _downsample(self, series):
+        if self.max_points is None or len(series) <= self.max_points:
+            return series
+        span = max(series.timestamps) - min(series.timestamps)
+        if span <= 0:
+            return series
+        # The interval is rounded up slightly so that the last metric doesn't end up
+        # in an interval of its own.
+        return series.downsample(span / self.max_points * (1 + 1e-9))
 
     def _get_namespaces(self):
 
@@ -7,8 +7,8 @@ from metrics import GENERATE_METRICS_REPORT, METRICS_ENDPOINT
 from metrics.reporters.graph import GRAPH_DIRECTORY
 
 from ...metrics import Metric, MetricsNamespace
-from ..graph import GRAPH_FILENAME, GRAPH_NAMESPACE, GRAPH_REPORTER_ID, GRAPH_TITLE, GRAPH_YLABEL, \
-    GRAPH_YMAX, GRAPH_YMIN, MetricsGraphReporter
+from ..graph import GRAPH_FILENAME, GRAPH_MAX_POINTS, GRAPH_NAMESPACE, GRAPH_REPORTER_ID, \
+    GRAPH_TITLE, GRAPH_YLABEL, GRAPH_YMAX, GRAPH_YMIN, MetricsGraphReporter
 
 
 class TestMetricsGraphReporter(TestCase):
@@ -40,8 +40,30 @@ class TestMetricsGraphReporter(TestCase):
             harness.trigger_event(GENERATE_METRICS_REPORT, METRICS_ENDPOINT, data=None)
             harness.messagebus.wait_for_not_active()
 
+    def test_series_are_not_downsampled_by_default(self):
+        namespace = MetricsNamespace()
+        for i in range(100):
+            namespace.values.store_series(Metric(i, i))
+
+        with _create_harness() as harness:
+            harness.extension._get_namespaces = lambda: {'values': namespace.values}
+            [(label, series)] = harness.extension._get_series()
+            assert label == 'values'
+            assert len(series) == 100
+
+    def test_long_series_are_downsampled_to_max_points(self):
+        namespace = MetricsNamespace()
+        for i in range(101):
+            namespace.values.store_series(Metric(i, i))
+
+        with _create_harness(max_points=10) as harness:
+            harness.extension._get_namespaces = lambda: {'values': namespace.values}
+            [(label, series)] = harness.extension._get_series()
+            assert len(series) == 10
+            assert series.data[0] == 5
+
 
-def _create_harness():
+def _create_harness(max_points=None):
     config = ConfigManager()
     entity = 'mygraphreporter'
     config.set(GRAPH_REPORTER_ID, [entity])
@@ -52,6 +74,8 @@ def _create_harness():
     config.set(GRAPH_YLABEL, 'my_graph_ylabel', entity=entity)
     config.set(GRAPH_YMIN, 1.0, entity=entity)
     config.set(GRAPH_YMAX, 2.0, entity=entity)
+    if max_points is not None:
+        config.set(GRAPH_MAX_POINTS, max_points, entity=entity)
 
     return ExtensionTestHarness(
         MetricsGraphReporter,
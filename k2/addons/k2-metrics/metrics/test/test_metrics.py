@@ -1,4 +1,5 @@
 import re
+from decimal import Decimal
 from unittest import TestCase
 from unittest.mock import ANY, patch
 
@@ -7,7 +8,7 @@ from zaf.config.manager import ConfigManager
 
 from ..messages import collect_metrics, create_series_metric, create_single_value_metric
 from ..metrics import CREATE_METRIC, METRICS_ENDPOINT, WRITE_TO_LOG_ON_EXIT, \
-    FlatMetricsNamespaceDataView, Metric, Metrics, MetricsNamespace
+    FlatMetricsNamespaceDataView, Metric, Metrics, MetricSeries, MetricsNamespace
 
 
 class TestMetric(TestCase):
@@ -28,6 +29,100 @@ class TestMetric(TestCase):
             Metric(ANY, ANY, non_iterable)
 
 
+class TestMetricSeries(TestCase):
+
+    def setUp(self):
+        self.series = MetricSeries()
+
+    def store(self, *metrics):
+        for timestamp, data in metrics:
+            self.series.append(Metric(timestamp, data))
+
+    def test_metrics_are_materialized_when_iterated(self):
+        self.series.append(Metric(1, 10, ['a_tag']))
+        self.series.append(Metric(2, 20))
+        assert [Metric(1, 10, ['a_tag']), Metric(2, 20)] == list(self.series)
+        assert Metric(2, 20) == self.series[-1]
+
+    def test_integers_and_floats_are_stored_in_typed_arrays(self):
+        self.store((1, 10))
+        assert self.series.data.typecode == 'q'
+        self.store((2, 10.5))
+        assert self.series.data.typecode == 'd'
+        assert [10, 10.5] == list(self.series.data)
+
+    def test_numpy_scalars_and_decimals_are_stored_in_typed_arrays(self):
+        import numpy
+
+        self.store((1, numpy.int64(4)), (2, numpy.int32(2)))
+        assert self.series.data.typecode == 'q'
+        self.store((3, numpy.float64(1.5)), (4, Decimal('0.5')))
+        assert self.series.data.typecode == 'd'
+        assert 8 == self.series.sum()
+        assert 2 == self.series.mean()
+
+    def test_other_values_are_stored_in_a_list(self):
+        self.store((1, 10), (2, 'a'), (3, True), (4, 2**70))
+        assert [10, 'a', True, 2**70] == self.series.data
+
+    def test_tags_are_interned(self):
+        for i in range(3):
+            self.series.append(Metric(i, i, ['a_tag']))
+        assert 2 == len(self.series._interned_tags)
+        assert [['a_tag']] * 3 == [metric.tags for metric in self.series]
+
+    def test_get_data(self):
+        self.series.append(Metric(1, 10, ['a_tag']))
+        assert [{'timestamp': 1, 'data': 10, 'tags': ['a_tag']}] == self.series.get_data()
+
+    def test_aggregations(self):
+        self.store((1, 4), (2, 1), (3, 3), (4, 2))
+        assert 1 == self.series.min()
+        assert 4 == self.series.max()
+        assert 10 == self.series.sum()
+        assert 2.5 == self.series.mean()
+        assert 2.5 == self.series.percentile(50)
+        assert 4 == self.series.percentile(100)
+
+    def test_aggregations_of_empty_series_are_none(self):
+        assert self.series.min() is None
+        assert self.series.percentile(95) is None
+
+    def test_aggregations_raise_type_error_for_values_that_are_not_numbers(self):
+        self.store((1, 'a'))
+        with self.assertRaises(TypeError):
+            self.series.mean()
+
+    def test_rates_are_per_second_and_skip_repeated_timestamps(self):
+        self.store((0, 0), (2, 10), (2, 12), (4, 12))
+        rates = self.series.rates()
+        assert [2, 4] == list(rates.timestamps)
+        assert [5, 0] == list(rates.data)
+
+    def test_downsample(self):
+        self.store((10, 1), (11, 3), (12, 5), (15, 7), (14, 9))
+        downsampled = self.series.downsample(2)
+        assert [10, 12, 14] == list(downsampled.timestamps)
+        assert [2, 5, 8] == list(downsampled.data)
+        assert [3, 5, 9] == list(self.series.downsample(2, 'max').data)
+        assert [2, 1, 2] == list(self.series.downsample(2, 'count').data)
+
+    def test_downsample_raises_value_error_for_unknown_aggregate(self):
+        self.store((1, 1))
+        with self.assertRaises(ValueError):
+            self.series.downsample(1, 'mode')
+
+    def test_concatenate(self):
+        self.series.append(Metric(1, 1, ['a_tag']))
+        other = MetricSeries()
+        other.append(Metric(2, 2.5, ['another_tag']))
+        other.append(Metric(3, 3, ['a_tag']))
+        concatenated = MetricSeries.concatenate([self.series, other])
+        assert [Metric(1, 1, ['a_tag']), Metric(2, 2.5, ['another_tag']),
+                Metric(3, 3, ['a_tag'])] == list(concatenated)
+        assert 'd' == concatenated.data.typecode
+
+
 class TestMetricsNamespace(TestCase):
 
     def setUp(self):
@@ -119,6 +214,31 @@ class TestMetricsNamespace(TestCase):
         assert len(self.mn.a.b.c.children) == 0
         assert len(self.mn.a.b.d.children) == 0
 
+    def test_leaves_and_qualified_names(self):
+        self.mn.a.b.c.store_single(Metric(1, 'a'))
+        self.mn.a.d.store_series(Metric(2, 'b'))
+        self.mn.a.e
+        assert ['a.b.c', 'a.d'] == [leaf.qualified_name for leaf in self.mn.a.leaves()]
+
+    def test_series(self):
+        self.mn.a.store_single(Metric(1, 'a'))
+        self.mn.b.store_series(Metric(2, 'b'))
+        assert [Metric(1, 'a')] == list(self.mn.a.series)
+        assert [Metric(2, 'b')] == list(self.mn.b.series)
+        assert 0 == len(self.mn.c.series)
+
+    def test_get_data(self):
+        self.mn.a.b.store_single(Metric(1, 'a'))
+        self.mn.a.c.store_series(Metric(2, 'b'))
+        self.mn.a.c.store_series(Metric(3, 'c'))
+        assert {
+            'b': {'timestamp': 1, 'data': 'a', 'tags': None},
+            'c': [
+                {'timestamp': 2, 'data': 'b', 'tags': None},
+                {'timestamp': 3, 'data': 'c', 'tags': None},
+            ]
+        } == self.mn.a.get_data()
+
 
 class TestFlatMetricsNamespaceDataView(TestCase):
 
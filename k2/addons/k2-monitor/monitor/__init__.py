@@ -8,5 +8,6 @@ PERFORM_MEASUREMENT = MessageId(
     'PERFORM_MEASUREMENT', """
     Request that a monitor performs its measurements.
 
-    data: None
+    data: The number of the measurement, counting from 1. Monitors that handle the
+          same request can use it to share data collected for the measurement.
     """)
@@ -9,6 +9,7 @@ The results of each measurement are sent to the metrics addon.
 
 import functools
 import logging
+import random
 import threading
 
 from zaf.component.decorator import requires
@@ -22,6 +23,7 @@ from k2.runner import TEST_RUN_FINISHED, TEST_RUN_STARTED
 from k2.sut import SUT, SUT_RESET_DONE, SUT_RESET_EXPECTED, SUT_RESET_NOT_EXPECTED, \
     SUT_RESET_STARTED
 from monitor import MONITOR_ENDPOINT, PERFORM_MEASUREMENT
+from monitor.scheduler import measurement_scheduler
 
 logger = logging.getLogger(get_logger_name('k2', 'monitor'))
 logger.addHandler(logging.NullHandler())
@@ -36,6 +38,13 @@ MONITOR_INTERVAL = ConfigOptionId(
     option_type=float,
     default=5.0)
 
+MONITOR_JITTER = ConfigOptionId(
+    'monitors.jitter',
+    'The largest part of the interval that the first measurement is randomly delayed by',
+    at=SUT,
+    option_type=float,
+    default=0.1)
+
 
 @CommandExtension(
     name='monitor',
@@ -43,7 +52,8 @@ MONITOR_INTERVAL = ConfigOptionId(
     config_options=[
         ConfigOption(SUT, required=True, instantiate_on=True),
         ConfigOption(MONITOR_ENABLED, required=True),
-        ConfigOption(MONITOR_INTERVAL, required=True)
+        ConfigOption(MONITOR_INTERVAL, required=True),
+        ConfigOption(MONITOR_JITTER, required=True),
     ],
     endpoints_and_messages={
         MONITOR_ENDPOINT: [PERFORM_MEASUREMENT],
@@ -57,31 +67,47 @@ class Monitor(AbstractExtension):
 
     Keeps track of when measurements are to be performed.
     Periodically sends PERFORM_MEASUREMENT requests.
+
+    The measurements of all SUTs are scheduled by one shared scheduler at a fixed rate.
+    The first measurement of each SUT is delayed by a random part of the interval,
+    so that the measurements of different SUTs are spread out over the interval.
+    Measurements that are skipped because the previous measurement of the SUT
+    was still running are counted in the monitor.missed_samples metric.
+    Stopping the measurements waits for a measurement that is running.
     """
 
     def __init__(self, config, instances):
-        self._timer = None
+        self._scheduled_measurement = None
+        self._scheduler = measurement_scheduler
         self._active = True
         self._entity = instances[SUT]
         self._trigger_interval = config.get(MONITOR_INTERVAL)
+        self._jitter = config.get(MONITOR_JITTER)
         self._lock = threading.Lock()
         self._sut_is_resetting = False
+        self._measurement_count = 0
 
     @callback_dispatcher([TEST_RUN_STARTED])
     @requires(messagebus='MessageBus')
     def start_sending_perform_measurement_requests(self, message, messagebus):
+        with self._lock:
+            if self._active and self._scheduled_measurement is None:
+                self._scheduled_measurement = self._scheduler.schedule(
+                    self._trigger_interval,
+                    functools.partial(self.perform_measurement, messagebus),
+                    delay=random.uniform(0, self._jitter * self._trigger_interval),
+                    missed=functools.partial(self.record_missed_measurements, messagebus))
 
-        def schedule_next_perform_measurement_request():
-            self._timer = threading.Timer(
-                self._trigger_interval,
-                functools.partial(
-                    self.start_sending_perform_measurement_requests, message, messagebus))
-            self._timer.start()
+    def perform_measurement(self, messagebus):
 
         def send_perform_measurement_request():
             logger.debug('Starting measurements')
+            self._measurement_count += 1
             return messagebus.send_request(
-                PERFORM_MEASUREMENT, MONITOR_ENDPOINT, data=None, entity=self._entity)
+                PERFORM_MEASUREMENT,
+                MONITOR_ENDPOINT,
+                data=self._measurement_count,
+                entity=self._entity)
 
         def log_any_failed_measurement(futures):
             for future in futures.as_completed():
@@ -98,13 +124,24 @@ class Monitor(AbstractExtension):
                                 'Failed measurement during reset: {exception}'.format(
                                     exception=str(exception)))
 
-        if self._active:
-            with self._lock:
-                schedule_next_perform_measurement_request()
-                if not self._sut_is_resetting:
-                    log_any_failed_measurement(send_perform_measurement_request())
-                else:
-                    logger.debug('Skipping measurements because SUT is resetting')
+        if not self._sut_is_resetting:
+            log_any_failed_measurement(send_perform_measurement_request())
+        else:
+            logger.debug('Skipping measurements because SUT is resetting')
+
+    def record_missed_measurements(self, messagebus, missed_count):
+        # The metric component is created for each report, in a scope of its own,
+        # instead of using one from the scope of the TEST_RUN_STARTED message
+        component_factory = messagebus.component_factory
+        scope = component_factory.enter_scope('measurement', messagebus.scope)
+        try:
+            component_factory.call(self._create_missed_samples_metric, scope, missed_count)
+        finally:
+            component_factory.exit_scope(scope)
+
+    @requires(create_metric='CreateSeriesMetric')
+    def _create_missed_samples_metric(self, missed_count, create_metric):
+        create_metric('monitor.missed_samples', missed_count)
 
     @callback_dispatcher(
         [SUT_RESET_EXPECTED, SUT_RESET_STARTED], entity_option_id=SUT, optional=True)
@@ -122,9 +159,9 @@ class Monitor(AbstractExtension):
     @callback_dispatcher([ABORT, CRITICAL_ABORT], [K2_APPLICATION_ENDPOINT])
     def stop_sending_perform_measurement_requests(self, message):
         with self._lock:
-            if self._timer is not None:
-                self._timer.cancel()
-            self._timer = None
+            if self._scheduled_measurement is not None:
+                self._scheduled_measurement.cancel()
+            self._scheduled_measurement = None
             self._active = False
 
     def destroy(self):
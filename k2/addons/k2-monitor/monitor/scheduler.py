@@ -0,0 +1,183 @@
+"""
+Schedules the measurements of all monitors from one thread.
+
+Measurements are scheduled at a fixed rate on the monotonic clock, the ticks of
+a measurement are at start + n * interval regardless of how long each
+measurement takes, so the measurements don't drift.
+
+When a tick is due the measurement is handed to a worker thread so that a slow
+measurement doesn't delay the measurements of other SUTs. If the previous
+measurement hasn't finished when a tick is due the tick is skipped and reported
+as missed, instead of letting the measurements pile up.
+
+Cancelling a measurement waits for the measurement and the reports of missed
+ticks that are running, so nothing is measured or reported after the cancel.
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from zaf.extensions.extension import get_logger_name
+
+logger = logging.getLogger(get_logger_name('k2', 'monitor', 'scheduler'))
+logger.addHandler(logging.NullHandler())
+
+
+class ScheduledMeasurement(object):
+    """A measurement that is performed periodically by a MeasurementScheduler."""
+
+    def __init__(self, scheduler, interval, measure, missed):
+        self.interval = interval
+        self.missed_count = 0
+        self._scheduler = scheduler
+        self._measure = measure
+        self._missed = missed
+        self._running = False
+        self._running_thread = None
+        self._pending_reports = 0
+        self._cancelled = False
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    @property
+    def _busy(self):
+        return self._running or self._pending_reports > 0
+
+    def cancel(self):
+        """Cancel the measurement and wait for a measurement that is running to finish."""
+        self._scheduler.cancel(self)
+
+    def _run(self):
+        self._running_thread = threading.current_thread()
+        try:
+            self._measure()
+        except Exception as e:
+            logger.debug(str(e), exc_info=True)
+            logger.error(str(e))
+        finally:
+            with self._scheduler._condition:
+                self._running = False
+                self._running_thread = None
+                self._scheduler._condition.notify_all()
+
+    def _report_missed(self, missed_count):
+        try:
+            if self._missed is not None and not self._cancelled:
+                self._missed(missed_count)
+        except Exception as e:
+            logger.debug(str(e), exc_info=True)
+            logger.error(str(e))
+        finally:
+            with self._scheduler._condition:
+                self._pending_reports -= 1
+                self._scheduler._condition.notify_all()
+
+
+class MeasurementScheduler(object):
+    """
+    Runs scheduled measurements at a fixed rate.
+
+    The scheduler thread is started when the first measurement is scheduled and
+    stops when there are no scheduled measurements left.
+    """
+
+    def __init__(self, max_workers=None, clock=time.monotonic):
+        self._max_workers = max_workers
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._thread = None
+        self._executor = None
+
+    def schedule(self, interval, measure, delay=0, missed=None):
+        """
+        Schedule a measurement.
+
+        :param interval: the interval between the ticks of the measurement in seconds
+        :param measure: callable that performs the measurement
+        :param delay: the time until the first tick in seconds
+        :param missed: callable that is called with the total number of missed ticks
+                       each time a tick is missed
+        :return: the ScheduledMeasurement
+        """
+        if interval <= 0:
+            raise ValueError('Measurement interval must be positive, got {interval}'.format(
+                interval=interval))
+        scheduled = ScheduledMeasurement(self, interval, measure, missed)
+        with self._condition:
+            self._push(self._clock() + delay, scheduled)
+            if self._thread is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers
+                    if self._max_workers is not None else (os.cpu_count() or 1) * 5,
+                    thread_name_prefix='measurement-')
+                self._thread = threading.Thread(
+                    target=self._run, name='measurement-scheduler', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return scheduled
+
+    def cancel(self, scheduled):
+        with self._condition:
+            scheduled._cancelled = True
+            self._condition.notify_all()
+            # A measurement that cancels itself can't wait for itself to finish
+            while scheduled._busy and scheduled._running_thread is not threading.current_thread():
+                self._condition.wait()
+
+    def _push(self, due, scheduled):
+        heapq.heappush(self._queue, (due, next(self._sequence), scheduled))
+
+    def _run(self):
+        with self._condition:
+            while True:
+                while self._queue and self._queue[0][2].cancelled:
+                    heapq.heappop(self._queue)
+                if not self._queue:
+                    self._executor.shutdown(wait=False)
+                    self._executor = None
+                    self._thread = None
+                    return
+
+                due, _, scheduled = self._queue[0]
+                now = self._clock()
+                if due > now:
+                    self._condition.wait(due - now)
+                    continue
+
+                heapq.heappop(self._queue)
+                self._tick(scheduled, due, now)
+
+    def _tick(self, scheduled, due, now):
+        missed = 0
+        if scheduled._running:
+            missed += 1
+        else:
+            scheduled._running = True
+            self._executor.submit(scheduled._run)
+
+        # Ticks that have already passed, for example because the process was suspended,
+        # are skipped and counted as missed.
+        next_due = due + scheduled.interval
+        if next_due <= now:
+            passed = int((now - next_due) // scheduled.interval) + 1
+            missed += passed
+            next_due += passed * scheduled.interval
+        self._push(next_due, scheduled)
+
+        if missed:
+            logger.debug('Missed {missed} measurement ticks'.format(missed=missed))
+            scheduled.missed_count += missed
+            scheduled._pending_reports += 1
+            self._executor.submit(scheduled._report_missed, scheduled.missed_count)
+
+
+measurement_scheduler = MeasurementScheduler()
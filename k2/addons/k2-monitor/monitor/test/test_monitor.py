@@ -1,8 +1,10 @@
+import threading
 from unittest import TestCase
+from unittest.mock import Mock
 
-from zaf.builtin.unittest.harness import ExtensionTestHarness
+from zaf.builtin.unittest.harness import ComponentMock, ExtensionTestHarness
 from zaf.config.manager import ConfigManager
-from zaf.messages.dispatchers import LocalMessageQueue
+from zaf.messages.dispatchers import CallbackDispatcher, LocalMessageQueue
 
 from k2 import ABORT, CRITICAL_ABORT, K2_APPLICATION_ENDPOINT
 from k2.runner import RUNNER_ENDPOINT, TEST_RUN_FINISHED, TEST_RUN_STARTED
@@ -22,10 +24,43 @@ class TestMonitor(TestCase):
         with _create_harness() as harness:
             with LocalMessageQueue(harness.messagebus, message_ids=[PERFORM_MEASUREMENT],
                                    endpoint_ids=[MONITOR_ENDPOINT], entities=['mysut']) as queue:
-                initial_timer = harness.extension._timer
                 harness.messagebus.trigger_event(TEST_RUN_STARTED, RUNNER_ENDPOINT)
                 queue.get(timeout=1)
-                assert harness.extension._timer is not initial_timer
+                assert harness.extension._scheduled_measurement is not None
+
+    def test_perform_measurement_requests_are_numbered(self):
+        with _create_harness() as harness:
+            with LocalMessageQueue(harness.messagebus, message_ids=[PERFORM_MEASUREMENT],
+                                   endpoint_ids=[MONITOR_ENDPOINT], entities=['mysut']) as queue:
+                harness.messagebus.trigger_event(TEST_RUN_STARTED, RUNNER_ENDPOINT)
+                assert queue.get(timeout=1).data == 1
+
+    def test_stop_waits_for_the_running_measurement(self):
+        measuring = threading.Event()
+        release = threading.Event()
+        with _create_harness() as harness:
+            dispatcher = CallbackDispatcher(
+                harness.messagebus, lambda message: measuring.set() or release.wait(timeout=2))
+            dispatcher.register([PERFORM_MEASUREMENT], [MONITOR_ENDPOINT], entities=['mysut'])
+            harness.messagebus.trigger_event(TEST_RUN_STARTED, RUNNER_ENDPOINT)
+            self.assertTrue(measuring.wait(timeout=1))
+
+            stop = threading.Thread(
+                target=harness.messagebus.trigger_event,
+                args=(TEST_RUN_FINISHED, RUNNER_ENDPOINT))
+            stop.start()
+            stop.join(timeout=0.1)
+            self.assertTrue(stop.is_alive())
+
+            release.set()
+            stop.join(timeout=1)
+            self.assertFalse(stop.is_alive())
+            dispatcher.destroy()
+
+    def test_missed_measurements_are_recorded_with_a_new_metric_component(self):
+        with _create_harness() as harness:
+            harness.extension.record_missed_measurements(harness.messagebus, 3)
+            harness.create_series_metric.assert_called_once_with('monitor.missed_samples', 3)
 
 
 def _create_harness(enabled=True):
@@ -34,7 +69,8 @@ def _create_harness(enabled=True):
     config.set(SUT, [entity])
     config.set(MONITOR_ENABLED, enabled, entity=entity)
 
-    return ExtensionTestHarness(
+    create_series_metric = Mock()
+    harness = ExtensionTestHarness(
         Monitor,
         config=config,
         endpoints_and_messages={
@@ -44,4 +80,7 @@ def _create_harness(enabled=True):
                 SUT_RESET_NOT_EXPECTED
             ],
         },
+        components=[ComponentMock(name='CreateSeriesMetric', mock=create_series_metric)],
     )
+    harness.create_series_metric = create_series_metric
+    return harness
@@ -0,0 +1,134 @@
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import Mock
+
+from ..scheduler import MeasurementScheduler, ScheduledMeasurement
+
+
+class TestMeasurementSchedulerTicks(TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        self.scheduler = MeasurementScheduler(clock=lambda: self.now)
+        self.scheduler._executor = Mock()
+        self.measure = Mock()
+        self.missed = Mock()
+
+    def schedule(self, interval=5):
+        return ScheduledMeasurement(self.scheduler, interval, self.measure, self.missed)
+
+    def tick(self, scheduled, due):
+        self.scheduler._tick(scheduled, due, self.now)
+        return self.scheduler._queue.pop()[0]
+
+    def test_next_tick_is_one_interval_after_the_due_time(self):
+        scheduled = self.schedule()
+        self.now = 101.5
+        self.assertEqual(self.tick(scheduled, 100.0), 105.0)
+        self.scheduler._executor.submit.assert_called_once_with(scheduled._run)
+
+    def test_tick_is_skipped_and_reported_as_missed_while_measurement_is_running(self):
+        scheduled = self.schedule()
+        scheduled._running = True
+        self.assertEqual(self.tick(scheduled, 100.0), 105.0)
+        self.assertEqual(scheduled.missed_count, 1)
+        self.scheduler._executor.submit.assert_called_once_with(scheduled._report_missed, 1)
+
+    def test_ticks_that_have_passed_are_skipped_and_reported_as_missed(self):
+        scheduled = self.schedule()
+        self.now = 112.0
+        self.assertEqual(self.tick(scheduled, 100.0), 115.0)
+        self.assertEqual(scheduled.missed_count, 2)
+
+    def test_running_flag_is_cleared_even_if_measurement_fails(self):
+        scheduled = self.schedule()
+        self.measure.side_effect = Exception('measurement failed')
+        scheduled._running = True
+        scheduled._run()
+        self.assertFalse(scheduled._running)
+
+    def test_interval_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.schedule(0, self.measure)
+
+
+class TestMeasurementScheduler(TestCase):
+
+    def setUp(self):
+        self.scheduler = MeasurementScheduler()
+
+    def test_measurements_are_performed_at_a_fixed_rate(self):
+        times = []
+        done = threading.Event()
+
+        def measure():
+            times.append(time.monotonic())
+            time.sleep(0.02)
+            if len(times) == 5:
+                done.set()
+
+        start = time.monotonic()
+        scheduled = self.scheduler.schedule(0.05, measure)
+        self.assertTrue(done.wait(timeout=2))
+        scheduled.cancel()
+        for index, measured in enumerate(times[:5]):
+            self.assertAlmostEqual(measured - start, index * 0.05, delta=0.04)
+
+    def test_slow_measurement_gives_missed_ticks(self):
+        missed = threading.Event()
+        scheduled = self.scheduler.schedule(
+            0.02, lambda: time.sleep(0.1), missed=lambda count: missed.set())
+        self.assertTrue(missed.wait(timeout=2))
+        scheduled.cancel()
+
+    def test_scheduler_thread_stops_when_all_measurements_are_cancelled(self):
+        first = self.scheduler.schedule(10, Mock())
+        second = self.scheduler.schedule(10, Mock())
+        thread = self.scheduler._thread
+        first.cancel()
+        second.cancel()
+        thread.join(timeout=1)
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(self.scheduler._thread)
+
+    def test_cancel_waits_for_the_running_measurement_to_finish(self):
+        started = threading.Event()
+        release = threading.Event()
+        finished = []
+
+        def measure():
+            started.set()
+            release.wait(timeout=2)
+            finished.append(True)
+
+        scheduled = self.scheduler.schedule(10, measure)
+        self.assertTrue(started.wait(timeout=1))
+        cancel = threading.Thread(target=scheduled.cancel)
+        cancel.start()
+        cancel.join(timeout=0.1)
+        self.assertTrue(cancel.is_alive())
+
+        release.set()
+        cancel.join(timeout=1)
+        self.assertFalse(cancel.is_alive())
+        self.assertEqual(finished, [True])
+
+    def test_measurement_can_cancel_itself(self):
+        cancelled = threading.Event()
+
+        def measure():
+            scheduled.cancel()
+            cancelled.set()
+
+        scheduled = self.scheduler.schedule(10, measure)
+        self.assertTrue(cancelled.wait(timeout=1))
+
+    def test_missed_ticks_are_not_reported_after_cancel(self):
+        missed = Mock()
+        scheduled = ScheduledMeasurement(self.scheduler, 10, Mock(), missed)
+        scheduled._pending_reports = 1
+        scheduled._cancelled = True
+        scheduled._report_missed(1)
+        missed.assert_not_called()
+        self.assertEqual(scheduled._pending_reports, 0)
@@ -48,7 +48,19 @@ SERIAL_RESUME = MessageId(
 
 SERIAL_RAW_LINE = MessageId(
     'SERIAL_RAW_LINE', """\
-    An event with a raw line that is read directly from the serial connection
+    An event with a raw line that is read directly from the serial connection.
+
+    The lines that are read at the same time are triggered as a batch.
+    """)
+
+SERIAL_STATISTICS = MessageId(
+    'SERIAL_STATISTICS', """\
+    Get the throughput and backlog counters of a serial port.
+
+    The result is a SerialCounters named tuple with the number of bytes and lines received,
+    the number of lines handled, the current and max backlog of received lines that are not
+    yet handled, the number of bytes of the current incomplete line and the average number
+    of bytes and lines received per second since the serial port was first connected.
     """)
 
 SERIAL_PORT_IDS = ConfigOptionId(
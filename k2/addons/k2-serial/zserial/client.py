@@ -5,9 +5,8 @@ import time
 from queue import Empty
 
 from zaf.extensions.extension import get_logger_name
-from zaf.messages.dispatchers import LocalMessageQueue
 
-from sutevents import LOG_LINE_RECEIVED
+from sutevents.loglines import wait_for_log_lines
 from zserial import SERIAL_ENDPOINT, SERIAL_SEND_COMMAND
 
 from .log import serial_log_line_entity
@@ -103,10 +102,10 @@ class SerialClient(object):
         else:
             endmark = re.compile(endmark)
 
+        response_pattern = self._get_response_pattern(command_prefix, endmark)
         timeout = timeout if timeout is not None else self.default_timeout
         start_time = time.time()
-        with LocalMessageQueue(self.messagebus, [LOG_LINE_RECEIVED], [SERIAL_ENDPOINT],
-                               [self.log_entity]) as queue:
+        with wait_for_log_lines(self.messagebus, [self.log_entity], response_pattern) as queue:
             serial_send_data = SendSerialCommandData(line, timeout)
             try:
                 serial_send_response = self.messagebus.send_request(
@@ -125,7 +124,7 @@ class SerialClient(object):
                 while not endmark.search(received_line):
                     try:
                         received_line = queue.get(
-                            timeout=max(0.1, timeout - (time.time() - start_time))).data
+                            timeout=max(0.1, timeout - (time.time() - start_time))).string
                     except Empty as e:
                         error = e
 
@@ -165,6 +164,21 @@ class SerialClient(object):
                 return ('\n'.join(lines), '', exit_code)
             return '\n'.join(lines)
 
+    def _get_response_pattern(self, command_prefix, endmark):
+        """
+        Get the pattern for the lines that the log line hub should pass on.
+
+        Only the response lines, the endmark and input overruns are of interest.
+        The endmark can only be combined with the other patterns if it doesn't have
+        any flags of its own, inline or given when it was compiled, because the flags
+        would apply to the whole pattern. Otherwise all lines are passed on.
+        """
+        if not command_prefix or endmark.flags & ~re.UNICODE:
+            return ''
+
+        return '|'.join(
+            [re.escape(command_prefix), endmark.pattern, self.input_overrun_pattern.pattern])
+
     def _get_command_prefix(self):
         with SerialClient.command_id_lock:
             SerialClient.command_id += 1
@@ -2,6 +2,13 @@ import fcntl
 import logging
 import os
 import re
+import time
+from collections import namedtuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
 
 from serial import serial_for_url
 from serial.threaded import LineReader, ReaderThread
@@ -27,11 +34,62 @@ class SerialConnectionError(Exception):
     pass
 
 
+SerialCounters = namedtuple(
+    'SerialCounters', [
+        'bytes_received', 'lines_received', 'lines_handled', 'backlog', 'max_backlog',
+        'buffered_bytes', 'bytes_per_second', 'lines_per_second'
+    ])
+
+
+class SerialStatistics(object):
+    """
+    Throughput and backlog counters for a serial port.
+
+    The lines are received by the reader thread and handled by the dispatcher thread of the
+    serial extension. The backlog is the number of lines that have been received but not handled.
+    Each counter is only updated from one thread.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.bytes_received = 0
+        self.lines_received = 0
+        self.lines_handled = 0
+        self.max_backlog = 0
+        self.buffered_bytes = 0
+
+    def received(self, nr_of_bytes, nr_of_lines, buffered_bytes):
+        self.bytes_received += nr_of_bytes
+        self.lines_received += nr_of_lines
+        self.buffered_bytes = buffered_bytes
+        backlog = self.lines_received - self.lines_handled
+        if backlog > self.max_backlog:
+            self.max_backlog = backlog
+
+    def handled(self, nr_of_lines):
+        self.lines_handled += nr_of_lines
+
+    def counters(self):
+        """Get a snapshot of the counters as a SerialCounters tuple."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        bytes_received = self.bytes_received
+        lines_received = self.lines_received
+        return SerialCounters(
+            bytes_received=bytes_received,
+            lines_received=lines_received,
+            lines_handled=self.lines_handled,
+            backlog=max(lines_received - self.lines_handled, 0),
+            max_backlog=self.max_backlog,
+            buffered_bytes=self.buffered_bytes,
+            bytes_per_second=bytes_received / elapsed,
+            lines_per_second=lines_received / elapsed)
+
+
 class SerialThreadFactory(object):
 
-    def __init__(self, serial, messagebus, entity, filters):
+    def __init__(self, serial, messagebus, entity, filters, statistics=None):
         self._serial = serial
-        self._protocol_factory = _serial_connection(messagebus, entity, filters)
+        self._protocol_factory = _serial_connection(messagebus, entity, filters, statistics)
 
     def create(self):
         thread = None
@@ -80,15 +138,19 @@ class SerialConnectionWrapper(object):
     def parse_raw_line(self, line):
         self.connection.parse_raw_line(line)
 
+    def parse_raw_lines(self, lines):
+        self.connection.parse_raw_lines(lines)
+
     def instance(self):
         return self.thread_factory.serial
 
 
-def start_serial_connection(port, baudrate, virtual, timeout, messagebus, entity, filters):
+def start_serial_connection(
+        port, baudrate, virtual, timeout, messagebus, entity, filters, statistics=None):
     serial = serial_for_url(
         port, baudrate=baudrate, rtscts=virtual, dsrdtr=virtual, timeout=timeout)
     _lock_serial_port(serial)
-    thread_factory = SerialThreadFactory(serial, messagebus, entity, filters)
+    thread_factory = SerialThreadFactory(serial, messagebus, entity, filters, statistics)
     connection = SerialConnectionWrapper(thread_factory)
     connection.open()
     return connection
@@ -112,7 +174,7 @@ def _lock_serial_port(serial):
         raise SerialConnectionError(msg)
 
 
-def _serial_connection(messagebus_arg, entity_arg, inline_filters_arg=None):
+def _serial_connection(messagebus_arg, entity_arg, inline_filters_arg=None, statistics_arg=None):
     """
     Create a SerialConnection class.
 
@@ -127,16 +189,21 @@ def _serial_connection(messagebus_arg, entity_arg, inline_filters_arg=None):
         entity = entity_arg
         log_entity = serial_log_line_entity(entity_arg)
         inline_filters = inline_filters_arg if inline_filters_arg else []
+        statistics = statistics_arg if statistics_arg is not None else SerialStatistics()
 
         def __init__(self):
             super().__init__()
             self.ENCODING = 'utf-8'
-            self.UNICODE_HANDLING = 'strict'
+            # Noise on the line must not stop the reader thread, so bytes that are
+            # not valid UTF-8 are replaced instead of raising an error
+            self.UNICODE_HANDLING = 'replace'
             self.stack = []
+            self._newline = self.TERMINATOR.decode(self.ENCODING)
 
             combined_filter = '|'.join(
                 ['({filter})'.format(filter=filter) for filter in self.inline_filters])
             self.filter_pattern = re.compile(combined_filter) if inline_filters_arg else None
+            self.batch_filter = _batch_filter(self.inline_filters) if inline_filters_arg else None
 
         def connection_made(self, transport):
             super().connection_made(transport)
@@ -150,51 +217,176 @@ def _serial_connection(messagebus_arg, entity_arg, inline_filters_arg=None):
                 self.messagebus.trigger_event(
                     SERIAL_CONNECTION_LOST, SERIAL_ENDPOINT, self.entity, exc)
 
+        def data_received(self, data):
+            """
+            Handle data read from the serial port.
+
+            All complete lines in the buffer are split and decoded at once and
+            sent as one batch, to keep the work done on the reader thread per read
+            independent of the number of lines.
+            """
+            buffer = self.buffer
+            buffer.extend(data)
+            end = buffer.rfind(self.TERMINATOR)
+            if end < 0:
+                self.statistics.received(len(data), 0, len(buffer))
+                return
+
+            lines = buffer[:end].decode(self.ENCODING, self.UNICODE_HANDLING).split(self._newline)
+            del buffer[:end + len(self.TERMINATOR)]
+            self.statistics.received(len(data), len(lines), len(buffer))
+            self.handle_lines(lines)
+
         def handle_line(self, line):
             """
             Handle a line from the serial port.
 
-            Each line is sent as a LOG_LINE_RECEIVED message on the messagebus.
-
-            Inline filters are used to filter out parts of a line and if the filtered content
-            contains the end of the line the remaining part of the line is stored in a stack
-            and combined with the next call to handle_line.
-            The filtered out content is also sent out in their own LOG_LINE_RECEIVED messages.
+            The line is sent as a SERIAL_RAW_LINE message on the messagebus.
 
             :param line: the line to handle
             """
             rawlogger.debug(line)
+            self.statistics.received(0, 1, len(self.buffer))
             self.messagebus.trigger_event(SERIAL_RAW_LINE, SERIAL_ENDPOINT, self.entity, line)
 
+        def handle_lines(self, lines):
+            """
+            Handle a batch of lines from the serial port.
+
+            The lines are sent as a batch of SERIAL_RAW_LINE messages on the messagebus.
+
+            :param lines: the lines to handle
+            """
+            if rawlogger.isEnabledFor(logging.DEBUG):
+                for line in lines:
+                    rawlogger.debug(line)
+            self.messagebus.trigger_events(
+                SERIAL_RAW_LINE, SERIAL_ENDPOINT, lines, entity=self.entity)
+
         def parse_raw_line(self, line):
-            """Help method for handle_line to support recursive calls."""
+            """
+            Parse a raw line and send the resulting lines as LOG_LINE_RECEIVED messages.
+
+            Inline filters are used to filter out parts of a line and if the filtered content
+            contains the end of the line the remaining part of the line is stored in a stack
+            and combined with the next raw line.
+            The filtered out content is also sent out in their own LOG_LINE_RECEIVED messages.
+
+            :param line: the raw line
+            """
+            for log_line in self._filter_raw_line(line, []):
+                self.messagebus.trigger_event(
+                    LOG_LINE_RECEIVED, SERIAL_ENDPOINT, self.log_entity, log_line)
+            self.statistics.handled(1)
+
+        def parse_raw_lines(self, lines):
+            """
+            Parse a batch of raw lines and send the resulting lines as a batch of messages.
+
+            The inline filters are first searched for in all lines at once and only if
+            anything is found, or if there is a stored remaining part of a line, the lines
+            are filtered one by one as by parse_raw_line.
+
+            :param lines: the raw lines
+            """
+            # Joined by \n for ^ and $ to match each line when the batch filter uses MULTILINE
+            text = '\n'.join(lines)
+            if '\0' in text:
+                lines = [line.replace('\0', '') for line in lines]
+                text = text.replace('\0', '')
+
+            if self.filter_pattern is None or (
+                    not self.stack and self.batch_filter is not None
+                    and not self.batch_filter(text)):
+                log_lines = lines
+                if logger.isEnabledFor(logging.DEBUG):
+                    for log_line in log_lines:
+                        logger.debug(log_line)
+            else:
+                log_lines = []
+                for line in lines:
+                    self._filter_raw_line(line, log_lines)
+
+            self.messagebus.trigger_events(
+                LOG_LINE_RECEIVED, SERIAL_ENDPOINT, log_lines, entity=self.log_entity)
+            self.statistics.handled(len(lines))
+
+        def _filter_raw_line(self, line, log_lines):
             line = line.replace('\0', '')
 
-            if len(self.stack) > 0:
-                line = '{old}{new}'.format(old=self.stack.pop(), new=line)
+            while True:
+                if len(self.stack) > 0:
+                    line = '{old}{new}'.format(old=self.stack.pop(), new=line)
+
+                if self.filter_pattern is None:
+                    break
 
-            if self.filter_pattern:
                 remaining, filtered, reached_end_of_line = _filter_line(line, self.filter_pattern)
-                if filtered:
-                    logger.debug(filtered)
-                    self.messagebus.trigger_event(
-                        LOG_LINE_RECEIVED, SERIAL_ENDPOINT, self.log_entity, filtered)
-                    if reached_end_of_line:
-                        self.stack.append(remaining)
-                    else:
-                        self.parse_raw_line(remaining)
-                else:
-                    logger.debug(remaining)
-                    self.messagebus.trigger_event(
-                        LOG_LINE_RECEIVED, SERIAL_ENDPOINT, self.log_entity, remaining)
-            else:
-                logger.debug(line)
-                self.messagebus.trigger_event(
-                    LOG_LINE_RECEIVED, SERIAL_ENDPOINT, self.log_entity, line)
+                if not filtered:
+                    line = remaining
+                    break
+
+                logger.debug(filtered)
+                log_lines.append(filtered)
+                if reached_end_of_line:
+                    self.stack.append(remaining)
+                    return log_lines
+                line = remaining
+
+            logger.debug(line)
+            log_lines.append(line)
+            return log_lines
 
     return SerialConnection
 
 
+def _batch_filter(filters):
+    """
+    Create a function that checks if any of the inline filters can match in many lines at once.
+
+    The lines are given joined by line breaks. If all filters contain a literal string,
+    which is the case for most filters, it's enough to look for the literals in the lines.
+    Otherwise the filters are searched for with MULTILINE, where ^ and $ match at the start
+    and end of each line, which means that a match is found in the joined lines if there is
+    a match in any of the lines. That is not true for lookarounds and \\A and \\Z,
+    so then None is returned and the lines have to be filtered one by one.
+
+    :param filters: the inline filters
+    :return: function from the joined lines to False if no filter can match, or None
+    """
+    literals = [_required_literal(filter) for filter in filters]
+    if all(literals):
+        return lambda text: any(literal in text for literal in literals)
+
+    combined_filter = '|'.join(['({filter})'.format(filter=filter) for filter in filters])
+    if any(token in combined_filter for token in ('(?=', '(?!', '(?<', '\\A', '\\Z')):
+        return None
+    try:
+        pattern = re.compile(combined_filter, re.MULTILINE)
+    except re.error:
+        return None
+    return lambda text: pattern.search(text) is not None
+
+
+def _required_literal(filter):
+    """Get the longest run of literal characters that every match of the filter contains."""
+    try:
+        parsed = sre_parse.parse(filter)
+    except Exception:
+        return None
+    if parsed.state.flags & re.IGNORECASE:
+        return None
+
+    longest = run = ''
+    for op, av in parsed:
+        if op == sre_parse.LITERAL:
+            run += chr(av)
+            longest = max(longest, run, key=len)
+        else:
+            run = ''
+    return longest or None
+
+
 def _filter_line(line, pattern):
     """
     Filter a line using the provided pattern.
@@ -212,7 +404,7 @@ def _filter_line(line, pattern):
     :return: a tuple with (remaining, filtered, reached_end_of_line)
     """
     last_match = None
-    for last_match in re.finditer(pattern, line):
+    for last_match in pattern.finditer(line):
         pass
 
     if last_match is None:
@@ -34,10 +34,10 @@ from zserial import SERIAL_RAW_LINE, SERIAL_RECONNECT
 
 from . import SERIAL_BAUDRATE, SERIAL_CONNECTED, SERIAL_CONNECTION_LOST, SERIAL_DEVICE, \
     SERIAL_ENABLED, SERIAL_ENDPOINT, SERIAL_FILTERS, SERIAL_LOG_ENABLED, SERIAL_PORT_IDS, \
-    SERIAL_PROMPT, SERIAL_RESUME, SERIAL_SEND_COMMAND, SERIAL_SUSPEND, SERIAL_TIMEOUT, \
-    SUT_SERIAL_PORTS
+    SERIAL_PROMPT, SERIAL_RESUME, SERIAL_SEND_COMMAND, SERIAL_STATISTICS, SERIAL_SUSPEND, \
+    SERIAL_TIMEOUT, SUT_SERIAL_PORTS
 from .client import SerialClient
-from .connection import find_serial_port, start_serial_connection
+from .connection import SerialStatistics, find_serial_port, start_serial_connection
 from .log import serial_log_line_entity
 from .messages import SendSerialCommandData
 from .sut import SUT_SERIAL_BAUDRATE, SUT_SERIAL_DEVICE, SUT_SERIAL_ENABLED, SUT_SERIAL_FILTERS, \
@@ -162,7 +162,7 @@ class RawSerialPort(object):
         SERIAL_ENDPOINT: [
             SERIAL_SEND_COMMAND, LOG_LINE_RECEIVED, SERIAL_CONNECTION_LOST, SERIAL_CONNECTED,
             CRITICAL_EXTENSION_ERROR, SERIAL_RECONNECT, SERIAL_RAW_LINE, SERIAL_SUSPEND,
-            SERIAL_RESUME
+            SERIAL_RESUME, SERIAL_STATISTICS
         ]
     },
     groups=['exec', 'serial'],
@@ -179,6 +179,7 @@ class SerialExtension(AbstractExtension):
         self._device = None
         self._virtual = None
         self._serial_connection = None
+        self._statistics = SerialStatistics()
 
         self._baudrate = config.get(SERIAL_BAUDRATE)
         self._prompt = config.get(SERIAL_PROMPT)
@@ -235,10 +236,15 @@ class SerialExtension(AbstractExtension):
         if event is not None:
             event.wait(timeout)
 
-    @sequential_dispatcher([SERIAL_RAW_LINE], [SERIAL_ENDPOINT], entity_option_id=SERIAL_PORT_IDS)
-    def handle_raw_line(self, message):
-        raw_line = message.data
-        self._serial_connection.parse_raw_line(raw_line)
+    @sequential_dispatcher(
+        [SERIAL_RAW_LINE], [SERIAL_ENDPOINT], entity_option_id=SERIAL_PORT_IDS, batch=True)
+    def handle_raw_lines(self, message_batch):
+        raw_lines = [message.data for message in message_batch]
+        self._serial_connection.parse_raw_lines(raw_lines)
+
+    @callback_dispatcher([SERIAL_STATISTICS], [SERIAL_ENDPOINT], entity_option_id=SERIAL_PORT_IDS)
+    def statistics(self, message):
+        return self._statistics.counters()
 
     @callback_dispatcher([SERIAL_SUSPEND], [SERIAL_ENDPOINT], entity_option_id=SERIAL_PORT_IDS)
     def suspend(self, message):
@@ -283,7 +289,7 @@ class SerialExtension(AbstractExtension):
             try:
                 self._serial_connection = start_serial_connection(
                     self._device, self._baudrate, self._virtual, self._timeout, messagebus,
-                    self._entity, self._filters)
+                    self._entity, self._filters, self._statistics)
                 logger.debug(
                     'Opened {device} for serial port {port}'.format(
                         device=self._device, port=self._entity))
@@ -303,6 +309,9 @@ class SerialExtension(AbstractExtension):
         if self._serial_connection:
             self._serial_connection.close()
             self._serial_connection = None
+            logger.debug(
+                'Closed serial port {port}: {counters}'.format(
+                    port=self._entity, counters=self._statistics.counters()))
 
 
 @FrameworkExtension(name='zserial', load_order=91, groups=['log_sources', 'serial'])
@@ -1,4 +1,5 @@
 import queue
+import re
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
@@ -97,6 +98,28 @@ class TestSerialClient(TestCase):
             })
         assert written_lines.get(timeout=1) == line
 
+    def test_send_line_with_automatic_prefixing_and_endmark_with_inline_flags(self):
+
+        def run(client):
+            self.assertEqual(client.send_line('line', endmark='(?i)done', timeout=1), 'b')
+
+        line = "{ line ; echo exit_code=$?; } 2>&1 | sed -e 's/^/cmd:1: /'"
+        written_lines = run_with_client(
+            run, responses={line: ['a', 'cmd:1: b', 'DONE', 'after']})
+        assert written_lines.get(timeout=1) == line
+
+    def test_send_line_with_automatic_prefixing_and_compiled_endmark_with_flags(self):
+
+        def run(client):
+            self.assertEqual(
+                client.send_line('line', endmark=re.compile('done', re.IGNORECASE), timeout=1),
+                'b')
+
+        line = "{ line ; echo exit_code=$?; } 2>&1 | sed -e 's/^/cmd:1: /'"
+        written_lines = run_with_client(
+            run, responses={line: ['a', 'cmd:1: b', 'DONE', 'after']})
+        assert written_lines.get(timeout=1) == line
+
     def test_parse_exit_code(self):
 
         def run(client):
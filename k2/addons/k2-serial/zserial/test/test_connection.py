@@ -7,7 +7,8 @@ from zserial import SERIAL_RAW_LINE
 from zserial.connection import SerialConnectionError
 
 from .. import SERIAL_CONNECTION_LOST, SERIAL_ENDPOINT
-from ..connection import PortNotFound, _lock_serial_port, _serial_connection, find_serial_port
+from ..connection import PortNotFound, SerialStatistics, _batch_filter, _lock_serial_port, \
+    _serial_connection, find_serial_port
 
 
 class TestSerialConnection(TestCase):
@@ -87,6 +88,89 @@ class TestSerialConnection(TestCase):
                 call(LOG_LINE_RECEIVED, SERIAL_ENDPOINT, 'serial-entity', '### error'),
             ])
 
+    def test_complete_lines_in_received_data_are_sent_as_one_batch(self):
+        messagebus = MagicMock()
+        connection = _serial_connection(messagebus, 'entity')()
+
+        connection.data_received(b'line1\r\nline2\r\nli')
+        connection.data_received(b'ne3\r\n')
+
+        messagebus.trigger_events.assert_has_calls(
+            [
+                call(SERIAL_RAW_LINE, SERIAL_ENDPOINT, ['line1', 'line2'], entity='entity'),
+                call(SERIAL_RAW_LINE, SERIAL_ENDPOINT, ['line3'], entity='entity'),
+            ])
+
+    def test_received_data_without_complete_line_is_buffered(self):
+        messagebus = MagicMock()
+        connection = _serial_connection(messagebus, 'entity')()
+
+        connection.data_received(b'partial')
+
+        messagebus.trigger_events.assert_not_called()
+        self.assertEqual(connection.buffer, b'partial')
+
+    def test_invalid_utf8_in_received_data_is_replaced(self):
+        messagebus = MagicMock()
+        connection = _serial_connection(messagebus, 'entity')()
+
+        connection.data_received(b'bad \xff byte\r\n')
+
+        messagebus.trigger_events.assert_called_with(
+            SERIAL_RAW_LINE, SERIAL_ENDPOINT, ['bad \ufffd byte'], entity='entity')
+
+    def test_parse_raw_lines_without_filters_sends_lines_as_one_batch(self):
+        messagebus = MagicMock()
+        connection = _serial_connection(messagebus, 'entity')()
+
+        connection.parse_raw_lines(['line1', 'li\0ne2'])
+
+        messagebus.trigger_events.assert_called_once_with(
+            LOG_LINE_RECEIVED, SERIAL_ENDPOINT, ['line1', 'line2'], entity='serial-entity')
+
+    def test_parse_raw_lines_with_filter_gives_same_lines_as_parse_raw_line(self):
+        messagebus = MagicMock()
+        connection = _serial_connection(messagebus, 'entity', ['!!! warning.*$', '### error'])()
+
+        connection.parse_raw_lines(['first', 'li!!! warning', 'ne', 'a### errorb'])
+
+        messagebus.trigger_events.assert_called_once_with(
+            LOG_LINE_RECEIVED,
+            SERIAL_ENDPOINT, ['first', '!!! warning', 'line', '### error', 'ab'],
+            entity='serial-entity')
+
+    def test_parse_raw_lines_combines_stored_remaining_line_with_next_batch(self):
+        messagebus = MagicMock()
+        connection = _serial_connection(messagebus, 'entity', ['### error.*'])()
+
+        connection.parse_raw_lines(['li### error'])
+        connection.parse_raw_lines(['ne', 'other'])
+
+        messagebus.trigger_events.assert_has_calls(
+            [
+                call(LOG_LINE_RECEIVED, SERIAL_ENDPOINT, ['### error'], entity='serial-entity'),
+                call(
+                    LOG_LINE_RECEIVED,
+                    SERIAL_ENDPOINT, ['line', 'other'],
+                    entity='serial-entity'),
+            ])
+
+    def test_statistics_count_received_and_handled_lines(self):
+        messagebus = MagicMock()
+        statistics = SerialStatistics()
+        connection = _serial_connection(messagebus, 'entity', statistics_arg=statistics)()
+
+        connection.data_received(b'line1\r\nline2\r\nline3\r\npartial')
+        connection.parse_raw_lines(['line1', 'line2'])
+
+        counters = statistics.counters()
+        self.assertEqual(counters.bytes_received, 28)
+        self.assertEqual(counters.lines_received, 3)
+        self.assertEqual(counters.lines_handled, 2)
+        self.assertEqual(counters.backlog, 1)
+        self.assertEqual(counters.max_backlog, 3)
+        self.assertEqual(counters.buffered_bytes, 7)
+
     def test_trigger_connection_lost_message_on_connection_lost(self):
         messagebus = MagicMock()
         connection = _serial_connection(messagebus, 'entity')()
@@ -100,6 +184,23 @@ class TestSerialConnection(TestCase):
             SERIAL_CONNECTION_LOST, SERIAL_ENDPOINT, 'entity', exception)
 
 
+class TestBatchFilter(TestCase):
+
+    def test_filters_with_literals_are_found_in_any_line(self):
+        batch_filter = _batch_filter(['### error.*', r'!!! warn\w+'])
+        self.assertTrue(batch_filter('first\nli### error\nlast'))
+        self.assertTrue(batch_filter('!!! warning'))
+        self.assertFalse(batch_filter('first\nsecond'))
+
+    def test_filters_without_literals_are_searched_for_in_each_line(self):
+        batch_filter = _batch_filter([r'^\d+$'])
+        self.assertTrue(batch_filter('first\n123\nlast'))
+        self.assertFalse(batch_filter('first 123\nlast'))
+
+    def test_filters_with_lookarounds_can_not_be_used_on_many_lines(self):
+        self.assertIsNone(_batch_filter([r'\d+(?=x)']))
+
+
 class TestLockSerialPort(TestCase):
 
     def test_does_not_raise_serial_connection_error_if_lock_can_be_acquired(self):
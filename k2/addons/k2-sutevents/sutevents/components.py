@@ -6,12 +6,15 @@ from queue import Empty
 from zaf.component.decorator import component, requires
 from zaf.extensions.extension import AbstractExtension, CommandExtension, get_logger_name
 from zaf.messages.dispatchers import LocalMessageQueue
+from zaf.messages.messagebus import NoSuchEndpoint, NoSuchMessage
 from zaf.utils.future import Future
 
 from k2.cmd.run import RUN_COMMAND
 from k2.sut import SUT_RESET_DONE, SUT_RESET_EXPECTED, SUT_RESET_NOT_EXPECTED, SUT_RESET_STARTED
 from k2.sut.log import SUT_LOG_SOURCES, NoLogSources
-from sutevents import IS_SUT_RESET_EXPECTED, LOG_LINE_RECEIVED, SUTEVENTSCOMPONENT_ENDPOINT
+from sutevents import IS_SUT_RESET_EXPECTED, SUTEVENTSCOMPONENT_ENDPOINT
+
+from .loglines import get_log_line_hub, wait_for_log_lines
 
 logger = logging.getLogger(get_logger_name('k2', 'sutevents.components'))
 
@@ -33,12 +36,32 @@ class SutEvents(object):
     Component for listening for SUT-related events.
 
     Simplifies listening or otherwise acting on events related to the SUT.
+
+    While the component is alive the log lines of the SUT are kept in a replay window,
+    see the replay_window argument of wait_for_log_line.
     """
 
     def __init__(self, messagebus, config, sut):
         self._messagebus = messagebus
         self._sut = sut
         self._log_entities = config.get(SUT_LOG_SOURCES, entity=sut.entity)
+        self._log_line_hubs = []
+
+    def __enter__(self):
+        for entity in self._log_entities or []:
+            hub = get_log_line_hub(self._messagebus, entity)
+            try:
+                hub.acquire()
+                self._log_line_hubs.append(hub)
+            except (NoSuchEndpoint, NoSuchMessage) as e:
+                logger.debug(
+                    'Not keeping log lines for {entity}: {msg}'.format(entity=entity, msg=str(e)))
+        return self
+
+    def __exit__(self, *exc_info):
+        for hub in self._log_line_hubs:
+            hub.release()
+        self._log_line_hubs = []
 
     def is_sut_reset_expected(self):
         """Check if a sut reset is expected for the sut right now."""
@@ -46,7 +69,7 @@ class SutEvents(object):
             IS_SUT_RESET_EXPECTED, entity=self._sut.entity).wait()[0].result()
 
     @contextmanager
-    def wait_for_log_line(self, log_line_regex, log_sources=None):
+    def wait_for_log_line(self, log_line_regex, log_sources=None, replay_window=None):
         """
         Context manager that can be used to wait for log lines matching a specific regex.
 
@@ -57,6 +80,11 @@ class SutEvents(object):
         to filter what log sources should be used. The specified log source still needs to be defined
         for the sut.
 
+        Lines that were received before the call can also be matched by giving the number of
+        seconds to look back as replay_window. This is useful when the lines may be logged before
+        it's possible to start waiting for them, but only works for lines that were received while
+        the SutEvents component or another waiter was alive.
+
         Example of how this can be used
 
         .. code-block:: python
@@ -88,16 +116,13 @@ class SutEvents(object):
         else:
             log_entities = self._log_entities
 
-        def match(message):
-            return compiled_regex.search(message.data) is not None
-
-        with LocalMessageQueue(self._messagebus, [LOG_LINE_RECEIVED], entities=log_entities,
-                               match=match) as queue:
+        with wait_for_log_lines(self._messagebus, log_entities, compiled_regex,
+                                replay_window) as waiter:
 
             class QueueWrapper(object):
 
-                def __init__(self, queue):
-                    self._queue = queue
+                def __init__(self, waiter):
+                    self._waiter = waiter
 
                 def get(self, timeout=None):
                     """
@@ -108,9 +133,9 @@ class SutEvents(object):
                     :param timeout: The timeout in seconds to wait for next line
                     """
                     try:
-                        log_line_message = self._queue.get(timeout=timeout)
-                        logger.debug('log line matched: {data}'.format(data=log_line_message.data))
-                        return compiled_regex.search(log_line_message.data)
+                        match = self._waiter.get(timeout=timeout)
+                        logger.debug('log line matched: {data}'.format(data=match.string))
+                        return match
                     except Empty:
                         msg = "No log line received matching '{regex}'".format(regex=log_line_regex)
                         logger.debug(msg)
@@ -125,14 +150,12 @@ class SutEvents(object):
                     result = []
                     try:
                         while True:
-                            log_line_message = self._queue.get_nowait()
-                            match = compiled_regex.search(log_line_message.data)
-                            result.append(match)
+                            result.append(self._waiter.get_nowait())
                     except Empty:
                         pass
                     return result
 
-            yield QueueWrapper(queue)
+            yield QueueWrapper(waiter)
 
     def wait_for_log_line_all(self, log_line_regex):
         """Wait for a log line on all available log sources."""
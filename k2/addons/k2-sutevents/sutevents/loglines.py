@@ -0,0 +1,229 @@
+"""
+Shared matching of log lines for everything that waits for log lines.
+
+Instead of every waiter registering its own dispatcher on LOG_LINE_RECEIVED, and
+searching for its own regex in every line, there is one LogLineHub per log entity.
+The hub searches for the patterns of all active waiters at once with a combined regex,
+and only when that finds something are the patterns of the waiters searched for
+to find out which waiters to wake. Waiters with the same pattern share the search.
+
+The hub keeps a bounded window of the most recently received lines, so that a waiter
+can also match lines that were received just before it started waiting.
+The hub is only registered on the messagebus while it is acquired, so the window only
+contains the lines that are received while there are waiters or while the hub is
+held by someone else, for example by the SutEvents component.
+"""
+
+import logging
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from queue import Queue
+
+from zaf.extensions.extension import get_logger_name
+from zaf.messages.dispatchers import CallbackDispatcher
+
+from sutevents import LOG_LINE_RECEIVED
+
+logger = logging.getLogger(get_logger_name('k2', 'sutevents.loglines'))
+
+REPLAY_WINDOW_LINES = 1000
+
+# Patterns that can't be part of the combined regex, because references to groups
+# would refer to the groups of other patterns
+_GROUP_REFERENCE = re.compile(r'\\\d|\(\?P=|\(\?\(')
+_NAMED_GROUP = re.compile(r'(?<!\\)\(\?P<\w+>')
+
+_hubs = weakref.WeakKeyDictionary()
+_hubs_lock = threading.Lock()
+
+
+def get_log_line_hub(messagebus, entity):
+    """
+    Get the hub for a log entity.
+
+    :param messagebus: the messagebus
+    :param entity: the log entity
+    :return: the LogLineHub, the same for all calls with the same messagebus and entity
+    """
+    with _hubs_lock:
+        hubs = _hubs.setdefault(messagebus, {})
+        if entity not in hubs:
+            hubs[entity] = LogLineHub(messagebus, entity)
+        return hubs[entity]
+
+
+@contextmanager
+def wait_for_log_lines(messagebus, entities, log_line_regex, replay_window=None):
+    """
+    Context manager that waits for log lines matching a regex on one or more log entities.
+
+    :param messagebus: the messagebus
+    :param entities: the log entities
+    :param log_line_regex: the regex to search for in the lines, str or compiled
+    :param replay_window: also match lines that were received up to this many seconds ago
+    :return: a LogLineWaiter that gives the regex match objects of the matching lines
+    """
+    waiter = LogLineWaiter(log_line_regex)
+    with ExitStack() as stack:
+        for entity in entities:
+            hub = get_log_line_hub(messagebus, entity)
+            hub.add_waiter(waiter, replay_window)
+            stack.callback(hub.remove_waiter, waiter)
+        yield waiter
+
+
+class LogLineWaiter(object):
+    """Receives the regex match objects of the matching lines from one or more hubs."""
+
+    def __init__(self, log_line_regex):
+        self.pattern = re.compile(log_line_regex)
+        self._matches = Queue()
+
+    def put(self, match):
+        self._matches.put(match)
+
+    def get(self, timeout=None):
+        """
+        Get the match object for the next matching line.
+
+        :param timeout: the timeout in seconds
+        :raises queue.Empty: if no line matched before the timeout
+        """
+        return self._matches.get(timeout=timeout)
+
+    def get_nowait(self):
+        return self._matches.get_nowait()
+
+    def empty(self):
+        return self._matches.empty()
+
+
+class LogLineHub(object):
+    """
+    Matches the log lines of one log entity against all waiters.
+
+    The hub is registered on the messagebus while it is acquired, either explicitly
+    or by having waiters. The lines are handled in the thread that sent them.
+    """
+
+    def __init__(self, messagebus, entity, window_lines=REPLAY_WINDOW_LINES):
+        # The hubs are kept per messagebus in a WeakKeyDictionary, so they must not keep it alive
+        self._messagebus = weakref.ref(messagebus)
+        self._entity = entity
+        self._lock = threading.RLock()
+        self._holders = 0
+        self._dispatcher = None
+        self._window = deque(maxlen=window_lines)
+        self._waiters = {}
+        self._combined = None
+        self._uncombined = []
+        self._dirty = False
+
+    def acquire(self):
+        with self._lock:
+            if self._holders == 0:
+                dispatcher = _LogLineDispatcher(self._messagebus(), self)
+                dispatcher.register([LOG_LINE_RECEIVED], entities=[self._entity])
+                self._dispatcher = dispatcher
+                logger.debug('Log line hub registered for {entity}'.format(entity=self._entity))
+            self._holders += 1
+
+    def release(self):
+        with self._lock:
+            self._holders -= 1
+            if self._holders == 0:
+                self._dispatcher.destroy()
+                self._dispatcher = None
+                self._window.clear()
+                logger.debug('Log line hub deregistered for {entity}'.format(entity=self._entity))
+
+    def add_waiter(self, waiter, replay_window=None):
+        """
+        Add a waiter and give it the matching lines from the replay window.
+
+        :param waiter: the LogLineWaiter
+        :param replay_window: the number of seconds back in time to replay lines from
+        """
+        with self._lock:
+            self.acquire()
+            if replay_window:
+                oldest = time.monotonic() - replay_window
+                for received, line in self._window:
+                    if received >= oldest:
+                        match = waiter.pattern.search(line)
+                        if match is not None:
+                            waiter.put(match)
+            self._waiters.setdefault(waiter.pattern, []).append(waiter)
+            self._dirty = True
+
+    def remove_waiter(self, waiter):
+        with self._lock:
+            waiters = self._waiters[waiter.pattern]
+            waiters.remove(waiter)
+            if not waiters:
+                del self._waiters[waiter.pattern]
+            self._dirty = True
+            self.release()
+
+    def handle_lines(self, lines):
+        with self._lock:
+            received = time.monotonic()
+            self._window.extend((received, line) for line in lines)
+            if not self._waiters:
+                return
+            if self._dirty:
+                self._combine()
+
+            for line in lines:
+                if self._combined is not None and self._combined.search(line) is None:
+                    patterns = self._uncombined
+                else:
+                    patterns = self._waiters
+                for pattern in patterns:
+                    match = pattern.search(line)
+                    if match is not None:
+                        for waiter in self._waiters[pattern]:
+                            waiter.put(match)
+
+    def handle_message(self, message):
+        self.handle_lines([message.data])
+
+    def _combine(self):
+        combined = []
+        uncombined = []
+        for pattern in self._waiters:
+            if pattern.flags & ~re.UNICODE or (pattern.groups
+                                               and _GROUP_REFERENCE.search(pattern.pattern)):
+                uncombined.append(pattern)
+            else:
+                combined.append(
+                    '(?:{pattern})'.format(pattern=_NAMED_GROUP.sub('(', pattern.pattern)))
+        try:
+            self._combined = re.compile('|'.join(combined)) if combined else None
+            self._uncombined = uncombined
+        except re.error:
+            self._combined = None
+            self._uncombined = list(self._waiters)
+        self._dirty = False
+
+
+class _LogLineDispatcher(CallbackDispatcher):
+    """Hands a batch of lines to the hub at once instead of message by message."""
+
+    def __init__(self, messagebus, hub):
+        super().__init__(messagebus, hub.handle_message)
+        self._hub = hub
+
+    def dispatch_batch(self, message_batch):
+        self._active_count.increase()
+        try:
+            self._hub.handle_lines([message.data for message in message_batch])
+        except Exception as e:
+            logger.debug(str(e), exc_info=True)
+            logger.error(str(e))
+        finally:
+            self._active_count.decrease()
@@ -80,6 +80,13 @@ class TestWaitForLine(unittest.TestCase):
 
             return [received_lines.get(timeout=0) for _ in range(0, expected_matches)]
 
+    def test_wait_for_line_replays_lines_received_while_component_is_alive(self):
+        with SutEvents(self.messagebus, self.config, self.sut) as sut_events:
+            self.messagebus.trigger_event(
+                LOG_LINE_RECEIVED, self.endpoint, entity='log-entity', data='early match')
+            with sut_events.wait_for_log_line(r'match', replay_window=10) as lines:
+                self.assertEqual(lines.get(timeout=0).string, 'early match')
+
     def test_get_all_lines(self):
         lines = ['first A', 'second B', 'third A', 'fourth B']
         regex = r'A'
@@ -0,0 +1,95 @@
+import re
+import unittest
+from queue import Empty
+
+from zaf.component.factory import Factory
+from zaf.component.manager import ComponentManager
+from zaf.messages.messagebus import MessageBus
+
+from sutevents import LOG_LINE_RECEIVED
+
+from ..loglines import get_log_line_hub, wait_for_log_lines
+from .utils import MOCK_ENDPOINT
+
+
+class TestLogLineHub(unittest.TestCase):
+
+    def setUp(self):
+        self.messagebus = MessageBus(Factory(ComponentManager({})))
+        self.messagebus.define_endpoints_and_messages({MOCK_ENDPOINT: [LOG_LINE_RECEIVED]})
+
+    def send(self, *lines, entity='log-entity'):
+        self.messagebus.trigger_events(LOG_LINE_RECEIVED, MOCK_ENDPOINT, lines, entity=entity)
+
+    def get_all(self, waiter):
+        matches = []
+        try:
+            while True:
+                matches.append(waiter.get_nowait().string)
+        except Empty:
+            return matches
+
+    def test_only_waiters_with_matching_patterns_get_the_line(self):
+        with wait_for_log_lines(self.messagebus, ['log-entity'], r'A') as a, \
+                wait_for_log_lines(self.messagebus, ['log-entity'], r'B\d') as b:
+            self.send('first A', 'second B1', 'third', 'fourth AB2')
+            self.assertEqual(self.get_all(a), ['first A', 'fourth AB2'])
+            self.assertEqual(self.get_all(b), ['second B1', 'fourth AB2'])
+
+    def test_waiters_with_the_same_pattern_all_get_the_line(self):
+        with wait_for_log_lines(self.messagebus, ['log-entity'], r'A') as first, \
+                wait_for_log_lines(self.messagebus, ['log-entity'], r'A') as second:
+            self.send('line A')
+            self.assertEqual(self.get_all(first), ['line A'])
+            self.assertEqual(self.get_all(second), ['line A'])
+
+    def test_match_groups_are_kept_when_patterns_are_combined(self):
+        with wait_for_log_lines(self.messagebus, ['log-entity'], r'(?P<word>\w+) A') as a, \
+                wait_for_log_lines(self.messagebus, ['log-entity'], r'(?P<word>\w+) B') as b:
+            self.send('first A', 'second B')
+            self.assertEqual(a.get_nowait().group('word'), 'first')
+            self.assertEqual(b.get_nowait().group('word'), 'second')
+
+    def test_patterns_that_can_not_be_combined_are_still_matched(self):
+        with wait_for_log_lines(self.messagebus, ['log-entity'], r'(\w)\1') as repeated, \
+                wait_for_log_lines(self.messagebus, ['log-entity'], r'(?i)upper') as upper, \
+                wait_for_log_lines(self.messagebus, ['log-entity'], r'other') as other:
+            self.send('aa', 'UpPeR', 'ab')
+            self.assertEqual(self.get_all(repeated), ['aa'])
+            self.assertEqual(self.get_all(upper), ['UpPeR'])
+            self.assertEqual(self.get_all(other), [])
+
+    def test_lines_from_other_entities_are_not_matched(self):
+        with wait_for_log_lines(self.messagebus, ['log-entity'], r'A') as waiter:
+            self.send('other A', entity='other-entity')
+            self.assertEqual(self.get_all(waiter), [])
+
+    def test_replay_window_gives_lines_received_before_waiting(self):
+        with wait_for_log_lines(self.messagebus, ['log-entity'], r'.*'):
+            self.send('before A', 'before B')
+            with wait_for_log_lines(self.messagebus, ['log-entity'], r'A',
+                                    replay_window=10) as replayed, \
+                    wait_for_log_lines(self.messagebus, ['log-entity'], r'A') as not_replayed:
+                self.send('after A')
+                self.assertEqual(self.get_all(replayed), ['before A', 'after A'])
+                self.assertEqual(self.get_all(not_replayed), ['after A'])
+
+    def test_hub_is_only_registered_while_acquired(self):
+        hub = get_log_line_hub(self.messagebus, 'log-entity')
+        self.assertIs(hub, get_log_line_hub(self.messagebus, 'log-entity'))
+        with wait_for_log_lines(self.messagebus, ['log-entity'], r'A'):
+            self.assertTrue(
+                self.messagebus.has_registered_dispatchers(
+                    LOG_LINE_RECEIVED, MOCK_ENDPOINT, 'log-entity'))
+        self.assertFalse(
+            self.messagebus.has_registered_dispatchers(
+                LOG_LINE_RECEIVED, MOCK_ENDPOINT, 'log-entity'))
+
+    def test_replay_window_is_cleared_when_hub_is_released(self):
+        hub = get_log_line_hub(self.messagebus, 'log-entity')
+        hub.acquire()
+        self.send('line A')
+        hub.release()
+        with wait_for_log_lines(self.messagebus, ['log-entity'], re.compile('A'),
+                                replay_window=10) as waiter:
+            self.assertEqual(self.get_all(waiter), [])
@@ -1,4 +1,5 @@
 from zaf.config.options import ConfigOptionId
+from zaf.config.types import Choice
 from zaf.messages.message import EndpointId
 
 from k2.sut import SUT
@@ -35,3 +36,19 @@ TELNET_TIMEOUT = ConfigOptionId(
 
 TELNET_PROMPT = ConfigOptionId(
     'telnet.prompt', 'Regular expression matching the prompt of the SUT', at=SUT, default=r'.* # ')
+
+TELNET_TRANSPORT = ConfigOptionId(
+    'telnet.transport',
+    'How to connect to the SUT. pexpect runs the telnet command and waits for the prompt, '
+    'socket connects directly and can have many commands in flight, '
+    'but requires the SUT to run a POSIX shell with stty',
+    at=SUT,
+    option_type=Choice(['pexpect', 'socket']),
+    default='pexpect')
+
+TELNET_MAX_IN_FLIGHT = ConfigOptionId(
+    'telnet.maxinflight',
+    'The maximum number of commands that are sent ahead of the responses with the socket transport',
+    at=SUT,
+    option_type=int,
+    default=16)
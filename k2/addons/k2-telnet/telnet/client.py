@@ -196,6 +196,30 @@ class TelnetClient(object):
             return (output, '', exit_code)
         return output
 
+    def send_lines(
+            self,
+            lines,
+            timeout=None,
+            expected_exit_code=None,
+            retry_once=True,
+            extended_process_information=False):
+        """
+        Send many lines to the remote host, one at a time.
+
+        The arguments are the same as for send_line and apply to each of the lines.
+        Use the socket transport to have many lines in flight at the same time.
+
+        :return: list with the output of each line, or the tuples if extended_process_information
+        """
+        return [
+            self.send_line(
+                line,
+                timeout=timeout,
+                expected_exit_code=expected_exit_code,
+                retry_once=retry_once,
+                extended_process_information=extended_process_information) for line in lines
+        ]
+
     def send_line_nowait(self, line):
         """
         Similar to send_line() but performs fewer checks.
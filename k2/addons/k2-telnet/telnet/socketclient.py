@@ -0,0 +1,376 @@
+"""
+Telnet client that talks to the remote host over a socket instead of through a telnet subprocess.
+
+Each command is wrapped in a small shell snippet that prints a begin marker before the command
+and an end marker with the exit code after it. The output and the exit code of a command are
+then received in one response, without waiting for the prompt or asking for the exit code
+afterwards. The markers contain a token that is unique for the connection and a sequence number.
+
+Echo is turned off and the commands get /dev/null as stdin, so that several commands can be
+sent before the responses of the earlier commands have been received. The responses are read
+in order, and anything that is received outside of the markers, like the output of a command
+that timed out, is skipped.
+"""
+
+import codecs
+import itertools
+import logging
+import re
+import socket
+import time
+import uuid
+from collections import deque
+
+from zaf.extensions.extension import get_logger_name
+
+from .client import LoggerFile, TelnetError, TelnetTimeout
+
+IAC = 255
+DONT = 254
+DO = 253
+WONT = 252
+WILL = 251
+SB = 250
+SE = 240
+
+ECHO = 1
+SUPPRESS_GO_AHEAD = 3
+
+# Options that are accepted if the server offers them, everything else is refused
+ACCEPTED_OPTIONS = (ECHO, SUPPRESS_GO_AHEAD)
+
+
+class SocketTelnetClient(object):
+    """
+    Communicates with a remote host using the telnet protocol over a socket.
+
+    Provides the same facilities for sending commands as the TelnetClient, and in addition
+    send_lines that pipelines many commands. Assumes that the remote host runs a POSIX shell.
+    """
+
+    # Default marker to look for in the remote host output when connecting.
+    DEFAULT_END_MARK = r'.* # '
+
+    # Numer of seconds to wait before considering a command to have timed-out.
+    DEFAULT_TIMEOUT = 60
+
+    # Maximum number of commands that are sent before their responses are received.
+    DEFAULT_MAX_IN_FLIGHT = 16
+
+    READ_SIZE = 65536
+
+    def __init__(
+            self,
+            ip,
+            port=23,
+            timeout=DEFAULT_TIMEOUT,
+            endmark=DEFAULT_END_MARK,
+            context_name='',
+            max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        self.ip = ip
+        self.port = port
+        self.timeout = timeout
+        self.endmark = re.compile(endmark) if endmark is not None else None
+        self.max_in_flight = max_in_flight
+        if context_name:
+            context_name = '.' + context_name
+        self.logger = logging.getLogger(get_logger_name('k2', 'telnet') + context_name)
+        self.logger.addHandler(logging.NullHandler())
+        self.rawlogger = logging.getLogger('rawtelnet' + context_name)
+        self.rawlogger.addHandler(logging.NullHandler())
+        self.rawlogger_file = None
+        self._socket = None
+        self._decoder = None
+        self._buffer = ''
+        self._pending_telnet_command = b''
+        self._token = None
+        self._command_ids = None
+
+    def connect(self):
+        if self.is_connected():
+            self.disconnect()
+        try:
+            self.logger.debug('Connecting to {ip}'.format(ip=self.ip))
+            self.rawlogger_file = LoggerFile(self.rawlogger, logging.DEBUG)
+            self._socket = socket.create_connection((self.ip, self.port), timeout=self.timeout)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._decoder = codecs.getincrementaldecoder('utf-8')('replace')
+            self._buffer = ''
+            self._pending_telnet_command = b''
+            self._token = uuid.uuid4().hex[:8]
+            self._command_ids = itertools.count(1)
+
+            if self.endmark is not None:
+                self._read_until(self.endmark, time.monotonic() + self.timeout)
+            # Without echo and prompts only the output of the commands is received,
+            # which is what makes it possible to have many commands in flight
+            self._write("stty -echo; PS1=''; PS2=''")
+            command_id = self._send_command('true')
+            self._read_response(command_id, 'true', time.monotonic() + self.timeout)
+        except Exception:
+            self.logger.debug('Connection failed', exc_info=True)
+            self.disconnect()
+            raise TelnetError('Connection to {ip}:{port} failed'.format(ip=self.ip, port=self.port))
+        self.logger.info('Connection to {ip}:{port} established'.format(ip=self.ip, port=self.port))
+
+    def disconnect(self):
+        if self._socket is not None:
+            self.logger.debug('Disconnecting from {ip}:{port}'.format(ip=self.ip, port=self.port))
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+        if self.rawlogger_file is not None:
+            self.rawlogger_file.close()
+            self.rawlogger_file = None
+
+    def is_connected(self):
+        return self._socket is not None
+
+    def _ensure_connected(self):
+        if not self.is_connected():
+            self.connect()
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc_details):
+        self.disconnect()
+
+    def send_line(
+            self,
+            line,
+            timeout=None,
+            endmark=None,
+            expected_exit_code=None,
+            retry_once=True,
+            extended_process_information=False):
+        """
+        Send a line to the remote host.
+
+        Raises TelnetError on communication error.
+        Raises TelnetTimeout if the response is not received before time-out.
+
+        Optionally checks that the exit code after executing the line.
+        Raises TelnetError if the exit code is not the expected value.
+
+        By default, if there was an TelnetError sending the line, it will retry sending the line again.
+
+        Returns a string containing the remote hosts output, with \\n as line separator.
+
+        :param line: the line to send.
+        :param timeout: the timeout when waiting for response.
+        :param endmark: not used, the end of the response is marked by the client itself
+        :param expected_exit_code: If specified, a TelnetError is sent if the exit code is different
+                                   than the expected exit code.
+        :param retry_once: Retry (once) if an TelnetError occurs while sending the line. It does not
+                           apply to checking the exit code or timeouts.
+        :param extended_process_information: Instead of the default return value, return a tuple
+                                             containing (stdout + stderr, '', exit_code).
+        :return: the command output.
+        """
+        return self.send_lines(
+            [line],
+            timeout=timeout,
+            expected_exit_code=expected_exit_code,
+            retry_once=retry_once,
+            extended_process_information=extended_process_information)[0]
+
+    def send_lines(
+            self,
+            lines,
+            timeout=None,
+            expected_exit_code=None,
+            retry_once=True,
+            extended_process_information=False):
+        """
+        Send many lines to the remote host, with up to max_in_flight lines in flight at a time.
+
+        The lines are run in order, one at a time, by the remote shell. The arguments are the same
+        as for send_line and apply to each of the lines. Exit codes are checked when all
+        responses have been received.
+
+        :return: list with the output of each line, or the tuples if extended_process_information
+        """
+        timeout = self.timeout if timeout is None else timeout
+        lines = list(lines)
+        responses = []
+        try:
+            self._ensure_connected()
+            self._pipeline(lines, timeout, responses)
+        except TelnetError as e:
+            if not retry_once:
+                raise
+            msg = 'Caught exception {e}, retrying once more.'.format(e=str(e))
+            self.logger.debug(msg, exc_info=True)
+            self.logger.warning(msg)
+            self._ensure_connected()
+            self._pipeline(lines[len(responses):], timeout, responses)
+
+        if expected_exit_code is not None:
+            for output, exit_code in responses:
+                self._check_exit_code(exit_code, expected_exit_code)
+        if extended_process_information:
+            return [(output, '', exit_code) for output, exit_code in responses]
+        return [output for output, exit_code in responses]
+
+    def send_line_nowait(self, line):
+        """
+        Similar to send_line() but performs fewer checks.
+
+        The line is sent as it is and any output is skipped when reading the following responses.
+        """
+        self._ensure_connected()
+        self._write(line)
+
+    def _pipeline(self, lines, timeout, responses):
+        in_flight = deque()
+        remaining = iter(lines)
+        for line in itertools.islice(remaining, self.max_in_flight):
+            in_flight.append((self._send_command(line), line))
+
+        while in_flight:
+            command_id, line = in_flight.popleft()
+            responses.append(
+                self._read_response(command_id, line, time.monotonic() + timeout))
+            for line in itertools.islice(remaining, 1):
+                in_flight.append((self._send_command(line), line))
+
+    def _marker(self, command_id, name):
+        return 'k2:{token}:{id}:{name}'.format(token=self._token, id=command_id, name=name)
+
+    def _send_command(self, line):
+        command_id = next(self._command_ids)
+        self.logger.info('Sending line: {line}'.format(line=line))
+        # The markers are split in two strings so that they are not in the command itself,
+        # and the command is on its own line so that it can't comment out the rest
+        prefix = self._marker(command_id, '')
+        self._write(
+            'echo "{prefix}""begin"; {{ {line}\n}} </dev/null 2>&1; echo "{prefix}""end:$?"'.format(
+                prefix=prefix, line=line))
+        return command_id
+
+    def _read_response(self, command_id, line, deadline):
+        begin = self._marker(command_id, 'begin')
+        end = re.compile(re.escape(self._marker(command_id, 'end:')) + r'(\d+)\r?\n')
+
+        while True:
+            start = self._buffer.find(begin)
+            if start >= 0:
+                output_start = self._buffer.find('\n', start)
+                if output_start >= 0:
+                    match = end.search(self._buffer, output_start + 1)
+                    if match is not None:
+                        break
+            else:
+                # Skip anything before the begin marker, but keep enough for a partial marker
+                self._buffer = self._buffer[-len(begin):]
+            self._receive(deadline, line)
+
+        output = self._buffer[output_start + 1:match.start()]
+        self._buffer = self._buffer[match.end():]
+        if output.endswith('\n'):
+            output = output[:-1]
+        output = output.replace('\r\n', '\n')
+        if output.endswith('\r'):
+            output = output[:-1]
+        exit_code = int(match.group(1))
+        self.logger.debug(
+            'Output of line {line} with exit code {exit_code}: {output}'.format(
+                line=line, exit_code=exit_code, output=output))
+        return output, exit_code
+
+    def _read_until(self, pattern, deadline):
+        while pattern.search(self._buffer) is None:
+            self._receive(deadline, pattern.pattern)
+        self._buffer = ''
+
+    def _receive(self, deadline, waiting_for):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TelnetTimeout(
+                'Timeout waiting for response to {waiting_for}'.format(waiting_for=waiting_for))
+        try:
+            self._socket.settimeout(remaining)
+            data = self._socket.recv(self.READ_SIZE)
+        except socket.timeout:
+            raise TelnetTimeout(
+                'Timeout waiting for response to {waiting_for}'.format(
+                    waiting_for=waiting_for)) from None
+        except OSError as e:
+            self.disconnect()
+            raise TelnetError(
+                'Connection to {ip}:{port} lost: {error}'.format(
+                    ip=self.ip, port=self.port, error=str(e))) from None
+        if not data:
+            self.disconnect()
+            raise TelnetError('Connection to {ip}:{port} lost'.format(ip=self.ip, port=self.port))
+        text = self._decoder.decode(self._handle_telnet_commands(data))
+        self.rawlogger_file.write(text)
+        self._buffer += text
+
+    def _handle_telnet_commands(self, data):
+        """Remove telnet commands from the data and answer option negotiations."""
+        if self._pending_telnet_command:
+            data = self._pending_telnet_command + data
+            self._pending_telnet_command = b''
+        if IAC not in data:
+            return data
+
+        result = bytearray()
+        replies = bytearray()
+        index = 0
+        while index < len(data):
+            iac = data.find(IAC, index)
+            if iac < 0:
+                result += data[index:]
+                break
+            result += data[index:iac]
+            if iac + 1 >= len(data):
+                self._pending_telnet_command = data[iac:]
+                break
+            command = data[iac + 1]
+            if command == IAC:
+                result.append(IAC)
+                index = iac + 2
+            elif command in (DO, DONT, WILL, WONT):
+                if iac + 2 >= len(data):
+                    self._pending_telnet_command = data[iac:]
+                    break
+                option = data[iac + 2]
+                if command == DO:
+                    replies += bytes([IAC, WONT, option])
+                elif command == WILL:
+                    replies += bytes(
+                        [IAC, DO if option in ACCEPTED_OPTIONS else DONT, option])
+                index = iac + 3
+            elif command == SB:
+                se = data.find(bytes([IAC, SE]), iac + 2)
+                if se < 0:
+                    self._pending_telnet_command = data[iac:]
+                    break
+                index = se + 2
+            else:
+                index = iac + 2
+
+        if replies:
+            self._socket.sendall(bytes(replies))
+        return bytes(result)
+
+    def _write(self, line):
+        if not self.is_connected():
+            raise TelnetError('Can not send lines while disconnected')
+        try:
+            self._socket.sendall((line + '\n').encode('utf-8').replace(b'\xff', b'\xff\xff'))
+        except OSError:
+            self.disconnect()
+            raise TelnetError(
+                'Connection to {ip}:{port} lost'.format(ip=self.ip, port=self.port)) from None
+
+    def _check_exit_code(self, exit_code, expected_exit_code):
+        if exit_code != expected_exit_code:
+            raise TelnetError(
+                'Unexpected exit code when running command. Expected {e} got {a}'.format(
+                    e=expected_exit_code, a=exit_code))
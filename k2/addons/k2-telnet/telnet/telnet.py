@@ -7,9 +7,11 @@ from zaf.extensions.extension import AbstractExtension, CommandExtension
 
 from k2.cmd.run import RUN_COMMAND
 from k2.sut import SUT, SUT_IP
-from telnet import TELNET_ENABLED, TELNET_PORT, TELNET_PROMPT, TELNET_TIMEOUT
+from telnet import TELNET_ENABLED, TELNET_MAX_IN_FLIGHT, TELNET_PORT, TELNET_PROMPT, \
+    TELNET_TIMEOUT, TELNET_TRANSPORT
 
 from .client import TelnetClient
+from .socketclient import SocketTelnetClient
 
 
 @requires(context='ComponentContext')
@@ -28,8 +30,15 @@ def telnet_exec(context, sut):
             date = exec.send_line('date', expected_exit_code=0)
             print(date)
     """
-    with TelnetClient(sut.ip, sut.telnet.port, sut.telnet.timeout, sut.telnet.prompt,
-                      context.callable_qualname) as client:
+    if sut.telnet.transport == 'socket':
+        client = SocketTelnetClient(
+            sut.ip, sut.telnet.port, sut.telnet.timeout, sut.telnet.prompt,
+            context.callable_qualname, sut.telnet.max_in_flight)
+    else:
+        client = TelnetClient(
+            sut.ip, sut.telnet.port, sut.telnet.timeout, sut.telnet.prompt,
+            context.callable_qualname)
+    with client:
         yield client
 
 
@@ -42,7 +51,9 @@ def telnet_exec(context, sut):
         ConfigOption(TELNET_ENABLED, required=True),
         ConfigOption(TELNET_PORT, required=False),
         ConfigOption(TELNET_TIMEOUT, required=False),
-        ConfigOption(TELNET_PROMPT, required=False)
+        ConfigOption(TELNET_PROMPT, required=False),
+        ConfigOption(TELNET_TRANSPORT, required=False),
+        ConfigOption(TELNET_MAX_IN_FLIGHT, required=False),
     ],
     groups=['exec', 'telnet'],
     activate_on=[TELNET_ENABLED],
@@ -56,6 +67,8 @@ class Telnet(AbstractExtension):
         self._port = config.get(TELNET_PORT)
         self._timeout = config.get(TELNET_TIMEOUT)
         self._prompt = config.get(TELNET_PROMPT)
+        self._transport = config.get(TELNET_TRANSPORT)
+        self._max_in_flight = config.get(TELNET_MAX_IN_FLIGHT)
 
     def register_components(self, component_manager):
         if self._enabled is True:
@@ -66,4 +79,6 @@ class Telnet(AbstractExtension):
                     'port': self._port,
                     'timeout': self._timeout,
                     'prompt': self._prompt,
+                    'transport': self._transport,
+                    'max_in_flight': self._max_in_flight,
                 })
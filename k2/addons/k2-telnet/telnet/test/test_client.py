@@ -162,3 +162,23 @@ class TestTelnetClient(TestCase):
         self.telnet.telnet.before = test_data
         self.assertEqual(
             self.telnet.send_line(test_data, extended_process_information=True), (test_data, '', 1))
+
+    def test_send_lines_sends_each_line(self):
+        self.telnet.send_line = MagicMock(side_effect=['first', 'second'])
+        self.assertEqual(
+            self.telnet.send_lines(['a', 'b'], expected_exit_code=0), ['first', 'second'])
+        self.telnet.send_line.assert_has_calls(
+            [
+                call(
+                    'a',
+                    timeout=None,
+                    expected_exit_code=0,
+                    retry_once=True,
+                    extended_process_information=False),
+                call(
+                    'b',
+                    timeout=None,
+                    expected_exit_code=0,
+                    retry_once=True,
+                    extended_process_information=False)
+            ])
@@ -0,0 +1,180 @@
+import os
+import pty
+import select
+import socket
+import threading
+from unittest import TestCase
+from unittest.mock import Mock
+
+from ..client import TelnetError, TelnetTimeout
+from ..socketclient import DO, DONT, ECHO, IAC, SB, SE, WILL, WONT, SocketTelnetClient
+
+
+class ShellServer(object):
+    """A telnet server on localhost that runs an interactive sh for each connection."""
+
+    def __init__(self):
+        self.server = socket.socket()
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+        self.received_telnet_commands = bytearray()
+        self.connections = []
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.close()
+        for connection, pid, fd in self.connections:
+            connection.close()
+            os.close(fd)
+            os.kill(pid, 9)
+            os.waitpid(pid, 0)
+
+    def _serve(self):
+        while True:
+            try:
+                connection, _ = self.server.accept()
+            except OSError:
+                return
+            pid, fd = pty.fork()
+            if pid == 0:
+                os.execve('/bin/sh', ['sh', '-i'], {'PS1': '/ # ', 'PATH': os.environ['PATH']})
+            self.connections.append((connection, pid, fd))
+            connection.sendall(bytes([IAC, WILL, ECHO, IAC, DO, 31, IAC, SB, 31, 0, IAC, SE]))
+            threading.Thread(target=self._bridge, args=(connection, fd), daemon=True).start()
+
+    def _bridge(self, connection, fd):
+        try:
+            while True:
+                readable, _, _ = select.select([connection, fd], [], [])
+                if connection in readable:
+                    data = connection.recv(4096)
+                    if not data:
+                        return
+                    while IAC in data:
+                        index = data.index(IAC)
+                        self.received_telnet_commands += data[index:index + 3]
+                        data = data[:index] + data[index + 3:]
+                    os.write(fd, data)
+                if fd in readable:
+                    connection.sendall(os.read(fd, 4096))
+        except OSError:
+            pass
+
+
+class TestSocketTelnetClient(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.server = ShellServer()
+        self.addCleanup(self.server.close)
+        self.telnet = SocketTelnetClient('127.0.0.1', self.server.port, timeout=5)
+
+    def test_is_connected_initially_returns_false(self):
+        self.assertFalse(self.telnet.is_connected())
+
+    def test_context_manager_connects_and_disconnects(self):
+        with self.telnet:
+            self.assertTrue(self.telnet.is_connected())
+        self.assertFalse(self.telnet.is_connected())
+
+    def test_options_offered_by_the_server_are_negotiated(self):
+        with self.telnet:
+            pass
+        self.assertIn(bytes([IAC, DO, ECHO]), self.server.received_telnet_commands)
+        self.assertIn(bytes([IAC, WONT, 31]), self.server.received_telnet_commands)
+
+    def test_send_line_returns_the_output_of_the_command(self):
+        with self.telnet:
+            self.assertEqual(self.telnet.send_line('echo first; echo second'), 'first\nsecond')
+
+    def test_send_line_returns_output_without_trailing_newline(self):
+        with self.telnet:
+            self.assertEqual(self.telnet.send_line('printf abc'), 'abc')
+
+    def test_send_line_returns_empty_output_for_command_without_output(self):
+        with self.telnet:
+            self.assertEqual(self.telnet.send_line('true'), '')
+
+    def test_send_line_includes_stderr_in_output(self):
+        with self.telnet:
+            self.assertEqual(self.telnet.send_line('echo error >&2'), 'error')
+
+    def test_send_line_with_comment_gives_exit_code(self):
+        with self.telnet:
+            self.assertEqual(
+                self.telnet.send_line('false # comment', extended_process_information=True),
+                ('', '', 1))
+
+    def test_send_line_raises_telnet_error_if_exit_code_is_not_as_expected(self):
+        with self.telnet:
+            with self.assertRaisesRegex(TelnetError, 'Expected 0 got 3'):
+                self.telnet.send_line('(exit 3)', expected_exit_code=0)
+
+    def test_send_lines_returns_the_outputs_in_order(self):
+        self.telnet.max_in_flight = 4
+        lines = ['echo line{index}; (exit {index})'.format(index=index) for index in range(20)]
+        with self.telnet:
+            responses = self.telnet.send_lines(lines, extended_process_information=True)
+        self.assertEqual(
+            responses,
+            [('line{index}'.format(index=index), '', index) for index in range(20)])
+
+    def test_commands_do_not_read_the_following_commands_as_input(self):
+        with self.telnet:
+            self.assertEqual(self.telnet.send_lines(['cat', 'echo after']), ['', 'after'])
+
+    def test_output_of_a_timed_out_command_is_skipped(self):
+        with self.telnet:
+            with self.assertRaises(TelnetTimeout):
+                self.telnet.send_line('sleep 0.5; echo late', timeout=0.1)
+            self.assertEqual(self.telnet.send_line('echo next'), 'next')
+
+    def test_output_of_send_line_nowait_is_skipped(self):
+        with self.telnet:
+            self.telnet.send_line_nowait('echo nowait')
+            self.assertEqual(self.telnet.send_line('echo next'), 'next')
+
+    def test_send_line_reconnects_and_retries_once_if_connection_is_lost(self):
+        with self.telnet:
+            self.telnet._socket.close()
+            self.assertEqual(self.telnet.send_line('echo retried'), 'retried')
+
+    def test_connect_raises_telnet_error_if_connection_fails(self):
+        self.server.server.close()
+        with self.assertRaises(TelnetError):
+            self.telnet.connect()
+
+
+class TestTelnetCommandHandling(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.telnet = SocketTelnetClient(None)
+        self.telnet._socket = Mock()
+
+    def handle(self, data):
+        sendall = self.telnet._socket.sendall
+        sendall.reset_mock()
+        result = self.telnet._handle_telnet_commands(data)
+        replies = b''.join(args[0] for args, kwargs in sendall.call_args_list)
+        return result, replies
+
+    def test_data_without_commands_is_unchanged(self):
+        self.assertEqual(self.handle(b'text'), (b'text', b''))
+
+    def test_escaped_iac_is_kept(self):
+        self.assertEqual(self.handle(bytes([65, IAC, IAC, 66])), (bytes([65, IAC, 66]), b''))
+
+    def test_options_are_refused_unless_accepted(self):
+        result, replies = self.handle(bytes([IAC, DO, 24, IAC, WILL, 5, IAC, WILL, ECHO]))
+        self.assertEqual(result, b'')
+        self.assertEqual(replies, bytes([IAC, WONT, 24, IAC, DONT, 5, IAC, DO, ECHO]))
+
+    def test_command_split_between_reads_is_handled(self):
+        self.assertEqual(self.handle(bytes([65, IAC])), (b'A', b''))
+        self.assertEqual(self.handle(bytes([DO, 24, 66])), (b'B', bytes([IAC, WONT, 24])))
+
+    def test_subnegotiation_is_removed(self):
+        self.assertEqual(self.handle(bytes([65, IAC, SB, 24, 1, IAC, SE, 66])), (b'AB', b''))
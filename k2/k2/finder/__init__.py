@@ -1,4 +1,5 @@
 from zaf.config.options import ConfigOptionId
+from zaf.config.types import Path
 from zaf.messages.message import EndpointId, MessageId
 
 TEST_SOURCES = ConfigOptionId(
@@ -7,6 +8,18 @@ TEST_SOURCES = ConfigOptionId(
     multiple=True,
     argument=True)
 
+TEST_INDEX = ConfigOptionId(
+    'test.index',
+    'Store the test cases found in test source files in an index, '
+    'so that unchanged test modules are not imported until their test cases are run',
+    option_type=bool,
+    default=True)
+
+TEST_INDEX_FILE = ConfigOptionId(
+    'test.index.file',
+    'Path to the test index. If no path is given the index is stored in $XDG_CACHE_HOME/k2',
+    option_type=Path())
+
 FINDER_ENDPOINT = EndpointId('testfinder', """\
 The test finder
 """)
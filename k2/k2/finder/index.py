@@ -0,0 +1,376 @@
+"""
+Index of the test cases found in test source files.
+
+Finding the test cases with nose imports every test module, which can take a
+long time for large test suites. To avoid doing this on every run the test
+cases found in each file are stored in an on-disk index, together with the
+modification time, size and content hash of the file.
+
+When a test source is a file or a directory, the test cases in unchanged files
+are taken from the index without importing the files. The test case functions
+are replaced with LazyTestFunction stand-ins that import the module the first
+time something is needed from it, which normally is right before the first
+test case in the module is run.
+
+Files that have changed are loaded with nose again, one file at a time.
+If files or directories have been added or removed, or if a package
+__init__.py file has changed, the whole test source is loaded again.
+
+Modules that define components or have parameterized test cases are always
+imported, as other test cases and the parameters can depend on the components.
+Test sources that nose fails to load are never stored in the index.
+
+The index is stored in *$XDG_CACHE_HOME/k2/test_index.json* unless another
+location is given with :ref:`option-test.index.file`.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+
+from zaf.extensions.extension import get_logger_name
+
+logger = logging.getLogger(get_logger_name('k2', 'testfinder', 'index'))
+logger.addHandler(logging.NullHandler())
+
+TEST_INDEX_VERSION = 1
+
+
+def default_index_path():
+    cache_dir = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_dir, 'k2', 'test_index.json')
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime, stat.st_size
+    except OSError:
+        return None, None
+
+
+def _hash(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _walk(source):
+    """Return the directories and the Python files of a test source."""
+    if not os.path.isdir(source):
+        return {}, [source]
+
+    directories = {}
+    files = []
+    for directory, dirnames, filenames in os.walk(source):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d != '__pycache__')
+        directories[directory] = _stat(directory)[0]
+        files.extend(
+            os.path.join(directory, filename) for filename in sorted(filenames)
+            if filename.endswith('.py'))
+    return directories, files
+
+
+def _location(test_function):
+    """
+    Get where a test function can be found without the finder.
+
+    :return: tuple with module name and attribute, or None for test functions that can't be
+             found from the module, for example test functions that are created dynamically
+    """
+    if inspect.ismethod(test_function):
+        cls = type(test_function.__self__)
+        module = sys.modules.get(cls.__module__)
+        if getattr(module, cls.__name__, None) is not cls:
+            return None
+        return cls.__module__, '{cls}.{name}'.format(cls=cls.__name__, name=test_function.__name__)
+    elif inspect.isfunction(test_function):
+        module = sys.modules.get(test_function.__module__)
+        if getattr(module, test_function.__name__, None) is not test_function:
+            return None
+        return test_function.__module__, test_function.__name__
+    return None
+
+
+def _module_names_by_file():
+    module_names = {}
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+        if path:
+            module_names[os.path.abspath(path)] = name
+    return module_names
+
+
+def _defines_components(module_name):
+    module = sys.modules.get(module_name)
+    return any(
+        hasattr(value, '_zaf_component_name') and getattr(value, '__module__', None) == module_name
+        for value in vars(module).values()) if module is not None else False
+
+
+class TestIndex(object):
+    """
+    On-disk index of the test cases in test source files.
+
+    Test sources are indexed on their absolute paths.
+    """
+
+    __test__ = False
+
+    def __init__(self, path=None):
+        """
+        Create a new index.
+
+        :param path: the path to the index file, None to not store the index
+        """
+        self._path = path
+        self._sources = None
+        self._modified = False
+
+    def get(self, source):
+        """
+        Get the indexed modules of a test source.
+
+        :param source: the absolute path of the test source
+        :return: list of module entries or None if the source is not indexed or has
+                 files or directories that have been added or removed
+        """
+        if self._sources is None:
+            self._sources = self._read()
+
+        entry = self._sources.get(source)
+        if entry is None:
+            return None
+
+        directories, files = _walk(source)
+        if directories != entry['directories'] or files != [m['path'] for m in entry['modules']]:
+            return None
+        return entry['modules']
+
+    def is_unchanged(self, module):
+        """
+        Check if the file of an indexed module is unchanged.
+
+        If only the modification time has changed the entry is updated.
+        """
+        mtime, size = _stat(module['path'])
+        if mtime == module['mtime'] and size == module['size']:
+            return True
+        if size == module['size'] and _hash(module['path']) == module['hash']:
+            module['mtime'] = mtime
+            self._modified = True
+            return True
+        return False
+
+    def add(self, source, test_cases):
+        """
+        Index the test cases that were found in a test source.
+
+        Nothing is indexed if any of the test cases can't be loaded lazily.
+
+        :param source: the absolute path of the test source
+        :param test_cases: list of TestCaseDefinition found in the test source
+        """
+        if self._sources is None:
+            self._sources = self._read()
+
+        directories, files = _walk(source)
+        modules = self._index_modules(files, test_cases)
+        if modules is None:
+            logger.debug('Test source {source} can not be indexed'.format(source=source))
+            if self._sources.pop(source, None) is not None:
+                self._modified = True
+            return
+
+        self._sources[source] = {
+            'directories': directories,
+            'modules': modules,
+        }
+        self._modified = True
+
+    def update(self, module, test_cases):
+        """
+        Update the entry of a module that has changed.
+
+        :return: False if the test cases can't be indexed and the source must be loaded again
+        """
+        modules = self._index_modules([module['path']], test_cases)
+        if modules is None:
+            return False
+
+        module.clear()
+        module.update(modules[0])
+        self._modified = True
+        return True
+
+    def save(self):
+        """Write the index to disk if it has been modified."""
+        if self._path is None or not self._modified:
+            return
+
+        content = {
+            'version': TEST_INDEX_VERSION,
+            'sources': self._sources,
+        }
+        try:
+            directory = os.path.dirname(self._path)
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temporary file and rename it to not expose half written
+            # files to concurrently running finders
+            with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as f:
+                json.dump(content, f)
+            os.replace(f.name, self._path)
+            self._modified = False
+        except OSError as e:
+            logger.debug(
+                'Could not write test index {path}: {msg}'.format(path=self._path, msg=str(e)))
+
+    def _index_modules(self, files, test_cases):
+        module_names = _module_names_by_file()
+        modules = OrderedDict(
+            (path, self._module_entry(path, module_names.get(path))) for path in files)
+        for test_case in test_cases:
+            location = None if test_case.always_included else _location(test_case.run_function)
+            if location is None:
+                return None
+            module_name, attribute = location
+            module = modules.get(os.path.abspath(getattr(sys.modules[module_name], '__file__', '')))
+            if module is None or module['module'] != module_name:
+                return None
+
+            module['eager'] = module['eager'] or bool(test_case.params)
+            # Parameterized test cases are found once for each parameter set
+            if not any(test['attribute'] == attribute for test in module['tests']):
+                module['tests'].append(
+                    {
+                        'name': test_case.name,
+                        'attribute': attribute,
+                        'doc': test_case.run_function.__doc__,
+                    })
+        return list(modules.values())
+
+    def _module_entry(self, path, module_name):
+        mtime, size = _stat(path)
+        return {
+            'path': path,
+            'module': module_name,
+            'mtime': mtime,
+            'size': size,
+            'hash': _hash(path),
+            'eager': _defines_components(module_name),
+            'tests': [],
+        }
+
+    def _read(self):
+        if self._path is None:
+            return {}
+        try:
+            with open(self._path, 'r') as f:
+                content = json.load(f)
+            if content.get('version') == TEST_INDEX_VERSION:
+                return content['sources']
+        except (OSError, ValueError, AttributeError, KeyError) as e:
+            logger.debug(
+                'Could not read test index {path}: {msg}'.format(path=self._path, msg=str(e)))
+        return {}
+
+
+def import_test_module(path, module_name):
+    """Import a test module the same way as nose does when finding test cases."""
+    from nose.importer import Importer
+
+    return Importer().importFromPath(path, module_name)
+
+
+class LazyTestFunction(object):
+    """
+    Stand-in for a test function in a module that has not been imported yet.
+
+    The name, module and doc string are available directly and everything else
+    is taken from the real test function, which is imported on first use.
+    """
+
+    def __init__(self, path, module, attribute, doc):
+        self.__dict__.update(
+            {
+                '_path': path,
+                '_function': None,
+                '__module__': module,
+                '__qualname__': attribute,
+                '__name__': attribute.rsplit('.', maxsplit=1)[-1],
+                '__doc__': doc,
+            })
+
+    @property
+    def is_resolved(self):
+        return self._function is not None
+
+    def resolve(self):
+        """
+        Import the module of the test function.
+
+        :return: the test function, or a bound method for test cases in classes
+        """
+        if self._function is None:
+            logger.debug(
+                'Importing lazily found test module {module}'.format(module=self.__module__))
+            value = import_test_module(self._path, self.__module__)
+            class_name, _, function_name = self.__qualname__.rpartition('.')
+            if class_name:
+                # Like nose, test cases in classes are run on a new instance of the class
+                value = getattr(value, class_name)()
+            self.__dict__['_function'] = getattr(value, function_name)
+        return self._function
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __eq__(self, other):
+        return isinstance(other, LazyTestFunction) and \
+            (self._path, self.__qualname__) == (other._path, other.__qualname__)
+
+    def __hash__(self):
+        return hash((self._path, self.__qualname__))
+
+    def __reduce__(self):
+        # Pickled as the indexed location, a worker process imports the test module itself
+        # because the directory of the module is only added to sys.path when it is imported
+        return LazyTestFunction, (self._path, self.__module__, self.__qualname__, self.__doc__)
+
+    def __repr__(self):
+        return 'LazyTestFunction({module}.{qualname})'.format(
+            module=self.__module__, qualname=self.__qualname__)
+
+
+def resolve_test_function(run_function):
+    """
+    Get the real test function for a run function that may have been found lazily.
+
+    If the test module can't be imported a function that raises the import error is returned,
+    so that the error is reported as the result of the test case.
+    """
+    if not isinstance(run_function, LazyTestFunction):
+        return run_function
+
+    try:
+        return run_function.resolve()
+    except Exception as e:
+        logger.debug(str(e), exc_info=True)
+        error = e
+
+        def failed_import():
+            raise error
+
+        failed_import.__name__ = run_function.__name__
+        failed_import.__qualname__ = run_function.__qualname__
+        return failed_import
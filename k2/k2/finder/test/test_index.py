@@ -0,0 +1,186 @@
+import inspect
+import os
+import pickle
+import sys
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import Mock
+
+from zaf.component.manager import ComponentManager, create_entity_map, create_registry
+
+from ..index import LazyTestFunction, TestIndex, import_test_module, resolve_test_function
+from ..testfinder import Finder, TestCaseFailureDefinition
+
+TEST_MODULE = """\
+def test_first():
+    '''The first test.'''
+    pass
+
+
+def test_second():
+    pass
+
+
+class TestClass(object):
+
+    def test_method(self):
+        assert isinstance(self, TestClass)
+"""
+
+COMPONENT_MODULE = """\
+from zaf.component.decorator import component
+
+
+@component(name='IndexedComponent')
+class IndexedComponent(object):
+    pass
+
+
+def test_component():
+    pass
+"""
+
+
+class TestTestIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.source = os.path.join(self.dir.name, 'suite')
+        os.mkdir(self.source)
+        self.index_file = os.path.join(self.dir.name, 'index.json')
+        self.loaded = []
+        self.module_names = []
+        self.addCleanup(self.remove_modules)
+
+    def remove_modules(self):
+        for module_name in self.module_names:
+            sys.modules.pop(module_name, None)
+
+    def write(self, filename, content):
+        path = os.path.join(self.source, filename)
+        with open(path, 'w') as f:
+            f.write(content)
+        self.module_names.append(inspect.getmodulename(path))
+        return path
+
+    def find(self):
+        """Find the test cases like a new k2 run, with nose replaced by a plain import."""
+        self.remove_modules()
+        finder = Finder(
+            ComponentManager(create_registry(), create_entity_map()), TestIndex(self.index_file))
+
+        def load_tests(*names):
+            tests = []
+            for name in names:
+                self.loaded.append(name)
+                paths = [name] if os.path.isfile(name) else [
+                    os.path.join(name, filename) for filename in sorted(os.listdir(name))
+                    if filename.endswith('.py')
+                ]
+                for path in paths:
+                    module = import_test_module(path, inspect.getmodulename(path))
+                    for attribute, value in vars(module).items():
+                        if attribute.startswith('test_') and inspect.isfunction(value):
+                            tests.extend(finder._create_testcase_definitions(value))
+                        elif attribute.startswith('Test') and inspect.isclass(value):
+                            tests.extend(finder._create_testcase_definitions(value().test_method))
+            return tests
+
+        finder._load_tests = load_tests
+        return finder.find_tests(self.source)
+
+    def test_test_cases_are_taken_from_the_index_without_importing_unchanged_modules(self):
+        self.write('indexed_unchanged.py', TEST_MODULE)
+        found = self.find()
+        self.assertEqual(self.loaded, [self.source])
+
+        indexed = self.find()
+        self.assertEqual(self.loaded, [self.source])
+        self.assertNotIn('indexed_unchanged', sys.modules)
+        self.assertEqual([t.name for t in indexed], [t.name for t in found])
+        self.assertEqual(indexed[0].description, 'The first test.')
+        self.assertTrue(all(isinstance(t.run_function, LazyTestFunction) for t in indexed))
+
+    def test_lazy_test_functions_import_the_module_when_resolved(self):
+        self.write('indexed_lazy.py', TEST_MODULE)
+        self.find()
+        first, _, method = self.find()
+
+        resolve_test_function(first.run_function)()
+        resolve_test_function(method.run_function)()
+        self.assertIn('indexed_lazy', sys.modules)
+        self.assertTrue(inspect.ismethod(resolve_test_function(method.run_function)))
+
+    def test_only_changed_modules_are_loaded_again(self):
+        self.write('indexed_changed.py', TEST_MODULE)
+        self.write('indexed_other.py', TEST_MODULE)
+        self.find()
+        changed = self.write(
+            'indexed_changed.py', TEST_MODULE + '\n\ndef test_third():\n    pass\n')
+
+        indexed = self.find()
+        self.assertEqual(self.loaded, [self.source, changed])
+        self.assertIn('indexed_changed.test_third', [t.name for t in indexed])
+        self.assertNotIn('indexed_other', sys.modules)
+
+    def test_modules_with_only_a_new_modification_time_are_not_loaded_again(self):
+        path = self.write('indexed_touched.py', TEST_MODULE)
+        self.find()
+        os.utime(path, (0, 0))
+
+        self.find()
+        self.assertEqual(self.loaded, [self.source])
+
+    def test_source_is_loaded_again_if_a_file_is_added(self):
+        self.write('indexed_first.py', TEST_MODULE)
+        self.find()
+        self.write('indexed_added.py', TEST_MODULE)
+        os.utime(self.source, (0, 0))
+
+        indexed = self.find()
+        self.assertEqual(self.loaded, [self.source, self.source])
+        self.assertIn('indexed_added.test_first', [t.name for t in indexed])
+
+    def test_modules_that_define_components_are_imported(self):
+        self.write('indexed_component.py', COMPONENT_MODULE)
+        self.find()
+
+        indexed = self.find()
+        self.assertEqual(self.loaded, [self.source])
+        self.assertIn('indexed_component', sys.modules)
+        self.assertNotIsInstance(indexed[0].run_function, LazyTestFunction)
+
+    def test_source_with_failures_is_not_indexed(self):
+        index = TestIndex(self.index_file)
+        index.add(self.source, [TestCaseFailureDefinition(Mock(), 'failure')])
+        self.assertIsNone(index.get(self.source))
+
+    def test_import_errors_are_raised_when_the_test_case_is_run(self):
+        run_function = resolve_test_function(
+            LazyTestFunction(
+                os.path.join(self.source, 'indexed_missing.py'), 'indexed_missing', 'test_missing',
+                None))
+        with self.assertRaises(ImportError):
+            run_function()
+
+
+class TestLazyTestFunction(unittest.TestCase):
+
+    def test_lazy_test_functions_are_equal_if_they_refer_to_the_same_test_function(self):
+        function = LazyTestFunction('/a.py', 'a', 'test', None)
+        self.assertEqual(function, LazyTestFunction('/a.py', 'a', 'test', 'doc'))
+        self.assertNotEqual(function, LazyTestFunction('/a.py', 'a', 'other', None))
+
+    def test_name_module_and_doc_are_available_without_import(self):
+        function = LazyTestFunction('/a.py', 'a', 'Class.test', 'doc')
+        self.assertEqual(function.__name__, 'test')
+        self.assertEqual(function.__module__, 'a')
+        self.assertEqual(function.__doc__, 'doc')
+        self.assertFalse(function.is_resolved)
+
+    def test_pickled_as_the_location_without_import(self):
+        function = pickle.loads(pickle.dumps(LazyTestFunction('/a.py', 'a', 'Class.test', 'doc')))
+        self.assertEqual(function, LazyTestFunction('/a.py', 'a', 'Class.test', 'doc'))
+        self.assertEqual(function.__doc__, 'doc')
+        self.assertFalse(function.is_resolved)
@@ -12,7 +12,7 @@ from zaf.config.manager import ConfigManager
 from k2.finder.testfinder import TestCaseDefinition, TestCaseParam
 from k2.runner.decorator import foreach
 
-from .. import FIND_TEST_CASES, FINDER_ENDPOINT, TEST_SOURCES
+from .. import FIND_TEST_CASES, FINDER_ENDPOINT, TEST_INDEX, TEST_INDEX_FILE, TEST_SOURCES
 from ..testfinder import Finder, TestFinder
 
 
@@ -25,6 +25,7 @@ class TestTestFinder(unittest.TestCase):
     def test_test_finder_extension_calls_finder_when_receiving_request(self):
         config = ConfigManager()
         config.set(TEST_SOURCES, ['name1', 'name2'])
+        config.set(TEST_INDEX, False)
 
         with ExtensionTestHarness(TestFinder, config=config) as harness:
 
@@ -38,6 +39,24 @@ class TestTestFinder(unittest.TestCase):
                 self.assertEqual(expected_result, actual_tests)
                 find_tests_mock.assert_called_with('name1', 'name2')
 
+    def find_with_index(self, config):
+        config.set(TEST_SOURCES, ['name'])
+        with ExtensionTestHarness(TestFinder, config=config) as harness, \
+                patch('k2.finder.testfinder.Finder') as finder:
+            harness.send_request(FIND_TEST_CASES, FINDER_ENDPOINT).wait(timeout=1)[0].result(
+                timeout=1)
+        return finder.call_args[0][1]
+
+    def test_test_finder_extension_stores_the_index_in_the_configured_file(self):
+        config = ConfigManager()
+        config.set(TEST_INDEX_FILE, '/tmp/k2test/test_index.json')
+        self.assertEqual(self.find_with_index(config)._path, '/tmp/k2test/test_index.json')
+
+    def test_test_finder_extension_does_not_use_an_index_if_disabled(self):
+        config = ConfigManager()
+        config.set(TEST_INDEX, False)
+        self.assertIsNone(self.find_with_index(config))
+
 
 class TestOfFinderMappingNoseTestsToK2TestCases(unittest.TestCase):
 
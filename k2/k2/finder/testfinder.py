@@ -4,6 +4,7 @@ import copy
 import inspect
 import itertools
 import logging
+import os
 import re
 from collections import namedtuple
 from enum import Enum
@@ -18,7 +19,8 @@ from k2.cmd.list import LIST_COMMAND
 from k2.cmd.run import RUN_COMMAND
 from k2.utils.string import make_valid_filename
 
-from . import FIND_TEST_CASES, FINDER_ENDPOINT, TEST_SOURCES
+from . import FIND_TEST_CASES, FINDER_ENDPOINT, TEST_INDEX, TEST_INDEX_FILE, TEST_SOURCES
+from .index import LazyTestFunction, TestIndex, default_index_path, import_test_module
 
 logger = logging.getLogger(get_logger_name('k2', 'testfinder'))
 logger.addHandler(logging.NullHandler())
@@ -29,7 +31,11 @@ Function = namedtuple('Function', ['name', 'callable'])
 @CommandExtension(
     'testfinder',
     extends=[RUN_COMMAND, LIST_COMMAND],
-    config_options=[ConfigOption(TEST_SOURCES, required=True)],
+    config_options=[
+        ConfigOption(TEST_SOURCES, required=True),
+        ConfigOption(TEST_INDEX, required=False),
+        ConfigOption(TEST_INDEX_FILE, required=False),
+    ],
     endpoints_and_messages={
         FINDER_ENDPOINT: [FIND_TEST_CASES]
     })
@@ -40,33 +46,108 @@ class TestFinder(AbstractExtension):
 
     def __init__(self, config, instances):
         self._test_sources = config.get(TEST_SOURCES)
+        self._use_index = config.get(TEST_INDEX)
+        self._index_file = config.get(TEST_INDEX_FILE)
 
     @callback_dispatcher([FIND_TEST_CASES], [FINDER_ENDPOINT])
     @requires(component_manager='ComponentManager')
     def find_test_cases(self, message, component_manager):
-        return Finder(component_manager).find_tests(*self._test_sources)
+        index = None
+        if self._use_index:
+            index = TestIndex(self._index_file if self._index_file else default_index_path())
+        return Finder(component_manager, index).find_tests(*self._test_sources)
+
+
+class OutdatedIndexEntry(Exception):
+    pass
 
 
 class Finder(object):
 
-    def __init__(self, component_manager):
+    def __init__(self, component_manager, index=None):
         self.setup_prefix = 'setup'
         self.test_case_prefix = 'test_'
         self.teardown_prefix = 'teardown'
         self.component_manager = component_manager
+        self.index = index
 
     def find_tests(self, *names):
         """
         Use nosetests to find the tests using the default naming rules.
 
+        If an index is given, test cases from names that are files or directories are
+        taken from the index when the files are unchanged.
+
         :param names: one or more names where a name can be a file, directory, module, or any object within a module
         """
+        if self.index is None:
+            return self._load_tests(*names)
+
+        tests = []
+        for name in names:
+            if os.path.exists(name):
+                tests.extend(self._find_indexed_tests(os.path.abspath(name)))
+            else:
+                tests.extend(self._load_tests(name))
+        self.index.save()
+        return tests
+
+    def _load_tests(self, *names):
         from nose.loader import Config, TestLoader
 
         suite = TestLoader(
             Config(includeExe=True), selector=K2TestSelector()).loadTestsFromNames(names)
         return self._test_cases_from_suite(suite)
 
+    def _find_indexed_tests(self, source):
+        modules = self.index.get(source)
+        if modules is not None:
+            try:
+                tests = []
+                for module in modules:
+                    tests.extend(self._indexed_test_cases(module))
+                return tests
+            except OutdatedIndexEntry as e:
+                logger.debug(
+                    'Loading all test cases in {source}: {reason}'.format(
+                        source=source, reason=str(e)))
+
+        tests = self._load_tests(source)
+        self.index.add(source, tests)
+        return tests
+
+    def _indexed_test_cases(self, module):
+        path = module['path']
+        if not self.index.is_unchanged(module):
+            if os.path.basename(path).startswith('_'):
+                # nose loads the whole package when loading __init__.py
+                raise OutdatedIndexEntry('{path} has changed'.format(path=path))
+
+            tests = self._load_tests(path)
+            if not self.index.update(module, tests):
+                raise OutdatedIndexEntry('{path} can not be indexed'.format(path=path))
+            return tests
+
+        lazy_functions = [
+            LazyTestFunction(path, module['module'], test['attribute'], test['doc'])
+            for test in module['tests']
+        ]
+        if not module['eager']:
+            return [
+                TestCaseDefinition(lazy_function, test['name'])
+                for lazy_function, test in zip(lazy_functions, module['tests'])
+            ]
+
+        try:
+            import_test_module(path, module['module'])
+            tests = []
+            for lazy_function in lazy_functions:
+                tests.extend(self._create_testcase_definitions(lazy_function.resolve()))
+            return tests
+        except Exception as e:
+            raise OutdatedIndexEntry(
+                'Could not import {path}: {error}'.format(path=path, error=str(e))) from e
+
     def _test_cases_from_suite(self, suite):
         """
         Recursively goes through the suite to find all matching tests.
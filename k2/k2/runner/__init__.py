@@ -1,4 +1,5 @@
 from zaf.config.options import ConfigOptionId
+from zaf.config.types import Choice
 from zaf.messages.message import EndpointId, MessageId
 
 EXTENSION_NAME = 'testrunner'
@@ -52,3 +53,9 @@ ABORT_TEST_CASE_REQUEST = MessageId(
 RUNNER_SUITE_NAME = ConfigOptionId('suite.name', 'Test suite name', default='suite')
 RUNNER_PARALLEL_WORKERS = ConfigOptionId(
     'parallel.workers', 'Number of parallel workers', default=1, option_type=int)
+RUNNER_PARALLEL_BACKEND = ConfigOptionId(
+    'parallel.backend',
+    'Run the parallel workers as threads or as forked processes. '
+    'Use process for CPU bound test cases, see k2.runner.process for the limitations.',
+    default='thread',
+    option_type=Choice(['thread', 'process']))
@@ -5,6 +5,10 @@ The runner support parallel execution by setting the :ref:`option-parallel.worke
 When running parallel test cases all components on runner and session scope need to be thread safe.
 Components on shorter scopes will be instantiated uniquely for each test thread.
 
+With :ref:`option-parallel.backend` set to process the test cases are instead run in forked
+worker processes and components on runner scope and shorter are instantiated uniquely for each
+worker process.
+
 Example flow of events for Manager:
 ===================================
     .. uml::
@@ -85,7 +89,9 @@ from zaf.messages.decorator import callback_dispatcher
 
 from k2 import ABORT, CRITICAL_ABORT
 from k2.cmd.run import RUN_COMMAND, TEST_RUN
-from k2.runner import ABORT_TEST_CASE_REQUEST, EXTENSION_NAME, RUNNER_PARALLEL_WORKERS, messages
+from k2.runner import ABORT_TEST_CASE_REQUEST, EXTENSION_NAME, RUNNER_PARALLEL_BACKEND, \
+    RUNNER_PARALLEL_WORKERS, messages
+from k2.runner.process import ProcessTestRunner
 from k2.runner.runner import TestRunner
 from k2.sut import SUT_RESET_DONE, SUT_RESET_STARTED
 
@@ -104,6 +110,7 @@ class AbortedBeforeStartException(Exception):
     config_options=[
         ConfigOption(RUNNER_SUITE_NAME, required=True),
         ConfigOption(RUNNER_PARALLEL_WORKERS, required=True),
+        ConfigOption(RUNNER_PARALLEL_BACKEND, required=True),
     ],
     extends=[RUN_COMMAND],
     endpoints_and_messages=messages.runner_endpoint_with_messages())
@@ -116,6 +123,8 @@ class TestRunnerManager(AbstractExtension):
         self._runner = None
         self._resetting_entities = set()
         self._parallel_workers = config.get(RUNNER_PARALLEL_WORKERS)
+        self._runner_class = ProcessTestRunner if config.get(
+            RUNNER_PARALLEL_BACKEND) == 'process' else TestRunner
         self._aborted = False
 
     @callback_dispatcher([ABORT, CRITICAL_ABORT])
@@ -180,7 +189,7 @@ class TestRunnerManager(AbstractExtension):
     def run(self, message, component_factory, messagebus):
         with self._external_message_lock:
             if not self._aborted:
-                self._runner = TestRunner(
+                self._runner = self._runner_class(
                     messagebus, component_factory, self._suite_name, message.data.parent_scope)
             else:
                 raise AbortedBeforeStartException('The test run was aborted before it was started')
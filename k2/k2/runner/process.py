@@ -0,0 +1,464 @@
+"""
+Runs test cases in worker processes instead of worker threads.
+
+Test cases that are CPU bound don't run in parallel in worker threads because of
+the GIL. With the process backend each parallel worker is a forked process
+with its own component scopes, from the runner scope and down. Components on
+session scope and above that have already been instantiated are copied into
+the worker processes when they are forked, which means that they are no longer
+shared between the parallel test cases. Components that a worker process
+instantiates on session scope and above are exited when the worker process exits.
+
+The coordinating process runs threads, for example the messagebus dispatchers,
+and forking a process with threads is only safe until the child process uses
+a lock that another thread held at the time of the fork. The coordinating
+process therefore only forks once, when the run starts, to start a fork server.
+The fork server is single threaded and forks all the worker processes, also the
+ones that replace worker processes that have exited. The locks of the component
+factory and the scopes are reset in the fork server.
+
+Scheduling, messages and results are still handled by the coordinating
+TestRunner, only the calls to the test cases are done in the worker processes,
+so TEST_CASE_STARTED, TEST_CASE_FINISHED and the reports are the same as for
+the thread backend. The messagebus is not available in the worker processes,
+test cases and components that use it can only be run with the thread backend.
+Using the messagebus in a worker process raises a WorkerProcessException.
+
+The test case functions, their arguments and their results are sent between the
+processes and need to be picklable. A test case that can't be sent to a
+worker process gets verdict ERROR. Test cases that were found in the test index
+are sent as their location and the worker process imports the test module itself.
+
+A test case is preferably sent to a worker process that ran a test case from
+the same module and class, so that the worker doesn't need to exit and enter
+the module and class scopes. Aborting a running test case terminates its
+worker process, a new worker process is started when it is needed.
+"""
+
+import logging
+import multiprocessing
+import os
+import pickle
+import signal
+import threading
+import time
+import traceback
+from multiprocessing.connection import Connection
+from multiprocessing.reduction import recv_handle, send_handle
+
+from zaf.component.scope import Scope
+from zaf.extensions.extension import get_logger_name
+from zaf.messages.messagebus import MessageBus
+
+from k2.finder.index import resolve_test_function
+from k2.runner import EXTENSION_NAME
+from k2.runner.exceptions import DisabledException, SkipException, TestCaseAborted
+from k2.runner.runner import RunResult, TestRunner, _format_stacktrace
+from k2.runner.testcase import RunnerTestCase
+
+logger = logging.getLogger(get_logger_name('k2', EXTENSION_NAME, 'process'))
+logger.addHandler(logging.NullHandler())
+
+
+class WorkerProcessException(Exception):
+    """Exception from a worker process that could not be sent to the coordinating process."""
+    pass
+
+
+class ProcessTestRunner(TestRunner):
+    """The K2 test runner with the test cases running in worker processes."""
+
+    __test__ = False
+
+    # How often the coordinating thread checks if the worker process is done.
+    # This is also how long it can take until an aborted test case is noticed.
+    POLL_INTERVAL_SECONDS = 0.1
+
+    # How long to wait for a worker process to exit its scopes when the run is done.
+    STOP_TIMEOUT_SECONDS = 30
+
+    def __init__(self, messagebus, component_factory, suite_name, parent_scope=None):
+        super().__init__(messagebus, component_factory, suite_name, parent_scope)
+        self._parent_scope = parent_scope
+        self._workers = None
+
+    def run(self, worker_count=1):
+        # The fork server must be forked to get the loaded extensions, components and test cases
+        fork_server = ForkServer(
+            multiprocessing.get_context('fork'), self._messagebus, self.component_factory,
+            self._suite_name, self._parent_scope)
+        try:
+            self._workers = WorkerPool(
+                worker_count, lambda: WorkerProcess(fork_server), self.STOP_TIMEOUT_SECONDS)
+            try:
+                super().run(worker_count)
+            finally:
+                self._workers.close()
+                self._workers = None
+        finally:
+            fork_server.close()
+
+    def _execute_test_case(self, scope, current_test_case, *args, **kwargs):
+        worker = self._workers.acquire(current_test_case)
+        try:
+            try:
+                worker.send(current_test_case, args, kwargs)
+            except Exception as e:
+                msg = 'Test case {name} could not be sent to a worker process: {error}'.format(
+                    name=current_test_case.full_name, error=str(e))
+                raise WorkerProcessException(msg) from e
+
+            try:
+                exception, stacktrace, abort_messages = worker.receive(self.POLL_INTERVAL_SECONDS)
+            except (Exception, TestCaseAborted):
+                worker.terminate()
+                raise
+        except Exception as e:
+            return RunResult(scope, e, _format_stacktrace(e))
+        finally:
+            self._workers.release(worker)
+
+        if abort_messages:
+            self.abort_run_after_current_test_cases_have_completed()
+            for msg in abort_messages:
+                logger.error(msg)
+                self._abort_exceptions.append(WorkerProcessException(msg))
+
+        return RunResult(scope, exception, stacktrace)
+
+
+class ForkServer(object):
+    """
+    A single threaded process that forks the worker processes.
+
+    The connection to each worker process is created by the fork server and the
+    coordinating end of it is sent back over the connection to the fork server.
+    The worker processes are children of the fork server, so the fork server also
+    waits for them to exit.
+    """
+
+    # How long to wait for a worker process to exit after its connection has been closed.
+    EXIT_TIMEOUT_SECONDS = 5
+
+    def __init__(self, context, messagebus, component_factory, suite_name, parent_scope):
+        self._lock = threading.Lock()
+        self._connection, server_connection = context.Pipe()
+        self._process = context.Process(
+            target=_run_fork_server,
+            args=(server_connection, messagebus, component_factory, suite_name, parent_scope),
+            name='testcase_fork_server',
+            daemon=True)
+        self._process.start()
+        server_connection.close()
+        logger.debug('Started fork server {pid}'.format(pid=self._process.pid))
+
+    def start_worker(self):
+        """
+        Fork a new worker process.
+
+        :return: tuple with the PID of the worker process and the connection to it
+        """
+        with self._lock:
+            self._connection.send(('start', ))
+            pid = self._connection.recv()
+            connection = Connection(recv_handle(self._connection))
+        logger.debug('Started worker process {pid}'.format(pid=pid))
+        return pid, connection
+
+    def wait(self, pid, timeout):
+        """
+        Wait for a worker process to exit.
+
+        :return: the exit code, or None if the worker process is still running
+        """
+        with self._lock:
+            self._connection.send(('wait', pid, timeout))
+            return self._connection.recv()
+
+    def close(self):
+        with self._lock:
+            try:
+                self._connection.send(None)
+            except Exception as e:
+                logger.debug(str(e), exc_info=True)
+            self._process.join(self.EXIT_TIMEOUT_SECONDS)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+            self._connection.close()
+
+
+class WorkerProcess(object):
+    """A process forked by the fork server that runs test cases sent to it, one at a time."""
+
+    def __init__(self, fork_server):
+        self.scope_key = None
+        self._fork_server = fork_server
+        self._pid, self._connection = fork_server.start_worker()
+        self._alive = True
+
+    @property
+    def is_alive(self):
+        return self._alive
+
+    def send(self, test_case, args, kwargs):
+        self._connection.send(
+            (
+                test_case.found_run_function, test_case.name, test_case.params,
+                test_case.filename_with_params, args, kwargs))
+
+    def receive(self, poll_interval):
+        """
+        Wait for the result of the test case that was sent to the worker process.
+
+        The connection is polled so that TestCaseAborted can be raised in the waiting thread.
+        The connection is closed when the worker process exits, which also ends the polling.
+
+        :return: tuple with exception, stacktrace and messages for errors that should abort the run
+        """
+        while not self._connection.poll(poll_interval):
+            pass
+        try:
+            return self._connection.recv()
+        except EOFError:
+            self._alive = False
+            self._connection.close()
+            raise WorkerProcessException(
+                'Worker process {pid} exited with exit code {code}'.format(
+                    pid=self._pid,
+                    code=self._fork_server.wait(self._pid, ForkServer.EXIT_TIMEOUT_SECONDS)))
+
+    def stop(self, timeout):
+        """Let the worker process exit its scopes and wait for it to exit."""
+        try:
+            self._connection.send(None)
+        except Exception as e:
+            logger.debug(str(e), exc_info=True)
+        if self._fork_server.wait(self._pid, timeout) is None:
+            logger.warning(
+                'Worker process {pid} did not exit within {timeout}s'.format(
+                    pid=self._pid, timeout=timeout))
+            self.terminate()
+        self._alive = False
+        self._connection.close()
+
+    def terminate(self):
+        logger.debug('Terminating worker process {pid}'.format(pid=self._pid))
+        try:
+            os.kill(self._pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        self._fork_server.wait(self._pid, ForkServer.EXIT_TIMEOUT_SECONDS)
+        self._alive = False
+        self._connection.close()
+
+
+class WorkerPool(object):
+    """
+    Keeps track of the worker processes and which of them are idle.
+
+    All worker processes are started up front, before the test cases start running
+    in the coordinating process. Worker processes that are terminated are replaced
+    when a worker is needed.
+    """
+
+    def __init__(self, size, start_worker, stop_timeout):
+        self._size = size
+        self._start_worker = start_worker
+        self._stop_timeout = stop_timeout
+        self._condition = threading.Condition()
+        self._idle = [start_worker() for _ in range(size)]
+        self._count = size
+
+    def acquire(self, test_case):
+        """Get an idle worker, preferably one that ran a test case in the same scope."""
+        scope_key = (test_case.test_case_module(), test_case.test_case_class())
+        with self._condition:
+            while not self._idle and self._count >= self._size:
+                self._condition.wait()
+
+            if self._idle:
+                worker = next((w for w in self._idle if w.scope_key == scope_key), None) or \
+                    next((w for w in self._idle if w.scope_key is None), self._idle[0])
+                self._idle.remove(worker)
+            else:
+                worker = self._start_worker()
+                self._count += 1
+
+        worker.scope_key = scope_key
+        return worker
+
+    def release(self, worker):
+        with self._condition:
+            if worker.is_alive:
+                self._idle.append(worker)
+            else:
+                self._count -= 1
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            workers = self._idle
+            self._idle = []
+            self._count -= len(workers)
+        for worker in workers:
+            worker.stop(self._stop_timeout)
+
+
+class UnavailableMessageBus(object):
+    """Replaces the messagebus in the worker processes, where it can't be used."""
+
+    def __getattribute__(self, name):
+        if name.startswith('__'):
+            return object.__getattribute__(self, name)
+        raise WorkerProcessException(
+            'The messagebus is not available in worker processes, '
+            'use the thread parallel.backend for test cases and components that use it')
+
+
+def _run_fork_server(connection, messagebus, component_factory, suite_name, parent_scope):
+    # Interrupts are handled by the coordinating process, that terminates the worker processes.
+    # The signal handlers are inherited by the worker processes.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    # Components that hold on to the messagebus get the replacement as well
+    if isinstance(messagebus, MessageBus):
+        messagebus.__class__ = UnavailableMessageBus
+    component_factory.reset_after_fork()
+    if parent_scope is not None:
+        parent_scope.reset_after_fork()
+
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        if request[0] == 'start':
+            worker_connection, child_connection = multiprocessing.Pipe()
+            pid = os.fork()
+            if pid == 0:
+                connection.close()
+                worker_connection.close()
+                _run_forked_worker(child_connection, component_factory, suite_name, parent_scope)
+            child_connection.close()
+            connection.send(pid)
+            send_handle(connection, worker_connection.fileno(), None)
+            worker_connection.close()
+        else:
+            _, pid, timeout = request
+            connection.send(_wait_for_exit(pid, timeout))
+    connection.close()
+
+
+def _wait_for_exit(pid, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            waited_pid, status = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            return None
+        if waited_pid != 0:
+            return os.waitstatus_to_exitcode(status)
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.01)
+
+
+def _run_forked_worker(connection, component_factory, suite_name, parent_scope):
+    """Run a worker in a process forked with os.fork, the process exits when the worker is done."""
+    exit_code = 1
+    try:
+        _run_worker(connection, component_factory, suite_name, parent_scope)
+        exit_code = 0
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        os._exit(exit_code)
+
+
+def _run_worker(connection, component_factory, suite_name, parent_scope):
+    ancestor_context_counts = _context_counts(parent_scope)
+    runner = TestRunner(None, component_factory, suite_name, parent_scope)
+    scope = runner.runner_scope
+    try:
+        while True:
+            try:
+                task = connection.recv()
+            except EOFError:
+                break
+            except Exception as e:
+                # The task has been read but could not be unpickled, for example because
+                # the test module can't be imported, which is the result of the test case
+                msg = 'Test case could not be received by worker process {pid}: {error}'.format(
+                    pid=os.getpid(), error=str(e))
+                connection.send((WorkerProcessException(msg), _format_stacktrace(e), []))
+                continue
+            if task is None:
+                break
+
+            run_function, name, params, filename_with_params, args, kwargs = task
+            test_case = RunnerTestCase(
+                resolve_test_function(run_function), name, params, filename_with_params)
+            with test_case.execution_context:
+                run_result = runner._execute_test_case(scope, test_case, *args, **kwargs)
+            scope = run_result.scope
+
+            # The cause of an exception is not sent, so the skip exception has to be found here
+            exception = runner._find_parent_exception_of_type(
+                run_result.exception, SkipException) or run_result.exception
+            abort_messages = [
+                ''.join(traceback.format_exception(type(e), e, e.__traceback__))
+                for e in runner._abort_exceptions
+            ]
+            runner._abort_exceptions.clear()
+            connection.send((_transferable(exception), run_result.stacktrace, abort_messages))
+    finally:
+        while scope != runner.runner_scope:
+            scope = component_factory.exit_scope(scope).scope
+        component_factory.exit_scope(scope)
+        _exit_added_contexts(component_factory, ancestor_context_counts)
+        connection.close()
+
+
+def _context_counts(scope):
+    """Return the scope and its ancestors together with how many contexts they have."""
+    counts = []
+    while scope is not None:
+        counts.append((scope, len(scope.contexts())))
+        scope = scope.parent
+    return counts
+
+
+def _exit_added_contexts(component_factory, context_counts):
+    """
+    Exit the contexts that were added to the ancestor scopes in the worker process.
+
+    Components that a test case instantiates on for example the session scope only
+    exist in the worker process, and os._exit doesn't exit them.
+    The contexts that were copied from the fork server are left to the coordinating process.
+    """
+    for scope, count in context_counts:
+        added_contexts = Scope(scope.name, data=scope.data)
+        for instance_id, context in scope.contexts()[count:]:
+            added_contexts.register_context(instance_id, context)
+        component_factory.exit_scope(added_contexts)
+
+
+def _transferable(exception):
+    """Return the exception if it can be pickled, otherwise a replacement with the same verdict."""
+    if exception is None:
+        return None
+
+    try:
+        pickle.loads(pickle.dumps(exception))
+        return exception
+    except Exception:
+        msg = ''.join(traceback.format_exception_only(type(exception), exception)).strip()
+        for exception_type in (SkipException, DisabledException, AssertionError):
+            if isinstance(exception, exception_type):
+                return exception_type(msg)
+        return WorkerProcessException(msg)
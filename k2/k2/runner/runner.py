@@ -275,46 +275,9 @@ class TestRunner(object):
                     if current_test_case.disabled:
                         raise DisabledException(current_test_case.disabled_message)
                     else:
-                        result = self._exit_scopes(scope, current_test_case)
-                        scope = result.scope
-                        if not result.success:
-                            e = self._handle_exit_scopes_fails(current_test_case, result.exceptions)
-                            raise SkipException(
-                                'Skipping test case due to failures in preparation') from e
-
-                        scope = self._enter_scopes(scope, current_test_case)
-                        logger.debug(
-                            "Calling test case '{test}' with '{scope}'".format(
-                                test=current_test_case.full_name, scope=repr(scope)))
-
-                        try:
-                            extra_req = [p.value for p in current_test_case.params if p.is_req]
-                            extra_kwargs = {
-                                p.key: p.value
-                                for p in current_test_case.params if not p.is_req
-                            }
-                            kwargs.update(extra_kwargs)
-                            self.component_factory.call(
-                                current_test_case.run,
-                                scope,
-                                *args,
-                                extra_req=extra_req,
-                                pre_instantiated=self.create_pre_instantiated_components(
-                                    current_test_case),
-                                **kwargs)
-                        finally:
-                            result = self.component_factory.exit_scope(scope)
-                            scope = result.scope
-                            if not result.success:
-                                self._handle_exit_scopes_fails(current_test_case, result.exceptions)
-
-                        return RunResult(scope, None, None)
+                        return self._execute_test_case(scope, current_test_case, *args, **kwargs)
             except (Exception, TestCaseAborted) as e:
-                try:
-                    msg = str(traceback.format_exc())
-                except Exception:
-                    msg = str(e)
-                return RunResult(scope, e, msg)
+                return RunResult(scope, e, _format_stacktrace(e))
             finally:
                 with self.running_test_cases.lock:
                     self.running_test_cases.remove(current_test_case)
@@ -323,6 +286,45 @@ class TestRunner(object):
         messages.trigger_test_case_started(self._messagebus, current_test_case)
         self._submit_to_thread_pool(run_test_case, [test_completed_callback])
 
+    def _execute_test_case(self, scope, current_test_case, *args, **kwargs):
+        """
+        Change to the scopes of the test case and call it.
+
+        :return: RunResult with the scope that the next test case should start from
+        """
+        try:
+            result = self._exit_scopes(scope, current_test_case)
+            scope = result.scope
+            if not result.success:
+                e = self._handle_exit_scopes_fails(current_test_case, result.exceptions)
+                raise SkipException('Skipping test case due to failures in preparation') from e
+
+            scope = self._enter_scopes(scope, current_test_case)
+            logger.debug(
+                "Calling test case '{test}' with '{scope}'".format(
+                    test=current_test_case.full_name, scope=repr(scope)))
+
+            try:
+                extra_req = [p.value for p in current_test_case.params if p.is_req]
+                extra_kwargs = {p.key: p.value for p in current_test_case.params if not p.is_req}
+                kwargs.update(extra_kwargs)
+                self.component_factory.call(
+                    current_test_case.run,
+                    scope,
+                    *args,
+                    extra_req=extra_req,
+                    pre_instantiated=self.create_pre_instantiated_components(current_test_case),
+                    **kwargs)
+            finally:
+                result = self.component_factory.exit_scope(scope)
+                scope = result.scope
+                if not result.success:
+                    self._handle_exit_scopes_fails(current_test_case, result.exceptions)
+
+            return RunResult(scope, None, None)
+        except (Exception, TestCaseAborted) as e:
+            return RunResult(scope, e, _format_stacktrace(e))
+
     def create_pre_instantiated_components(self, test_case_definition):
         """Create the pre-instantiated TestContext instance."""
         return {'TestContext': TestContext(test_case_definition)}
@@ -448,6 +450,13 @@ class TestRunner(object):
             return RunnerTestCase.from_test_case_definition(test_case_definition)
 
 
+def _format_stacktrace(exception):
+    try:
+        return str(traceback.format_exc())
+    except Exception:
+        return str(exception)
+
+
 def _async_raise(thread_id, exctype):
     """Raise an exception of the specified type in the target thread."""
     if not inspect.isclass(exctype):
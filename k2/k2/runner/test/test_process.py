@@ -0,0 +1,275 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from zaf.builtin.unittest.harness import ComponentMock
+from zaf.component.decorator import component, requires
+from zaf.component.factory import Factory
+from zaf.component.manager import ComponentManager, create_entity_map, create_registry
+from zaf.component.scope import Scope
+from zaf.messages.messagebus import MessageBus
+
+from k2.finder.index import LazyTestFunction
+from k2.finder.testfinder import TestCaseDefinition
+from k2.scheduler import SCHEDULE_NEXT_TEST, SCHEDULER_ENDPOINT
+
+from ..exceptions import TestCaseAborted
+from ..process import ProcessTestRunner, WorkerPool, WorkerProcessException
+from ..testcase import RunnerTestCase, Verdict
+
+COORDINATOR_PID = os.getpid()
+
+
+def passing_test_case():
+    pass
+
+
+def failing_test_case():
+    assert False, 'failing'
+
+
+def erroring_test_case():
+    raise ValueError('erroring')
+
+
+def worker_process_test_case():
+    assert os.getpid() != COORDINATOR_PID
+
+
+def fork_server_worker_process_test_case():
+    assert os.getppid() != COORDINATOR_PID
+
+
+def crashing_test_case():
+    os._exit(3)
+
+
+def sleeping_test_case():
+    time.sleep(10)
+
+
+class UnpicklableException(Exception):
+
+    def __init__(self, lock):
+        super().__init__('unpicklable')
+        self.lock = lock
+
+
+def unpicklable_exception_test_case():
+    raise UnpicklableException(threading.Lock())
+
+
+def raise_when_unpickled():
+    raise ValueError('can not be unpickled')
+
+
+class UnpicklableInWorkerTestCase(object):
+    """A test case that can be pickled but raises when it is unpickled in the worker process."""
+
+    __name__ = 'unpicklable_in_worker_test_case'
+    __qualname__ = 'unpicklable_in_worker_test_case'
+
+    def __call__(self):
+        pass
+
+    def __reduce__(self):
+        return raise_when_unpickled, ()
+
+
+class SessionComponent(object):
+    """Writes to the file in EXIT_FILE when exited, the worker process can't report it any other way."""
+
+    EXIT_FILE = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        with open(SessionComponent.EXIT_FILE, 'a') as f:
+            f.write('exit\n')
+
+
+@requires(session_component='SessionComponent', scope='session')
+def session_component_test_case(session_component):
+    pass
+
+
+@requires(messagebus='MessageBus')
+def messagebus_test_case(messagebus):
+    messagebus.send_request(SCHEDULE_NEXT_TEST, SCHEDULER_ENDPOINT)
+
+
+class TestProcessTestRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.run_queue = []
+        messagebus = Mock()
+        messagebus.send_request.side_effect = self.send_request
+        self.create_runner(messagebus, Factory(ComponentManager()))
+
+    def send_request(self, message_id, endpoint_id=None, entities=None, data=None):
+        futures = Mock()
+        if message_id == SCHEDULE_NEXT_TEST:
+            future = Mock()
+            if self.run_queue:
+                future.result.return_value = self.run_queue.pop(0)
+            else:
+                future.result.return_value = None
+
+            futures.wait.return_value = [future]
+        return futures
+
+    def create_runner(self, messagebus, component_factory, parent_scope=None):
+        self.tr = ProcessTestRunner(
+            messagebus=messagebus,
+            component_factory=component_factory,
+            suite_name='suite-name',
+            parent_scope=parent_scope)
+        self.tr.QUEUE_TIMEOUT_SECONDS = 10
+        self.tr.EXECUTION_PAUSED_TIMEOUT_SECONDS = 1
+
+    def run_test_cases(self, *test_cases, worker_count=1):
+        self.run_queue.extend(TestCaseDefinition(test_case) for test_case in test_cases)
+        self.tr.run(worker_count)
+        return self.tr.run_history
+
+    def test_verdicts_are_set_from_the_worker_process(self):
+        history = self.run_test_cases(
+            passing_test_case, failing_test_case, erroring_test_case, worker_process_test_case)
+        self.assertEqual(
+            [test_case.verdict for test_case in history],
+            [Verdict.PASSED, Verdict.FAILED, Verdict.ERROR, Verdict.PASSED])
+        self.assertIsInstance(history[2].exception, ValueError)
+        self.assertIn('erroring', history[2].stacktrace)
+
+    def test_test_cases_run_in_parallel_worker_processes(self):
+        history = self.run_test_cases(
+            worker_process_test_case, worker_process_test_case, worker_count=2)
+        self.assertEqual([test_case.verdict for test_case in history], [Verdict.PASSED] * 2)
+
+    def test_test_case_that_can_not_be_sent_to_worker_process_gets_error(self):
+
+        def local_test_case():
+            pass
+
+        history = self.run_test_cases(local_test_case, passing_test_case)
+        self.assertIsInstance(history[0].exception, WorkerProcessException)
+        self.assertEqual(history[0].verdict, Verdict.ERROR)
+        self.assertEqual(history[1].verdict, Verdict.PASSED)
+
+    def test_unpicklable_exception_is_replaced(self):
+        history = self.run_test_cases(unpicklable_exception_test_case)
+        self.assertIsInstance(history[0].exception, WorkerProcessException)
+        self.assertIn('unpicklable', str(history[0].exception))
+
+    def test_test_case_that_can_not_be_unpickled_in_worker_process_gets_error(self):
+        history = self.run_test_cases(
+            UnpicklableInWorkerTestCase(), fork_server_worker_process_test_case)
+        self.assertEqual(history[0].verdict, Verdict.ERROR)
+        self.assertIsInstance(history[0].exception, WorkerProcessException)
+        self.assertIn('can not be unpickled', str(history[0].exception))
+        self.assertEqual(history[1].verdict, Verdict.PASSED)
+
+    def test_worker_process_is_replaced_if_it_exits(self):
+        history = self.run_test_cases(crashing_test_case, passing_test_case)
+        self.assertEqual(history[0].verdict, Verdict.ERROR)
+        self.assertIn('exit code 3', str(history[0].exception))
+        self.assertEqual(history[1].verdict, Verdict.PASSED)
+
+    def test_worker_processes_are_forked_by_the_fork_server_also_when_replaced(self):
+        history = self.run_test_cases(
+            fork_server_worker_process_test_case, crashing_test_case,
+            fork_server_worker_process_test_case)
+        self.assertEqual(
+            [test_case.verdict for test_case in history],
+            [Verdict.PASSED, Verdict.ERROR, Verdict.PASSED])
+
+    def test_test_case_that_uses_the_messagebus_gets_error(self):
+        component_manager = ComponentManager(create_registry(), create_entity_map())
+        component_factory = Factory(component_manager)
+        messagebus = MessageBus(component_factory)
+        messagebus.send_request = self.send_request
+        messagebus.trigger_event = Mock()
+        component(name='MessageBus')(ComponentMock('MessageBus', messagebus), component_manager)
+        self.create_runner(messagebus, component_factory)
+
+        history = self.run_test_cases(messagebus_test_case, passing_test_case)
+        self.assertEqual(history[0].verdict, Verdict.ERROR)
+        self.assertIsInstance(history[0].exception, WorkerProcessException)
+        self.assertIn('messagebus is not available', str(history[0].exception))
+        self.assertEqual(history[1].verdict, Verdict.PASSED)
+        self.assertIsInstance(messagebus, MessageBus)
+
+    def test_session_scope_component_instantiated_in_worker_process_is_exited(self):
+        component_manager = ComponentManager(create_registry(), create_entity_map())
+        component(name='SessionComponent')(SessionComponent, component_manager)
+        self.create_runner(self.tr._messagebus, Factory(component_manager), Scope('session'))
+
+        with tempfile.TemporaryDirectory() as directory:
+            SessionComponent.EXIT_FILE = os.path.join(directory, 'exit')
+            history = self.run_test_cases(
+                session_component_test_case, session_component_test_case)
+            self.assertEqual([test_case.verdict for test_case in history], [Verdict.PASSED] * 2)
+            with open(SessionComponent.EXIT_FILE) as f:
+                self.assertEqual(f.read(), 'exit\n')
+
+    def test_lazily_found_test_cases_are_imported_in_the_worker_process(self):
+        module_name = 'k2_lazily_found_test_module'
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, module_name + '.py')
+            with open(path, 'w') as f:
+                f.write('def test_passing():\n    pass\n\n\ndef test_failing():\n    assert False\n')
+            self.addCleanup(sys.modules.pop, module_name, None)
+            self.addCleanup(
+                lambda: sys.path.remove(directory) if directory in sys.path else None)
+
+            history = self.run_test_cases(
+                LazyTestFunction(path, module_name, 'test_passing', None),
+                LazyTestFunction(path, module_name, 'test_failing', None))
+        self.assertEqual(
+            [test_case.verdict for test_case in history], [Verdict.PASSED, Verdict.FAILED])
+
+    def test_abort_run_immediately_terminates_running_test_case(self):
+        timer = threading.Timer(0.5, self.tr.abort_run_immediately)
+        timer.start()
+        self.addCleanup(timer.cancel)
+        start = time.monotonic()
+        history = self.run_test_cases(sleeping_test_case, passing_test_case)
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertIsInstance(history[0].exception, TestCaseAborted)
+        self.assertEqual(history[1].verdict, Verdict.SKIPPED)
+
+
+class TestWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.workers = []
+
+        def start_worker():
+            worker = Mock(scope_key=None, is_alive=True)
+            self.workers.append(worker)
+            return worker
+
+        self.pool = WorkerPool(2, start_worker, 1)
+
+    def test_all_workers_are_started_up_front(self):
+        self.assertEqual(len(self.workers), 2)
+
+    def test_worker_that_ran_test_case_in_the_same_scope_is_preferred(self):
+        first = self.pool.acquire(RunnerTestCase(passing_test_case))
+        second = self.pool.acquire(RunnerTestCase(Mock(__name__='other')))
+        self.pool.release(second)
+        self.pool.release(first)
+        self.assertIs(self.pool.acquire(RunnerTestCase(failing_test_case)), first)
+
+    def test_terminated_worker_is_replaced(self):
+        worker = self.pool.acquire(RunnerTestCase(passing_test_case))
+        worker.is_alive = False
+        self.pool.release(worker)
+        self.pool.acquire(RunnerTestCase(passing_test_case))
+        self.pool.acquire(RunnerTestCase(passing_test_case))
+        self.assertEqual(len(self.workers), 3)
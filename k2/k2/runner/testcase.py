@@ -9,6 +9,7 @@ from textwrap import dedent
 
 from zaf.extensions.extension import get_logger_name
 
+from k2.finder.index import resolve_test_function
 from k2.runner import EXTENSION_NAME
 from k2.runner.exceptions import DisabledException, SkipException
 from k2.runner.timeout import get_timeout
@@ -64,8 +65,12 @@ class RunnerTestCase(object):
 
     __test__ = False
 
-    def __init__(self, run_function, name=None, params=None, filename_with_params=None):
+    def __init__(
+            self, run_function, name=None, params=None, filename_with_params=None,
+            found_run_function=None):
         self.run = run_function
+        # The run function as it was found, which is a LazyTestFunction if it was found in the index
+        self.found_run_function = run_function if found_run_function is None else found_run_function
         self._name = run_function.__name__ if name is None else name
         self._filename_with_params = make_valid_filename(
             self._name) if filename_with_params is None else filename_with_params
@@ -178,5 +183,6 @@ class RunnerTestCase(object):
     @classmethod
     def from_test_case_definition(cls, test_case_definition):
         return RunnerTestCase(
-            test_case_definition.run_function, test_case_definition.name,
-            test_case_definition.params, test_case_definition.filename_with_params)
+            resolve_test_function(test_case_definition.run_function), test_case_definition.name,
+            test_case_definition.params, test_case_definition.filename_with_params,
+            test_case_definition.run_function)
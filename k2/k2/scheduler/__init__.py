@@ -1,4 +1,7 @@
+from collections import namedtuple
+
 from zaf.config.options import ConfigOptionId
+from zaf.config.types import Path
 from zaf.messages.message import EndpointId, MessageId
 
 SCHEDULER_ENDPOINT = EndpointId(
@@ -33,6 +36,17 @@ TESTS_EXCLUDE_REGEX = ConfigOptionId(
     multiple=True,
 )
 
+TESTS_DURATIONS_REPORTS = ConfigOptionId(
+    'tests.durations.reports',
+    'JUnit XML or Z2 JSON reports from previous runs to read historic test case durations from. '
+    'When given, the longest test cases are scheduled first, while keeping test cases '
+    'that share module and class scope together.',
+    multiple=True,
+    option_type=Path(),
+)
+
+RunQueueModification = namedtuple('RunQueueModification', ['added', 'removed'])
+
 SCHEDULE_NEXT_TEST = MessageId(
     'SCHEDULE_NEXT_TEST', """\
     Request that the scheduler schedules the next test case to be run.
@@ -94,9 +108,10 @@ RUN_QUEUE_INITIALIZED = MessageId(
 
 RUN_QUEUE_MODIFIED = MessageId(
     'RUN_QUEUE_MODIFIED', """\
-    Event that is sent from the scheduler when a the run queue is modified
+    Event that is sent from the scheduler when a the run queue is modified.
+    Only the modification is sent, use GET_CURRENT_RUN_QUEUE to get the complete run queue.
 
-    data: Complete run queue as a list of TestCaseDefinition
+    data: RunQueueModification with the added and removed test cases as lists of TestCaseDefinition
     """)
 
 RUN_QUEUE_EMPTY = MessageId(
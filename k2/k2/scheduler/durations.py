@@ -0,0 +1,77 @@
+"""
+Reads historic test case durations from the reports of previous k2 runs.
+
+Both JUnit XML reports and Z2 JSON reports are supported, the format is chosen
+from the file extension. Durations are keyed on the qualified name of the test
+case. If a test case occurs more than once, for example because it is
+parameterized or because several reports are given, the mean duration is used.
+
+Z2 reports only have the durations in whole seconds.
+"""
+
+import json
+import logging
+import os
+import xml.etree.ElementTree as ElementTree
+from collections import defaultdict
+
+from zaf.extensions.extension import get_logger_name
+
+logger = logging.getLogger(get_logger_name('k2', 'testscheduler'))
+logger.addHandler(logging.NullHandler())
+
+
+def read_test_durations(report_files):
+    """
+    Read the test case durations from a number of previous reports.
+
+    Reports that can't be read are logged and skipped, missing durations
+    should only make the scheduling less efficient and not stop the run.
+
+    :param report_files: list of paths to JUnit XML or Z2 JSON reports
+    :return: dict from qualified test case name to duration in seconds
+    """
+    durations = defaultdict(list)
+    for report_file in report_files:
+        try:
+            if os.path.splitext(report_file)[1].lower() == '.json':
+                entries = _read_z2_report(report_file)
+            else:
+                entries = _read_junit_report(report_file)
+            for name, duration in entries:
+                durations[name].append(duration)
+        except Exception as e:
+            logger.debug(str(e), exc_info=True)
+            logger.warning(
+                'Could not read test durations from {file}: {error}'.format(
+                    file=report_file, error=str(e)))
+
+    return {name: sum(values) / len(values) for name, values in durations.items()}
+
+
+def _read_junit_report(report_file):
+    for testcase in ElementTree.parse(report_file).iter('testcase'):
+        time = testcase.get('time')
+        name = testcase.get('name')
+        if time is None or name is None:
+            continue
+
+        # Parameterized test cases are reported as name[params]
+        name = name.split('[', maxsplit=1)[0]
+        classname = testcase.get('classname')
+        # k2 reports the qualified name as name and its parent as classname,
+        # other tools only report the short name of the test case as name
+        if classname and not name.startswith(classname + '.'):
+            name = '.'.join([classname, name])
+        yield name, float(time)
+
+
+def _read_z2_report(report_file):
+    with open(report_file, 'r') as f:
+        report = json.load(f)
+
+    for test_case in report.get('testCases', []):
+        duration = test_case.get('duration')
+        qualified_name = test_case.get('qualifiedName')
+        if duration is not None and qualified_name is not None:
+            yield qualified_name, float(duration)
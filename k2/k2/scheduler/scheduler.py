@@ -7,8 +7,17 @@ The run queue can be modified during the run using requests.
 
 If ABORT or CRITICAL_ABORT has been received no more test cases can be added to the run queue.
 Remaining test cases will still be provided to the test runner so the correct verdict can be set on them.
+
+If reports from previous runs are given with tests.durations.reports the initial run queue is
+ordered longest-processing-time-first, so that the longest test cases don't start last when
+running with parallel workers. Test cases that share module and class scope are kept together
+so that the runner doesn't have to exit and re-enter the scoped components between them.
+Test cases added during the run are scheduled in the order they are added.
 """
+import inspect
 import re
+from collections import OrderedDict, deque
+from threading import RLock
 
 from zaf.component.decorator import requires
 from zaf.config.options import ConfigOption
@@ -18,12 +27,13 @@ from zaf.messages.decorator import callback_dispatcher, concurrent_dispatcher
 from k2 import ABORT, CRITICAL_ABORT
 from k2.cmd.run import RUN_COMMAND
 from k2.finder import FIND_TEST_CASES, FINDER_ENDPOINT
-from k2.utils.threading import LockableList
+from k2.finder.index import LazyTestFunction
 
 from . import ADD_TEST_CASES, CLEAR_RUN_QUEUE, GET_CURRENT_RUN_QUEUE, GET_LAST_SCHEDULED_TEST, \
     REMOVE_TEST_CASES, RUN_QUEUE_EMPTY, RUN_QUEUE_INITIALIZED, RUN_QUEUE_MODIFIED, \
-    SCHEDULE_NEXT_TEST, SCHEDULER_ENDPOINT, SCHEDULING_NEXT_TEST, TESTS_EXCLUDE, \
-    TESTS_EXCLUDE_REGEX, TESTS_INCLUDE, TESTS_INCLUDE_REGEX
+    SCHEDULE_NEXT_TEST, SCHEDULER_ENDPOINT, SCHEDULING_NEXT_TEST, TESTS_DURATIONS_REPORTS, \
+    TESTS_EXCLUDE, TESTS_EXCLUDE_REGEX, TESTS_INCLUDE, TESTS_INCLUDE_REGEX, RunQueueModification
+from .durations import read_test_durations
 
 EXTENSION_NAME = 'testscheduler'
 
@@ -36,6 +46,7 @@ EXTENSION_NAME = 'testscheduler'
         ConfigOption(TESTS_INCLUDE_REGEX, required=False),
         ConfigOption(TESTS_EXCLUDE, required=False),
         ConfigOption(TESTS_EXCLUDE_REGEX, required=False),
+        ConfigOption(TESTS_DURATIONS_REPORTS, required=False),
     ],
     endpoints_and_messages={
         SCHEDULER_ENDPOINT: [
@@ -51,6 +62,7 @@ class TestScheduler(AbstractExtension):
         self._include_re = config.get(TESTS_INCLUDE_REGEX, [])
         self._exclude = config.get(TESTS_EXCLUDE, [])
         self._exclude_re = config.get(TESTS_EXCLUDE_REGEX, [])
+        self._durations_reports = config.get(TESTS_DURATIONS_REPORTS, [])
 
         self._run_queue = None
         self._last_scheduled = None
@@ -83,15 +95,18 @@ class TestScheduler(AbstractExtension):
         self._aborted = True
 
     def _initialize_test_cases(self, messagebus):
-        run_queue = LockableList()
+        test_cases = []
         if not self._aborted:
             for find_result in messagebus.send_request(FIND_TEST_CASES,
                                                        FINDER_ENDPOINT).wait(timeout=5):
-                run_queue.extend(self._filter_using_config(find_result.result(timeout=5)))
-        self._run_queue = run_queue
+                test_cases.extend(self._filter_using_config(find_result.result(timeout=5)))
+            if self._durations_reports:
+                test_cases = order_test_cases(
+                    test_cases, read_test_durations(self._durations_reports))
+        self._run_queue = RunQueue(test_cases)
 
         messagebus.trigger_event(
-            RUN_QUEUE_INITIALIZED, SCHEDULER_ENDPOINT, data=self._cloned_run_queue())
+            RUN_QUEUE_INITIALIZED, SCHEDULER_ENDPOINT, data=self._run_queue.copy())
 
     def _filter_using_config(self, test_cases):
         split_includes = [include.split('.') for include in self._include]
@@ -137,41 +152,135 @@ class TestScheduler(AbstractExtension):
         if len(self._run_queue) == 0:
             messagebus.trigger_event(RUN_QUEUE_EMPTY, SCHEDULER_ENDPOINT)
 
-        if self._run_queue:
-            with self._run_queue.lock:
-                self._last_scheduled = self._run_queue.pop(0)
+        with self._run_queue.lock:
+            if self._run_queue:
+                self._last_scheduled = self._run_queue.popleft()
                 return self._last_scheduled
-        else:
-            return None
+            else:
+                return None
 
     def _get_current_run_queue(self):
-        with self._run_queue.lock:
-            return self._cloned_run_queue()
-
-    def _cloned_run_queue(self):
-        return self._run_queue[::]
+        return self._run_queue.copy()
 
     def _add_test_cases(self, test_cases, messagebus):
         if not self._aborted:
-            with self._run_queue.lock:
-                self._run_queue.extend(test_cases)
-                cloned_run_queue = self._cloned_run_queue()
-            messagebus.trigger_event(RUN_QUEUE_MODIFIED, SCHEDULER_ENDPOINT, data=cloned_run_queue)
+            self._run_queue.extend(test_cases)
+            messagebus.trigger_event(
+                RUN_QUEUE_MODIFIED,
+                SCHEDULER_ENDPOINT,
+                data=RunQueueModification(added=list(test_cases), removed=[]))
 
     def _remove_test_cases(self, test_cases, messagebus):
-        with self._run_queue.lock:
-            removed_tests = []
-            for remove_test in test_cases:
-                removed_tests.extend([test for test in self._run_queue.data if test == remove_test])
-                self._run_queue.data = [
-                    test for test in self._run_queue.data if test != remove_test
-                ]
-                cloned_run_queue = self._cloned_run_queue()
-        messagebus.trigger_event(RUN_QUEUE_MODIFIED, SCHEDULER_ENDPOINT, data=cloned_run_queue)
+        removed_tests = self._run_queue.remove_all(test_cases)
+        messagebus.trigger_event(
+            RUN_QUEUE_MODIFIED,
+            SCHEDULER_ENDPOINT,
+            data=RunQueueModification(added=[], removed=removed_tests))
         return removed_tests
 
     def _clear_run_queue(self):
-        with self._run_queue.lock:
-            removed_test_cases = self._run_queue.data[::]
-            self._run_queue.clear()
-            return removed_test_cases
+        return self._run_queue.clear()
+
+
+class RunQueue(object):
+    """
+    Thread safe FIFO queue of test cases.
+
+    Scheduling the next test case is O(1). Compares equal to a list with the same test cases.
+    """
+
+    def __init__(self, test_cases=()):
+        self.lock = RLock()
+        self._queue = deque(test_cases)
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __eq__(self, other):
+        with self.lock:
+            return list(self._queue) == list(other)
+
+    def popleft(self):
+        with self.lock:
+            return self._queue.popleft()
+
+    def extend(self, test_cases):
+        with self.lock:
+            self._queue.extend(test_cases)
+
+    def copy(self):
+        with self.lock:
+            return list(self._queue)
+
+    def remove_all(self, test_cases):
+        """
+        Remove all occurrences of the test cases from the queue.
+
+        :return: the removed test cases, in the order they were given
+        """
+        with self.lock:
+            removed = []
+            for remove_test in test_cases:
+                matching = [test for test in self._queue if test == remove_test]
+                if matching:
+                    removed.extend(matching)
+                    self._queue = deque(test for test in self._queue if test != remove_test)
+            return removed
+
+    def clear(self):
+        """Remove all test cases from the queue and return them."""
+        with self.lock:
+            removed = list(self._queue)
+            self._queue.clear()
+            return removed
+
+
+def order_test_cases(test_cases, durations):
+    """
+    Order test cases longest-processing-time-first while keeping scopes together.
+
+    The test cases are grouped on module and, within each module, on class.
+    Modules are ordered by their total duration, longest first, and the same is
+    done for the classes within each module and the test cases within each class.
+    Test cases without a historic duration count as 0 and otherwise keep their
+    relative order.
+
+    :param test_cases: list of TestCaseDefinition
+    :param durations: dict from qualified test case name to duration in seconds
+    :return: new list with the ordered test cases
+    """
+    modules = OrderedDict()
+    for test_case in test_cases:
+        module, cls = _scope_of(test_case)
+        modules.setdefault(module, OrderedDict()).setdefault(cls, []).append(test_case)
+
+    def duration(test_case):
+        return durations.get(test_case.name, 0)
+
+    def total(test_cases):
+        return sum(duration(test_case) for test_case in test_cases)
+
+    ordered_modules = []
+    for classes in modules.values():
+        ordered_classes = sorted(
+            (sorted(tests, key=duration, reverse=True) for tests in classes.values()),
+            key=total,
+            reverse=True)
+        ordered_modules.append([test for tests in ordered_classes for test in tests])
+
+    return [
+        test_case for tests in sorted(ordered_modules, key=total, reverse=True)
+        for test_case in tests
+    ]
+
+
+def _scope_of(test_case):
+    # Same scopes as the runner uses when entering and exiting module and class scopes
+    run_function = test_case.run_function
+    module = getattr(run_function, '__module__', None)
+    if isinstance(run_function, LazyTestFunction):
+        # The class is taken from the name to not import the module of a lazy test function
+        cls = run_function.__qualname__.rpartition('.')[0] or None
+    else:
+        cls = run_function.__self__.__class__ if inspect.ismethod(run_function) else None
+    return module, cls
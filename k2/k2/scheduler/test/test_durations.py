@@ -0,0 +1,119 @@
+import datetime
+import json
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import Mock
+
+from k2.finder.testfinder import TestCaseDefinition
+from k2.reports.junit.writer import generate_junit_report
+from k2.results.results import ResultsCollection, TestCaseResult, TestRunResult
+from k2.runner.testcase import Verdict
+
+from ..durations import read_test_durations
+from ..scheduler import order_test_cases
+
+
+def k2_junit_report(durations):
+    """Create a JUnit report the same way as k2 does for a run with the given durations."""
+    start = datetime.datetime(2020, 1, 1)
+    test_results = []
+    for name, seconds, params in durations:
+        result = TestCaseResult(name, name, start, params)
+        result.set_finished(
+            start + datetime.timedelta(seconds=seconds), Verdict.PASSED, None, '')
+        test_results.append(result)
+    run_result = TestRunResult('suite', start)
+    run_result.set_finished(start + datetime.timedelta(seconds=10), Verdict.PASSED, None)
+    return generate_junit_report(ResultsCollection(test_results, run_result))
+
+
+JUNIT_REPORT = k2_junit_report(
+    [
+        ('pkg.mod.test1', 2.5, []),
+        ('pkg.mod.test2', 1, ['a=1']),
+        ('pkg.mod.test2', 3, ['a=2']),
+    ])
+
+FOREIGN_JUNIT_REPORT = """\
+<?xml version="1.0" ?>
+<testsuites>
+    <testsuite name="suite" tests="2">
+        <testcase classname="pkg.mod.Class" name="test1" time="2.5"/>
+        <testcase classname="pkg.mod.Class" name="test2[a=1]" time="1.0"/>
+    </testsuite>
+</testsuites>
+"""
+
+
+class TestReadTestDurations(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_durations_are_read_from_junit_report(self):
+        report = self.write('junit-results.xml', JUNIT_REPORT)
+        self.assertEqual(
+            read_test_durations([report]), {
+                'pkg.mod.test1': 2.5,
+                'pkg.mod.test2': 2.0
+            })
+
+    def test_durations_from_junit_report_are_found_for_the_test_cases(self):
+        report = self.write('junit-results.xml', JUNIT_REPORT)
+        test1 = TestCaseDefinition(Mock(__module__='pkg.mod'), 'pkg.mod.test1')
+        test2 = TestCaseDefinition(Mock(__module__='pkg.mod'), 'pkg.mod.test2', params=[1])
+        test3 = TestCaseDefinition(Mock(__module__='pkg.mod'), 'pkg.mod.test3')
+        self.assertEqual(
+            order_test_cases([test3, test1, test2], read_test_durations([report])),
+            [test1, test2, test3])
+
+    def test_short_names_in_foreign_junit_reports_are_qualified_with_the_classname(self):
+        report = self.write('junit-results.xml', FOREIGN_JUNIT_REPORT)
+        self.assertEqual(
+            read_test_durations([report]), {
+                'pkg.mod.Class.test1': 2.5,
+                'pkg.mod.Class.test2': 1.0
+            })
+
+    def test_durations_are_read_from_z2_report(self):
+        report = self.write(
+            'z2-results.json',
+            json.dumps(
+                {
+                    'testCases': [
+                        {
+                            'qualifiedName': 'pkg.mod.test1',
+                            'duration': 4
+                        }, {
+                            'qualifiedName': 'pkg.mod.test2',
+                            'duration': None
+                        }
+                    ]
+                }))
+        self.assertEqual(read_test_durations([report]), {'pkg.mod.test1': 4.0})
+
+    def test_durations_from_multiple_reports_are_averaged(self):
+        junit = self.write('junit-results.xml', JUNIT_REPORT)
+        z2 = self.write(
+            'z2-results.json',
+            json.dumps({'testCases': [{
+                'qualifiedName': 'pkg.mod.test1',
+                'duration': 4.5
+            }]}))
+        self.assertEqual(read_test_durations([junit, z2])['pkg.mod.test1'], 3.5)
+
+    def test_unreadable_reports_are_skipped(self):
+        junit = self.write('junit-results.xml', JUNIT_REPORT)
+        broken = self.write('broken.xml', '<testsuites>')
+        missing = os.path.join(self.dir.name, 'missing.json')
+        self.assertEqual(
+            read_test_durations([broken, missing, junit]),
+            {'pkg.mod.test1': 2.5, 'pkg.mod.test2': 2.0})
@@ -1,19 +1,24 @@
+import json
+import os
 import unittest
+from tempfile import TemporaryDirectory
 from unittest.mock import Mock
 
 from zaf.builtin.unittest.harness import ExtensionTestHarness
+from zaf.config.manager import ConfigManager
 from zaf.messages.dispatchers import CallbackDispatcher
 
 from k2 import ABORT, CRITICAL_ABORT, K2_APPLICATION_ENDPOINT
 from k2.finder import FIND_TEST_CASES, FINDER_ENDPOINT
+from k2.finder.index import LazyTestFunction
 from k2.finder.testfinder import TestCaseDefinition, TestCaseFailureDefinition
 from k2.runner import RUNNER_ENDPOINT
 
 from .. import ADD_TEST_CASES, CLEAR_RUN_QUEUE, GET_CURRENT_RUN_QUEUE, GET_LAST_SCHEDULED_TEST, \
     REMOVE_TEST_CASES, RUN_QUEUE_EMPTY, RUN_QUEUE_INITIALIZED, RUN_QUEUE_MODIFIED, \
-    SCHEDULE_NEXT_TEST, SCHEDULER_ENDPOINT, SCHEDULING_NEXT_TEST, TESTS_EXCLUDE, \
-    TESTS_EXCLUDE_REGEX, TESTS_INCLUDE, TESTS_INCLUDE_REGEX
-from ..scheduler import TestScheduler
+    SCHEDULE_NEXT_TEST, SCHEDULER_ENDPOINT, SCHEDULING_NEXT_TEST, TESTS_DURATIONS_REPORTS, \
+    TESTS_EXCLUDE, TESTS_EXCLUDE_REGEX, TESTS_INCLUDE, TESTS_INCLUDE_REGEX, RunQueueModification
+from ..scheduler import TestScheduler, order_test_cases
 
 
 class TestScheduleNextTestCase(unittest.TestCase):
@@ -259,7 +264,7 @@ class TestEvents(unittest.TestCase):
 
             harness.send_request(
                 ADD_TEST_CASES, SCHEDULER_ENDPOINT, data=[test2]).wait()[0].result()
-            self.assertEqual(run_queue, [test1, test2])
+            self.assertEqual(run_queue, RunQueueModification(added=[test2], removed=[]))
 
     def test_that_run_queue_modified_is_triggered_from_remove_test_cases(self):
         with create_harness([test1, test2]) as harness:
@@ -276,7 +281,7 @@ class TestEvents(unittest.TestCase):
 
             harness.send_request(
                 REMOVE_TEST_CASES, SCHEDULER_ENDPOINT, data=[test1]).wait()[0].result()
-            self.assertEqual(run_queue, [test2])
+            self.assertEqual(run_queue, RunQueueModification(added=[], removed=[test1]))
 
 
 class TestSchedulingNextTest(unittest.TestCase):
@@ -401,9 +406,68 @@ class TestFilterUsingConfig(unittest.TestCase):
         self.assertEqual(scheduler._filter_using_config([always_include]), [always_include])
 
 
-def create_harness(test_cases):
+class TestOrderTestCases(unittest.TestCase):
+
+    def test_order_is_kept_without_durations(self):
+        self.assertEqual(
+            order_test_cases([mod1_test1, mod1_test2, mod2_test1], {}),
+            [mod1_test1, mod1_test2, mod2_test1])
+
+    def test_longest_test_case_is_scheduled_first(self):
+        durations = {mod1_test1.name: 1, mod1_test2.name: 5}
+        self.assertEqual(
+            order_test_cases([mod1_test1, mod1_test2], durations), [mod1_test2, mod1_test1])
+
+    def test_modules_are_ordered_by_total_duration(self):
+        durations = {mod1_test1.name: 3, mod1_test2.name: 3, mod2_test1.name: 5}
+        self.assertEqual(
+            order_test_cases([mod1_test1, mod2_test1, mod1_test2], durations),
+            [mod1_test1, mod1_test2, mod2_test1])
+
+    def test_test_cases_in_the_same_module_are_kept_together(self):
+        durations = {mod1_test1.name: 1, mod1_test2.name: 10, mod2_test1.name: 5}
+        self.assertEqual(
+            order_test_cases([mod1_test1, mod2_test1, mod1_test2], durations),
+            [mod1_test2, mod1_test1, mod2_test1])
+
+    def test_test_cases_without_duration_are_scheduled_last_in_their_scope(self):
+        durations = {mod1_test2.name: 1}
+        self.assertEqual(
+            order_test_cases([mod1_test1, mod1_test2, mod1_test3], durations),
+            [mod1_test2, mod1_test1, mod1_test3])
+
+    def test_lazy_test_cases_in_the_same_class_are_kept_together(self):
+        durations = {
+            lazy_class1_test1.name: 1,
+            lazy_class1_test2.name: 10,
+            lazy_class2_test1.name: 5,
+            lazy_class2_test2.name: 2,
+        }
+        self.assertEqual(
+            order_test_cases(
+                [lazy_class1_test1, lazy_class2_test1, lazy_class1_test2, lazy_class2_test2],
+                durations),
+            [lazy_class1_test2, lazy_class1_test1, lazy_class2_test1, lazy_class2_test2])
+        self.assertFalse(lazy_class1_test1.run_function.is_resolved)
+
+    def test_initial_run_queue_is_ordered_using_durations_from_reports(self):
+        with TemporaryDirectory() as dir:
+            report = os.path.join(dir, 'z2-results.json')
+            with open(report, 'w') as f:
+                json.dump({'testCases': [{'qualifiedName': 'test2', 'duration': 10}]}, f)
+
+            config = ConfigManager()
+            config.set(TESTS_DURATIONS_REPORTS, [report])
+            with create_harness([test1, test2], config) as harness:
+                actual = harness.send_request(GET_CURRENT_RUN_QUEUE,
+                                              SCHEDULER_ENDPOINT).wait()[0].result()
+                self.assertEqual(actual, [test2, test1])
+
+
+def create_harness(test_cases, config=None):
     harness = ExtensionTestHarness(
         TestScheduler,
+        config=config,
         endpoints_and_messages={
             FINDER_ENDPOINT: [FIND_TEST_CASES],
             RUNNER_ENDPOINT: [ABORT],
@@ -423,6 +487,20 @@ test1 = TestCaseDefinition(Mock(), 'test1')
 test2 = TestCaseDefinition(Mock(), 'test2')
 test3 = TestCaseDefinition(Mock(), 'test3')
 
+mod1_test1 = TestCaseDefinition(Mock(__module__='pkg.mod1'), 'pkg.mod1.test1')
+mod1_test2 = TestCaseDefinition(Mock(__module__='pkg.mod1'), 'pkg.mod1.test2')
+mod1_test3 = TestCaseDefinition(Mock(__module__='pkg.mod1'), 'pkg.mod1.test3')
+mod2_test1 = TestCaseDefinition(Mock(__module__='pkg.mod2'), 'pkg.mod2.test1')
+
+lazy_class1_test1 = TestCaseDefinition(
+    LazyTestFunction('/pkg/mod.py', 'pkg.mod', 'Class1.test1', None), 'pkg.mod.Class1.test1')
+lazy_class1_test2 = TestCaseDefinition(
+    LazyTestFunction('/pkg/mod.py', 'pkg.mod', 'Class1.test2', None), 'pkg.mod.Class1.test2')
+lazy_class2_test1 = TestCaseDefinition(
+    LazyTestFunction('/pkg/mod.py', 'pkg.mod', 'Class2.test1', None), 'pkg.mod.Class2.test1')
+lazy_class2_test2 = TestCaseDefinition(
+    LazyTestFunction('/pkg/mod.py', 'pkg.mod', 'Class2.test2', None), 'pkg.mod.Class2.test2')
+
 filter_test1 = TestCaseDefinition(Mock(), 'pkg1.pkg2.mod1.test1')
 filter_test2 = TestCaseDefinition(Mock(), 'pkg1.pkg2.mod1.Class.test2')
 filter_test3 = TestCaseDefinition(Mock(), 'pkg3.mod1.test3')
@@ -0,0 +1,74 @@
+import timeit
+
+from zaf.component.decorator import component, requires
+from zaf.component.factory import Factory
+from zaf.component.manager import ComponentManager, create_entity_map, create_registry
+
+DEPTH = 20
+NUMBER_OF_CALLS = 1000
+
+
+def create_component_tree(component_manager, depth):
+    """
+    Register a chain of components where each component requires the next one.
+
+    :return: a function that requires the first component in the chain
+    """
+    for level in reversed(range(depth)):
+        name = 'Component{level}'.format(level=level)
+        if level == depth - 1:
+
+            def leaf():
+                return 'leaf'
+
+            component(name=name, component_manager=component_manager)(leaf)
+        else:
+
+            def node(child):
+                return child
+
+            node = requires(child='Component{level}'.format(level=level + 1))(node)
+            component(name=name, component_manager=component_manager)(node)
+
+    @requires(root='Component0')
+    def call(root):
+        return root
+
+    return call
+
+
+def measure_call_overhead(depth, number_of_calls, cache_size):
+    """
+    Measure the time of Factory.call for a component tree.
+
+    A new test scope is used for each call so that all components are
+    instantiated each time.
+
+    :return: the average time per call in microseconds
+    """
+    component_manager = ComponentManager(create_registry(), create_entity_map())
+    factory = Factory(component_manager, cache_size=cache_size)
+    call = create_component_tree(component_manager, depth)
+    session = factory.enter_scope('session')
+
+    def call_in_new_scope():
+        scope = factory.enter_scope('test', session)
+        factory.call(call, scope)
+        factory.exit_scope(scope)
+
+    call_in_new_scope()
+    return timeit.timeit(call_in_new_scope, number=number_of_calls) * 1000000 / number_of_calls
+
+
+@requires(metrics='CreateSingleValueMetric')
+def test_measure_factory_call_for_20_deep_component_tree(metrics):
+    metrics(
+        'benchmark.component_factory.call_20_deep_tree',
+        measure_call_overhead(DEPTH, NUMBER_OF_CALLS, cache_size=1024))
+
+
+@requires(metrics='CreateSingleValueMetric')
+def test_measure_factory_call_for_20_deep_component_tree_without_cache(metrics):
+    metrics(
+        'benchmark.component_factory.call_20_deep_tree_without_cache',
+        measure_call_overhead(DEPTH, NUMBER_OF_CALLS, cache_size=0))
@@ -25,17 +25,24 @@ class BenchmarkEventBus(object):
         self.metrics = metrics
 
     def __call__(
-            self, number_of_messages, number_of_dispatchers, dispatcher_type, message_type,
-            handler_type):
+            self,
+            number_of_messages,
+            number_of_dispatchers,
+            dispatcher_type,
+            message_type,
+            handler_type,
+            trace=True):
         result = self.zk2(
             ['measureeventsandrequests', 'runcommand'],
             '--log-level off '
+            '{notrace}'
             'run '
             '--number-of-messages {number_of_messages} '
             '--dispatcher-type {dispatcher_type} '
             '--number-of-dispatchers {number_of_dispatchers} '
             '--message-type {message_type} '
             '--handler-type {handler_type} '.format(
+                notrace='' if trace else '--log-notrace zaf.messages ',
                 number_of_messages=number_of_messages,
                 number_of_dispatchers=number_of_dispatchers,
                 dispatcher_type=dispatcher_type,
@@ -56,11 +63,14 @@ class BenchmarkEventBus(object):
                 number_of_messages=number_of_messages, message_type=message_type) if
             number_of_messages != 1 else 'trigger_{message_type}'.format(message_type=message_type))
 
-        measurement = '{dispatcher_count_pre}{dispatcher_type}_dispatcher{dispatcher_plural}{handler_type_ext}'.format(
+        measurement = (
+            '{dispatcher_count_pre}{dispatcher_type}_dispatcher{dispatcher_plural}'
+            '{handler_type_ext}{trace_ext}').format(
             dispatcher_count_pre=dispatcher_count_pre,
             dispatcher_type=dispatcher_type,
             dispatcher_plural='s' if number_of_dispatchers > 1 else '',
             handler_type_ext=handler_type_ext,
+            trace_ext='' if trace else '_notrace',
         )
 
         self.metrics('.'.join(['benchmark', namespace, measurement]), int(m.group(1)))
@@ -111,6 +121,31 @@ def test_measure_event_with_1600_callback_dispatcher(benchmark):
     benchmark(1, 1600, CALL, EVENT, NO)
 
 
+@requires(benchmark='BenchmarkEventBus')
+def test_measure_16000_events_with_callback_dispatcher(benchmark):
+    benchmark(16000, 1, CALL, EVENT, NO)
+
+
+@requires(benchmark='BenchmarkEventBus')
+def test_measure_16000_requests_with_callback_dispatcher(benchmark):
+    benchmark(16000, 1, CALL, REQUEST, NO)
+
+
+@requires(benchmark='BenchmarkEventBus')
+def test_measure_16000_events_with_callback_dispatcher_without_message_tracing(benchmark):
+    benchmark(16000, 1, CALL, EVENT, NO, trace=False)
+
+
+@requires(benchmark='BenchmarkEventBus')
+def test_measure_16000_events_with_sequential_dispatcher(benchmark):
+    benchmark(16000, 1, SEQ, EVENT, NO)
+
+
+@requires(benchmark='BenchmarkEventBus')
+def test_measure_16000_events_with_sequential_dispatcher_without_message_tracing(benchmark):
+    benchmark(16000, 1, SEQ, EVENT, NO, trace=False)
+
+
 @requires(benchmark='BenchmarkEventBus')
 def test_measure_1600_requests_with_sequential_dispatcher(benchmark):
     benchmark(1600, 1, SEQ, REQUEST, NO)
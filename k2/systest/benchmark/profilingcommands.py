@@ -43,6 +43,11 @@ def test_profile_noop(benchmark):
         assert float(data[1]) < 1, 'K2 startup time must be less that 1 seconds'
 
 
+@requires(zk2='Zk2')
+def test_startup_of_noop_is_within_budget(zk2):
+    zk2(['noop', 'startupprofiler'], '--startup-budget 1 noop', file_logging=False)
+
+
 @requires(benchmark='BenchmarkProfileCommand')
 def test_profile_config(benchmark):
     benchmark('configcommand', 'config')
@@ -70,6 +70,7 @@ class Zk2Component(AbstractExtension):
                         "''",
                     ]
 
+                logdir = os.path.join(self.logdir_tests, self.context.filename_with_params)
                 zk2_args = (
                     '--disable-default-config-files '
                     '--ext-output@enabled true '
@@ -84,7 +85,15 @@ class Zk2Component(AbstractExtension):
                         enabled_extensions=' '.join(extension_args),
                         command=command,
                         filelog='' if not file_logging else ' '.join(file_logging_args),
-                        logdir=os.path.join(self.logdir_tests, self.context.filename_with_params))
+                        logdir=logdir)
+
+                # Caches, like the test index, are stored in the log dir of the test
+                # instead of in the cache of the user that runs the systests
+                env = {'XDG_CACHE_HOME': os.path.join(logdir, 'cache')}
 
                 return self.zk2(
-                    zk2_args, expected_exit_code=expected_exit_code, wait=wait, timeout=timeout)
+                    zk2_args,
+                    expected_exit_code=expected_exit_code,
+                    wait=wait,
+                    timeout=timeout,
+                    env=env)
@@ -20,19 +20,46 @@ class Analyzer():
         for tracker in self.trackers:
             tracker.analyze(data, self.collector)
 
+    def get_line_filter(self):
+        """
+        Get the patterns that a line must match to have any effect on the analysis.
+
+        Lines that don't match any of the patterns can be skipped without changing the result,
+        which makes it possible to filter the data before it is analyzed.
+
+        :return: list of compiled regular expressions or None if every line needs to be analyzed
+        """
+        patterns = []
+        for tracker in self.trackers:
+            tracker_patterns = tracker.get_line_filter()
+            if tracker_patterns is None:
+                return None
+            patterns.extend(tracker_patterns)
+        return patterns
+
     def get_items(self):
         return self.collector
 
 
 class AnalyzerFactory():
 
-    def get_analyzer(self, config):
+    def get_analyzer(self, config, trackers=None):
+        """
+        Create an analyzer for a configuration.
+
+        :param config: the rule configuration
+        :param trackers: trackers already created for the configuration, None to create them
+        """
         logger.debug('AnalyzerFactory:get_analyzer (config={cfg})'.format(cfg=config))
         collector = Collector()
-        definitions = self._create_definitions(config.definitions)
-        trackers = [SingleTracker(definitions)]
+        if trackers is None:
+            trackers = self.get_trackers(config)
         return Analyzer(trackers, collector)
 
+    def get_trackers(self, config):
+        definitions = self._create_definitions(config.definitions)
+        return [SingleTracker(definitions)]
+
     def _create_definitions(self, definitionsconfig):
         result = []
         for definition in definitionsconfig:
@@ -24,3 +24,34 @@ class LogAnalyzerApplication():
         logger.info('Writing summaries')
         for reporter in self.reporters:
             reporter.write_summary(items)
+
+
+class FollowLogAnalyzerApplication():
+    """
+    Analyzes data that is still being written and reports each item as soon as it is completed.
+
+    The reporters need to support write_item and close, they are closed when the following stops.
+    Reported items are removed from the collector, so the memory use does not grow with
+    the amount of data.
+    """
+
+    def __init__(self, analyzer, datasource, *reporters):
+        self.analyzer = analyzer
+        self.datasource = datasource
+        self.reporters = reporters
+
+    def run(self):
+        logger.info('Following data')
+        items = self.analyzer.get_items()
+        try:
+            for data in self.datasource.get_data():
+                self.analyzer.analyze(data)
+                if items:
+                    for item in items:
+                        for reporter in self.reporters:
+                            reporter.write_item(item)
+                    items.clear()
+        finally:
+            for reporter in self.reporters:
+                reporter.close()
+        logger.info('Following stopped')
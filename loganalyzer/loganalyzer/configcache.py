@@ -0,0 +1,139 @@
+"""
+Cache of compiled rule configurations.
+
+Reading a rule configuration means parsing the YAML, validating all definitions,
+compiling all markers and invalidators and building the trackers with their matchers.
+For large configurations this takes a lot longer than analyzing a small log.
+
+The compiled configuration, the validated definitions together with the trackers,
+is stored in a cache directory, keyed by a hash of the content of the configuration.
+The key also covers the Python version and the loganalyzer version and source files,
+so that a compiled configuration is never used by another version than the one that created it.
+
+The cache is enabled by setting the LOG_ANALYZER_CONFIG_CACHE environment variable
+to the path of the cache directory. The compiled configurations are stored as pickles,
+so the directory must only be writable by trusted users.
+"""
+
+import glob
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+
+from . import __version__
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+CONFIG_CACHE_VERSION = 1
+
+MAX_CACHED_CONFIGS = 64
+
+
+class CompiledConfig():
+    """A validated rule configuration together with the trackers that are built from it."""
+
+    def __init__(self, config, trackers):
+        self.config = config
+        self.trackers = trackers
+
+
+class ConfigCache():
+
+    def __init__(self, directory, max_entries=MAX_CACHED_CONFIGS):
+        """
+        Create a new cache.
+
+        :param directory: the cache directory, created when the first entry is stored
+        :param max_entries: the maximum number of compiled configurations to keep
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        logger.debug('ConfigCache: created (directory={directory})'.format(directory=directory))
+
+    def get_key(self, source):
+        """
+        Get the key for a configuration.
+
+        :param source: the content of the configuration as str
+        :return: the key as a hex string
+        """
+        digest = hashlib.sha256()
+        digest.update(
+            '{cache_version}:{python}:{version}\n'.format(
+                cache_version=CONFIG_CACHE_VERSION,
+                python=sys.version,
+                version=__version__).encode('utf-8'))
+        for path, mtime in _package_sources():
+            digest.update('{path}:{mtime}\n'.format(path=path, mtime=mtime).encode('utf-8'))
+        digest.update(source.encode('utf-8', errors='surrogatepass'))
+        return digest.hexdigest()
+
+    def load(self, key):
+        """
+        Load a compiled configuration.
+
+        :param key: the key of the configuration
+        :return: CompiledConfig or None if it is not in the cache or can't be read
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                compiled = pickle.load(f)
+            if isinstance(compiled, CompiledConfig):
+                logger.debug('ConfigCache: load, found (key={key})'.format(key=key))
+                # Touch the entry to keep the most recently used entries when pruning
+                os.utime(path)
+                return compiled
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(
+                'ConfigCache: load, could not read {path} (error={err})'.format(path=path, err=e))
+        return None
+
+    def store(self, key, compiled):
+        """
+        Store a compiled configuration.
+
+        Failing to store the configuration is not an error, it is only logged.
+
+        :param key: the key of the configuration
+        :param compiled: the CompiledConfig
+        """
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            # Write to a temporary file and rename it to not expose half written
+            # files to concurrently running applications
+            with tempfile.NamedTemporaryFile('wb', dir=self.directory, delete=False) as f:
+                pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, self._path(key))
+            logger.debug('ConfigCache: store (key={key})'.format(key=key))
+            self._prune()
+        except Exception as e:
+            logger.warning(
+                'ConfigCache: store, could not write to {directory} (error={err})'.format(
+                    directory=self.directory, err=e))
+
+    def _path(self, key):
+        return os.path.join(self.directory, '{key}.pickle'.format(key=key))
+
+    def _prune(self):
+        entries = glob.glob(os.path.join(self.directory, '*.pickle'))
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[self.max_entries:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _package_sources():
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for path in sorted(glob.glob(os.path.join(package_dir, '*.py'))):
+        yield os.path.basename(path), os.stat(path).st_mtime
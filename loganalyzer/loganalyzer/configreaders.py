@@ -1,6 +1,7 @@
 """Contains different configuration readers."""
 
 import argparse
+import io
 import logging
 import os
 import sys
@@ -10,7 +11,10 @@ from collections import OrderedDict
 import yaml
 from cchardet import UniversalDetector
 
+from .analyzer import AnalyzerFactory
 from .config import ConfigError, RawConfigParser, dict_to_raw_config
+from .configcache import CompiledConfig
+from .datasources import is_compressed, open_log_file
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
@@ -55,6 +59,19 @@ class YAMLConfigReader():
     def get_raw_config(self):
         return dict_to_raw_config(yaml.load(self.stream))
 
+    def get_source(self):
+        """
+        Get the content of the configuration.
+
+        The stream is replaced by an in-memory copy, so that it can still be parsed
+        and searched for errors afterwards, also when reading from stdin.
+        """
+        source = self.stream.read()
+        name = getattr(self.stream, 'name', '<config>')
+        self.stream = io.StringIO(source)
+        self.stream.name = name
+        return source
+
     def identify_errors(self):
         self.stream.seek(0)
         for index, line in enumerate(self.stream, start=1):
@@ -69,11 +86,34 @@ class YAMLConfigReader():
         return msg
 
 
+class CompiledConfigReader():
+    """
+    Reads a rule configuration and builds the trackers, using a cache of compiled configurations.
+
+    The reader needs to support get_source, which is used to find the configuration in the cache.
+    """
+
+    def __init__(self, reader, cache):
+        self.reader = reader
+        self.cache = cache
+        logger.debug('CompiledConfigReader: created')
+
+    def get_compiled_config(self):
+        key = self.cache.get_key(self.reader.get_source())
+        compiled = self.cache.load(key)
+        if compiled is None:
+            config = self.reader.get_config()
+            compiled = CompiledConfig(config, AnalyzerFactory().get_trackers(config))
+            self.cache.store(key, compiled)
+        return compiled
+
+
 class EnvVarConfigReader():
 
     PROFILE = 'LOG_ANALYZER_PROFILE'
     DEBUG = 'LOG_ANALYZER_DEBUG'
     ENCODING = 'LOG_ANALYZER_ENCODING'
+    CONFIG_CACHE = 'LOG_ANALYZER_CONFIG_CACHE'
 
     def __init__(self, env=os.environ):
         self.env = env
@@ -84,6 +124,7 @@ class EnvVarConfigReader():
         cfg['profile'] = self._parse_bool(self.env.get(self.PROFILE, 'False'))
         cfg['debug'] = self._parse_bool(self.env.get(self.DEBUG, 'False'))
         cfg['encoding'] = self._parse_str(self.env.get(self.ENCODING, None))
+        cfg['config_cache'] = self._parse_str(self.env.get(self.CONFIG_CACHE, None))
         return dict_to_raw_config(cfg)
 
     def _parse_bool(self, str_value):
@@ -122,7 +163,7 @@ class CmdLineConfigReader():
 
         default = 'UTF-8'
         detector = UniversalDetector()
-        with open(path, 'rb') as file, detector:
+        with open_log_file(path, 'rb') as file, detector:
             for line in file:
                 detector.feed(line)
                 if detector.done:
@@ -165,7 +206,7 @@ class CmdLineConfigReader():
             '--in',
             dest='infile',
             default='-',
-            help='set log input path [default: stdin (-)]',
+            help='set log input path, gzip and xz files are decompressed [default: stdin (-)]',
             metavar='FILE')
 
         parser.add_argument(
@@ -231,6 +272,41 @@ class CmdLineConfigReader():
             'If not set, automatic detection of the input file is done.'
             'Encoding settings has no effect when reading from stdin.')
 
+        parser.add_argument(
+            '-j',
+            '--jobs',
+            dest='jobs',
+            default=1,
+            type=int,
+            help='number of processes used to analyze the input file, 0 to use all CPUs. '
+            'Has no effect when reading from stdin [default: %(default)s]',
+            metavar='N')
+
+        parser.add_argument(
+            '--follow',
+            dest='follow',
+            action='store_true',
+            default=False,
+            help='follow the input file as it grows and is rotated, like tail -F, and write '
+            'each item as a JSON line to the report output as soon as it is found. '
+            'Runs until interrupted [default: %(default)s]')
+
+        parser.add_argument(
+            '--follow-idle-timeout',
+            dest='follow_idle_timeout',
+            default=None,
+            type=float,
+            help='stop following after SECONDS without new data [default: %(default)s]',
+            metavar='SECONDS')
+
+        parser.add_argument(
+            '--result-db',
+            dest='result_db',
+            default=None,
+            help='add the found items as a new run to a SQLite result database, '
+            'that can be queried with "%(prog)s query" [default: %(default)s]',
+            metavar='FILE')
+
         parser.add_argument(
             '--watchers-file',
             dest='watchers_file',
@@ -249,10 +325,21 @@ class CmdLineConfigReader():
 
         if result.infile == '-':
             result.infile = sys.stdin
+            result.infile_path = None
         else:
             if os.path.exists(result.infile):
+                result.infile_path = result.infile
                 self.detect_encoding(result.infile, result)
-                result.infile = open(result.infile, 'r', encoding=result.encoding, errors='replace')
+                result.infile = open_log_file(
+                    result.infile, 'r', encoding=result.encoding, errors='replace')
+            elif result.follow and not is_compressed(result.infile):
+                # The file to follow may not have been created yet
+                result.infile_path = result.infile
+                result.infile = None
+                result.detected_encoding = None
+                result.detected_encoding_confidence = 0
+                if result.encoding is None:
+                    result.encoding = 'UTF-8'
             else:
                 # Emulate the behavior of other file-based options parsed by the parser.
                 msg = "argument -i/--in: can't open '{infile}': [Errno 2] No such file or directory: '{infile}'".format(
@@ -263,3 +350,72 @@ class CmdLineConfigReader():
                 sys.exit(2)
 
         return result
+
+
+class QueryCmdLineConfigReader():
+    """Reads the command line of the query command, argv[1] is expected to be 'query'."""
+
+    def __init__(self, program_info, argv=None):
+        self.program_info = program_info
+        self.argv = argv if argv is not None else sys.argv.copy()
+        logger.debug('QueryCmdLineConfigReader: created')
+
+    def get_config(self):
+        parser = ArgumentParser(
+            prog='{name} query'.format(name=self.program_info.name),
+            description='Aggregate the items found in runs stored in result databases.',
+            formatter_class=RawDescriptionHelpFormatter)
+
+        parser.add_argument(
+            dest='result_dbs',
+            nargs='+',
+            help='result database created with --result-db',
+            metavar='RESULT_DB')
+
+        parser.add_argument(
+            '--id',
+            dest='definition_id',
+            default=None,
+            help='only count items of the definition with this id [default: all]',
+            metavar='ID')
+
+        parser.add_argument(
+            '--group-by',
+            dest='group_by',
+            default='id',
+            choices=['id', 'run'],
+            help='count the items per definition id or per run [default: %(default)s]')
+
+        parser.add_argument(
+            '-o',
+            '--out',
+            dest='outfile',
+            default=sys.stdout,
+            type=argparse.FileType('w', encoding='UTF-8'),
+            help='set output path [default: stdout (-)]',
+            metavar='FILE')
+
+        parser.add_argument(
+            '-v',
+            '--verbose',
+            dest='verbose',
+            action='store_true',
+            default=False,
+            help='turn on verbose mode [default: %(default)s]')
+
+        parser.add_argument(
+            '-q',
+            '--quiet',
+            dest='quiet',
+            action='store_true',
+            default=False,
+            help='prevent errors from being printed to stderr [default: %(default)s]')
+
+        parser.add_argument(
+            '--logfile',
+            dest='logfile_path',
+            default=None,
+            help='set logfile output path [default: %(default)s]',
+            metavar='FILE')
+
+        return dict_to_raw_config(vars(parser.parse_args(args=self.argv[2:])))
@@ -5,14 +5,88 @@ The interface dictates that get_data() returns an iterable of
 LogData objects
 """
 
+import codecs
+import gzip
+import io
+import locale
 import logging
+import lzma
+import mmap
+import os
+import sys
+import threading
+import time
+from multiprocessing import Pool
 
+from .filewatch import create_file_watcher
 from .item import LogData
+from .matcher import MultiPatternMatcher, literal_prefilter
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 
+COMPRESSED_FILE_OPENERS = {
+    '.gz': gzip.open,
+    '.xz': lzma.open,
+    '.lzma': lzma.open,
+}
+
+
+# Encodings that can be decoded from any line start, in addition to the single byte encodings
+LINE_DECODABLE_ENCODINGS = {'utf-8', 'utf-8-sig', 'ascii', 'iso8859-1'}
+
+
+def is_compressed(path):
+    return os.path.splitext(path)[1] in COMPRESSED_FILE_OPENERS
+
+
+def open_log_file(path, mode='r', **kwargs):
+    """
+    Open a log file, transparently decompressing gzip and xz files.
+
+    Compressed files are identified by the file extension.
+
+    :param path: the path to the file
+    :param mode: the mode as for the builtin open, text mode unless 'b' is given
+    :param kwargs: additional arguments as for the builtin open, like encoding and errors
+    :return: file object
+    """
+    opener = COMPRESSED_FILE_OPENERS.get(os.path.splitext(path)[1])
+    if opener is None:
+        return open(path, mode, **kwargs)
+    if 'b' not in mode and 't' not in mode:
+        mode += 't'
+    return opener(path, mode, **kwargs)
+
+
+def supports_encoding(encoding):
+    """
+    Check if files with the encoding can be handled as bytes split on newline bytes.
+
+    Only UTF-8 and single byte encodings are supported. Other encodings are either
+    stateful, like UTF-7 and ISO-2022, or can have ASCII bytes inside multibyte characters,
+    so a line can't be decoded on its own from an arbitrary offset.
+
+    :param encoding: the encoding, None for the default encoding
+    """
+    if encoding is None:
+        encoding = locale.getpreferredencoding(False)
+    try:
+        codec = codecs.lookup(encoding)
+        if codec.name not in LINE_DECODABLE_ENCODINGS and not _is_charmap_codec(codec):
+            return False
+        return '\n'.encode(encoding) == b'\n' and 'a\nb'.encode(encoding) == b'a\nb'
+    except (LookupError, UnicodeError):
+        return False
+
+
+def _is_charmap_codec(codec):
+    # The single byte codecs in the standard library decode with a table of 256 characters
+    module = sys.modules.get(getattr(codec.incrementaldecoder, '__module__', None))
+    return len(getattr(module, 'decoding_table', '')) == 256
+
+
 class DataSourceError(Exception):
 
     def __init__(self, msg, original_exception=None):
@@ -54,6 +128,437 @@ class FileDataSource(StreamDataSource):
         self.path = path
 
     def get_data(self):
-        with open(self.path) as stream:
+        with open_log_file(self.path) as stream:
             self.stream = stream
             return super().get_data()
+
+
+DEFAULT_FOLLOW_BLOCK_SIZE = 64 * 1024
+
+DEFAULT_MAX_LINE_LENGTH = 1024 * 1024
+
+
+class FollowFileDataSource():
+    """
+    Follows a file that is still being written, like tail -F.
+
+    The file is read from the beginning and then followed as it grows. If the file is
+    rotated, by being replaced by a new file or truncated, the rest of the old file is read
+    and the new file is followed from its beginning. The line index continues to count
+    across rotations. If the file doesn't exist yet, it is waited for.
+
+    Only complete lines are provided, except at rotation and when the following stops,
+    where the last line of the file is provided even if it is not terminated.
+    Lines longer than max_line_length are split, to keep the memory use bounded.
+
+    Following continues until stop is called or, if an idle timeout is given, until no new
+    data has been found for that long.
+    """
+
+    def __init__(
+            self,
+            path,
+            encoding=None,
+            idle_timeout=None,
+            poll_interval=1.0,
+            block_size=DEFAULT_FOLLOW_BLOCK_SIZE,
+            max_line_length=DEFAULT_MAX_LINE_LENGTH):
+        """
+        Create a new data source.
+
+        :param path: the path to the file
+        :param encoding: the encoding of the file, None for the default encoding
+        :param idle_timeout: stop following after this many seconds without new data,
+                             None to follow until stopped
+        :param poll_interval: the maximum time in seconds between checks of the file
+        :param block_size: the maximum number of bytes to read at a time
+        :param max_line_length: the maximum number of characters in a line
+        """
+        logger.debug(
+            'FollowFileDataSource: created (idle_timeout={timeout})'.format(timeout=idle_timeout))
+        self.path = path
+        self.encoding = encoding if encoding is not None else locale.getpreferredencoding(False)
+        self.idle_timeout = idle_timeout
+        self.poll_interval = poll_interval
+        self.block_size = block_size
+        self.max_line_length = max_line_length
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """Stop following the file, can be called from any thread."""
+        self._stopped.set()
+
+    def get_data(self):
+        followed = None
+        try:
+            index = 1
+            last_data_time = time.monotonic()
+            with create_file_watcher(self.path) as watcher:
+                while not self._stopped.is_set():
+                    if followed is None:
+                        followed = _FollowedFile.open(self)
+
+                    lines = []
+                    rotated = False
+                    if followed is not None:
+                        lines = followed.read_lines()
+                        if not lines and followed.at_end and followed.is_replaced():
+                            logger.info(
+                                'FollowFileDataSource: file rotated (path={path})'.format(
+                                    path=self.path))
+                            lines = followed.close()
+                            followed = None
+                            rotated = True
+
+                    for content in lines:
+                        yield LogData(index, content)
+                        index += 1
+
+                    if lines or rotated:
+                        last_data_time = time.monotonic()
+                    elif self._is_idle(last_data_time):
+                        break
+                    else:
+                        watcher.wait(self.poll_interval)
+
+            if followed is not None:
+                lines = followed.close()
+                followed = None
+                for content in lines:
+                    yield LogData(index, content)
+                    index += 1
+
+        except DataSourceError:
+            raise
+        except Exception as e:
+            logger.error('FollowFileDataSource: get_data (error={err})'.format(err=e))
+            raise DataSourceError('Error while following data stream', e)
+        finally:
+            if followed is not None:
+                followed.stream.close()
+
+    def _is_idle(self, last_data_time):
+        return (
+            self.idle_timeout is not None
+            and time.monotonic() - last_data_time >= self.idle_timeout)
+
+
+class _FollowedFile():
+    """An open file that is being followed, with the decoding state between reads."""
+
+    def __init__(self, stream, datasource):
+        self.stream = stream
+        self.stat = os.fstat(stream.fileno())
+        self.datasource = datasource
+        self.decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(datasource.encoding)(errors='replace'), translate=True)
+        self.partial_line = ''
+        self.at_end = False
+
+    @classmethod
+    def open(cls, datasource):
+        try:
+            return cls(open(datasource.path, 'rb'), datasource)
+        except FileNotFoundError:
+            return None
+
+    def read_lines(self):
+        """
+        Read at most one block and get the lines that were completed by it.
+
+        :return: list of lines, empty if there was no new complete line
+        """
+        data = self.stream.read(self.datasource.block_size)
+        self.at_end = not data
+        if not data:
+            return []
+        return self._split_lines(self.decoder.decode(data))
+
+    def is_replaced(self):
+        """Check if the path now refers to another file or if the file has been truncated."""
+        try:
+            stat = os.stat(self.datasource.path)
+        except FileNotFoundError:
+            # Keep reading the old file until the new file is created
+            return False
+        replaced = (stat.st_ino, stat.st_dev) != (self.stat.st_ino, self.stat.st_dev)
+        return replaced or stat.st_size < self.stream.tell()
+
+    def close(self):
+        """
+        Close the file and get the lines that remain of the data that has been read.
+
+        This includes an unterminated last line.
+
+        :return: list of lines
+        """
+        lines = self._split_lines(self.decoder.decode(b'', final=True))
+        if self.partial_line:
+            lines.append(self.partial_line.rstrip())
+            self.partial_line = ''
+        self.stream.close()
+        return lines
+
+    def _split_lines(self, text):
+        lines = (self.partial_line + text).split('\n')
+        self.partial_line = lines.pop()
+        max_line_length = self.datasource.max_line_length
+        while len(self.partial_line) > max_line_length:
+            lines.append(self.partial_line[:max_line_length])
+            self.partial_line = self.partial_line[max_line_length:]
+        return [line.rstrip() for line in lines]
+
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+LINE_BREAK_COUNT_WINDOW = 16 * 1024 * 1024
+
+
+class MappedFileDataSource():
+    """
+    Reads a file as bytes and only provides the lines that can match any of the patterns.
+
+    Uncompressed files are memory mapped and gzip and xz files are decompressed block by block.
+    Literals that are required by the patterns are searched for directly in the bytes
+    and only the lines that contain any of them are decoded. Lines that don't match
+    any of the patterns are skipped, in the same way as for ParallelFileDataSource, and
+    the provided lines have the same index and content as StreamDataSource would give them.
+
+    If any of the patterns can match without a literal, all lines are decoded and provided.
+
+    The encoding must be supported according to supports_encoding.
+    """
+
+    def __init__(self, path, patterns, encoding=None, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Create a new data source.
+
+        :param path: the path to the file
+        :param patterns: list of compiled regular expressions, lines not matching any are skipped
+        :param encoding: the encoding of the file, None for the default encoding
+        :param block_size: the size in bytes of the blocks that compressed files are read in
+        """
+        logger.debug('MappedFileDataSource: created')
+        self.path = path
+        self.patterns = patterns
+        self.encoding = encoding if encoding is not None else locale.getpreferredencoding(False)
+        self.block_size = block_size
+
+    def get_data(self):
+        try:
+            prefilter = literal_prefilter(self.patterns, _without_bom(self.encoding))
+            if prefilter is None:
+                logger.debug('MappedFileDataSource: get_data, all lines needed by the patterns')
+                with open_log_file(self.path, encoding=self.encoding, errors='replace') as stream:
+                    yield from StreamDataSource(stream).get_data()
+                return
+
+            scanner = _LineScanner(prefilter, self.encoding)
+            if is_compressed(self.path):
+                with open_log_file(self.path, 'rb') as stream:
+                    yield from self._scan_blocks(stream, scanner)
+            else:
+                with open(self.path, 'rb') as f:
+                    if os.fstat(f.fileno()).st_size == 0:
+                        return
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                        yield from scanner.scan(buffer, 0, len(buffer))
+
+        except DataSourceError:
+            raise
+        except Exception as e:
+            logger.error('MappedFileDataSource: get_data (error={err})'.format(err=e))
+            raise DataSourceError('Error while processing data stream', e)
+
+    def _scan_blocks(self, stream, scanner):
+        rest = b''
+        while True:
+            block = stream.read(self.block_size)
+            if not block:
+                yield from scanner.scan(rest, 0, len(rest))
+                return
+
+            buffer = rest + block if rest else block
+            end = _last_line_end(buffer)
+            yield from scanner.scan(buffer, 0, end)
+            rest = buffer[end:]
+
+
+class _LineScanner():
+    """
+    Finds the lines that contain a match of the prefilter in buffers of whole lines.
+
+    Lines are split on \\n, \\r\\n and \\r as for files opened in text mode.
+    The line index and byte offset are kept between calls to scan, so a file can be scanned
+    in consecutive parts.
+    """
+
+    def __init__(self, prefilter, encoding):
+        self.prefilter = prefilter
+        self.first_line_encoding = encoding
+        self.encoding = _without_bom(encoding)
+        self.index = 1
+        self.offset = 0
+
+    def scan(self, buffer, start, end):
+        """
+        Scan buffer[start:end], which must start at the beginning of a line.
+
+        :return: generator of LogData for the lines that contain a match of the prefilter
+        """
+        find = self.prefilter.finder(buffer, start, end)
+        base_offset = self.offset - start
+        position = start
+        hit_start = find(position)
+        while hit_start >= 0:
+            newline = buffer.rfind(b'\n', position, hit_start)
+            carriage_return = buffer.rfind(b'\r', max(newline + 1, position), hit_start)
+            line_start = max(newline, carriage_return, position - 1) + 1
+            line_end = _find_line_break(buffer, hit_start, end)
+
+            self.index += _count_line_breaks(buffer, position, line_start)
+            encoding = self.first_line_encoding if self.index == 1 else self.encoding
+            content = buffer[line_start:line_end].decode(encoding, errors='replace').rstrip()
+            yield LogData(self.index, content, base_offset + line_start)
+
+            position = line_end
+            hit_start = find(position)
+
+        self.index += _count_line_breaks(buffer, position, end)
+        self.offset += end - start
+
+
+def _find_line_break(buffer, start, end):
+    newline = buffer.find(b'\n', start, end)
+    if newline < 0:
+        newline = end
+    carriage_return = buffer.find(b'\r', start, newline)
+    return carriage_return if carriage_return >= 0 else newline
+
+
+def _last_line_end(buffer):
+    # A \r at the end can be followed by a \n in the next block
+    newline = buffer.rfind(b'\n')
+    carriage_return = buffer.rfind(b'\r', newline + 1, len(buffer) - 1)
+    return max(newline, carriage_return) + 1
+
+
+def _count_line_breaks(buffer, start, end):
+    count = 0
+    while start < end:
+        stop = min(start + LINE_BREAK_COUNT_WINDOW, end)
+        if stop < end and buffer[stop - 1:stop] == b'\r':
+            # Keep \r\n together
+            stop += 1
+        data = buffer[start:stop]
+        count += data.count(b'\n') + data.count(b'\r') - data.count(b'\r\n')
+        start = stop
+    return count
+
+
+class ParallelFileDataSource():
+    """
+    Reads a file in parallel and only provides the lines that match any of the patterns.
+
+    The file is split into line-aligned byte ranges that are decoded and pre-filtered
+    by a pool of processes. The matching lines are provided in line order with the same
+    index and content as StreamDataSource would give them, so an analyzer that only changes
+    state on lines matching the patterns gives the same result as when reading all lines.
+
+    The encoding must be supported according to supports_encoding.
+    """
+
+    def __init__(self, path, patterns, encoding=None, jobs=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Create a new data source.
+
+        :param path: the path to the file
+        :param patterns: list of compiled regular expressions, lines not matching any are skipped
+        :param encoding: the encoding of the file, None for the default encoding
+        :param jobs: the number of processes to use, None for the number of CPUs
+        :param chunk_size: the approximate size in bytes of each chunk
+        """
+        logger.debug(
+            'ParallelFileDataSource: created (jobs={jobs}, chunk_size={size})'.format(
+                jobs=jobs, size=chunk_size))
+        self.path = path
+        self.patterns = patterns
+        self.encoding = encoding if encoding is not None else locale.getpreferredencoding(False)
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+
+    def get_data(self):
+        try:
+            chunks = self.get_chunks()
+            with Pool(self.jobs, _init_chunk_filter, (self.patterns, )) as pool:
+                first_index = 1
+                for nr_of_lines, lines in pool.imap(_filter_chunk, chunks):
+                    for offset, content in lines:
+                        yield LogData(first_index + offset, content)
+                    first_index += nr_of_lines
+
+        except Exception as e:
+            logger.error('ParallelFileDataSource: get_data (error={err})'.format(err=e))
+            raise DataSourceError('Error while processing data stream', e)
+
+    def get_chunks(self):
+        """
+        Split the file into chunks that start at the beginning of a line.
+
+        :return: list of (path, encoding, start, end) with byte offsets
+        """
+        size = os.path.getsize(self.path)
+        chunks = []
+        with open(self.path, 'rb') as f:
+            start = 0
+            while start < size:
+                f.seek(min(start + self.chunk_size, size))
+                f.readline()
+                end = f.tell()
+                encoding = self.encoding if start == 0 else _without_bom(self.encoding)
+                chunks.append((self.path, encoding, start, end))
+                start = end
+        logger.debug(
+            'ParallelFileDataSource: get_chunks (size={size}, chunks={chunks})'.format(
+                size=size, chunks=len(chunks)))
+        return chunks
+
+
+def _without_bom(encoding):
+    # Only the first chunk can start with a byte order mark
+    if codecs.lookup(encoding).name == 'utf-8-sig':
+        return 'utf-8'
+    return encoding
+
+
+_chunk_matcher = None
+
+
+def _init_chunk_filter(patterns):
+    global _chunk_matcher
+    _chunk_matcher = MultiPatternMatcher(patterns)
+
+
+def _filter_chunk(chunk):
+    """
+    Read and filter one chunk of the file in a worker process.
+
+    :return: (number of lines in the chunk, list of (line offset, content) for the matching lines)
+    """
+    path, encoding, start, end = chunk
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    # Decode and split lines in the same way as a file opened in text mode
+    stream = io.StringIO(data.decode(encoding, errors='replace'), newline=None)
+    search = _chunk_matcher.search
+    lines = []
+    offset = -1
+    for offset, line in enumerate(stream):
+        content = line.rstrip()
+        if search(content):
+            lines.append((offset, content))
+    return offset + 1, lines
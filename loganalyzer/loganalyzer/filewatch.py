@@ -0,0 +1,102 @@
+"""
+Waiting for changes of files that are being followed.
+
+On Linux inotify is used to wake up as soon as anything changes in the directory
+of the file, which covers the file being written to, created, truncated or rotated.
+Where inotify is not available the file is polled instead.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import time
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+
+DIRECTORY_EVENTS = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE)
+
+
+def create_file_watcher(path):
+    """
+    Create the best available watcher for a file.
+
+    :param path: the path to the file, the directory of the file must exist for inotify to be used
+    :return: InotifyWatcher or PollingWatcher
+    """
+    try:
+        return InotifyWatcher(path)
+    except (OSError, AttributeError) as e:
+        logger.debug(
+            'create_file_watcher: inotify not available, polling (path={path}, error={err})'.format(
+                path=path, err=e))
+        return PollingWatcher()
+
+
+class PollingWatcher():
+
+    def wait(self, timeout):
+        """Wait for the full timeout, the caller checks the file afterwards."""
+        time.sleep(timeout)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class InotifyWatcher():
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        directory = os.path.dirname(os.path.abspath(path))
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), DIRECTORY_EVENTS) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, os.strerror(errno), directory)
+        logger.debug('InotifyWatcher: created (directory={directory})'.format(directory=directory))
+
+    def wait(self, timeout):
+        """
+        Wait until something changes in the directory of the file or the timeout expires.
+
+        :param timeout: the maximum time to wait in seconds
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            # The events are only used to wake up, so they are discarded
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
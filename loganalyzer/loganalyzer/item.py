@@ -6,17 +6,159 @@ a log, matching a definition  results in an instance (ItemInstance) being create
 """
 
 import logging
+from array import array
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 
-class Collector(list):
+class Collector():
+    """
+    Collects the complete items found by the trackers.
+
+    The fields of the matches are copied to ResultColumns when an item is added, so
+    the ItemInstance and its re match objects are not kept during the analysis.
+    The collected items are read back as CollectedItem objects that are created
+    from the columns when they are accessed.
+    """
+
+    def __init__(self):
+        self.columns = ResultColumns()
 
     def add(self, item):
         """Add an item to the collector."""
         logger.debug('Collector: Added item (item={item})'.format(item=item))
-        self.append(item)
+        self.columns.add(item)
+
+    def clear(self):
+        """Remove all collected items."""
+        self.columns.clear()
+
+    def __len__(self):
+        return self.columns.item_count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Collector index out of range')
+        return self.columns.get_item(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.columns.get_item(index)
+
+
+class MatchRecord():
+    """One row of ResultColumns, the match of one marker of a found item."""
+
+    __slots__ = ('item', 'id', 'marker', 'line', 'offset', 'match', 'groups')
+
+    def __init__(self, item, definition_id, marker, line, offset, match, groups):
+        self.item = item
+        self.id = definition_id
+        self.marker = marker
+        self.line = line
+        self.offset = offset
+        self.match = match
+        self.groups = groups
+
+    def __str__(self, *args, **kwargs):
+        return '{item}:{id}:{marker}:{line}'.format(
+            item=self.item, id=self.id, marker=self.marker, line=self.line)
+
+
+class ResultColumns():
+    """
+    Columnar storage of found items and the matches of their markers.
+
+    Each match of a marker is a row. The numeric columns are kept in arrays, the
+    definitions are shared between the items and only the matched text and the
+    captured groups are kept of the re match objects. This makes a row a lot smaller
+    than the ItemInstance, LogMatch and re match objects that it is created from.
+
+    The items are numbered in the order they are added, also across calls to clear.
+    """
+
+    def __init__(self):
+        # One entry per item
+        self.items = array('q')
+        self.definitions = []
+        self.first_rows = array('q')
+        # One entry per row
+        self.lines = array('q')
+        self.offsets = array('q')
+        self.contents = []
+        self.matches = []
+        self.groups = []
+        self.next_item = 1
+
+    def add(self, item):
+        """
+        Add the matches of a found item.
+
+        :param item: a complete ItemInstance
+        """
+        self.items.append(self.next_item)
+        self.definitions.append(item.definition)
+        self.first_rows.append(len(self.lines))
+        for logmatch in item.matches:
+            match = logmatch.match
+            offset = logmatch.data.offset
+            self.lines.append(logmatch.data.index)
+            self.offsets.append(offset if offset is not None else -1)
+            self.contents.append(logmatch.data.content)
+            self.matches.append(match.group() if match is not None else None)
+            self.groups.append(match.groups() if match is not None else ())
+        self.next_item += 1
+
+    def clear(self):
+        """Remove all rows, the numbering of the items continues where it was."""
+        for column in (self.items, self.first_rows, self.lines, self.offsets):
+            del column[:]
+        for column in (self.definitions, self.contents, self.matches, self.groups):
+            column.clear()
+
+    @property
+    def item_count(self):
+        return len(self.items)
+
+    @property
+    def titles(self):
+        """Dict from definition id to title for the definitions of the items."""
+        return {definition.id: definition.title for definition in self.definitions}
+
+    def get_item(self, index):
+        """
+        Get an item in the order they were added.
+
+        :param index: the index of the item among the items in the columns
+        :return: CollectedItem
+        """
+        return CollectedItem(
+            self.definitions[index], [
+                LogMatch(
+                    LogData(
+                        self.lines[row], self.contents[row],
+                        self.offsets[row] if self.offsets[row] >= 0 else None),
+                    MatchedText(self.matches[row], self.groups[row])
+                    if self.matches[row] is not None else None) for row in self._rows(index)
+            ])
+
+    def _rows(self, index):
+        end = self.first_rows[index + 1] if index + 1 < len(self.first_rows) else len(self.lines)
+        return range(self.first_rows[index], end)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __iter__(self):
+        for index, (item, definition) in enumerate(zip(self.items, self.definitions)):
+            for marker, row in enumerate(self._rows(index)):
+                offset = self.offsets[row]
+                yield MatchRecord(
+                    item, definition.id, marker, self.lines[row],
+                    offset if offset >= 0 else None, self.matches[row] or '', self.groups[row])
 
 
 class ItemDefinition():
@@ -44,6 +186,8 @@ class ItemDefinition():
 
 class ItemInstance():
 
+    __slots__ = ('definition', 'matches', 'invalidators')
+
     def __init__(self, definition):
         self.definition = definition
         self.matches = [None] * len(definition.markers)
@@ -72,9 +216,19 @@ class ItemInstance():
 
 class LogData():
 
-    def __init__(self, index, content):
+    __slots__ = ('index', 'content', 'offset')
+
+    def __init__(self, index, content, offset=None):
+        """
+        Create a new line of data.
+
+        :param index: the line number, starting at 1
+        :param content: the content of the line without the line break
+        :param offset: the byte offset of the start of the line, None if not known by the data source
+        """
         self.index = index
         self.content = content
+        self.offset = offset
 
     def __str__(self, *args, **kwargs):
         return '{index}:{content}'.format(index=self.index, content=self.content)
@@ -90,6 +244,8 @@ class LogData():
 
 class LogMatch():
 
+    __slots__ = ('data', 'match')
+
     def __init__(self, data, match):
         self.data = data
         self.match = match
@@ -114,3 +270,39 @@ class LogMatch():
 
     def __ne__(self, other):
         return not self.__eq__(other)
+
+
+class CollectedItem():
+    """A found item read back from ResultColumns, with the same attributes as ItemInstance."""
+
+    __slots__ = ('definition', 'matches')
+
+    def __init__(self, definition, matches):
+        self.definition = definition
+        self.matches = matches
+
+    def is_complete(self):
+        return True
+
+    def is_invalid(self):
+        return False
+
+
+class MatchedText():
+    """
+    The parts of an re match object that are kept for a collected item.
+
+    Supports group and groups in the same way as the re match object.
+    """
+
+    __slots__ = ('text', 'captured')
+
+    def __init__(self, text, captured=()):
+        self.text = text
+        self.captured = captured
+
+    def group(self, index=0):
+        return self.text if index == 0 else self.captured[index - 1]
+
+    def groups(self):
+        return self.captured
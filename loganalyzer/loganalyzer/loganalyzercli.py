@@ -9,14 +9,20 @@ CLI application to run Log Analyzer.
 
 import logging
 import sys
+import time
 
 from . import program_info
 from .analyzer import AnalyzerFactory
 from .appconfig import ConfigFactory, ConfigureLogger, log_config
-from .application import LogAnalyzerApplication
-from .configreaders import CmdLineConfigReader, ConfigError, EnvVarConfigReader, YAMLConfigReader
-from .datasources import DataSourceError, StreamDataSource
-from .reporters import ReportingError, TextReporter, WatchersReporter
+from .application import FollowLogAnalyzerApplication, LogAnalyzerApplication
+from .configcache import ConfigCache
+from .configreaders import CmdLineConfigReader, CompiledConfigReader, ConfigError, \
+    EnvVarConfigReader, QueryCmdLineConfigReader, YAMLConfigReader
+from .datasources import DataSourceError, FollowFileDataSource, MappedFileDataSource, \
+    ParallelFileDataSource, StreamDataSource, is_compressed, supports_encoding
+from .reporters import JsonLinesReporter, ReportingError, ResultStoreReporter, TextReporter, \
+    WatchersReporter
+from .resultstore import ResultStore, ResultStoreError
 
 
 class CLIError(Exception):
@@ -37,10 +43,11 @@ class LogAnalyzerCLI():
 
     logger = logging.getLogger('main')
 
-    def __init__(self, debug=False, encoding=None, argv=None):
+    def __init__(self, debug=False, encoding=None, argv=None, config_cache=None):
         self.debug = debug
         self.encoding = encoding
         self.argv = argv
+        self.config_cache = config_cache
         self.exit_code = 0
 
     def __enter__(self):
@@ -59,7 +66,7 @@ class LogAnalyzerCLI():
                 print('')
                 self.logger.warning('Aborted by user, keyboard interrupt detected.')
                 self.exit_code = 0
-            elif exc_type in [DataSourceError, ConfigError, ReportingError]:
+            elif exc_type in [DataSourceError, ConfigError, ReportingError, ResultStoreError]:
                 error_msg = str(exc_val)
                 self.logger.critical(
                     program_info.name + ': Critical error, {err} \n - exiting application'.format(
@@ -86,10 +93,20 @@ class LogAnalyzerCLI():
                     confidence=self.args.detected_encoding_confidence))
         else:
             self.logger.info('Parsing rules configuration')
-            config = YAMLConfigReader(self.args.configfile, self.args.config_check).get_config()
+            reader = YAMLConfigReader(self.args.configfile, self.args.config_check)
+            if self.config_cache is None or self.args.config_check:
+                config = reader.get_config()
+                trackers = None
+            else:
+                compiled = CompiledConfigReader(
+                    reader, ConfigCache(self.config_cache)).get_compiled_config()
+                config, trackers = compiled.config, compiled.trackers
             if not self.args.config_check:
                 self.logger.info('Assembling analysis-application')
-                app = self._assemble_application(config)
+                if self.args.follow:
+                    app = self._assemble_follow_application(config, trackers)
+                else:
+                    app = self._assemble_application(config, trackers)
                 self.logger.info('Performing analysis')
                 app.run()
                 self.logger.info('Analysis done')
@@ -103,32 +120,140 @@ class LogAnalyzerCLI():
     def log_commandline_args(self, config):
         log_config('Commandline arguments:', config)
 
-    def _assemble_application(self, config):
-        analyzer = AnalyzerFactory().get_analyzer(config)
-        datasource = StreamDataSource(self.args.infile)
+    def _assemble_application(self, config, trackers=None):
+        analyzer = AnalyzerFactory().get_analyzer(config, trackers)
+        datasource = self._get_datasource(analyzer)
         reporters = [TextReporter(self.args.summaryfile, self.args.outfile)]
         if self.args.watchers_file:
             reporters.append(
                 WatchersReporter(self.args.watchers_file, self.args.watchers_separator))
+        if self.args.result_db:
+            reporters.append(self._get_result_store_reporter())
 
         app = LogAnalyzerApplication(analyzer, datasource, *reporters)
         return app
 
+    def _assemble_follow_application(self, config, trackers=None):
+        analyzer = AnalyzerFactory().get_analyzer(config, trackers)
+        if self.args.infile_path is None or is_compressed(self.args.infile_path):
+            datasource = StreamDataSource(self.args.infile)
+        else:
+            if self.args.infile is not None:
+                # The file is reopened by the data source to be able to follow rotations
+                self.args.infile.close()
+            datasource = FollowFileDataSource(
+                self.args.infile_path,
+                self.args.encoding,
+                idle_timeout=self.args.follow_idle_timeout)
+        reporters = [JsonLinesReporter(self.args.outfile)]
+        if self.args.result_db:
+            reporters.append(self._get_result_store_reporter())
+        return FollowLogAnalyzerApplication(analyzer, datasource, *reporters)
+
+    def _get_result_store_reporter(self):
+        return ResultStoreReporter(
+            self.args.result_db, self.args.infile_path,
+            getattr(self.args.configfile, 'name', None))
+
+    def _get_datasource(self, analyzer):
+        if self.args.infile_path is None:
+            return StreamDataSource(self.args.infile)
+
+        patterns = analyzer.get_line_filter()
+        if patterns is None:
+            self.logger.info('Reading all lines, all lines are needed by the rule configuration')
+            return StreamDataSource(self.args.infile)
+        if not supports_encoding(self.args.encoding):
+            self.logger.info(
+                'Reading all lines, the encoding {encoding} can not be read as bytes'.format(
+                    encoding=self.args.encoding))
+            return StreamDataSource(self.args.infile)
+
+        if self.args.infile is not None:
+            # The file is read from its path by the data source
+            self.args.infile.close()
+        path = self.args.infile_path
+        if self.args.jobs != 1 and not is_compressed(path):
+            jobs = self.args.jobs if self.args.jobs > 0 else None
+            return ParallelFileDataSource(path, patterns, self.args.encoding, jobs=jobs)
+        return MappedFileDataSource(path, patterns, self.args.encoding)
+
+
+class QueryCLI(LogAnalyzerCLI):
+    """CLI application to aggregate the results stored in result databases."""
+
+    def run(self):
+        if self.args.group_by == 'run':
+            header = ('ITEMS', 'RUN', 'STARTED', 'INPUT', 'DATABASE')
+            rows = self._get_run_counts()
+        else:
+            header = ('ITEMS', 'RUNS', 'ID', 'TITLE')
+            rows = self._get_definition_counts()
+        self._write_table(header, rows)
+
+    def parse_commandline_args(self, argv=None):
+        return QueryCmdLineConfigReader(program_info, argv).get_config()
+
+    def _get_definition_counts(self):
+        counts = {}
+        for path in self.args.result_dbs:
+            with ResultStore(path, create=False) as store:
+                for definition_id, title, items, runs in store.get_definition_counts(
+                        self.args.definition_id):
+                    count = counts.setdefault(definition_id, [0, 0, title])
+                    count[0] += items
+                    count[1] += runs
+                    count[2] = title
+        return [
+            (items, runs, definition_id, title)
+            for definition_id, (items, runs, title) in sorted(counts.items())
+        ]
+
+    def _get_run_counts(self):
+        rows = []
+        for path in self.args.result_dbs:
+            with ResultStore(path, create=False) as store:
+                for run, started, input_path, config_path, items in store.get_run_counts(
+                        self.args.definition_id):
+                    rows.append(
+                        (
+                            items, run,
+                            time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started)),
+                            input_path if input_path is not None else '-', path))
+        return rows
+
+    def _write_table(self, header, rows):
+        rows = [header] + [tuple(str(value) for value in row) for row in rows]
+        widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+        for row in rows:
+            self.args.outfile.write(
+                '  '.join(
+                    value.ljust(width) for value, width in zip(row, widths)).rstrip() + '\n')
+
 
 def main():
     """Application entry point."""
     envcfg = EnvVarConfigReader().get_config()
     logging.raiseExceptions = envcfg.debug
 
+    if sys.argv[1:2] == ['query']:
+        return _run_query(envcfg.debug)
+
     if envcfg.profile:
         exit_code = _profile_run(envcfg)
     else:
-        exit_code = _run(envcfg.debug, envcfg.encoding)
+        exit_code = _run(envcfg.debug, envcfg.encoding, envcfg.config_cache)
     return exit_code
 
 
-def _run(debug, encoding):
-    with LogAnalyzerCLI(debug, encoding) as app:
+def _run(debug, encoding, config_cache=None):
+    with LogAnalyzerCLI(debug, encoding, config_cache=config_cache) as app:
+        app.run()
+    return app.exit_code
+
+
+def _run_query(debug):
+    with QueryCLI(debug) as app:
         app.run()
     return app.exit_code
 
@@ -140,7 +265,10 @@ def _profile_run(envcfg):
     profile_filename = 'zloganalyzer.profile.txt'
     stats_filename = 'zloganalyzer.stats.txt'
     cProfile.runctx(
-        '_run(envcfg.debug, envcfg.encoding)', globals(), locals(), filename=profile_filename)
+        '_run(envcfg.debug, envcfg.encoding, envcfg.config_cache)',
+        globals(),
+        locals(),
+        filename=profile_filename)
     with open(stats_filename, 'wt') as statsfile:
         p = pstats.Stats(profile_filename, stream=statsfile)
         stats = p.sort_stats('cumulative')
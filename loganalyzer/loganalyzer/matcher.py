@@ -0,0 +1,271 @@
+"""
+Matching of many regular expressions against the same data in one pass.
+
+Running every marker and invalidator separately against every line means that
+the number of regex searches grows with both the log size and the number of
+definitions, even though most lines do not match anything.
+
+The MultiPatternMatcher extracts literal strings from each pattern, where at least
+one must be part of every match of the pattern. All literals are combined into a single
+regex, built as a trie so that it can be evaluated efficiently, that rejects
+lines that can't match any pattern with one search.
+For the remaining lines only the patterns that have a literal in the line are
+searched, and the result is the original match objects of these patterns.
+
+Patterns that no literals can be extracted from, for example patterns that only
+consist of character classes or that are case insensitive, are searched on every line.
+"""
+
+import heapq
+import logging
+import re
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class MultiPatternMatcher():
+
+    def __init__(self, patterns):
+        """
+        Create a matcher for the patterns.
+
+        :param patterns: list of compiled regular expressions, all str or all bytes patterns
+        """
+        self.patterns = patterns
+        self._always_searched = []
+        literals = {}
+        for pattern_index, pattern in enumerate(patterns):
+            pattern_literals = required_literals(pattern)
+            for literal in pattern_literals:
+                literals.setdefault(literal, []).append(pattern_index)
+            if not pattern_literals:
+                self._always_searched.append(pattern_index)
+
+        self._literals = list(literals.items())
+        self._prefilter = None
+        if self._literals:
+            self._prefilter = re.compile(_trie_regex(literals.keys()))
+
+        logger.debug(
+            'MultiPatternMatcher: created (patterns={patterns}, literals={literals}, '
+            'always_searched={always})'.format(
+                patterns=len(patterns), literals=len(self._literals),
+                always=len(self._always_searched)))
+
+    def search(self, content):
+        """
+        Search for all patterns in content.
+
+        :param content: the str or bytes to search in
+        :return: list of (pattern_index, match) for the matching patterns, ordered by pattern_index
+        """
+        candidates = self._candidates(content)
+        if not candidates:
+            return []
+
+        result = []
+        patterns = self.patterns
+        for pattern_index in candidates:
+            match = patterns[pattern_index].search(content)
+            if match:
+                result.append((pattern_index, match))
+        return result
+
+    def _candidates(self, content):
+        if self._prefilter is None or self._prefilter.search(content) is None:
+            return self._always_searched
+
+        candidates = set(self._always_searched)
+        for literal, pattern_indexes in self._literals:
+            if literal in content:
+                candidates.update(pattern_indexes)
+        return sorted(candidates)
+
+
+def required_literals(pattern):
+    """
+    Find literals where at least one must be part of every match of the pattern.
+
+    :param pattern: compiled regular expression
+    :return: list of literals as str or bytes depending on the type of pattern,
+             empty if no literals are found
+    """
+    if pattern.flags & re.IGNORECASE:
+        return []
+
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return []
+
+    if isinstance(pattern.pattern, bytes):
+        return [bytes(literal) for literal in _required_literals(parsed)]
+    return [''.join(map(chr, literal)) for literal in _required_literals(parsed)]
+
+
+def _required_literals(parsed):
+    """
+    Find the most selective set of literals where at least one is required in a parsed sequence.
+
+    A single run of literals is one option and alternations where all alternatives have
+    required literals are other options. The option with the longest shortest literal is chosen.
+    """
+    options = [[run] for run in _literal_runs(parsed) if run]
+    for op, av in _flatten_groups(parsed):
+        if op == sre_parse.BRANCH:
+            alternatives = [_required_literals(alternative) for alternative in av[1]]
+            if all(alternatives):
+                options.append([literal for literals in alternatives for literal in literals])
+
+    if not options:
+        return []
+    return max(options, key=lambda literals: min(len(literal) for literal in literals))
+
+
+def _literal_runs(parsed):
+    """
+    Yield all runs of consecutive literal characters that are required in a parsed sequence.
+
+    Groups without flags are part of the sequence. Repeated items that must occur at least once
+    are searched for runs of their own.
+    """
+    run = []
+    for op, av in _flatten_groups(parsed):
+        if op == sre_parse.LITERAL:
+            run.append(av)
+            continue
+
+        yield run
+        run = []
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            yield from _literal_runs(av[2])
+    yield run
+
+
+def _flatten_groups(parsed):
+    for op, av in parsed:
+        # The group flags were added to SUBPATTERN in Python 3.6
+        if op == sre_parse.SUBPATTERN and (len(av) == 2 or (not av[1] and not av[2])):
+            yield from _flatten_groups(av[-1])
+        else:
+            yield op, av
+
+
+def _trie_regex(literals):
+    """
+    Build a regex that matches if any of the literals is found.
+
+    The literals are arranged in a trie to make the alternation cheap to evaluate.
+    A literal that is a prefix of another literal makes the longer literal redundant.
+    """
+    is_bytes = isinstance(next(iter(literals)), bytes)
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal.decode('latin-1') if is_bytes else literal:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        if '' in node:
+            return ''
+        alternatives = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return '(?:{alternatives})'.format(alternatives='|'.join(alternatives))
+
+    regex = build(trie)
+    return regex.encode('latin-1') if is_bytes else regex
+
+
+def literal_prefilter(patterns, encoding):
+    """
+    Create a prefilter that finds the places in encoded data where any of the patterns can match.
+
+    Searching the encoded data directly makes it possible to only decode the parts of the data
+    that can match. This requires an encoding where an encoded string is always found as is
+    in the encoded data, which is true for UTF-8 and the single-byte encodings.
+
+    :param patterns: list of compiled str regular expressions
+    :param encoding: the encoding of the data
+    :return: LiteralPrefilter or None if any of the patterns can match without a literal
+    """
+    literals = set()
+    for pattern in patterns:
+        pattern_literals = required_literals(pattern)
+        if not pattern_literals:
+            return None
+        try:
+            literals.update(literal.encode(encoding) for literal in pattern_literals)
+        except UnicodeEncodeError:
+            return None
+    return LiteralPrefilter(literals)
+
+
+class LiteralPrefilter():
+    """
+    Finds the places in bytes data where any of a set of literals occur.
+
+    A few literals are searched for separately with bytes.find, which is a lot faster
+    than a regex but needs one pass over the data for each literal.
+    Many literals are searched for with a regex built as a trie.
+    """
+
+    max_separate_literals = 32
+
+    def __init__(self, literals):
+        """
+        Create a prefilter for the literals.
+
+        :param literals: iterable of bytes literals
+        """
+        self.literals = sorted(literals)
+        self.regex = None
+        if len(self.literals) > self.max_separate_literals:
+            self.regex = re.compile(_trie_regex(self.literals))
+
+    def finder(self, buffer, start, end):
+        """
+        Create a function that finds the first literal at or after a position in buffer[start:end].
+
+        The positions given to the function must never decrease.
+
+        :param buffer: bytes-like object supporting find, for example bytes or mmap
+        :return: function from position to the index of the first literal found, -1 if none is found
+        """
+        if self.regex is not None:
+            search = self.regex.search
+
+            def find_with_regex(position):
+                match = search(buffer, position, end)
+                return match.start() if match is not None else -1
+
+            return find_with_regex
+
+        # Heap with the index of the next occurrence of each literal that is still found
+        heap = []
+        for literal in self.literals:
+            index = buffer.find(literal, start, end)
+            if index >= 0:
+                heap.append((index, literal))
+        heapq.heapify(heap)
+
+        def find_separately(position):
+            while heap:
+                index, literal = heap[0]
+                if index >= position:
+                    return index
+                index = buffer.find(literal, position, end)
+                if index < 0:
+                    heapq.heappop(heap)
+                else:
+                    heapq.heapreplace(heap, (index, literal))
+            return -1
+
+        return find_separately
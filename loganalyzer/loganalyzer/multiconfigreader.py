@@ -10,3 +10,7 @@ class MultiConfigReader():
 
     def get_config(self):
         return merge_configs(*[r.get_config() for r in self.readers])
+
+    def get_source(self):
+        """Get the content of all configurations, in the order of the readers."""
+        return '\0'.join(r.get_source() for r in self.readers)
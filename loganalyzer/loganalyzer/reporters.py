@@ -5,7 +5,12 @@ Reporters write a summary and a full report of all the items
 found during analysis.
 """
 
+import json
 import logging
+from array import array
+
+from .item import Collector, ResultColumns
+from .resultstore import ResultStore, ResultStoreError
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
@@ -36,6 +41,9 @@ class ItemSummary():
 class ItemStats():
 
     def get_item_summaries(self, items):
+        if isinstance(items, Collector):
+            return self.get_collected_item_summaries(items)
+
         summaries = {}
         for item in items:
             definition_id = item.definition.definition_id
@@ -47,6 +55,25 @@ class ItemStats():
         result = (summaries[def_id] for def_id in sorted(summaries.keys()))
         return result
 
+    def get_collected_item_summaries(self, collector):
+        """
+        Get the summaries of the items in a collector.
+
+        Only the positions of the items are kept in the summaries and the items are
+        created from the columns of the collector when the summary items are iterated over.
+        """
+        definitions = {}
+        positions = {}
+        for position, definition in enumerate(collector.columns.definitions):
+            definitions[definition.definition_id] = definition
+            positions.setdefault(definition.definition_id, array('q')).append(position)
+
+        for definition_id in sorted(positions.keys()):
+            summary = ItemSummary(definitions[definition_id])
+            summary.count = len(positions[definition_id])
+            summary.items = (collector[position] for position in positions[definition_id])
+            yield summary
+
 
 class TextReporter():
 
@@ -150,3 +177,119 @@ class WatchersReporter():
             for email in summary.definition.watchers:
                 emails.add(email)
         return sorted(emails)
+
+
+class JsonLinesReporter():
+    """
+    Writes each item as a JSON object on a line of its own.
+
+    Items can be written one at a time as they are found with write_item, which makes
+    the reporter suitable for following logs that are still being written.
+    Each line is flushed when it has been written.
+    """
+
+    def __init__(self, report_output):
+        self.report_output = report_output
+        logger.debug('JsonLinesReporter: created')
+
+    def write_summary(self, items):
+        pass
+
+    def write_report(self, items):
+        for item in items:
+            self.write_item(item)
+
+    def write_item(self, item):
+        try:
+            self.report_output.write(json.dumps(self.item_to_dict(item), sort_keys=True))
+            self.report_output.write('\n')
+            self.report_output.flush()
+        except Exception as e:
+            logger.error('JsonLinesReporter: write_item (error={err}'.format(err=e))
+            raise ReportingError('JsonLinesReporter: Unknown error while writing item.', e)
+
+    def close(self):
+        # The lines are already flushed and the output is owned by the caller
+        pass
+
+    def item_to_dict(self, item):
+        definition = item.definition
+        return {
+            'id': definition.id,
+            'title': definition.title,
+            'matches': [self.match_to_dict(match) for match in item.matches],
+        }
+
+    def match_to_dict(self, logmatch):
+        return {
+            'index': logmatch.data.index,
+            'content': logmatch.data.content,
+            'match': logmatch.match.group() if logmatch.match else '',
+        }
+
+
+class ResultStoreReporter():
+    """
+    Writes the items to a result store, as a new run.
+
+    The run is added when the first items are written, or when the report is written if
+    no items are found. Items written one at a time with write_item are stored directly,
+    which makes the reporter suitable for following logs that are still being written.
+    The database is kept open, without syncing each write to disk, until the report is
+    written or the reporter is closed.
+    """
+
+    def __init__(self, path, input_path=None, config_path=None):
+        """
+        Create a new reporter.
+
+        :param path: the path to the result database
+        :param input_path: the path of the analyzed log, None for stdin
+        :param config_path: the path of the rule configuration
+        """
+        self.path = path
+        self.input_path = input_path
+        self.config_path = config_path
+        self.run = None
+        self.store = None
+        self.columns = ResultColumns()
+        logger.debug('ResultStoreReporter: created')
+
+    def write_summary(self, items):
+        pass
+
+    def write_report(self, items):
+        try:
+            if isinstance(items, Collector):
+                # The collected items are already stored in columns
+                self._write('report', items.columns)
+            else:
+                for item in items:
+                    self.columns.add(item)
+                self._write('report', self.columns)
+        finally:
+            self.close()
+
+    def write_item(self, item):
+        self.columns.add(item)
+        self._write('item', self.columns)
+
+    def close(self):
+        """Close the result database, it is opened again if more items are written."""
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def _write(self, what, columns):
+        try:
+            if self.store is None:
+                self.store = ResultStore(self.path, sync_commits=False).__enter__()
+            if self.run is None:
+                self.run = self.store.add_run(self.input_path, self.config_path)
+            self.store.write(self.run, columns)
+            self.columns.clear()
+        except ResultStoreError as e:
+            logger.error('ResultStoreReporter: write_{what} (error={err}'.format(what=what, err=e))
+            raise ReportingError(
+                'ResultStoreReporter: Error while writing {what}: {msg}'.format(
+                    what=what, msg=str(e)), e)
@@ -0,0 +1,234 @@
+"""
+Structured storage of the items found during analysis.
+
+The text reports are meant to be read and can't be searched or compared between runs.
+The result store keeps the matches of the found items in a SQLite database, where each
+run of the application is added as a new run, so that the results of many runs can be
+aggregated afterwards, for example with *zloganalyzer query*.
+
+The matches are written from ResultColumns, which the Collector fills during the analysis
+and which keeps one compact column per field instead of the item instances and their
+match objects.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from . import __version__
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+RESULT_STORE_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    input TEXT,
+    config TEXT,
+    version TEXT
+);
+CREATE TABLE IF NOT EXISTS definitions (
+    run INTEGER NOT NULL,
+    id TEXT,
+    title TEXT,
+    PRIMARY KEY (run, id)
+);
+CREATE TABLE IF NOT EXISTS items (
+    run INTEGER NOT NULL,
+    item INTEGER NOT NULL,
+    id TEXT,
+    PRIMARY KEY (run, item)
+);
+CREATE TABLE IF NOT EXISTS matches (
+    run INTEGER NOT NULL,
+    item INTEGER NOT NULL,
+    marker INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    offset INTEGER,
+    match TEXT,
+    groups TEXT,
+    PRIMARY KEY (run, item, marker)
+);
+CREATE INDEX IF NOT EXISTS items_id ON items (id);
+"""
+
+
+class ResultStoreError(Exception):
+
+    def __init__(self, msg, original_exception=None):
+        super().__init__(type(self))
+        self.msg = msg
+        self.original_exception = original_exception
+
+    def __str__(self):
+        return self.msg
+
+    def __unicode__(self):
+        return self.msg
+
+
+class ResultStore():
+    """
+    A SQLite database with the results of any number of runs.
+
+    The store is used as a context manager, which opens the database and closes it again.
+    """
+
+    def __init__(self, path, create=True, sync_commits=True):
+        """
+        Create a new store.
+
+        :param path: the path to the database file
+        :param create: create the database if it does not exist, otherwise it is an error
+        :param sync_commits: wait for each write to be synced to disk. Otherwise the database
+                             uses a write-ahead log that is only synced at checkpoints, which is
+                             a lot faster for many small writes but can lose the latest writes
+                             if the system crashes.
+        """
+        self.path = path
+        self.create = create
+        self.sync_commits = sync_commits
+        self.connection = None
+        logger.debug('ResultStore: created (path={path})'.format(path=path))
+
+    def __enter__(self):
+        if not self.create and not os.path.isfile(self.path):
+            raise ResultStoreError(
+                'Result database {path} does not exist'.format(path=self.path))
+        try:
+            self.connection = sqlite3.connect(self.path)
+            version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+            if version == 0:
+                self.connection.executescript(SCHEMA)
+                self.connection.execute(
+                    'PRAGMA user_version = {version}'.format(version=RESULT_STORE_VERSION))
+            elif version != RESULT_STORE_VERSION:
+                raise ResultStoreError(
+                    'Result database {path} has unsupported version {version}'.format(
+                        path=self.path, version=version))
+            if not self.sync_commits:
+                self.connection.execute('PRAGMA journal_mode = WAL')
+                self.connection.execute('PRAGMA synchronous = NORMAL')
+        except sqlite3.Error as e:
+            self.close()
+            raise ResultStoreError(
+                'Could not open result database {path}: {msg}'.format(path=self.path, msg=str(e)),
+                e)
+        except ResultStoreError:
+            self.close()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def add_run(self, input_path=None, config_path=None):
+        """
+        Add a new run.
+
+        :param input_path: the path of the analyzed log, None for stdin
+        :param config_path: the path of the rule configuration
+        :return: the run number
+        """
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                'INSERT INTO runs (started, input, config, version) VALUES (?, ?, ?, ?)',
+                (time.time(), input_path, config_path, __version__))
+            run = cursor.lastrowid
+        logger.debug('ResultStore: add_run (run={run})'.format(run=run))
+        return run
+
+    def write(self, run, columns):
+        """
+        Write the rows of the columns to a run, in one transaction.
+
+        :param run: the run number
+        :param columns: the ResultColumns
+        """
+        with self._transaction() as connection:
+            connection.executemany(
+                'INSERT OR IGNORE INTO definitions (run, id, title) VALUES (?, ?, ?)',
+                ((run, definition_id, title) for definition_id, title in columns.titles.items()))
+            connection.executemany(
+                'INSERT OR IGNORE INTO items (run, item, id) VALUES (?, ?, ?)',
+                (
+                    (run, item, definition.id)
+                    for item, definition in zip(columns.items, columns.definitions)))
+            connection.executemany(
+                'INSERT INTO matches (run, item, marker, line, offset, match, groups) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (
+                    (
+                        run, record.item, record.marker, record.line, record.offset, record.match,
+                        json.dumps(record.groups) if record.groups else None)
+                    for record in columns))
+        logger.debug(
+            'ResultStore: write (run={run}, rows={rows})'.format(run=run, rows=len(columns)))
+
+    def get_definition_counts(self, definition_id=None):
+        """
+        Count the found items per definition over all runs.
+
+        :param definition_id: only count items of this definition, None for all
+        :return: list of (id, title, number of items, number of runs with items) ordered by id
+        """
+        where, parameters = self._where_id(definition_id)
+        return self._query(
+            """
+            SELECT items.id, (
+                SELECT title FROM definitions
+                WHERE definitions.id IS items.id ORDER BY run DESC LIMIT 1),
+                COUNT(*), COUNT(DISTINCT run)
+            FROM items {where}
+            GROUP BY items.id ORDER BY items.id
+            """.format(where=where), parameters)
+
+    def get_run_counts(self, definition_id=None):
+        """
+        Count the found items per run.
+
+        :param definition_id: only count items of this definition, None for all
+        :return: list of (run, started, input, config, number of items) ordered by run
+        """
+        where, parameters = self._where_id(definition_id, 'AND')
+        return self._query(
+            """
+            SELECT runs.run, runs.started, runs.input, runs.config, COUNT(items.item)
+            FROM runs LEFT JOIN items ON items.run = runs.run {where}
+            GROUP BY runs.run ORDER BY runs.run
+            """.format(where=where), parameters)
+
+    def _where_id(self, definition_id, keyword='WHERE'):
+        if definition_id is None:
+            return '', ()
+        return '{keyword} items.id = ?'.format(keyword=keyword), (definition_id, )
+
+    def _query(self, sql, parameters):
+        try:
+            return self.connection.execute(sql, parameters).fetchall()
+        except sqlite3.Error as e:
+            raise ResultStoreError(
+                'Could not query result database {path}: {msg}'.format(path=self.path, msg=str(e)),
+                e)
+
+    @contextmanager
+    def _transaction(self):
+        try:
+            # The connection commits when the block succeeds and rolls back otherwise
+            with self.connection:
+                yield self.connection
+        except sqlite3.Error as e:
+            raise ResultStoreError(
+                'Could not write to result database {path}: {msg}'.format(
+                    path=self.path, msg=str(e)), e)
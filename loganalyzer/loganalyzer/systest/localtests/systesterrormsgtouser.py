@@ -46,7 +46,7 @@ class TestErrorInApplication(SysTest):
         logging.getLogger().removeHandler(self.handler)
 
     @patch(
-        loganalyzercli.__name__ + '.StreamDataSource.get_data',
+        loganalyzercli.__name__ + '.MappedFileDataSource.get_data',
         side_effect=DataSourceError('Induced data error'))
     def test_datasrc_error_running_app_as_in_std_mode(self, DataSourceMock):
         out = 'datasrc_error_std_mode.txt'
@@ -59,7 +59,7 @@ class TestErrorInApplication(SysTest):
         self.baseline_check(out)
 
     @patch(
-        loganalyzercli.__name__ + '.StreamDataSource.get_data',
+        loganalyzercli.__name__ + '.MappedFileDataSource.get_data',
         side_effect=DataSourceError('Induced data error'))
     def test_datasrc_error_running_app_as_in_verbose_mode(self, DataSourceMock):
         out = 'datasrc_error_verbose_mode.txt'
@@ -5,10 +5,11 @@ Note: uses relative imports and hence the parent module need to be loaded.
 """
 import re
 import unittest
+from unittest.mock import Mock
 
 import munch
 
-from ..analyzer import AnalyzerFactory
+from ..analyzer import Analyzer, AnalyzerFactory
 
 
 class TestAnalyzerFactory(unittest.TestCase):
@@ -74,3 +75,18 @@ class TestAnalyzerFactory(unittest.TestCase):
         self.assertEqual(2, len(definitions))
         self.assertEqual('Title1', definitions[0].title)
         self.assertEqual('Title2', definitions[1].title)
+
+
+class TestAnalyzer(unittest.TestCase):
+
+    def test_line_filter_combines_the_line_filters_of_all_trackers(self):
+        m1 = re.compile('a')
+        m2 = re.compile('b')
+        analyzer = Analyzer([Mock(**{'get_line_filter.return_value': [m1]}),
+                             Mock(**{'get_line_filter.return_value': [m2]})], Mock())
+        self.assertEqual(analyzer.get_line_filter(), [m1, m2])
+
+    def test_no_line_filter_if_any_tracker_needs_all_lines(self):
+        analyzer = Analyzer([Mock(**{'get_line_filter.return_value': [re.compile('a')]}),
+                             Mock(**{'get_line_filter.return_value': None})], Mock())
+        self.assertIsNone(analyzer.get_line_filter())
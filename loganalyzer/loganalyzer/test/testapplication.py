@@ -6,7 +6,7 @@ Note: uses relative imports and hence the parent module need to be loaded.
 import unittest
 from unittest.mock import Mock, call
 
-from ..application import LogAnalyzerApplication
+from ..application import FollowLogAnalyzerApplication, LogAnalyzerApplication
 
 
 class TestApplication(unittest.TestCase):
@@ -27,3 +27,33 @@ class TestApplication(unittest.TestCase):
         analyzer.analyze.assert_has_calls([call(d) for d in data])
         reporter.write_summary.assert_called_once_with(items)
         reporter.write_report.assert_called_once_with(items)
+
+
+class TestFollowApplication(unittest.TestCase):
+
+    def test_items_are_reported_and_removed_when_completed(self):
+        data = ['a', 'b']
+        items = []
+        analyzer = Mock()
+        analyzer.get_items.return_value = items
+        analyzer.analyze.side_effect = lambda d: items.append(d.upper())
+        datasource = Mock()
+        datasource.get_data.return_value = data
+        reporter = Mock()
+
+        app = FollowLogAnalyzerApplication(analyzer, datasource, reporter)
+        app.run()
+
+        reporter.write_item.assert_has_calls([call('A'), call('B')])
+        self.assertEqual(items, [])
+
+    def test_reporters_are_closed_when_following_stops(self):
+        analyzer = Mock()
+        analyzer.get_items.return_value = []
+        datasource = Mock()
+        datasource.get_data.side_effect = Exception('Induced error')
+        reporter = Mock()
+
+        app = FollowLogAnalyzerApplication(analyzer, datasource, reporter)
+        self.assertRaises(Exception, app.run)
+        reporter.close.assert_called_once_with()
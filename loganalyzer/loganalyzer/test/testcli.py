@@ -3,10 +3,20 @@ Tests the classes in the cli module.
 
 Note: uses relative imports and hence the parent module need to be loaded.
 """
+import gzip
+import os
+import re
 import sys
+import tempfile
 import unittest
+from unittest.mock import Mock
 
-from ..loganalyzercli import LogAnalyzerCLI
+from ..datasources import FollowFileDataSource, MappedFileDataSource, ParallelFileDataSource, \
+    StreamDataSource
+from ..item import ResultColumns
+from ..loganalyzercli import LogAnalyzerCLI, QueryCLI
+from ..reporters import ResultStoreReporter
+from ..resultstore import ResultStore
 
 
 class TestCmdLineParsingDefaults(unittest.TestCase):
@@ -28,6 +38,9 @@ class TestCmdLineParsingDefaults(unittest.TestCase):
     def test_does_not_write_log_by_default(self):
         self.assertIsNone(self.args.logfile_path)
 
+    def test_does_not_write_result_db_by_default(self):
+        self.assertIsNone(self.args.result_db)
+
 
 class TestCmdLineParsingDashAsStdinStdout(unittest.TestCase):
 
@@ -47,3 +60,139 @@ class TestCmdLineParsingDashAsStdinStdout(unittest.TestCase):
 
     def test_dash_works_as_stdout_for_summary(self):
         self.assertEqual(sys.stdout, self.args.summaryfile)
+
+
+class TestDataSourceSelection(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.analyzer = Mock()
+        self.analyzer.get_line_filter.return_value = [re.compile('a')]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def get_datasource(self, args, filename='log.txt', opener=open):
+        path = os.path.join(self.tmp.name, filename)
+        with opener(path, 'wb') as f:
+            f.write(b'a line\n')
+        self.cli = LogAnalyzerCLI()
+        self.cli.args = self.cli.parse_commandline_args(['zloganalyzer', '-', '--in', path] + args)
+        self.addCleanup(self.cli.args.infile.close)
+        return self.cli._get_datasource(self.analyzer)
+
+    def test_input_file_is_memory_mapped(self):
+        self.assertIsInstance(self.get_datasource([]), MappedFileDataSource)
+
+    def test_input_file_opened_for_reading_lines_is_closed_when_memory_mapped(self):
+        self.get_datasource([])
+        self.assertTrue(self.cli.args.infile.closed)
+
+    def test_input_file_is_read_in_parallel_with_jobs(self):
+        self.assertIsInstance(self.get_datasource(['--jobs', '2']), ParallelFileDataSource)
+
+    def test_compressed_input_file_is_decompressed(self):
+        datasource = self.get_datasource(['--jobs', '2'], 'log.txt.gz', gzip.open)
+        self.assertIsInstance(datasource, MappedFileDataSource)
+        self.assertEqual([data.content for data in datasource.get_data()], ['a line'])
+
+    def test_all_lines_are_read_if_needed_by_the_rule_configuration(self):
+        self.analyzer.get_line_filter.return_value = None
+        self.assertIsInstance(self.get_datasource([]), StreamDataSource)
+
+    def test_all_lines_are_read_for_encodings_that_can_not_be_read_as_bytes(self):
+        self.assertIsInstance(
+            self.get_datasource(['--set-encoding', 'utf-16']), StreamDataSource)
+
+    def test_all_lines_are_read_for_stateful_encodings(self):
+        self.assertIsInstance(self.get_datasource(['--set-encoding', 'utf-7']), StreamDataSource)
+        self.assertFalse(self.cli.args.infile.closed)
+
+
+class TestFollowMode(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = Mock(definitions=[])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def assemble(self, path):
+        cli = LogAnalyzerCLI()
+        cli.args = cli.parse_commandline_args(
+            ['zloganalyzer', '-', '--in', path, '--follow', '--follow-idle-timeout', '1'])
+        return cli._assemble_follow_application(self.config)
+
+    def test_input_file_is_followed(self):
+        path = os.path.join(self.tmp.name, 'log.txt')
+        with open(path, 'w') as f:
+            f.write('a line\n')
+        app = self.assemble(path)
+        self.assertIsInstance(app.datasource, FollowFileDataSource)
+        self.assertEqual(app.datasource.idle_timeout, 1)
+
+    def test_input_file_that_does_not_exist_can_be_followed(self):
+        app = self.assemble(os.path.join(self.tmp.name, 'log.txt'))
+        self.assertIsInstance(app.datasource, FollowFileDataSource)
+        self.assertEqual(app.datasource.encoding, 'UTF-8')
+
+    def test_items_are_written_to_result_db(self):
+        path = os.path.join(self.tmp.name, 'log.txt')
+        cli = LogAnalyzerCLI()
+        cli.args = cli.parse_commandline_args(
+            ['zloganalyzer', '-', '--in', path, '--follow', '--result-db', 'results.db'])
+        app = cli._assemble_follow_application(self.config)
+        self.assertIsInstance(app.reporters[-1], ResultStoreReporter)
+        self.assertEqual(app.reporters[-1].path, 'results.db')
+
+
+class TestQuery(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'results.db')
+        self.outfile = os.path.join(self.tmp.name, 'out.txt')
+        item = Mock()
+        item.definition.id = 'ID'
+        item.definition.title = 'Title'
+        item.matches = [Mock()]
+        item.matches[0].data.index = 1
+        item.matches[0].data.offset = None
+        item.matches[0].match = re.search('a', 'a')
+        with ResultStore(self.path) as store:
+            for run_items in ([item, item], [item]):
+                columns = ResultColumns()
+                for run_item in run_items:
+                    columns.add(run_item)
+                store.write(store.add_run('log.txt'), columns)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def query(self, *args):
+        cli = QueryCLI()
+        cli.args = cli.parse_commandline_args(
+            ['zloganalyzer', 'query', '--out', self.outfile] + list(args))
+        cli.run()
+        cli.args.outfile.close()
+        with open(self.outfile) as f:
+            return [line.split() for line in f.read().splitlines()]
+
+    def test_items_are_counted_per_definition(self):
+        self.assertEqual(
+            [['ITEMS', 'RUNS', 'ID', 'TITLE'], ['3', '2', 'ID', 'Title']], self.query(self.path))
+
+    def test_items_are_counted_over_all_databases(self):
+        self.assertEqual(['6', '4', 'ID', 'Title'], self.query(self.path, self.path)[1])
+
+    def test_items_are_counted_per_run(self):
+        rows = self.query('--group-by', 'run', self.path)
+        self.assertEqual(['ITEMS', 'RUN', 'STARTED', 'INPUT', 'DATABASE'], rows[0])
+        self.assertEqual([['2', '1'], ['1', '2']], [row[:2] for row in rows[1:]])
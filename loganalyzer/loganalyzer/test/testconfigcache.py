@@ -0,0 +1,87 @@
+"""
+Tests the classes in the configcache module.
+
+Note: uses relative imports and hence the parent module need to be loaded.
+"""
+import os
+import re
+import tempfile
+import unittest
+
+import munch
+
+from ..analyzer import AnalyzerFactory
+from ..configcache import CompiledConfig, ConfigCache
+from ..item import LogData
+
+
+def create_compiled_config():
+    config = munch.munchify(
+        {
+            'definitions': [
+                {
+                    'markers': [re.compile('first'), re.compile('second')],
+                    'invalidators': [re.compile('invalid')],
+                    'title': 'Title',
+                    'id': 'ID',
+                    'desc': 'Description',
+                    'watchers': []
+                }
+            ]
+        })
+    return CompiledConfig(config, AnalyzerFactory().get_trackers(config))
+
+
+class TestConfigCache(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, 'cache')
+        self.cache = ConfigCache(self.directory, max_entries=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def test_key_depends_on_the_source(self):
+        self.assertEqual(self.cache.get_key('a'), self.cache.get_key('a'))
+        self.assertNotEqual(self.cache.get_key('a'), self.cache.get_key('b'))
+
+    def test_load_returns_none_for_a_missing_entry(self):
+        self.assertIsNone(self.cache.load(self.cache.get_key('a')))
+
+    def test_stored_config_can_be_loaded(self):
+        key = self.cache.get_key('a')
+        self.cache.store(key, create_compiled_config())
+        compiled = self.cache.load(key)
+        self.assertEqual('ID', compiled.config.definitions[0].id)
+        analyzer = AnalyzerFactory().get_analyzer(compiled.config, compiled.trackers)
+        analyzer.analyze(LogData(1, 'line with first'))
+        analyzer.analyze(LogData(2, 'line with second'))
+        self.assertEqual(1, len(analyzer.get_items()))
+
+    def test_load_returns_none_for_an_unreadable_entry(self):
+        key = self.cache.get_key('a')
+        os.makedirs(self.directory)
+        with open(os.path.join(self.directory, key + '.pickle'), 'wb') as f:
+            f.write(b'not a pickle')
+        self.assertIsNone(self.cache.load(key))
+
+    def test_store_does_not_raise_if_the_directory_can_not_be_created(self):
+        path = os.path.join(self.tmp.name, 'file')
+        open(path, 'w').close()
+        ConfigCache(path).store('key', create_compiled_config())
+
+    def test_least_recently_used_entries_are_removed(self):
+        compiled = create_compiled_config()
+        keys = [self.cache.get_key(source) for source in ('a', 'b', 'c')]
+        for index, key in enumerate(keys):
+            self.cache.store(key, compiled)
+            path = os.path.join(self.directory, key + '.pickle')
+            os.utime(path, (index, index))
+
+        self.cache.store(self.cache.get_key('d'), compiled)
+        self.assertIsNone(self.cache.load(keys[0]))
+        self.assertIsNone(self.cache.load(keys[1]))
+        self.assertIsNotNone(self.cache.load(keys[2]))
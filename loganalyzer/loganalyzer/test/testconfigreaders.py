@@ -4,7 +4,9 @@ from unittest.mock import Mock, PropertyMock, mock_open, patch
 
 from .. import configreaders
 from ..config import ConfigError, ParseMarkerErrorInfo, RawConfigParser, dict_to_raw_config
-from ..configreaders import CmdLineConfigReader, EnvVarConfigReader, YAMLConfigReader
+from ..configcache import CompiledConfig
+from ..configreaders import CmdLineConfigReader, CompiledConfigReader, EnvVarConfigReader, \
+    YAMLConfigReader
 from .utils.parameterized import parameterized
 
 
@@ -52,6 +54,45 @@ definitions:
         self.assertEqual([m1, m2], definition.invalidators)
 
 
+class TestYAMLConfigReaderGetSource(unittest.TestCase):
+
+    def test_stream_can_be_read_again_after_getting_the_source(self):
+        stream = StringIO('definitions: []\n')
+        stream.name = 'config.yaml'
+        reader = YAMLConfigReader(stream, False)
+        self.assertEqual('definitions: []\n', reader.get_source())
+        self.assertEqual('definitions: []\n', reader.stream.read())
+        self.assertEqual('config.yaml', reader.stream.name)
+
+
+class TestCompiledConfigReader(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.reader = Mock()
+        self.reader.get_source.return_value = 'source'
+        self.reader.get_config.return_value = dict_to_raw_config({'definitions': []})
+        self.cache = Mock()
+        self.cache.get_key.return_value = 'key'
+
+    def test_config_is_compiled_and_stored_if_not_in_cache(self):
+        self.cache.load.return_value = None
+        compiled = CompiledConfigReader(self.reader, self.cache).get_compiled_config()
+        self.cache.get_key.assert_called_once_with('source')
+        self.reader.get_config.assert_called_once_with()
+        self.assertEqual(1, len(compiled.trackers))
+        self.cache.store.assert_called_once_with('key', compiled)
+
+    def test_config_is_not_read_if_in_cache(self):
+        cached = CompiledConfig(Mock(), [])
+        self.cache.load.return_value = cached
+        compiled = CompiledConfigReader(self.reader, self.cache).get_compiled_config()
+        self.cache.load.assert_called_once_with('key')
+        self.reader.get_config.assert_not_called()
+        self.cache.store.assert_not_called()
+        self.assertIs(cached, compiled)
+
+
 class TestYAMLConfigReaderParseMarkerErrors(unittest.TestCase):
 
     def setUp(self):
@@ -116,6 +157,9 @@ class TestEnvVarConfigReaderDefaultValues(unittest.TestCase):
     def test_forced_encoding_is_off_by_default(self):
         self.assertIsNone(self.config.encoding)
 
+    def test_config_cache_is_off_by_default(self):
+        self.assertIsNone(self.config.config_cache)
+
 
 class TestEnvVarConfigReaderSetValues(unittest.TestCase):
 
@@ -157,6 +201,13 @@ class TestEnvVarConfigReaderSetValues(unittest.TestCase):
         config = self._r(env={var_name: var_value}).get_config()
         self.assertEqual(cfg_value, config.encoding)
 
+    config_cache = [(_r.CONFIG_CACHE, '/tmp/cache', '/tmp/cache'), (_r.CONFIG_CACHE, '', None)]
+
+    @parameterized.expand(config_cache)
+    def test_config_cache(self, var_name, var_value, cfg_value):
+        config = self._r(env={var_name: var_value}).get_config()
+        self.assertEqual(cfg_value, config.config_cache)
+
 
 class TestCmdLineConfigReaderDetectEncoding(unittest.TestCase):
 
@@ -3,12 +3,20 @@ Tests the classes in the datasources module.
 
 Note: uses relative imports and hence the parent module need to be loaded.
 """
+import gzip
+import lzma
+import os
+import re
+import tempfile
 import unittest
 from io import StringIO
 
-from loganalyzer.datasources import StreamDataSource
+from loganalyzer.datasources import FollowFileDataSource, MappedFileDataSource, \
+    ParallelFileDataSource, StreamDataSource, open_log_file, supports_encoding
 
-from ..item import LogData
+from ..analyzer import Analyzer
+from ..item import Collector, ItemDefinition, LogData
+from ..trackers import SingleTracker
 
 
 class TestApplication(unittest.TestCase):
@@ -22,3 +30,294 @@ class TestApplication(unittest.TestCase):
         all_data = list(self.datasource.get_data())
         expected_data = [LogData(1, 'one'), LogData(2, 'two'), LogData(3, 'three')]
         self.assertEqual(expected_data, all_data, 'The captured data was not what was expected.')
+
+
+class TestParallelFileDataSource(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'log.txt')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def write_log(self, content, encoding='utf-8'):
+        with open(self.path, 'wb') as f:
+            f.write(content.encode(encoding))
+
+    def serial_data(self, encoding='utf-8'):
+        with open(self.path, 'r', encoding=encoding, errors='replace') as stream:
+            return list(StreamDataSource(stream).get_data())
+
+    def parallel_data(self, patterns, encoding='utf-8', chunk_size=16):
+        datasource = ParallelFileDataSource(
+            self.path, patterns, encoding, jobs=2, chunk_size=chunk_size)
+        return list(datasource.get_data())
+
+    def test_only_matching_lines_are_provided_with_the_line_index(self):
+        self.write_log('one\ntwo\nthree\nfour\n')
+        self.assertEqual(
+            self.parallel_data([re.compile('o')]),
+            [LogData(1, 'one'), LogData(2, 'two'), LogData(4, 'four')])
+
+    def test_lines_are_split_and_stripped_as_in_text_mode(self):
+        lines = ['line {index} text  '.format(index=index) for index in range(200)]
+        self.write_log('\r\n'.join(lines[:100]) + '\r' + '\n'.join(lines[100:]))
+        self.assertEqual(self.parallel_data([re.compile('line')]), self.serial_data())
+
+    def test_non_ascii_content_is_decoded_with_the_encoding(self):
+        self.write_log('\ufeffr\u00e4ksm\u00f6rg\u00e5s\n' * 50, encoding='utf-8-sig')
+        self.assertEqual(
+            self.parallel_data([re.compile('r')], encoding='utf-8-sig'),
+            self.serial_data(encoding='utf-8-sig'))
+
+    def test_empty_file_provides_no_data(self):
+        self.write_log('')
+        self.assertEqual(self.parallel_data([re.compile('a')]), [])
+
+    def test_chunks_start_at_the_beginning_of_lines(self):
+        self.write_log('aaaa\nbbbb\ncccc\ndddd\n')
+        datasource = ParallelFileDataSource(self.path, [], 'utf-8', chunk_size=6)
+        self.assertEqual(
+            [(start, end) for _, _, start, end in datasource.get_chunks()], [(0, 10), (10, 20)])
+
+    def test_analysis_gives_the_same_result_as_reading_all_lines(self):
+        lines = []
+        for index in range(2000):
+            lines.append('boot {index}'.format(index=index) if index % 97 == 0 else '')
+            lines.append('error {index}'.format(index=index) if index % 13 == 0 else 'info')
+            lines.append('reset' if index % 41 == 0 else 'debug {index}'.format(index=index))
+        self.write_log('\n'.join(lines))
+
+        def create_analyzer():
+            definitions = [
+                ItemDefinition([re.compile('boot'), re.compile(r'error \d+')], [re.compile('reset')]),
+                ItemDefinition([re.compile(r'error (\d+)7')], []),
+            ]
+            return Analyzer([SingleTracker(definitions)], Collector())
+
+        def analyze(data):
+            analyzer = create_analyzer()
+            for d in data:
+                analyzer.analyze(d)
+            return [[match.data for match in item.matches] for item in analyzer.get_items()]
+
+        patterns = create_analyzer().get_line_filter()
+        expected = analyze(self.serial_data())
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(analyze(self.parallel_data(patterns, chunk_size=1000)), expected)
+
+
+class TestMappedFileDataSource(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'log.txt')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def write_log(self, content, encoding='utf-8', opener=open, suffix=''):
+        self.path = os.path.join(self.tmp.name, 'log.txt' + suffix)
+        with opener(self.path, 'wb') as f:
+            f.write(content.encode(encoding))
+
+    def serial_data(self, encoding='utf-8', pattern=None):
+        with open_log_file(self.path, encoding=encoding, errors='replace') as stream:
+            return [
+                data for data in StreamDataSource(stream).get_data()
+                if pattern is None or pattern.search(data.content)
+            ]
+
+    def mapped_data(self, patterns, encoding='utf-8', block_size=16):
+        datasource = MappedFileDataSource(self.path, patterns, encoding, block_size=block_size)
+        return list(datasource.get_data())
+
+    def mixed_line_breaks_log(self):
+        lines = ['line {index} text  '.format(index=index) for index in range(300)]
+        return '\r\n'.join(lines[:100]) + '\r' + '\r'.join(lines[100:200]) + '\n' + '\n'.join(
+            lines[200:]) + '\n\n\r\n'
+
+    def test_only_lines_containing_literals_are_provided_with_the_line_index(self):
+        self.write_log('one\ntwo\nthree\nfour\n')
+        self.assertEqual(
+            self.mapped_data([re.compile('o'), re.compile('r+e+')]),
+            [LogData(1, 'one'), LogData(2, 'two'), LogData(3, 'three'), LogData(4, 'four')])
+        self.assertEqual(
+            self.mapped_data([re.compile('th')]), [LogData(3, 'three')])
+
+    def test_lines_are_split_and_stripped_as_in_text_mode(self):
+        self.write_log(self.mixed_line_breaks_log())
+        pattern = re.compile(r'\d text')
+        self.assertEqual(self.mapped_data([pattern]), self.serial_data(pattern=pattern))
+
+    def test_last_line_without_line_break_is_provided(self):
+        self.write_log('one\ntwo')
+        self.assertEqual(self.mapped_data([re.compile('tw')]), [LogData(2, 'two')])
+
+    def test_non_ascii_content_is_decoded_with_the_encoding(self):
+        self.write_log('\ufeffr\u00e4ksm\u00f6rg\u00e5s\n' * 50, encoding='utf-8-sig')
+        self.assertEqual(
+            self.mapped_data([re.compile('\u00e4ksm')], encoding='utf-8-sig'),
+            self.serial_data(encoding='utf-8-sig'))
+
+    def test_all_lines_are_provided_if_a_pattern_has_no_literal(self):
+        self.write_log('one\ntwo\n')
+        self.assertEqual(
+            self.mapped_data([re.compile('th'), re.compile('[a-z]')]),
+            [LogData(1, 'one'), LogData(2, 'two')])
+
+    def test_empty_file_provides_no_data(self):
+        self.write_log('')
+        self.assertEqual(self.mapped_data([re.compile('a')]), [])
+
+    def test_lines_are_provided_with_the_byte_offset(self):
+        content = self.mixed_line_breaks_log()
+        for opener, suffix in ((open, ''), (gzip.open, '.gz')):
+            self.write_log(content, opener=opener, suffix=suffix)
+            offsets = [data.offset for data in self.mapped_data([re.compile('5 text')])]
+            self.assertEqual(
+                offsets, [content.index('line {index} text'.format(index=index))
+                          for index in range(300) if index % 10 == 5])
+
+    def test_gzip_file_is_decompressed(self):
+        self.write_log(self.mixed_line_breaks_log(), opener=gzip.open, suffix='.gz')
+        pattern = re.compile(r'\d text')
+        self.assertEqual(self.mapped_data([pattern]), self.serial_data(pattern=pattern))
+
+    def test_xz_file_is_decompressed(self):
+        self.write_log(self.mixed_line_breaks_log(), opener=lzma.open, suffix='.xz')
+        pattern = re.compile('5 text')
+        self.assertEqual(self.mapped_data([pattern]), self.serial_data(pattern=pattern))
+
+    def test_analysis_gives_the_same_result_as_reading_all_lines(self):
+        lines = []
+        for index in range(2000):
+            lines.append('boot {index}'.format(index=index) if index % 97 == 0 else '')
+            lines.append('error {index}'.format(index=index) if index % 13 == 0 else 'info')
+            lines.append('reset' if index % 41 == 0 else 'debug {index}'.format(index=index))
+        self.write_log('\n'.join(lines), opener=gzip.open, suffix='.gz')
+
+        def create_analyzer():
+            definitions = [
+                ItemDefinition([re.compile('boot'), re.compile(r'error \d+')], [re.compile('reset')]),
+                ItemDefinition([re.compile(r'error (\d+)7')], []),
+            ]
+            return Analyzer([SingleTracker(definitions)], Collector())
+
+        def analyze(data):
+            analyzer = create_analyzer()
+            for d in data:
+                analyzer.analyze(d)
+            return [[match.data for match in item.matches] for item in analyzer.get_items()]
+
+        patterns = create_analyzer().get_line_filter()
+        expected = analyze(self.serial_data())
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(analyze(self.mapped_data(patterns, block_size=1000)), expected)
+
+
+class TestFollowFileDataSource(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'log.txt')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def append(self, data, path=None):
+        with open(path if path is not None else self.path, 'ab') as f:
+            f.write(data)
+
+    def follow(self, **kwargs):
+        kwargs.setdefault('idle_timeout', 0.2)
+        self.datasource = FollowFileDataSource(
+            self.path, 'utf-8', poll_interval=0.01, **kwargs)
+        return self.datasource.get_data()
+
+    def test_existing_lines_are_provided_until_idle(self):
+        self.append(b'one\ntwo  \r\n')
+        self.assertEqual(list(self.follow()), [LogData(1, 'one'), LogData(2, 'two')])
+
+    def test_appended_lines_are_provided(self):
+        self.append(b'one\n')
+        data = self.follow()
+        self.assertEqual(next(data), LogData(1, 'one'))
+        self.append(b'two\nthree\n')
+        self.assertEqual(list(data), [LogData(2, 'two'), LogData(3, 'three')])
+
+    def test_line_is_not_provided_until_complete(self):
+        self.append(b'one\ntw')
+        data = self.follow()
+        self.assertEqual(next(data), LogData(1, 'one'))
+        self.append(b'o\n')
+        self.assertEqual(next(data), LogData(2, 'two'))
+
+    def test_unterminated_last_line_is_provided_when_stopping(self):
+        self.append(b'one\ntwo')
+        self.assertEqual(list(self.follow()), [LogData(1, 'one'), LogData(2, 'two')])
+
+    def test_rotated_file_is_read_to_the_end_and_the_new_file_is_followed(self):
+        self.append(b'one\n')
+        data = self.follow()
+        self.assertEqual(next(data), LogData(1, 'one'))
+        self.append(b'two')
+        os.rename(self.path, self.path + '.1')
+        self.append(b'three\n')
+        self.assertEqual(list(data), [LogData(2, 'two'), LogData(3, 'three')])
+
+    def test_truncated_file_is_followed_from_the_beginning(self):
+        self.append(b'one\ntwo\n')
+        data = self.follow()
+        self.assertEqual([next(data), next(data)], [LogData(1, 'one'), LogData(2, 'two')])
+        with open(self.path, 'wb') as f:
+            f.write(b'3\n')
+        self.assertEqual(list(data), [LogData(3, '3')])
+
+    def test_file_that_does_not_exist_is_waited_for(self):
+        data = self.follow(idle_timeout=None)
+        self.append(b'one\n')
+        self.assertEqual(next(data), LogData(1, 'one'))
+
+    def test_following_can_be_stopped(self):
+        self.append(b'one\n')
+        data = self.follow(idle_timeout=None)
+        self.assertEqual(next(data), LogData(1, 'one'))
+        self.datasource.stop()
+        self.assertEqual(list(data), [])
+
+    def test_long_lines_are_split(self):
+        self.append(b'a' * 25 + b'\n')
+        self.assertEqual(
+            [d.content for d in self.follow(max_line_length=10, block_size=4)],
+            ['a' * 10, 'a' * 10, 'a' * 5])
+
+    def test_line_breaks_are_handled_as_in_text_mode_across_reads(self):
+        self.append(b'one\r\ntwo\rthree\n\xc3\xa4\n')
+        self.assertEqual(
+            [d.content for d in self.follow(block_size=1)], ['one', 'two', 'three', '\u00e4'])
+
+
+class TestSupportsEncoding(unittest.TestCase):
+
+    def test_supported_encodings(self):
+        self.assertTrue(supports_encoding('utf-8'))
+        self.assertTrue(supports_encoding('ISO-8859-1'))
+        self.assertFalse(supports_encoding('utf-16'))
+        self.assertFalse(supports_encoding('no-such-encoding'))
+
+    def test_single_byte_encodings_are_supported(self):
+        self.assertTrue(supports_encoding('cp1252'))
+        self.assertTrue(supports_encoding('koi8-r'))
+
+    def test_stateful_and_multibyte_encodings_are_not_supported(self):
+        self.assertFalse(supports_encoding('utf-7'))
+        self.assertFalse(supports_encoding('iso2022_jp'))
+        self.assertFalse(supports_encoding('shift_jis'))
@@ -0,0 +1,45 @@
+"""
+Tests the classes in the filewatch module.
+
+Note: uses relative imports and hence the parent module need to be loaded.
+"""
+import os
+import tempfile
+import time
+import unittest
+
+from ..filewatch import InotifyWatcher, PollingWatcher, create_file_watcher
+
+
+class TestCreateFileWatcher(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def test_polling_is_used_when_the_directory_does_not_exist(self):
+        path = os.path.join(self.tmp.name, 'missing', 'log.txt')
+        with create_file_watcher(path) as watcher:
+            self.assertIsInstance(watcher, PollingWatcher)
+
+    @unittest.skipUnless(hasattr(os, 'O_CLOEXEC'), 'inotify requires Linux')
+    def test_inotify_watcher_wakes_up_when_the_file_is_written(self):
+        path = os.path.join(self.tmp.name, 'log.txt')
+        with create_file_watcher(path) as watcher:
+            self.assertIsInstance(watcher, InotifyWatcher)
+            with open(path, 'w') as f:
+                f.write('line\n')
+            start = time.monotonic()
+            watcher.wait(10)
+            self.assertLess(time.monotonic() - start, 5)
+
+    @unittest.skipUnless(hasattr(os, 'O_CLOEXEC'), 'inotify requires Linux')
+    def test_inotify_watcher_waits_for_the_timeout_without_changes(self):
+        with create_file_watcher(os.path.join(self.tmp.name, 'log.txt')) as watcher:
+            start = time.monotonic()
+            watcher.wait(0.05)
+            self.assertGreaterEqual(time.monotonic() - start, 0.04)
@@ -6,7 +6,7 @@ Note: uses relative imports and hence the parent module need to be loaded.
 import re
 import unittest
 
-from ..item import ItemDefinition, ItemInstance, LogData, LogMatch
+from ..item import Collector, ItemDefinition, ItemInstance, LogData, LogMatch, MatchedText
 from .utils.parameterized import parameterized
 
 
@@ -19,6 +19,56 @@ class TestItemDefinition(unittest.TestCase):
             itemdef1.definition_id, itemdef2.definition_id, 'Expected definition id to be unique')
 
 
+class TestCollector(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.definition = ItemDefinition(
+            [re.compile(r'error (\d+)'), re.compile('done')], [], 'Title', 'ID')
+        self.collector = Collector()
+
+    def add_item(self, first_index):
+        item = ItemInstance(self.definition)
+        for marker, content in enumerate(['error 17 in module', 'module done']):
+            data = LogData(first_index + marker, content, 10 * marker)
+            item.set_match(marker, LogMatch(data, self.definition.markers[marker].search(content)))
+        self.collector.add(item)
+
+    def test_collected_items_have_the_data_of_the_matches(self):
+        self.add_item(1)
+        self.add_item(5)
+        self.assertEqual(2, len(self.collector))
+        item = self.collector[1]
+        self.assertIs(self.definition, item.definition)
+        self.assertEqual([LogData(5, 'error 17 in module'), LogData(6, 'module done')],
+                         [logmatch.data for logmatch in item.matches])
+        self.assertEqual(10, item.matches[1].data.offset)
+        self.assertEqual('error 17', item.matches[0].match.group())
+        self.assertEqual('17', item.matches[0].match.group(1))
+        self.assertEqual(('17', ), item.matches[0].match.groups())
+
+    def test_re_match_objects_are_not_kept(self):
+        self.add_item(1)
+        for logmatch in self.collector[0].matches:
+            self.assertIsInstance(logmatch.match, MatchedText)
+        self.assertEqual(['error 17', 'done'], self.collector.columns.matches)
+
+    def test_iterating_gives_the_items_in_the_order_they_were_added(self):
+        self.add_item(1)
+        self.add_item(3)
+        self.assertEqual(
+            [1, 3], [item.matches[0].data.index for item in self.collector])
+        self.assertEqual(3, self.collector[-1].matches[0].data.index)
+        with self.assertRaises(IndexError):
+            self.collector[2]
+
+    def test_clear_removes_all_items(self):
+        self.add_item(1)
+        self.collector.clear()
+        self.assertEqual(0, len(self.collector))
+        self.assertFalse(self.collector)
+
+
 class TestItemInstance(unittest.TestCase):
 
     def test_complete(self):
@@ -0,0 +1,131 @@
+"""
+Tests the classes and functions in the matcher module.
+
+Note: uses relative imports and hence the parent module need to be loaded.
+"""
+import re
+import unittest
+
+from ..matcher import MultiPatternMatcher, literal_prefilter, required_literals
+
+PATTERNS = [
+    'Event Queue blocked by (.*)',
+    r'W\[[0-9]+:[0-9]+:[0-9]+\.[0-9]+\].*DispatchEvent,.*with (.*) took ([0-9]+) ms',
+    r'E\[[0-9]+:[0-9]+:[0-9]+\.[0-9]+\]',
+    'page allocation failure',
+    r'[Oo]ut of [Mm]emory: [Kk]ill process [0-9]+ \((.*)\) score [0-9]+',
+    r'(The box seems to be offline\. Trying to turn it on\.|Upgrade finished\!)',
+    '(?i)case insensitive',
+    '[0-9]{4}',
+    'page',
+    '(?P<name>named) group',
+]
+
+LINES = [
+    'E[06:59:10.939] zinc/TimerTask[934]: AddEvent, Event Queue blocked by cal::Calendar',
+    'W[01:00:11.482] dizco/EventLoop[673]: DispatchEvent,   with cal::TimerEvent took 387 ms',
+    'page allocation failure',
+    'a page',
+    '[221818.647000] Out of memory: kill process 15166 (lxc-init) score 67200 or a child',
+    'Upgrade finished!',
+    'CASE INSENSITIVE',
+    'a named group',
+    'no match at all',
+    '',
+]
+
+
+class TestRequiredLiterals(unittest.TestCase):
+
+    def test_literal_text(self):
+        self.assertEqual(required_literals(re.compile('page allocation failure')),
+                         ['page allocation failure'])
+
+    def test_longest_literal_run_is_used(self):
+        self.assertEqual(required_literals(re.compile('ab.*cdef[0-9]gh')), ['cdef'])
+
+    def test_groups_are_part_of_the_literal(self):
+        self.assertEqual(required_literals(re.compile('ab(cd)ef')), ['abcdef'])
+
+    def test_repeated_at_least_once_is_used(self):
+        self.assertEqual(required_literals(re.compile('a(?:xyz)+b')), ['xyz'])
+
+    def test_optional_is_not_used(self):
+        self.assertEqual(required_literals(re.compile('a(?:xyz)*b')), ['a'])
+
+    def test_all_alternatives_are_used(self):
+        self.assertEqual(required_literals(re.compile('(first|second)')), ['first', 'second'])
+
+    def test_case_insensitive_has_no_literals(self):
+        self.assertEqual(required_literals(re.compile('(?i)abc')), [])
+        self.assertEqual(required_literals(re.compile('a(?i:bcd)')), ['a'])
+
+    def test_bytes_pattern_gives_bytes_literals(self):
+        self.assertEqual(required_literals(re.compile(b'ab.c')), [b'ab'])
+
+
+class TestMultiPatternMatcher(unittest.TestCase):
+
+    def test_same_matches_as_searching_each_pattern(self):
+        patterns = [re.compile(pattern) for pattern in PATTERNS]
+        matcher = MultiPatternMatcher(patterns)
+        for line in LINES:
+            expected = [
+                (index, pattern.search(line).span())
+                for index, pattern in enumerate(patterns) if pattern.search(line)
+            ]
+            actual = [(index, match.span()) for index, match in matcher.search(line)]
+            self.assertEqual(actual, expected, line)
+
+    def test_same_matches_as_searching_each_bytes_pattern(self):
+        patterns = [re.compile(pattern.encode('utf-8')) for pattern in PATTERNS]
+        matcher = MultiPatternMatcher(patterns)
+        for line in LINES:
+            line = line.encode('utf-8')
+            expected = [
+                (index, pattern.search(line).span())
+                for index, pattern in enumerate(patterns) if pattern.search(line)
+            ]
+            actual = [(index, match.span()) for index, match in matcher.search(line)]
+            self.assertEqual(actual, expected, line)
+
+    def test_no_patterns(self):
+        self.assertEqual(MultiPatternMatcher([]).search('line'), [])
+
+
+class TestLiteralPrefilter(unittest.TestCase):
+
+    def find_all(self, prefilter, data):
+        find = prefilter.finder(data, 0, len(data))
+        result = []
+        index = find(0)
+        while index >= 0:
+            result.append(index)
+            index = find(index + 1)
+        return result
+
+    def test_prefilter_finds_the_encoded_literals(self):
+        prefilter = literal_prefilter([re.compile('ab+c'), re.compile('räv')], 'utf-8')
+        self.assertEqual(self.find_all(prefilter, 'xxabbc räv'.encode('utf-8')), [2, 7])
+        self.assertEqual(self.find_all(prefilter, b'xyz'), [])
+
+    def test_many_literals_are_found_with_a_regex(self):
+        patterns = [re.compile('literal{index}'.format(index=index)) for index in range(50)]
+        prefilter = literal_prefilter(patterns, 'utf-8')
+        self.assertIsNotNone(prefilter.regex)
+        self.assertEqual(self.find_all(prefilter, b'literal12 literal7 literal'), [0, 10])
+
+    def test_found_position_is_not_before_the_given_position(self):
+        prefilter = literal_prefilter([re.compile('ab'), re.compile('cd')], 'utf-8')
+        data = b'ab cd ab cd'
+        find = prefilter.finder(data, 0, len(data))
+        self.assertEqual([find(0), find(1), find(4), find(7), find(10)], [0, 3, 6, 9, -1])
+
+    def test_no_prefilter_if_a_pattern_has_no_literal(self):
+        self.assertIsNone(literal_prefilter([re.compile('abc'), re.compile('[a-z]+')], 'utf-8'))
+
+    def test_no_prefilter_if_a_literal_can_not_be_encoded(self):
+        self.assertIsNone(literal_prefilter([re.compile('€')], 'latin-1'))
+
+    def test_prefilter_without_patterns_finds_nothing(self):
+        self.assertEqual(self.find_all(literal_prefilter([], 'utf-8'), b'anything'), [])
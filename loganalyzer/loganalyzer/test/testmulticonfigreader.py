@@ -39,3 +39,11 @@ class TestMultiConfigReader(unittest.TestCase):
         mreader = MultiConfigReader(reader1, reader2)
         cfg = mreader.get_config()
         self.assertEqual(1, cfg.a)
+
+    def test_source_of_all_readers_is_combined(self):
+        reader1 = Mock()
+        reader1.get_source.return_value = 'a'
+        reader2 = Mock()
+        reader2.get_source.return_value = 'b'
+        mreader = MultiConfigReader(reader1, reader2)
+        self.assertEqual('a\0b', mreader.get_source())
@@ -3,14 +3,20 @@ Tests the classes in the reporters module.
 
 Note: uses relative imports and hence the parent module need to be loaded.
 """
+import json
+import os
+import re
+import tempfile
 import unittest
 from io import StringIO
 from unittest.mock import Mock
 
 from loganalyzer.reporters import WatchersReporter
 
-from ..item import ItemDefinition, ItemInstance, LogData, LogMatch
-from ..reporters import ItemStats, ReportingError, TextReporter
+from ..item import Collector, ItemDefinition, ItemInstance, LogData, LogMatch
+from ..reporters import ItemStats, JsonLinesReporter, ReportingError, ResultStoreReporter, \
+    TextReporter
+from ..resultstore import ResultStore
 
 
 class TestTextReporter(unittest.TestCase):
@@ -136,6 +142,16 @@ class TestItemStatsGetSummaries(unittest.TestCase):
     def test_no_items_gives_empty_list(self):
         self.assertEqual([], list(ItemStats().get_item_summaries([])))
 
+    def test_items_in_a_collector_are_summarized_by_definition(self):
+        collector = Collector()
+        for item in [self.item1a, self.item2a, self.item1b]:
+            collector.add(item)
+        summaries = list(ItemStats().get_item_summaries(collector))
+        self.assertEqual([self.itemdef1, self.itemdef2], [s.definition for s in summaries])
+        self.assertEqual([2, 1], [s.count for s in summaries])
+        self.assertEqual(
+            [1, 3], [item.matches[0].data.index for item in summaries[0].items])
+
 
 class TestWatchersReporter(unittest.TestCase):
 
@@ -166,3 +182,97 @@ class TestWatchersReporter(unittest.TestCase):
             ['a', 'b'], [], 'Title2', 'id2', 'desc2', watchers=['watcher2', 'watcher1'])
         reporter.write_report([ItemInstance(itemdef1), ItemInstance(itemdef2)])
         self.assertEqual(watchers_file.getvalue(), 'watcher1, watcher2')
+
+
+class TestJsonLinesReporter(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.output = StringIO()
+        self.reporter = JsonLinesReporter(self.output)
+        mock_match = Mock()
+        mock_match.group.return_value = 'Log'
+        self.item = ItemInstance(ItemDefinition(['a', 'b'], [], 'Title', 'id', 'desc'))
+        self.item.set_match(0, LogMatch(LogData(2, 'Log2-a'), mock_match))
+        self.item.set_match(1, LogMatch(LogData(4, 'Log2-b'), mock_match))
+
+    def test_item_is_written_as_a_json_line(self):
+        self.reporter.write_item(self.item)
+        self.assertEqual(
+            json.loads(self.output.getvalue()), {
+                'id': 'id',
+                'title': 'Title',
+                'matches': [
+                    {
+                        'index': 2,
+                        'content': 'Log2-a',
+                        'match': 'Log'
+                    }, {
+                        'index': 4,
+                        'content': 'Log2-b',
+                        'match': 'Log'
+                    }
+                ]
+            })
+
+    def test_report_writes_one_line_per_item(self):
+        self.reporter.write_report([self.item, self.item])
+        self.assertEqual(len(self.output.getvalue().splitlines()), 2)
+
+    def test_throws_reporting_error_on_failed_write(self):
+        mock_stream = Mock()
+        mock_stream.write.side_effect = Exception('Induced error')
+        r = JsonLinesReporter(mock_stream)
+        self.assertRaises(ReportingError, r.write_item, self.item)
+
+
+class TestResultStoreReporter(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'results.db')
+        definition = ItemDefinition([re.compile('Log')], [], 'Title', 'id', 'desc')
+        self.item = ItemInstance(definition)
+        self.item.set_match(0, LogMatch(LogData(2, 'Log2-a'), re.search('Log', 'Log2-a')))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def run_counts(self):
+        with ResultStore(self.path) as store:
+            return [(run, items) for run, started, input_path, config, items in
+                    store.get_run_counts()]
+
+    def test_report_is_written_as_a_new_run(self):
+        ResultStoreReporter(self.path).write_report([self.item, self.item])
+        ResultStoreReporter(self.path).write_report([])
+        self.assertEqual([(1, 2), (2, 0)], self.run_counts())
+
+    def test_items_are_written_to_the_same_run(self):
+        reporter = ResultStoreReporter(self.path, 'log.txt', 'config.yaml')
+        reporter.write_item(self.item)
+        reporter.write_item(self.item)
+        self.assertEqual([(1, 2)], self.run_counts())
+
+    def test_many_items_are_written_to_one_run_with_the_database_kept_open(self):
+        reporter = ResultStoreReporter(self.path)
+        reporter.write_item(self.item)
+        store = reporter.store
+        for _ in range(999):
+            reporter.write_item(self.item)
+        self.assertIs(store, reporter.store)
+        self.assertEqual([(1, 1000)], self.run_counts())
+        reporter.close()
+        self.assertIsNone(store.connection)
+        self.assertEqual([(1, 1000)], self.run_counts())
+
+    def test_database_is_closed_when_report_is_written(self):
+        reporter = ResultStoreReporter(self.path)
+        reporter.write_report([self.item])
+        self.assertIsNone(reporter.store)
+
+    def test_throws_reporting_error_on_failed_write(self):
+        r = ResultStoreReporter(self.tmp.name)
+        self.assertRaises(ReportingError, r.write_item, self.item)
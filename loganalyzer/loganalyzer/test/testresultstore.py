@@ -0,0 +1,122 @@
+"""
+Tests the classes in the resultstore module.
+
+Note: uses relative imports and hence the parent module need to be loaded.
+"""
+import os
+import re
+import sqlite3
+import tempfile
+import unittest
+
+from ..item import ItemDefinition, ItemInstance, LogData, LogMatch, ResultColumns
+from ..resultstore import ResultStore, ResultStoreError
+
+
+def create_item(definition, index, content='error 17 in module', offset=None):
+    match = definition.markers[0].search(content)
+    item = ItemInstance(definition)
+    item.set_match(0, LogMatch(LogData(index, content, offset), match))
+    return item
+
+
+class TestResultColumns(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.definition = ItemDefinition([re.compile(r'error (\d+)')], [], 'Title', 'ID')
+        self.columns = ResultColumns()
+
+    def test_each_match_is_a_record(self):
+        self.columns.add(create_item(self.definition, 3, offset=20))
+        records = list(self.columns)
+        self.assertEqual(1, len(records))
+        record = records[0]
+        self.assertEqual(1, record.item)
+        self.assertEqual('ID', record.id)
+        self.assertEqual(0, record.marker)
+        self.assertEqual(3, record.line)
+        self.assertEqual(20, record.offset)
+        self.assertEqual('error 17', record.match)
+        self.assertEqual(('17', ), record.groups)
+
+    def test_unknown_offset_is_none(self):
+        self.columns.add(create_item(self.definition, 3))
+        self.assertIsNone(next(iter(self.columns)).offset)
+
+    def test_items_are_numbered_across_clear(self):
+        self.columns.add(create_item(self.definition, 1))
+        self.columns.clear()
+        self.assertEqual(0, len(self.columns))
+        self.columns.add(create_item(self.definition, 2))
+        self.assertEqual([2], [record.item for record in self.columns])
+
+
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'results.db')
+        self.definition_a = ItemDefinition([re.compile(r'error (\d+)')], [], 'Title A', 'A')
+        self.definition_b = ItemDefinition([re.compile('warning')], [], 'Title B', 'B')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def write_run(self, store, *items):
+        columns = ResultColumns()
+        for item in items:
+            columns.add(item)
+        run = store.add_run('log.txt', 'config.yaml')
+        store.write(run, columns)
+        return run
+
+    def test_items_are_counted_per_definition_over_all_runs(self):
+        with ResultStore(self.path) as store:
+            self.write_run(
+                store, create_item(self.definition_a, 1), create_item(self.definition_a, 2))
+            self.write_run(store, create_item(self.definition_a, 1))
+            self.write_run(store, create_item(self.definition_b, 1, 'warning'))
+            self.assertEqual(
+                [('A', 'Title A', 3, 2), ('B', 'Title B', 1, 1)], store.get_definition_counts())
+            self.assertEqual(
+                [('B', 'Title B', 1, 1)], store.get_definition_counts(definition_id='B'))
+
+    def test_items_are_counted_per_run(self):
+        with ResultStore(self.path) as store:
+            self.write_run(store, create_item(self.definition_a, 1))
+            self.write_run(store)
+        with ResultStore(self.path) as store:
+            counts = store.get_run_counts()
+        self.assertEqual([1, 2], [run for run, started, input_path, config, items in counts])
+        self.assertEqual([1, 0], [items for run, started, input_path, config, items in counts])
+        self.assertEqual('log.txt', counts[0][2])
+
+    def test_items_of_definitions_without_markers_are_counted(self):
+        definition = ItemDefinition([], [], 'Title E', 'E')
+        with ResultStore(self.path) as store:
+            self.write_run(store, ItemInstance(definition), ItemInstance(definition))
+            self.assertEqual([('E', 'Title E', 2, 1)], store.get_definition_counts())
+
+    def test_missing_database_is_an_error_if_it_should_not_be_created(self):
+        with self.assertRaises(ResultStoreError):
+            with ResultStore(self.path, create=False):
+                pass
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_database_with_unsupported_version_is_an_error(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute('PRAGMA user_version = 1000')
+        connection.close()
+        with self.assertRaises(ResultStoreError):
+            with ResultStore(self.path):
+                pass
+
+    def test_file_that_is_not_a_database_is_an_error(self):
+        with open(self.path, 'w') as f:
+            f.write('not a database' * 100)
+        with self.assertRaises(ResultStoreError):
+            with ResultStore(self.path):
+                pass
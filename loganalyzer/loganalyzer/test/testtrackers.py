@@ -153,3 +153,29 @@ class TestSingleTrackerSingleInvalidator(unittest.TestCase):
         self.tracker.analyze(self.data3, self.collector)
         self.tracker.analyze(self.data4, self.collector)
         self.assertEqual(len(self.collector), 0, 'Length of collector was not 0 as expected.')
+
+
+class TestSingleTrackerDefinitionWithoutMarkers(unittest.TestCase):
+
+    def test_definition_without_markers_is_completed_on_every_line(self):
+        definitions = [ItemDefinition([re.compile('MARKER')], []), ItemDefinition([], [])]
+        collector = Collector()
+        tracker = SingleTracker(definitions)
+        tracker.analyze(LogData(1, 'MARKER'), collector)
+        tracker.analyze(LogData(2, 'nothing'), collector)
+        self.assertEqual(
+            [item.definition for item in collector],
+            [definitions[0], definitions[1], definitions[1]])
+
+    def test_line_filter_is_not_available_for_definition_without_markers(self):
+        tracker = SingleTracker([ItemDefinition([re.compile('MARKER')], []), ItemDefinition([], [])])
+        self.assertIsNone(tracker.get_line_filter())
+
+
+class TestSingleTrackerLineFilter(unittest.TestCase):
+
+    def test_line_filter_contains_all_invalidators_and_markers(self):
+        marker = re.compile('MARKER')
+        invalidator = re.compile('INVALID')
+        tracker = SingleTracker([ItemDefinition([marker], [invalidator])])
+        self.assertEqual(tracker.get_line_filter(), [invalidator, marker])
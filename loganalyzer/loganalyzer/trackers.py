@@ -9,6 +9,7 @@ See also item for additional information.
 import logging
 
 from .item import ItemInstance, LogMatch
+from .matcher import MultiPatternMatcher
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
@@ -26,23 +27,62 @@ class SingleTracker():
         self.definitions = definitions
         self.instances = [None] * len(definitions)
 
-    def analyze(self, data, collector):
-        for definition_index, definition in enumerate(self.definitions):
-            instance = self.get_item_instance(definition_index)
+        # All invalidators and markers of all definitions are matched in one pass.
+        # Each pattern has a target (definition_index, is_marker, index) and the patterns
+        # are ordered in the same order as they used to be evaluated, definition by definition
+        # and invalidators before markers.
+        patterns = []
+        self.targets = []
+        for definition_index, definition in enumerate(definitions):
             for invalidator_index, invalidator in enumerate(definition.invalidators):
-                match = invalidator.search(data.content)
-                if match:
-                    instance.set_invalid(invalidator_index, LogMatch(data, match))
+                patterns.append(invalidator)
+                self.targets.append((definition_index, False, invalidator_index))
             for marker_index, marker in enumerate(definition.markers):
-                match = marker.search(data.content)
-                if match:
-                    instance.set_match(marker_index, LogMatch(data, match))
+                patterns.append(marker)
+                self.targets.append((definition_index, True, marker_index))
+        self.matcher = MultiPatternMatcher(patterns)
+
+        # A definition without markers is complete on every line
+        self.always_evaluated = [
+            definition_index for definition_index, definition in enumerate(definitions)
+            if not definition.markers
+        ]
+
+    def get_line_filter(self):
+        """
+        Get the patterns that a line must match to change the state of the tracker.
+
+        :return: list of compiled regular expressions or None if every line needs to be analyzed
+        """
+        if self.always_evaluated:
+            return None
+        return self.matcher.patterns
+
+    def analyze(self, data, collector):
+        matches_per_definition = {}
+        for pattern_index, match in self.matcher.search(data.content):
+            definition_index, is_marker, index = self.targets[pattern_index]
+            matches_per_definition.setdefault(definition_index, []).append(
+                (is_marker, index, match))
+
+        definition_indexes = set(matches_per_definition)
+        if self.always_evaluated:
+            definition_indexes.update(self.always_evaluated)
+
+        for definition_index in sorted(definition_indexes):
+            instance = self.get_item_instance(definition_index)
+            for is_marker, index, match in matches_per_definition.get(definition_index, []):
+                if is_marker:
+                    instance.set_match(index, LogMatch(data, match))
+                else:
+                    instance.set_invalid(index, LogMatch(data, match))
             self.evaluate_instance(definition_index, instance, collector)
 
-        nr_of_started_items = sum(x is not None for x in self.instances)
-        logger.debug(
-            'SingleTracker: analyze, number of started items (count={count})'.format(
-                count=nr_of_started_items))
+        if logger.isEnabledFor(logging.DEBUG):
+            nr_of_started_items = sum(x is not None for x in self.instances)
+            logger.debug(
+                'SingleTracker: analyze, number of started items (count={count})'.format(
+                    count=nr_of_started_items))
 
     def evaluate_instance(self, definition_index, instance, collector):
         if instance.is_invalid():
@@ -0,0 +1,32 @@
+import os
+from tempfile import TemporaryDirectory
+
+from zaf.component.decorator import requires
+
+
+@requires(zafapp='ZafApp')
+def test_startup_profile_is_logged(zafapp):
+    result = zafapp(['startupprofiler', 'noop'], '--startup-profile true noop')
+
+    assert 'Startup profile:' in result.stderr, result.stderr
+    assert 'load_extensions' in result.stderr, result.stderr
+
+
+@requires(zafapp='ZafApp')
+def test_startup_profile_is_written_in_folded_stacks_format(zafapp):
+    with TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'startup.folded')
+        zafapp(['startupprofiler', 'noop'], '--startup-profile-path {path} noop'.format(path=path))
+
+        with open(path, 'r') as f:
+            lines = f.readlines()
+
+    assert any(line.startswith('startup;load_extensions') for line in lines), lines
+
+
+@requires(zafapp='ZafApp')
+def test_exceeding_startup_budget_fails_the_application(zafapp):
+    result = zafapp(
+        ['startupprofiler', 'noop'], '--startup-budget 0.000001 noop', expected_exit_code=1)
+
+    assert 'exceeds the budget' in result.stderr, result.stderr
@@ -32,6 +32,16 @@ MESSAGEBUS_TIMEOUT = ConfigOptionId(
     hidden=True,
     application_contexts=[ApplicationContext.EXTENDABLE])
 
+COMPONENT_WORKERS = ConfigOptionId(
+    'application.components.workers',
+    'The maximum number of components to instantiate, or exit, in parallel. '
+    'Components in the same scope that are independent of each other are '
+    'instantiated in parallel and the components of a scope are exited in parallel.',
+    option_type=int,
+    default=1,
+    hidden=True,
+    application_contexts=[ApplicationContext.EXTENDABLE])
+
 APPLICATION_NAME = ConfigOptionId(
     'application.name', 'Name of the application', application_contexts=ApplicationContext.INTERNAL)
 APPLICATION_ROOT = ConfigOptionId(
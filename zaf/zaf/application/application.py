@@ -6,10 +6,11 @@ import traceback
 from zaf import __version__
 from zaf.application import AFTER_COMMAND, APPLICATION_CHANGELOG_TYPE, APPLICATION_CONTEXT, \
     APPLICATION_ENDPOINT, APPLICATION_NAME, APPLICATION_ROOT, APPLICATION_VERSION, BEFORE_COMMAND, \
-    CWD, ENTRYPOINT_NAME, MESSAGEBUS_TIMEOUT
+    COMPONENT_WORKERS, CWD, ENTRYPOINT_NAME, MESSAGEBUS_TIMEOUT
 from zaf.application.context import ApplicationContext
 from zaf.application.metadata import ZafMetadata
 from zaf.builtin.changelog import ChangeLogType
+from zaf.builtin.startup.profiler import startup_profiler
 from zaf.component.decorator import component
 from zaf.component.factory import Factory
 from zaf.component.manager import ComponentManager
@@ -62,6 +63,7 @@ class Application(object):
             application_config,
             entry_points=['zaf.addons', 'zaf.local_addons'],
             signalhandler=None):
+        startup_profiler.reset()
         root_logger = logging.getLogger()
         # Default config for rootlogger to not spam until logger is correctly configured
         root_logger.setLevel(logging.INFO)
@@ -141,12 +143,15 @@ class Application(object):
     def setup(self):
         application_config_options = [
             ConfigOption(MESSAGEBUS_TIMEOUT, required=False),
+            ConfigOption(COMPONENT_WORKERS, required=False),
             ConfigOption(CWD, required=True),
         ]
         loader = ExtensionLoader(
             self.extension_manager, self.config, self.messagebus, application_config_options,
             self.component_manager)
-        self.command = loader.load_extensions(self.entry_points)
+        with startup_profiler.section('load_extensions'):
+            self.command = loader.load_extensions(self.entry_points)
+        self.component_factory.max_workers = self.config.get(COMPONENT_WORKERS)
 
     def teardown(self):
         try:
@@ -177,6 +182,7 @@ class Application(object):
                 application=self.app_config.name,
                 version=self.app_config.version))
         self._activate_signalhandler()
+        startup_profiler.stop()
         self.messagebus.trigger_event(BEFORE_COMMAND, APPLICATION_ENDPOINT, data=self.command.name)
         result = 0
         try:
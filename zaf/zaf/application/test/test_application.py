@@ -1,9 +1,11 @@
+import os
 import unittest
 from unittest.mock import patch
 
 from zaf.application import ApplicationContext
 from zaf.commands.command import CommandId
 from zaf.component.decorator import component, requires
+from zaf.extensions.entrypoints import ENTRY_POINT_INDEX_ENV
 
 from ..application import Application, ApplicationConfiguration
 
@@ -33,6 +35,12 @@ REQUIRES_COMMAND = CommandId('Requires', 'Returns component value', command_with
 
 class ApplicationExitCodeTest(unittest.TestCase):
 
+    def setUp(self):
+        # Don't write to the entry point index of the user running the tests
+        environ = patch.dict(os.environ, {ENTRY_POINT_INDEX_ENV: ''})
+        environ.start()
+        self.addCleanup(environ.stop)
+
     def test_exit_code_zero_on_success(self):
         with patch('sys.argv', ['test', 'noop']):
             app = Application(
@@ -34,6 +34,13 @@ LOG_WARNING = ConfigOptionId(
 LOG_ERROR = ConfigOptionId(
     'log.error', 'Set named logger to log at error level', default=[], multiple=True, hidden=True)
 
+LOG_NO_TRACE = ConfigOptionId(
+    'log.notrace',
+    'Disable the per message debug logging for named logger, e.g. zaf.messages',
+    default=[],
+    multiple=True,
+    hidden=True)
+
 EXTENSION_LOG_LEVEL = ConfigOptionId(
     'log.level',
     'The log level used for the extension',
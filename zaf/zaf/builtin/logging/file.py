@@ -49,6 +49,7 @@ from zaf.builtin.logging.utils import CustomJSONFormatter, Filter, combine_logge
 from zaf.config.options import ConfigOption
 from zaf.extensions.extension import AbstractExtension, FrameworkExtension, get_logger_name
 from zaf.messages.dispatchers import SequentialDispatcher
+from zaf.messages.tracing import update_message_tracing
 
 from . import ENTER_LOG_SCOPE, EXIT_LOG_SCOPE, LOG_END_POINT, LOG_FILE_DEBUG, LOG_FILE_ENABLED, \
     LOG_FILE_ERROR, LOG_FILE_FORMAT, LOG_FILE_INFO, LOG_FILE_LEVEL, LOG_FILE_LOGGERS, \
@@ -143,6 +144,7 @@ class FileLogger(AbstractExtension):
                 logger = logging.getLogger(logger_name)
                 logger.addHandler(self.log_handler)
                 logger.setLevel(logging.DEBUG)
+            update_message_tracing()
 
     def register_dispatchers(self, messagebus):
         if self.enabled and self.rotate_scope:
@@ -17,6 +17,12 @@ to warning::
     ext.click.log.level: debug
     log.warning: [zaf.application]
 
+The messaging layer logs every message on debug level. No log records are created for the
+messages if no log handler writes debug records for the messaging loggers. The logging of the
+messages can also be turned off completely with the *log.notrace* config option::
+
+    log.notrace: [zaf.messages]
+
 """
 import logging
 import sys
@@ -26,9 +32,10 @@ from zaf.builtin.logging.utils import Filter
 from zaf.config.options import ConfigOption
 from zaf.extensions import ENABLED_EXTENSIONS
 from zaf.extensions.extension import AbstractExtension, FrameworkExtension, get_logger_name
+from zaf.messages.tracing import set_message_tracing, update_message_tracing
 
 from . import EXTENSION_LOG_LEVEL, LOG_DEBUG, LOG_DIR, LOG_ERROR, LOG_FORMAT, LOG_INFO, LOG_LEVEL, \
-    LOG_LEVEL_OFF, LOG_WARNING
+    LOG_LEVEL_OFF, LOG_NO_TRACE, LOG_WARNING
 
 logger = logging.getLogger(get_logger_name('zaf', 'logger'))
 logger.addHandler(logging.NullHandler())
@@ -45,6 +52,7 @@ logger.addHandler(logging.NullHandler())
         ConfigOption(LOG_INFO, required=False),
         ConfigOption(LOG_WARNING, required=False),
         ConfigOption(LOG_ERROR, required=False),
+        ConfigOption(LOG_NO_TRACE, required=False),
         ConfigOption(APPLICATION_NAME, required=False),
         ConfigOption(ENABLED_EXTENSIONS, required=False),
         ConfigOption(EXTENSION_LOG_LEVEL, required=False),
@@ -91,6 +99,11 @@ class RootLogger(AbstractExtension):
         ch.setFormatter(formatter)
         ch.addFilter(Filter(exclude_dict))
         root_logger.addHandler(ch)
+        update_message_tracing()
+
+        no_trace = config.get(LOG_NO_TRACE)
+        if no_trace:
+            set_message_tracing(False, no_trace)
 
 
 def map_level(level):
@@ -25,6 +25,10 @@ class FileLoggerTest(unittest.TestCase):
             for logger in harness.loggers.values():
                 logger.addHandler.assert_called_with(self.handler)
 
+    def test_message_tracing_is_updated_when_the_file_handler_has_been_added(self):
+        with FileLoggerHarness(self.handler, config=default_config()) as harness:
+            harness.update_message_tracing.assert_called_once_with()
+
 
 class RotatingFileLoggerTest(unittest.TestCase):
 
@@ -109,12 +113,15 @@ class FileLoggerHarness(object):
             self.handler_qual_name = 'zaf.builtin.logging.file.ScopedRotatingLogHandler'
 
         self.handler_constructor_patch = patch(self.handler_qual_name, return_value=handler_mock)
+        self.update_message_tracing_patch = patch(
+            'zaf.builtin.logging.file.update_message_tracing')
 
         self.harness = ExtensionTestHarness(FileLogger, config=config)
 
     def __enter__(self):
         self.getlogger = self.getlogger_patch.__enter__()
         self.handler_constructor = self.handler_constructor_patch.__enter__()
+        self.update_message_tracing = self.update_message_tracing_patch.__enter__()
         self.harness.__enter__()
 
         return self
@@ -122,6 +129,7 @@ class FileLoggerHarness(object):
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.getlogger_patch.__exit__(exc_type, exc_val, exc_tb)
         self.handler_constructor_patch.__exit__(exc_type, exc_val, exc_tb)
+        self.update_message_tracing_patch.__exit__(exc_type, exc_val, exc_tb)
         self.harness.__exit__(exc_type, exc_val, exc_tb)
 
 
@@ -7,14 +7,22 @@ from zaf.builtin.unittest.harness import ExtensionTestHarness
 from zaf.config.manager import ConfigManager
 from zaf.extensions import ENABLED_EXTENSIONS
 from zaf.extensions.extension import get_logger_name
+from zaf.messages import tracing
+from zaf.messages.test.utils import create_dispatcher, create_messagebus, data, \
+    defined_endpoint, defined_message
 
 from .. import EXTENSION_LOG_LEVEL, LOG_DEBUG, LOG_DIR, LOG_ERROR, LOG_FORMAT, LOG_INFO, \
-    LOG_LEVEL, LOG_WARNING
+    LOG_LEVEL, LOG_NO_TRACE, LOG_WARNING
 from ..logging import RootLogger, map_level
 
 
 class RootLoggerTest(unittest.TestCase):
 
+    def setUp(self):
+        update_message_tracing = patch('zaf.builtin.logging.logging.update_message_tracing')
+        update_message_tracing.start()
+        self.addCleanup(update_message_tracing.stop)
+
     def test_sets_root_logger_level_and_attaches_stdout_handler(self):
         logger = MagicMock()
         handler = Mock()
@@ -49,6 +57,18 @@ class RootLoggerTest(unittest.TestCase):
                 handler.setFormatter.assert_called_with(formatter)
                 get_filter.assert_called_with({'': 20})
 
+    def test_can_disable_message_tracing_for_specific_loggers(self):
+        logger = MagicMock()
+
+        config = ConfigManager()
+        config.set(LOG_NO_TRACE, ['zaf.messages'])
+
+        with patch('logging.getLogger', return_value=logger), \
+                patch('logging.StreamHandler'), \
+                patch('zaf.builtin.logging.logging.set_message_tracing') as set_message_tracing:
+            with ExtensionTestHarness(RootLogger, config=config):
+                set_message_tracing.assert_called_once_with(False, ('zaf.messages', ))
+
     def test_can_set_level_for_specific_loggers(self):
         logger = MagicMock()
 
@@ -112,6 +132,39 @@ class RootLoggerTest(unittest.TestCase):
                 get_filter.assert_called_with({'': 30})
 
 
+class MessageTracingTest(unittest.TestCase):
+
+    def setUp(self):
+        # Only the handlers configured by the RootLogger should be used
+        root_logger = logging.getLogger()
+        self.addCleanup(setattr, root_logger, 'handlers', root_logger.handlers)
+        self.addCleanup(root_logger.setLevel, root_logger.level)
+        root_logger.handlers = []
+        self.addCleanup(
+            setattr, tracing, '_handlers_configured', tracing._handlers_configured)
+        for tracer in tracing._tracers:
+            self.addCleanup(setattr, tracer, 'handled', tracer.handled)
+
+    def trigger_event(self, log_level):
+        config = ConfigManager()
+        config.set(LOG_LEVEL, log_level)
+        messagebus = create_messagebus()
+        messagebus.register_dispatcher(create_dispatcher(), [defined_message], [defined_endpoint])
+
+        with patch('zaf.messages.messagebus.logger') as logger, \
+                ExtensionTestHarness(RootLogger, config=config):
+            messagebus.trigger_event(defined_message, defined_endpoint, data=data)
+            return logger
+
+    def test_no_trace_strings_are_built_when_logging_at_info_level(self):
+        logger = self.trigger_event('info')
+        logger.debug.assert_not_called()
+
+    def test_messages_are_traced_when_logging_at_debug_level(self):
+        logger = self.trigger_event('debug')
+        logger.debug.assert_called()
+
+
 class LevelMapping(unittest.TestCase):
 
     def test_that_levels_are_mapped_from_string_to_logging(self):
@@ -0,0 +1,24 @@
+from zaf.application.context import ApplicationContext
+from zaf.config.options import ConfigOptionId, Path
+
+STARTUP_PROFILE = ConfigOptionId(
+    'startup.profile',
+    'Log a breakdown of where the startup time is spent',
+    option_type=bool,
+    default=False,
+    hidden=True,
+    application_contexts=ApplicationContext.EXTENDABLE)
+
+STARTUP_PROFILE_PATH = ConfigOptionId(
+    'startup.profile.path',
+    'Write the startup profile in the folded stacks format used by flamegraph tools to this path',
+    option_type=Path(exists=False),
+    hidden=True,
+    application_contexts=ApplicationContext.EXTENDABLE)
+
+STARTUP_BUDGET = ConfigOptionId(
+    'startup.budget',
+    'Fail if the startup takes longer than this many seconds',
+    option_type=float,
+    hidden=True,
+    application_contexts=ApplicationContext.EXTENDABLE)
@@ -0,0 +1,149 @@
+"""
+Records how the startup time of a zaf application is spent.
+
+The startup is divided into nested sections, for example the phases of the
+extension loading and the import of each extension.
+Sections with the same name and the same parent are merged, in the same way
+as stacks are merged in a flamegraph.
+
+Only the thread that started the profiling is recorded and nothing is
+recorded after the profiling has been stopped, so sections can be added
+in code that is also used after the startup.
+
+.. code-block:: python
+
+    with startup_profiler.section('find_plugins'):
+        find_plugins()
+
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupSection(object):
+    """A named section of the startup with the total time and the child sections."""
+
+    def __init__(self, name):
+        self.name = name
+        self.duration = 0.0
+        self.children = []
+
+    def child(self, name):
+        for child in self.children:
+            if child.name == name:
+                return child
+        child = StartupSection(name)
+        self.children.append(child)
+        return child
+
+    @property
+    def self_duration(self):
+        """The time spent in this section that is not spent in any of the child sections."""
+        return max(0.0, self.duration - sum(child.duration for child in self.children))
+
+
+class StartupProfiler(object):
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Start a new profiling from the current time in the current thread."""
+        self._thread = threading.get_ident()
+        self._start_time = time.perf_counter()
+        self._root = StartupSection('startup')
+        self._stack = [self._root]
+        self._stopped = False
+
+    def stop(self):
+        """Stop the profiling. The total duration is the time from reset to the first stop."""
+        if not self._stopped:
+            self._stopped = True
+            self._root.duration = time.perf_counter() - self._start_time
+
+    @property
+    def stopped(self):
+        return self._stopped
+
+    @property
+    def total_duration(self):
+        if self._stopped:
+            return self._root.duration
+        return time.perf_counter() - self._start_time
+
+    @property
+    def root(self):
+        return self._root
+
+    @contextmanager
+    def section(self, name):
+        """
+        Record the time spent in the with-block as a section with name.
+
+        :param name: the name of the section
+        """
+        if self._stopped or threading.get_ident() != self._thread:
+            yield
+            return
+
+        section = self._stack[-1].child(name)
+        self._stack.append(section)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            section.duration += time.perf_counter() - start
+            self._stack.pop()
+
+    def folded_stacks(self):
+        """
+        Get the profile in the folded stacks format used by flamegraph tools.
+
+        Each line contains the names of the nested sections separated by semicolons
+        and the time spent only in the innermost section in microseconds.
+
+        :return: list of lines
+        """
+        self._root.duration = self.total_duration
+        lines = []
+
+        def add_lines(section, stack):
+            stack = stack + [section.name.replace(';', ':').replace(' ', '_')]
+            microseconds = int(section.self_duration * 1000000)
+            if microseconds > 0:
+                lines.append('{stack} {microseconds}'.format(stack=';'.join(stack),
+                                                             microseconds=microseconds))
+            for child in section.children:
+                add_lines(child, stack)
+
+        add_lines(self._root, [])
+        return lines
+
+    def format_tree(self, min_duration=0.001):
+        """
+        Get the profile as an indented tree with the slowest sections first.
+
+        :param min_duration: sections that are faster than this are left out
+        :return: list of lines
+        """
+        self._root.duration = self.total_duration
+        total = self._root.duration if self._root.duration > 0 else 1
+        lines = []
+
+        def add_lines(section, depth):
+            lines.append(
+                '{indent}{duration:8.3f}s {percent:5.1f}% {name}'.format(
+                    indent='  ' * depth,
+                    duration=section.duration,
+                    percent=100 * section.duration / total,
+                    name=section.name))
+            for child in sorted(section.children, key=lambda c: c.duration, reverse=True):
+                if child.duration >= min_duration:
+                    add_lines(child, depth + 1)
+
+        add_lines(self._root, 0)
+        return lines
+
+
+startup_profiler = StartupProfiler()
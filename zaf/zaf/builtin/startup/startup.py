@@ -0,0 +1,81 @@
+"""
+Provides a profile of the startup of zaf applications.
+
+The startup is the time from when the application is created until the command is executed.
+The profile contains the phases of the extension loading, the import time for each
+extension and the initialization time for each framework extension, for example the
+config file loaders.
+
+Example of config that logs the startup profile and writes it in the folded stacks format
+that can be used to create a flamegraph::
+
+    startup.profile: true
+    startup.profile.path: ${output.dir}/startup.folded
+
+A startup budget in seconds can be given with the *startup.budget* config option.
+If the startup takes longer than the budget the application fails before the command is executed,
+which can be used to keep startup time regressions from being introduced::
+
+    startup.budget: 1.5
+
+"""
+import logging
+import os
+
+from zaf.application import APPLICATION_ENDPOINT, BEFORE_COMMAND
+from zaf.config.options import ConfigOption
+from zaf.extensions.extension import AbstractExtension, FrameworkExtension, get_logger_name
+from zaf.messages.decorator import callback_dispatcher
+
+from . import STARTUP_BUDGET, STARTUP_PROFILE, STARTUP_PROFILE_PATH
+from .profiler import startup_profiler
+
+logger = logging.getLogger(get_logger_name('zaf', 'startupprofiler'))
+logger.addHandler(logging.NullHandler())
+
+
+class StartupBudgetExceeded(Exception):
+    pass
+
+
+@FrameworkExtension(
+    name='startupprofiler',
+    load_order=100,
+    config_options=[
+        ConfigOption(STARTUP_PROFILE, required=False),
+        ConfigOption(STARTUP_PROFILE_PATH, required=False),
+        ConfigOption(STARTUP_BUDGET, required=False),
+    ],
+    activate_on=[(STARTUP_PROFILE, STARTUP_PROFILE_PATH, STARTUP_BUDGET)],
+    groups=['logging'])
+class StartupProfilerExtension(AbstractExtension):
+    """Profiles the startup of the application and checks it against a budget."""
+
+    def __init__(self, config, instances):
+        self._profile = config.get(STARTUP_PROFILE)
+        self._path = config.get(STARTUP_PROFILE_PATH)
+        self._budget = config.get(STARTUP_BUDGET)
+
+    @callback_dispatcher([BEFORE_COMMAND], [APPLICATION_ENDPOINT], priority=100)
+    def before_command(self, message):
+        startup_profiler.stop()
+
+        if self._profile:
+            logger.info(
+                'Startup profile:\n{profile}'.format(
+                    profile='\n'.join(startup_profiler.format_tree())))
+
+        if self._path:
+            os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+            with open(self._path, 'w') as f:
+                f.write('\n'.join(startup_profiler.folded_stacks()))
+                f.write('\n')
+
+        total_duration = startup_profiler.total_duration
+        if self._budget is not None and total_duration > self._budget:
+            raise StartupBudgetExceeded(
+                'Startup took {duration:.3f}s which exceeds the budget of {budget:.3f}s\n'
+                '{profile}'.format(
+                    duration=total_duration,
+                    budget=self._budget,
+                    profile='\n'.join(startup_profiler.format_tree(min_duration=0.01))))
@@ -0,0 +1,93 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from ..profiler import StartupProfiler
+
+
+class TestStartupProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.time = 0.0
+        self.perf_counter = patch('zaf.builtin.startup.profiler.time.perf_counter', new=self.now)
+        self.perf_counter.start()
+        self.profiler = StartupProfiler()
+
+    def tearDown(self):
+        self.perf_counter.stop()
+
+    def now(self):
+        return self.time
+
+    def test_sections_are_nested(self):
+        with self.profiler.section('load_extensions'):
+            with self.profiler.section('find_addons'):
+                self.time += 2
+            self.time += 1
+        self.profiler.stop()
+
+        load_extensions = self.profiler.root.children[0]
+        self.assertEqual(load_extensions.name, 'load_extensions')
+        self.assertEqual(load_extensions.duration, 3)
+        self.assertEqual(load_extensions.self_duration, 1)
+        self.assertEqual(load_extensions.children[0].name, 'find_addons')
+        self.assertEqual(load_extensions.children[0].duration, 2)
+
+    def test_sections_with_same_name_and_parent_are_merged(self):
+        with self.profiler.section('a'):
+            self.time += 1
+        with self.profiler.section('a'):
+            self.time += 2
+
+        self.assertEqual(len(self.profiler.root.children), 1)
+        self.assertEqual(self.profiler.root.children[0].duration, 3)
+
+    def test_nothing_is_recorded_after_stop(self):
+        self.time += 1
+        self.profiler.stop()
+        with self.profiler.section('a'):
+            self.time += 1
+
+        self.assertEqual(self.profiler.root.children, [])
+        self.assertEqual(self.profiler.total_duration, 1)
+
+    def test_nothing_is_recorded_from_other_threads(self):
+
+        def record():
+            with self.profiler.section('a'):
+                pass
+
+        thread = threading.Thread(target=record)
+        thread.start()
+        thread.join()
+        self.assertEqual(self.profiler.root.children, [])
+
+    def test_folded_stacks_contains_the_self_time_for_each_section(self):
+        with self.profiler.section('load_extensions'):
+            with self.profiler.section('import a.b:C'):
+                self.time += 0.5
+            self.time += 0.25
+        self.time += 0.125
+        self.profiler.stop()
+
+        self.assertEqual(
+            self.profiler.folded_stacks(), [
+                'startup 125000',
+                'startup;load_extensions 250000',
+                'startup;load_extensions;import_a.b:C 500000',
+            ])
+
+    def test_format_tree_sorts_sections_by_duration_and_skips_short_sections(self):
+        with self.profiler.section('fast'):
+            self.time += 1
+        with self.profiler.section('slow'):
+            self.time += 3
+        with self.profiler.section('negligible'):
+            self.time += 0.0001
+        self.profiler.stop()
+
+        lines = self.profiler.format_tree()
+        self.assertEqual(len(lines), 3)
+        self.assertIn('startup', lines[0])
+        self.assertIn('slow', lines[1])
+        self.assertIn('fast', lines[2])
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from zaf.application import APPLICATION_ENDPOINT, BEFORE_COMMAND
+from zaf.builtin.unittest.harness import ExtensionTestHarness
+from zaf.config.manager import ConfigManager
+
+from .. import STARTUP_BUDGET, STARTUP_PROFILE_PATH
+from ..profiler import StartupProfiler
+from ..startup import StartupBudgetExceeded, StartupProfilerExtension
+
+
+class TestStartupProfilerExtension(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = StartupProfiler()
+        with self.profiler.section('load_extensions'):
+            pass
+        patcher = patch('zaf.builtin.startup.startup.startup_profiler', new=self.profiler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def harness(self, config):
+        return ExtensionTestHarness(
+            StartupProfilerExtension,
+            endpoints_and_messages={APPLICATION_ENDPOINT: [BEFORE_COMMAND]},
+            config=config)
+
+    def test_writes_folded_stacks_to_profile_path(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'startup', 'startup.folded')
+            config = ConfigManager()
+            config.set(STARTUP_PROFILE_PATH, path)
+
+            with self.harness(config) as harness:
+                harness.trigger_event(BEFORE_COMMAND, APPLICATION_ENDPOINT)
+
+            with open(path) as f:
+                self.assertTrue(f.read().startswith('startup'))
+        self.assertTrue(self.profiler.stopped)
+
+    def test_raises_when_startup_budget_is_exceeded(self):
+        config = ConfigManager()
+        config.set(STARTUP_BUDGET, 1e-9)
+
+        with self.harness(config) as harness:
+            with self.assertRaisesRegex(StartupBudgetExceeded, 'exceeds the budget'):
+                harness.trigger_event(BEFORE_COMMAND, APPLICATION_ENDPOINT)
+
+    def test_does_not_raise_when_startup_is_within_budget(self):
+        config = ConfigManager()
+        config.set(STARTUP_BUDGET, 1000.0)
+
+        with self.harness(config) as harness:
+            harness.trigger_event(BEFORE_COMMAND, APPLICATION_ENDPOINT)
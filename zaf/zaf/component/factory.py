@@ -1,6 +1,8 @@
 import inspect
 import logging
+import threading
 from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 from zaf.component.decorator import component
 from zaf.component.dependencygraph import DependencyGraphBuilder
@@ -10,6 +12,9 @@ from .util import is_context_manager, is_generator
 
 logger = logging.getLogger('zaf.component.factory')
 
+# The number of resolved dependency graphs that are kept by each Factory
+DEPENDENCY_GRAPH_CACHE_SIZE = 1024
+
 _InternalInstanceId = namedtuple('_InternalInstanceId', ['callable', 'args', 'kwargs'])
 
 
@@ -116,11 +121,144 @@ class ComponentContext(object):
         return isinstance(other, ComponentContext)
 
 
+def _run_and_catch(function):
+    try:
+        return function(), None
+    except Exception as e:
+        return None, e
+
+
+class _ResolvedDependencyGraph(object):
+    """
+    A resolved dependency graph and the information derived from it when instantiating.
+
+    The graph is not modified after it has been resolved so the same instance
+    can be used for all calls with the same callable, scope hierarchy, fixated
+    entities and extra requirements.
+    """
+
+    def __init__(self, dependency_graph, scope_hierarchy, extra_req=None):
+        self.dependency_graph = dependency_graph
+        self._scope_hierarchy = scope_hierarchy
+        # The cache key contains the ids of the extra requirements so they are kept
+        # alive to make sure that the ids are not reused while the graph is cached.
+        self._extra_req = extra_req
+        self._requirements = {}
+        self._requirement_groups = {}
+        self._parameters = {}
+
+    def requirements(self, callable_node):
+        """Get the (argument, requirement) pairs of a callable node, sorted in scope order."""
+        requirements = self._requirements.get(id(callable_node))
+        if requirements is None:
+            requirements = sorted(
+                callable_node.requirements.items(),
+                key=lambda item: self._scope_hierarchy.index(item[1].selected().selected_scope))
+            self._requirements[id(callable_node)] = requirements
+        return requirements
+
+    def requirement_groups(self, callable_node):
+        """
+        Get the (argument, requirement) pairs of a callable node grouped by selected scope.
+
+        The groups are in scope order and the requirements in a group are independent
+        of each other, so they can be instantiated in parallel.
+        """
+        groups = self._requirement_groups.get(id(callable_node))
+        if groups is None:
+            groups = []
+            group_scope = None
+            for argument, requirement in self.requirements(callable_node):
+                scope = requirement.selected().selected_scope
+                if not groups or scope != group_scope:
+                    groups.append([])
+                    group_scope = scope
+                groups[-1].append((argument, requirement))
+            self._requirement_groups[id(callable_node)] = groups
+        return groups
+
+    def parameters(self, callable):
+        """Get the names of the keyword arguments of a callable, None if it takes any argument."""
+        try:
+            return self._parameters[id(callable)]
+        except KeyError:
+            signature = inspect.signature(callable)
+            splat_arguments = (
+                inspect._VAR_KEYWORD,
+                inspect._VAR_POSITIONAL,
+            )
+            if any(filter(lambda p: p.kind in splat_arguments, signature.parameters.values())):
+                parameters = None
+            else:
+                parameters = frozenset(signature.parameters)
+            self._parameters[id(callable)] = parameters
+            return parameters
+
+
 class Factory(object):
 
-    def __init__(self, component_manager):
+    def __init__(self, component_manager, cache_size=DEPENDENCY_GRAPH_CACHE_SIZE, max_workers=1):
+        """
+        Create a factory.
+
+        :param component_manager: the component manager with the components to instantiate
+        :param cache_size: the number of resolved dependency graphs to keep, 0 to not cache.
+                           Graphs are only cached if the component registry is a
+                           ComponentRegistry, so that changes to it can be detected.
+        :param max_workers: the maximum number of components to instantiate or exit
+                            at the same time, see max_workers
+        """
         self._component_manager = component_manager
+        self._executor = None
+        self._worker_slots = None
+        self.max_workers = max_workers
         self._builder = DependencyGraphBuilder(component_manager.COMPONENT_REGISTRY)
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_version = None
+
+    @property
+    def max_workers(self):
+        """
+        The maximum number of components to instantiate or exit at the same time.
+
+        With more than one worker the requirements of a callable that are
+        instantiated in the same scope are instantiated in parallel, including
+        their own requirements. Requirements in different scopes are still
+        instantiated in scope order. Exiting a scope exits all contexts of the
+        scope in parallel, so components can't depend on the order in which
+        the contexts in a scope are exited.
+
+        Worker threads are only used when they are available, otherwise the
+        components are instantiated in the calling thread.
+        """
+        return self._max_workers
+
+    @max_workers.setter
+    def max_workers(self, max_workers):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._max_workers = max_workers
+        if max_workers > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers - 1, thread_name_prefix='component-')
+            self._worker_slots = threading.Semaphore(max_workers - 1)
+        else:
+            self._executor = None
+            self._worker_slots = None
+
+    def reset_after_fork(self):
+        """
+        Reset the locks and the worker threads of the factory in a forked child process.
+
+        Only the thread that forked the process exists in the child process, so locks
+        that were held by other threads when the process was forked would never be
+        released, and the worker threads of the parent process are gone.
+        """
+        self._cache_lock = threading.Lock()
+        self._executor = None
+        self.max_workers = self._max_workers
 
     def call(
             self,
@@ -151,20 +289,19 @@ class Factory(object):
         """
         fixated_entities = [] if fixated_entities is None else fixated_entities
         pre_instantiated = {} if pre_instantiated is None else pre_instantiated
-        dependency_graph = self._builder.create_dependency_graph(
-            callable, scope, extra_req, *args, **kwargs)
         fixated_entity_mapping = self._component_manager.component_name_to_entity_mapping(
             fixated_entities)
-
-        dependency_graph.resolve(top_level_scope=scope, fixated_entities=fixated_entity_mapping)
+        resolved_graph = self._resolve(
+            callable, scope, extra_req, fixated_entity_mapping, args, kwargs)
 
         callable_information = CallableInformation(callable)
         kwargs = dict(kwargs)
-        instances = self.instantiate(
-            dependency_graph, scope, callable_information, pre_instantiated)
+        instances = self._instantiate_requirements_for_callable(
+            resolved_graph.dependency_graph.root, scope, callable_information, pre_instantiated,
+            resolved_graph)
         kwargs.update(instances)
 
-        kwargs = self._strip_unused_kwargs(callable, kwargs)
+        kwargs = self._strip_unused_kwargs(resolved_graph.parameters(callable), kwargs)
 
         callable_information.args = args
         callable_information.kwargs = kwargs
@@ -192,26 +329,32 @@ class Factory(object):
         """
         result = ExitScopeResult(scope.parent, True, [])
 
-        for instance_id, context in scope.contexts():
+        def exit_context(instance_id, context):
             logger.debug(
                 'Exiting scope {scope} for component {component}'.format(
                     scope=scope.name, component=instance_id.callable.__name__))
-            try:
-                if is_generator(context):
-                    try:
-                        next(context)
-                    except StopIteration:
-                        pass
-                if is_context_manager(context):
-                    context.__exit__(None, None, None)
-            except Exception as e:
+            if is_generator(context):
+                try:
+                    next(context)
+                except StopIteration:
+                    pass
+            if is_context_manager(context):
+                context.__exit__(None, None, None)
+
+        outcomes = self._run_in_parallel(
+            [
+                lambda instance_id=instance_id, context=context: exit_context(
+                    instance_id, context) for instance_id, context in scope.contexts()
+            ])
+        for (instance_id, _), (_, e) in zip(scope.contexts(), outcomes):
+            if e is not None:
                 logger.error(
                     'Error occurred when exiting scope {scope} for component {component}: {msg}'.
                     format(scope=scope.name, component=instance_id.callable.__name__, msg=str(e)))
                 logger.debug(
                     'Error occurred when exiting scope {scope} for component {component}: {msg}'.
                     format(scope=scope.name, component=instance_id.callable.__name__, msg=str(e)),
-                    exc_info=True)
+                    exc_info=e)
                 result.success = False
                 result.exceptions.append(e)
 
@@ -228,22 +371,76 @@ class Factory(object):
                                  component instances
         """
         return self._instantiate_requirements_for_callable(
-            dependency_graph.root, scope, callable_information, pre_instantiated)
-
-    def _strip_unused_kwargs(self, callable, kwargs):
-        signature = inspect.signature(callable)
-        splat_arguments = (
-            inspect._VAR_KEYWORD,
-            inspect._VAR_POSITIONAL,
-        )
-        if not any(filter(lambda p: p.kind in splat_arguments, signature.parameters.values())):
+            dependency_graph.root, scope, callable_information, pre_instantiated,
+            _ResolvedDependencyGraph(dependency_graph, scope.hierarchy()))
+
+    def clear_cache(self):
+        """Remove all cached dependency graphs."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _resolve(self, callable, scope, extra_req, fixated_entity_mapping, args, kwargs):
+        """
+        Get the resolved dependency graph for a call.
+
+        The resolved graphs are cached so that only the first call with the same
+        callable, scope hierarchy, fixated entities and extra requirements has to
+        build and resolve the graph. The cache is cleared when the component registry
+        is changed.
+        """
+        version, key = self._cache_key(callable, scope, extra_req, fixated_entity_mapping)
+        if key is not None:
+            with self._cache_lock:
+                if version != self._cache_version:
+                    self._cache.clear()
+                    self._cache_version = version
+                resolved_graph = self._cache.get(key)
+                if resolved_graph is not None:
+                    self._cache.move_to_end(key)
+                    return resolved_graph
+
+        dependency_graph = self._builder.create_dependency_graph(
+            callable, scope, extra_req, *args, **kwargs)
+        dependency_graph.resolve(top_level_scope=scope, fixated_entities=fixated_entity_mapping)
+        resolved_graph = _ResolvedDependencyGraph(dependency_graph, scope.hierarchy(), extra_req)
+
+        if key is not None:
+            with self._cache_lock:
+                # Graphs resolved while the registry was changed may be out of date
+                if version == self._cache_version == self._registry_version():
+                    self._cache[key] = resolved_graph
+                    if len(self._cache) > self._cache_size:
+                        self._cache.popitem(last=False)
+        return resolved_graph
+
+    def _cache_key(self, callable, scope, extra_req, fixated_entity_mapping):
+        version = self._registry_version()
+        if version is None or self._cache_size <= 0:
+            return None, None
+
+        # Requirements are equal if they have the same argument name, regardless of
+        # component, so the extra requirements are identified by id.
+        key = (
+            callable, tuple(scope.hierarchy()), frozenset(fixated_entity_mapping.items()),
+            tuple(id(requirement) for requirement in extra_req) if extra_req else ())
+        try:
+            hash(key)
+        except TypeError:
+            return None, None
+        return version, key
+
+    def _registry_version(self):
+        return getattr(self._component_manager.COMPONENT_REGISTRY, 'version', None)
+
+    def _strip_unused_kwargs(self, parameters, kwargs):
+        if parameters is not None:
             for k in list(kwargs.keys()):
-                if k not in signature.parameters:
+                if k not in parameters:
                     kwargs.pop(k)
         return kwargs
 
     def _instantiate_requirements_for_callable(
-            self, callable_node, scope, callable_information, pre_instantiated):
+            self, callable_node, scope, callable_information, pre_instantiated, resolved_graph):
         """
         Instantiate the selected callable for each of the requirements for the callable using the scope.
 
@@ -252,18 +449,63 @@ class Factory(object):
         :param callable_information: Information about the top level callable
         :param pre_instantiated: dict mapping from component name to pre-created
                                  component instances
+        :param resolved_graph: the resolved dependency graph that the callable node is part of
         :return: a dict from the argument name to the instantiated component
         """
         kwargs = OrderedDict()
-        for argument, requirement in self._sort_requirements_in_scope_order(
-                callable_node.requirements, scope).items():
-            kwargs[argument] = self._recursively_instantiate(
-                requirement, scope, callable_node, callable_information, pre_instantiated)
-        return self._strip_unused_kwargs(callable_node.callable, kwargs)
+        if self._executor is None:
+            for argument, requirement in resolved_graph.requirements(callable_node):
+                kwargs[argument] = self._recursively_instantiate(
+                    requirement, scope, callable_node, callable_information, pre_instantiated,
+                    resolved_graph)
+        else:
+            for group in resolved_graph.requirement_groups(callable_node):
+                outcomes = self._run_in_parallel(
+                    [
+                        lambda requirement=requirement: self._recursively_instantiate(
+                            requirement, scope, callable_node, callable_information,
+                            pre_instantiated, resolved_graph) for _, requirement in group
+                    ])
+                for (argument, _), (instance, e) in zip(group, outcomes):
+                    if e is not None:
+                        raise e
+                    kwargs[argument] = instance
+        return self._strip_unused_kwargs(resolved_graph.parameters(callable_node.callable), kwargs)
+
+    def _run_in_parallel(self, functions):
+        """
+        Run functions in parallel on the worker threads that are available.
+
+        Functions that don't get a worker thread are run in the calling thread.
+        Workers are never waited for, so nested calls can't deadlock.
+
+        :param functions: the functions to run
+        :return: a (result, exception) tuple for each function, in the same order
+        """
+        futures = {}
+        if self._executor is not None:
+            for index in range(1, len(functions)):
+                if not self._worker_slots.acquire(blocking=False):
+                    break
+                futures[index] = self._executor.submit(self._run_in_worker, functions[index])
+
+        outcomes = [
+            _run_and_catch(function) if index not in futures else None
+            for index, function in enumerate(functions)
+        ]
+        for index, future in futures.items():
+            outcomes[index] = future.result()
+        return outcomes
+
+    def _run_in_worker(self, function):
+        try:
+            return _run_and_catch(function)
+        finally:
+            self._worker_slots.release()
 
     def _recursively_instantiate(
             self, requirement, parent_scope, parent_callable, callable_information,
-            pre_instantiated):
+            pre_instantiated, resolved_graph):
         callable = requirement.selected()
         selected_instantiation_scope = parent_scope.find_ancestor(callable.selected_scope)
 
@@ -271,7 +513,8 @@ class Factory(object):
             return callable.callable
         else:
             kwargs = self._instantiate_requirements_for_callable(
-                callable, selected_instantiation_scope, callable_information, pre_instantiated)
+                callable, selected_instantiation_scope, callable_information, pre_instantiated,
+                resolved_graph)
 
             try:
                 return self._get_instance(
@@ -337,11 +580,3 @@ class Factory(object):
             return pre_instantiated[component_name]
         else:
             return find_or_create_instance()
-
-    def _sort_requirements_in_scope_order(self, requirements, scope):
-
-        def ordering(req_arg_val_tuple):
-            _, requirement = req_arg_val_tuple
-            return scope.hierarchy().index(requirement.selected().selected_scope)
-
-        return OrderedDict(sorted(requirements.items(), key=ordering))
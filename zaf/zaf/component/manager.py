@@ -1,13 +1,78 @@
 import collections
 import inspect
 import logging
+import weakref
 from textwrap import dedent
 
 logger = logging.getLogger('zaf.component.manager')
 
+# All component registries, so that the registries of a component can be found
+# when the component itself is changed
+_registries = weakref.WeakValueDictionary()
+
+
+class ComponentRegistry(collections.defaultdict):
+    """
+    Mapping from component name to the components registered with that name.
+
+    The version is increased each time the registry is changed so that
+    information derived from the registry, like resolved dependency graphs,
+    can be invalidated.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        _registries[id(self)] = self
+
+    def register(self, name, fn):
+        self[name].append(fn)
+        self.version += 1
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self.version += 1
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.version += 1
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.version += 1
+
+
+def component_changed(component):
+    """
+    Increase the version of all registries that a component is registered in.
+
+    This needs to be called when a registered component is changed in a way that
+    affects how requirements are resolved, for example when capabilities are added.
+    """
+    for registry in list(_registries.values()):
+        if any(component in components for components in list(registry.values())):
+            registry.version += 1
+
 
 def create_registry():
-    return collections.defaultdict(list)
+    return ComponentRegistry(list)
 
 
 def create_entity_map():
@@ -46,13 +111,16 @@ class ComponentManager(object):
         if hasattr(fn, 'entity'):
             ENTITY_COMPONENT_NAMES[fn.entity].add(fn._zaf_component_name)
 
-        COMPONENT_REGISTRY[fn._zaf_component_name].append(fn)
+        COMPONENT_REGISTRY.register(fn._zaf_component_name, fn)
 
     def register_component(self, fn):
         if hasattr(fn, 'entity'):
             self.ENTITY_COMPONENT_NAMES[fn.entity].add(fn._zaf_component_name)
 
-        self.COMPONENT_REGISTRY[fn._zaf_component_name].append(fn)
+        if isinstance(self.COMPONENT_REGISTRY, ComponentRegistry):
+            self.COMPONENT_REGISTRY.register(fn._zaf_component_name, fn)
+        else:
+            self.COMPONENT_REGISTRY[fn._zaf_component_name].append(fn)
 
     def clear_component_registry(self):
         self.COMPONENT_REGISTRY.clear()
@@ -52,6 +52,20 @@ class Scope(object):
         hierarchy.append(self.name)
         return hierarchy
 
+    def reset_after_fork(self):
+        """
+        Reset the locks of the scope and its ancestors in a forked child process.
+
+        Only the thread that forked the process exists in the child process, so locks
+        that were held by other threads when the process was forked would never be released.
+        """
+        self._internal_scope_lock = threading.Lock()
+        self._instance_locks = [
+            (instance_id, threading.Lock()) for instance_id, _ in self._instance_locks
+        ]
+        if self.parent is not None:
+            self.parent.reset_after_fork()
+
     def get_instance(self, instance_id):
         for id, instance in self._instances:
             if id == instance_id:
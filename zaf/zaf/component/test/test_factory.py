@@ -1,14 +1,15 @@
 import threading
 import unittest
 from contextlib import contextmanager
-from unittest.mock import MagicMock, Mock
+from unittest.mock import MagicMock, Mock, patch
 
 from zaf.component.dependencygraph import ComponentDependencyError
 
-from ..decorator import component, requires
-from ..factory import ComponentContext, Factory, _InstanceId
+from ..decorator import Requirement, component, requires
+from ..factory import ComponentContext, ComponentInstanceException, Factory, _InstanceId
 from ..manager import ComponentManager, create_entity_map, create_registry
 from ..scope import Scope
+from ..util import add_cans
 
 
 class TestFactory(unittest.TestCase):
@@ -1179,3 +1180,325 @@ class TestFactory(unittest.TestCase):
             self.f.call(f, self.scope, pre_instantiated={
                 'PreInstantiated': instance
             }), instance)
+
+
+class TestFactoryDependencyGraphCache(unittest.TestCase):
+
+    def setUp(self):
+        self.component_manager = ComponentManager(create_registry(), create_entity_map())
+        self.f = Factory(self.component_manager)
+        self.session = self.f.enter_scope('session')
+        self.scope = self.f.enter_scope('test', self.session)
+
+        @component(name='A', component_manager=self.component_manager)
+        def a():
+            return 'a'
+
+        @requires(a='A')
+        def f(a):
+            return a
+
+        self.function = f
+
+    def call_counting_graphs(self, *calls):
+        with patch.object(
+                self.f._builder, 'create_dependency_graph',
+                wraps=self.f._builder.create_dependency_graph) as create_dependency_graph:
+            results = [self.f.call(self.function, scope, **kwargs) for scope, kwargs in calls]
+        return results, create_dependency_graph.call_count
+
+    def test_dependency_graph_is_only_resolved_once_for_repeated_calls(self):
+        results, graphs = self.call_counting_graphs((self.scope, {}), (self.scope, {}))
+        self.assertEqual(results, ['a', 'a'])
+        self.assertEqual(graphs, 1)
+
+    def test_dependency_graph_is_shared_between_scopes_with_the_same_hierarchy(self):
+        other_scope = self.f.enter_scope('test', self.session)
+        _, graphs = self.call_counting_graphs((self.scope, {}), (other_scope, {}))
+        self.assertEqual(graphs, 1)
+
+    def test_dependency_graph_is_resolved_for_each_scope_hierarchy(self):
+        _, graphs = self.call_counting_graphs((self.scope, {}), (self.session, {}))
+        self.assertEqual(graphs, 2)
+
+    def test_dependency_graph_is_resolved_for_each_set_of_fixated_entities(self):
+
+        @component(name='E', component_manager=self.component_manager)
+        class E1(object):
+            entity = 'e1'
+
+        @component(name='E', component_manager=self.component_manager)
+        class E2(object):
+            entity = 'e2'
+
+        @requires(e='E')
+        def f(e):
+            return e.entity
+
+        self.function = f
+        results, graphs = self.call_counting_graphs(
+            (self.scope, {
+                'fixated_entities': ['e1']
+            }), (self.scope, {
+                'fixated_entities': ['e2']
+            }), (self.scope, {
+                'fixated_entities': ['e1']
+            }))
+        self.assertEqual(results, ['e1', 'e2', 'e1'])
+        self.assertEqual(graphs, 2)
+
+    def test_extra_requirements_with_the_same_argument_are_resolved_separately(self):
+
+        @component(name='B', component_manager=self.component_manager)
+        def b():
+            return 'b'
+
+        def f(x):
+            return x
+
+        self.function = f
+        results, graphs = self.call_counting_graphs(
+            (self.scope, {
+                'extra_req': [Requirement(x='A')]
+            }), (self.scope, {
+                'extra_req': [Requirement(x='B')]
+            }))
+        self.assertEqual(results, ['a', 'b'])
+        self.assertEqual(graphs, 2)
+
+    def test_cache_is_invalidated_when_a_component_is_registered(self):
+        self.assertEqual(self.f.call(self.function, self.scope), 'a')
+
+        @component(name='A', priority=1, component_manager=self.component_manager)
+        def a_with_higher_priority():
+            return 'a with higher priority'
+
+        self.assertEqual(self.f.call(self.function, self.f.enter_scope('test', self.session)),
+                         'a with higher priority')
+
+    def test_cache_is_invalidated_when_capabilities_are_added_to_a_component(self):
+
+        @component(name='C', component_manager=self.component_manager)
+        def c():
+            return 'c'
+
+        @component(name='C', priority=-1, component_manager=self.component_manager)
+        def c_with_lower_priority():
+            return 'c with lower priority'
+
+        add_cans(c_with_lower_priority, ['telnet'])
+
+        @requires(c='C', can=['telnet'])
+        def f(c):
+            return c
+
+        self.assertEqual(self.f.call(f, self.scope), 'c with lower priority')
+        add_cans(c, ['telnet'])
+        self.assertEqual(self.f.call(f, self.f.enter_scope('test', self.session)), 'c')
+
+    def test_dependency_graphs_are_not_cached_if_cache_size_is_zero(self):
+        self.f = Factory(self.component_manager, cache_size=0)
+        _, graphs = self.call_counting_graphs((self.scope, {}), (self.scope, {}))
+        self.assertEqual(graphs, 2)
+
+    def test_least_recently_used_dependency_graph_is_evicted_when_cache_is_full(self):
+        self.f = Factory(self.component_manager, cache_size=1)
+        _, graphs = self.call_counting_graphs(
+            (self.scope, {}), (self.session, {}), (self.scope, {}))
+        self.assertEqual(graphs, 3)
+
+    def test_unresolvable_dependency_graphs_are_not_cached(self):
+
+        @requires(m='Missing')
+        def g(m):
+            pass
+
+        for _ in range(2):
+            with self.assertRaises(ComponentDependencyError):
+                self.f.call(g, self.scope)
+
+
+class TestFactoryParallelInstantiation(unittest.TestCase):
+
+    def setUp(self):
+        self.component_manager = ComponentManager(create_registry(), create_entity_map())
+        self.f = Factory(self.component_manager, max_workers=4)
+        self.session = self.f.enter_scope('session')
+        self.scope = self.f.enter_scope('test', self.session)
+        self.barrier = threading.Barrier(2, timeout=2)
+
+    def test_components_in_the_same_scope_are_instantiated_in_parallel(self):
+
+        @component(name='A', component_manager=self.component_manager)
+        def a():
+            return self.barrier.wait()
+
+        @component(name='B', component_manager=self.component_manager)
+        def b():
+            return self.barrier.wait()
+
+        @requires(a='A')
+        @requires(b='B')
+        def f(a, b):
+            return sorted([a, b])
+
+        self.assertEqual(self.f.call(f, self.scope), [0, 1])
+
+    def test_requirements_of_requirements_are_instantiated_in_parallel(self):
+
+        @component(name='A', component_manager=self.component_manager)
+        def a():
+            return self.barrier.wait()
+
+        @component(name='B', component_manager=self.component_manager)
+        def b():
+            return self.barrier.wait()
+
+        @component(name='AParent', component_manager=self.component_manager)
+        @requires(a='A')
+        def a_parent(a):
+            return a
+
+        @component(name='BParent', component_manager=self.component_manager)
+        @requires(b='B')
+        def b_parent(b):
+            return b
+
+        @requires(a='AParent')
+        @requires(b='BParent')
+        def f(a, b):
+            return sorted([a, b])
+
+        self.assertEqual(self.f.call(f, self.scope), [0, 1])
+
+    def test_components_are_instantiated_in_scope_order(self):
+        instantiated = []
+
+        @component(name='TestComponent', component_manager=self.component_manager)
+        def test_component():
+            instantiated.append('test')
+
+        @component(name='SessionComponent', component_manager=self.component_manager)
+        def session_component():
+            instantiated.append('session')
+
+        @requires(t='TestComponent')
+        @requires(s='SessionComponent', scope='session')
+        def f(t, s):
+            pass
+
+        self.f.call(f, self.scope)
+        self.assertEqual(instantiated, ['session', 'test'])
+
+    def test_shared_requirement_is_only_instantiated_once(self):
+        instantiated = []
+
+        @component(name='Shared', component_manager=self.component_manager)
+        def shared():
+            instantiated.append('shared')
+            return 'shared'
+
+        @component(name='A', component_manager=self.component_manager)
+        @requires(shared='Shared')
+        def a(shared):
+            return shared
+
+        @component(name='B', component_manager=self.component_manager)
+        @requires(shared='Shared')
+        def b(shared):
+            return shared
+
+        @requires(a='A')
+        @requires(b='B')
+        def f(a, b):
+            return a, b
+
+        self.assertEqual(self.f.call(f, self.scope), ('shared', 'shared'))
+        self.assertEqual(instantiated, ['shared'])
+
+    def test_reset_after_fork_replaces_the_cache_lock_and_the_worker_threads(self):
+        executor = self.f._executor
+        self.addCleanup(executor.shutdown)
+        self.f._cache_lock.acquire()
+        self.f.reset_after_fork()
+        self.assertFalse(self.f._cache_lock.locked())
+        self.assertIsNot(self.f._executor, executor)
+        self.assertEqual(self.f.max_workers, 4)
+
+    def test_more_requirements_than_workers_are_instantiated_in_the_calling_thread(self):
+        self.f.max_workers = 2
+        names = ['C{index}'.format(index=index) for index in range(4)]
+        for name in names:
+            component(name=name, component_manager=self.component_manager)(
+                lambda: threading.current_thread().name)
+
+        def f(**kwargs):
+            return kwargs
+
+        threads = self.f.call(
+            f, self.scope, extra_req=[Requirement(**{name.lower(): name}) for name in names])
+        self.assertEqual(len(threads), 4)
+        self.assertIn(threading.current_thread().name, threads.values())
+
+    def test_instantiation_errors_are_raised_as_component_instance_exceptions(self):
+
+        @component(name='A', component_manager=self.component_manager)
+        def a():
+            return 'a'
+
+        @component(name='B', component_manager=self.component_manager)
+        def b():
+            raise Exception('b failed')
+
+        @requires(a='A')
+        @requires(b='B')
+        def f(a, b):
+            pass
+
+        with self.assertRaisesRegex(ComponentInstanceException, 'b failed'):
+            self.f.call(f, self.scope)
+
+    def test_contexts_in_a_scope_are_exited_in_parallel(self):
+        exited = []
+
+        @component(name='A', component_manager=self.component_manager)
+        def a():
+            yield
+            exited.append(self.barrier.wait())
+
+        @component(name='B', component_manager=self.component_manager)
+        def b():
+            yield
+            exited.append(self.barrier.wait())
+
+        @requires(a='A')
+        @requires(b='B')
+        def f(a, b):
+            pass
+
+        self.f.call(f, self.scope)
+        result = self.f.exit_scope(self.scope)
+        self.assertTrue(result.success)
+        self.assertEqual(sorted(exited), [0, 1])
+
+    def test_exit_errors_are_reported_in_the_exit_scope_result(self):
+        error = Exception('b failed')
+
+        @component(name='A', component_manager=self.component_manager)
+        def a():
+            yield
+
+        @component(name='B', component_manager=self.component_manager)
+        def b():
+            yield
+            raise error
+
+        @requires(a='A')
+        @requires(b='B')
+        def f(a, b):
+            pass
+
+        self.f.call(f, self.scope)
+        result = self.f.exit_scope(self.scope)
+        self.assertFalse(result.success)
+        self.assertEqual(result.exceptions, [error])
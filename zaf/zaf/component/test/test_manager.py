@@ -17,6 +17,22 @@ class TestComponentManager(unittest.TestCase):
         component_manager.clear_component_registry()
         self.assertEqual(len(component_manager.COMPONENT_REGISTRY), 0)
 
+    def test_registry_version_is_increased_when_registry_is_changed(self):
+        component_manager = self.get_component_manager()
+        registry = component_manager.COMPONENT_REGISTRY
+        versions = [registry.version]
+
+        def c():
+            pass
+
+        component(name='A')(c, component_manager=component_manager)
+        versions.append(registry.version)
+        component(name='A')(c, component_manager=component_manager)
+        versions.append(registry.version)
+        component_manager.clear_component_registry()
+        versions.append(registry.version)
+        self.assertEqual(len(set(versions)), 4)
+
     def test_log_component_info(self):
         with patch('zaf.component.manager.logger') as mock_logger:
             captured = []
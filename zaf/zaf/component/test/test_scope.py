@@ -63,3 +63,15 @@ class TestScope(unittest.TestCase):
 
         self.assertIs(my_instance, self.scope.get_instance(instance_id))
         self.assertIs(my_other_instance, self.scope.get_instance(my_other_instance_id))
+
+    def test_reset_after_fork_replaces_the_locks_of_the_scope_and_its_ancestors(self):
+        child = Scope('child', self.scope)
+        instance_id = _InstanceId(lambda: None, ())
+        self.scope.instantiation_lock(instance_id).acquire()
+        self.scope._internal_scope_lock.acquire()
+        child._internal_scope_lock.acquire()
+
+        child.reset_after_fork()
+        self.assertFalse(child._internal_scope_lock.locked())
+        self.assertFalse(self.scope._internal_scope_lock.locked())
+        self.assertFalse(self.scope.instantiation_lock(instance_id).locked())
@@ -1,6 +1,8 @@
 import inspect
 from types import SimpleNamespace
 
+from .manager import component_changed
+
 
 def add_cans(component, cans):
     """
@@ -34,6 +36,7 @@ def add_cans(component, cans):
     if isinstance(cans, str):
         cans = [cans]
     component._zaf_component_can.update(cans)
+    component_changed(component)
 
 
 class ComponentPropertyError(Exception):
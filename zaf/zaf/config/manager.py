@@ -1,6 +1,8 @@
 import logging
 import re
+import threading
 from collections import defaultdict
+from functools import lru_cache
 
 from zaf.config.typechecker import ConfigOptionIdTypeChecker
 
@@ -9,6 +11,9 @@ from .values import ConfigValueHolder
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+REFERENCE_PATTERN = re.compile(r'\${([\w\d.]+)}')
+KEY_SEPARATOR_PATTERN = re.compile(r'[_-]')
+
 
 class InvalidReference(Exception):
     pass
@@ -59,6 +64,27 @@ class ConfigManager(object):
     def __init__(self):
         self._config = defaultdict(ConfigValueHolder)
         self._type_checker = ConfigOptionIdTypeChecker(self)
+        self._option_keys = {}
+        self._values = {}
+        self._expanded_values = {}
+        # The generation is incremented each time the memoized values are forgotten.
+        # A value is only memoized if the generation is the same as when its computation
+        # started, otherwise a get that runs at the same time as a change of the config
+        # could memoize a value computed from the old config.
+        self._generation = 0
+        self._cache_lock = threading.Lock()
+
+    def _invalidate_cache(self):
+        """Forget all memoized values. Needs to be called when the content of the config changes."""
+        with self._cache_lock:
+            self._generation += 1
+            self._values.clear()
+            self._expanded_values.clear()
+
+    def _memoize(self, cache, key, value, generation):
+        with self._cache_lock:
+            if generation == self._generation:
+                cache[key] = value
 
     def set_default_values(self, option_ids):
         """
@@ -99,6 +125,7 @@ class ConfigManager(object):
         """
         for key, value in config.items():
             self._config[key].add(value, priority, source)
+        self._invalidate_cache()
 
     def filter_config(self, option_ids, entity_option=None, entity=None):
         """
@@ -132,9 +159,19 @@ class ConfigManager(object):
         """
         key = self._option_key(option_id, entity)
 
+        generation = self._generation
+        cache_key = None
         if key in additional_options:
             value = additional_options.get(key)
         elif key in self._config:
+            # The value only depends on the content of the config so it can be memoized.
+            # The option_id is stored with the value because different option IDs can map
+            # to the same key but have different defaults and transforms.
+            cache_key = (key, transform)
+            cached = self._values.get(cache_key)
+            if cached is not None and cached[0] == option_id:
+                return cached[1]
+
             holder = self._config[key]
             if option_id.multiple:
                 value = holder.get_combined(option_id.default)
@@ -152,11 +189,10 @@ class ConfigManager(object):
         if transform and option_id.transform is not None:
             return_value = option_id.transform(value)
 
-        try:
-            return self._expand_value(return_value, multiple=option_id.multiple)
-        except RuntimeError:
-            raise InvalidValue(
-                'Circular reference found when evaluating config value for {key}'.format(key=key))
+        return_value = self._expand_value(return_value, multiple=option_id.multiple)
+        if cache_key is not None:
+            self._memoize(self._values, cache_key, (option_id, return_value), generation)
+        return return_value
 
     def _raw_get(self, raw_key, default=None):
         """
@@ -165,21 +201,48 @@ class ConfigManager(object):
         :param raw_key: A string representing the internal storage in the config
         :return: the value from the config or default if raw_key does not exist
         """
-        try:
-            if raw_key in self._config:
-                holder = self._config[raw_key]
-                if holder.is_multiple():
-                    return self._expand_value(holder.get_combined(default), multiple=True)
-                else:
-                    return self._expand_value(holder.get_highest_priority().value)
+        if raw_key in self._config:
+            if default is None:
+                return self._get_expanded_value(raw_key, ())
+
+            holder = self._config[raw_key]
+            if holder.is_multiple():
+                return self._expand_value(holder.get_combined(default), multiple=True)
             else:
-                return self._expand_value(default)
-        except RuntimeError:
+                return self._expand_value(holder.get_highest_priority().value)
+        else:
+            return self._expand_value(default)
+
+    def _get_expanded_value(self, raw_key, resolving):
+        """
+        Get the memoized expanded value for a raw key that exists in the config.
+
+        :param raw_key: A string representing the internal storage in the config
+        :param resolving: the keys that are currently being expanded, used to detect cycles
+        :return: the expanded value
+        :raises: InvalidValue if there is a cyclic dependency between values
+        """
+        generation = self._generation
+        try:
+            return self._expanded_values[raw_key]
+        except KeyError:
+            pass
+
+        if raw_key in resolving:
             raise InvalidValue(
                 'Circular reference found when evaluating config value for {key}'.format(
                     key=raw_key))
 
-    def _expand_value(self, value, multiple=False):
+        resolving = resolving + (raw_key, )
+        holder = self._config[raw_key]
+        if holder.is_multiple():
+            value = self._expand_value(holder.get_combined(), multiple=True, resolving=resolving)
+        else:
+            value = self._expand_value(holder.get_highest_priority().value, resolving=resolving)
+        self._memoize(self._expanded_values, raw_key, value, generation)
+        return value
+
+    def _expand_value(self, value, multiple=False, resolving=()):
         """
         Expand the value by recursively expanding all the references in the value.
 
@@ -188,25 +251,29 @@ class ConfigManager(object):
 
         :param value: the value
         :param multiple: If the value is a multiple
+        :param resolving: the keys that are currently being expanded, used to detect cycles
         :return: value with all references expanded
-        :raises: RuntimeError if there is a cyclic dependency between values
+        :raises: InvalidValue if there is a cyclic dependency between values
         """
         if multiple:
-            return tuple(self._expand_value(item) for item in value)
+            return tuple(self._expand_value(item, resolving=resolving) for item in value)
         elif isinstance(value, str):
-            expanded_value = value
-            for match in re.finditer(r'\${([\w\d.]+)}', value):
-                key = match.group(1)
-                substring = '${{{key}}}'.format(key=key)
-
-                if key in self._config:
-                    expanded_value = value.replace(substring, str(self._raw_get(key)))
+            parts = _compile_template(value)
+            if len(parts) == 1:
+                return value
+
+            expanded_parts = []
+            for index, part in enumerate(parts):
+                if index % 2 == 0:
+                    expanded_parts.append(part)
+                elif part in self._config:
+                    expanded_parts.append(str(self._get_expanded_value(part, resolving)))
                 else:
                     msg = 'Error expanding value {value}. No value found for reference {ref}'.format(
-                        value=value, ref=key)
+                        value=value, ref=part)
                     raise InvalidReference(msg)
 
-            return expanded_value
+            return ''.join(expanded_parts)
         else:
             return value
 
@@ -225,6 +292,7 @@ class ConfigManager(object):
         self._type_checker.assert_type(option_id, value, entity=entity)
         key = self._option_key(option_id, entity)
         self._config[key].add(value, priority, source)
+        self._invalidate_cache()
 
     def _option_key(self, option_id, entity=None):
         """
@@ -234,15 +302,26 @@ class ConfigManager(object):
         :param entity: the entity to use if option_id.at is specified
         :return: internal key representation
         """
+        if option_id.at is None:
+            entity = None
+        elif entity is None:
+            raise ValueError(
+                'Error reading entity config option {option} without entity'.format(
+                    option=option_id.name))
+
+        cache_key = (option_id.namespace, option_id.name, entity)
+        try:
+            return self._option_keys[cache_key]
+        except KeyError:
+            pass
+
         parts = [] if option_id.namespace is None else [option_id.namespace]
-        if option_id.at is not None:
-            if entity is None:
-                raise ValueError(
-                    'Error reading entity config option {option} without entity'.format(
-                        option=option_id.name))
-            parts.append(re.sub(r'[_-]', '.', entity))
-        parts.append(re.sub(r'[_-]', '.', option_id.name))
-        return '.'.join(parts)
+        if entity is not None:
+            parts.append(KEY_SEPARATOR_PATTERN.sub('.', entity))
+        parts.append(KEY_SEPARATOR_PATTERN.sub('.', option_id.name))
+        key = '.'.join(parts)
+        self._option_keys[cache_key] = key
+        return key
 
     def print_config(self, options=()):
         """
@@ -279,3 +358,18 @@ class ConfigManager(object):
                         value=actual_value,
                         priority=config_value.priority,
                         source=config_value.source))
+
+
+@lru_cache(maxsize=1024)
+def _compile_template(value):
+    """
+    Split a string value into literal parts and references.
+
+    Even indexes in the result are literal strings and odd indexes are the keys
+    of the referenced values.
+    A value without references results in a tuple with only the value itself.
+
+    :param value: the string value
+    :return: tuple of parts
+    """
+    return tuple(REFERENCE_PATTERN.split(value))
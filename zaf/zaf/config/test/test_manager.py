@@ -1,6 +1,6 @@
 import unittest
 
-from ..manager import ConfigManager, InvalidReference
+from ..manager import ConfigManager, InvalidReference, InvalidValue
 from ..options import ConfigOptionId
 
 
@@ -152,6 +152,78 @@ class ExpandValuesTest(unittest.TestCase):
         self.config.set(option2, '${1}/value2')
         self.assertRaises(InvalidReference, self.config.get, option2)
 
+    def test_get_value_with_different_references(self):
+        self.config.set(option1, 'value1')
+        self.config.set(option2, 'value2')
+        self.config.set(option3, '${1}/${2}/value3')
+        self.assertEqual(self.config.get(option3), 'value1/value2/value3')
+
+    def test_get_value_with_reference_to_itself_raises_invalid_value(self):
+        self.config.set(option1, '${1}/value1')
+        with self.assertRaisesRegex(InvalidValue, 'Circular reference'):
+            self.config.get(option1)
+
+    def test_get_value_with_circular_references_raises_invalid_value(self):
+        self.config.set(option1, '${3}/value1')
+        self.config.set(option2, '${1}/value2')
+        self.config.set(option3, '${2}/value3')
+        with self.assertRaisesRegex(InvalidValue, 'Circular reference'):
+            self.config.get(option3)
+
+
+class TestValueCache(unittest.TestCase):
+
+    def setUp(self):
+        self.config = ConfigManager()
+
+    def test_get_returns_cached_value_when_config_is_unchanged(self):
+        self.config.set(option1, 'value1')
+        self.config.set(option2, '${1}/value2')
+        self.assertIs(self.config.get(option2), self.config.get(option2))
+
+    def test_set_invalidates_referencing_values(self):
+        self.config.set(option1, 'value1')
+        self.config.set(option2, '${1}/value2')
+        self.assertEqual(self.config.get(option2), 'value1/value2')
+        self.config.set(option1, 'new', priority=2)
+        self.assertEqual(self.config.get(option2), 'new/value2')
+
+    def test_update_config_invalidates_referencing_values(self):
+        self.config.set(option1, 'value1')
+        self.config.set(option2, '${1}/value2')
+        self.assertEqual(self.config._raw_get('2'), 'value1/value2')
+        self.config.update_config({'1': 'new'}, priority=2, source='unittest')
+        self.assertEqual(self.config._raw_get('2'), 'new/value2')
+
+    def test_additional_options_are_not_cached(self):
+        self.config.set(option1, 'value1')
+        self.assertEqual(self.config.get(option1, additional_options={'1': 'value2'}), 'value2')
+        self.assertEqual(self.config.get(option1), 'value1')
+
+    def test_get_with_and_without_transform_are_cached_separately(self):
+        transformed = ConfigOptionId('1', '', transform=lambda value: value.upper())
+        self.config.set(transformed, 'value1')
+        self.assertEqual(self.config.get(transformed), 'VALUE1')
+        self.assertEqual(self.config.get(transformed, transform=False), 'value1')
+
+    def test_option_ids_with_same_key_are_cached_separately(self):
+        transformed = ConfigOptionId('1', '', transform=lambda value: value.upper())
+        self.config.set(option1, 'value1')
+        self.assertEqual(self.config.get(transformed), 'VALUE1')
+        self.assertEqual(self.config.get(option1), 'value1')
+
+    def test_value_computed_before_a_concurrent_set_is_not_cached(self):
+
+        def set_while_getting(value):
+            # Simulates a set from another thread after the value has been computed
+            self.config.update_config({'1': 'new'}, priority=2, source='unittest')
+            return value
+
+        transformed = ConfigOptionId('1', '', transform=set_while_getting)
+        self.config.set(option1, 'value1')
+        self.assertEqual(self.config.get(transformed), 'value1')
+        self.assertEqual(self.config.get(transformed), 'new')
+
 
 class TestSetDefaultValues(unittest.TestCase):
 
@@ -0,0 +1,304 @@
+"""
+Index of the entry points that are used to find addons.
+
+Finding the addons requires listing all site-packages directories on the Python path,
+following all egg-links and parsing all entry_points.txt files.
+To avoid doing this on every startup the result is stored in an on-disk index that is
+reused as long as the modification times of the scanned directories and files are unchanged.
+
+The index also remembers the basic properties of the extensions that it has seen, like the name
+and the load order. This makes it possible to register an extension without importing it.
+The extension is imported the first time something else is needed from it, for example when
+it is enabled.
+
+The index is stored in *$XDG_CACHE_HOME/zaf/entry_points.json*.
+A different location can be specified with the ZAF_ENTRY_POINT_INDEX environment variable
+and setting it to an empty string disables the index.
+"""
+
+import configparser
+import functools
+import json
+import logging
+import os
+import sys
+import tempfile
+from importlib import import_module
+
+from zaf.builtin.startup.profiler import startup_profiler
+
+from .extension import ExtensionType
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+ENTRY_POINT_INDEX_VERSION = 1
+
+ENTRY_POINT_INDEX_ENV = 'ZAF_ENTRY_POINT_INDEX'
+
+
+def default_index_path():
+    """
+    Get the path to the entry point index.
+
+    :return: the path or None if the index is disabled
+    """
+    path = os.environ.get(ENTRY_POINT_INDEX_ENV)
+    if path is not None:
+        return path if path else None
+
+    cache_dir = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_dir, 'zaf', 'entry_points.json')
+
+
+def load_entry_point(entry_point):
+    module_name, attr = entry_point.split(':')
+    module = import_module(module_name)
+    try:
+        return getattr(module, attr)
+    except AttributeError as e:
+        raise ImportError(str(e))
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _find_entry_points(path, config, sources):
+
+    def _follow_egg_link(egg_link_path):
+        with open(egg_link_path, 'r') as f:
+            egg_info_path = f.readline().strip()
+            egg_info_paths = map(
+                functools.partial(os.path.join, egg_info_path), os.listdir(egg_info_path))
+            return filter(lambda p: p.endswith('.egg-info'), egg_info_paths)
+
+    sources[path] = _mtime(path)
+    paths = list(map(functools.partial(os.path.join, path), os.listdir(path)))
+    all_infos = list(filter(lambda p: p.endswith('.dist-info') or p.endswith('.egg-info'), paths))
+    for egg_link_path in filter(lambda p: p.endswith('.egg-link'), paths):
+        # Develop installs update the entry points outside of the site-packages directory
+        egg_infos = list(_follow_egg_link(egg_link_path))
+        for egg_info in egg_infos:
+            entry_points_path = os.path.join(egg_info, 'entry_points.txt')
+            sources[entry_points_path] = _mtime(entry_points_path)
+        all_infos.extend(egg_infos)
+
+    for f in [f for f in all_infos if os.path.exists(f)]:
+        config.read(os.path.join(f, 'entry_points.txt'))
+
+
+def _site_packages_paths():
+    return [path for path in sys.path if 'site-package' in path and os.path.isdir(path)]
+
+
+class EntryPointIndex(object):
+    """
+    On-disk index of entry points and the extensions that they refer to.
+
+    The entry points are rescanned if any of the scanned site-packages directories or
+    entry_points.txt files for develop installs have changed.
+    The stored extension information is only used if the source file of the extension
+    is unchanged.
+    """
+
+    def __init__(self, path=None):
+        """
+        Create a new index.
+
+        :param path: the path to the index file, None to not store the index
+        """
+        self._path = path
+        self._paths = []
+        self._sources = {}
+        self._entry_points = {}
+        self._extensions = {}
+        self._modified = False
+        self._loaded = False
+
+    def entry_points(self, namespace):
+        """
+        Get the entry points for a namespace.
+
+        :param namespace: the namespace
+        :return: list of entry point strings on the form 'module:attribute'
+        """
+        if not self._loaded:
+            self._load()
+        return list(self._entry_points.get(namespace, {}).values())
+
+    def extension_info(self, entry_point):
+        """
+        Get the stored information about the extension that an entry point refers to.
+
+        :param entry_point: the entry point
+        :return: dict with the extension information or None if it is unknown or outdated
+        """
+        info = self._extensions.get(entry_point)
+        if info is None or _mtime(info['source']) != info['source_mtime']:
+            return None
+        return info
+
+    def add_extension(self, entry_point, extension):
+        """
+        Store information about an extension that has been imported.
+
+        :param entry_point: the entry point that refers to the extension
+        :param extension: the extension class
+        """
+        module = sys.modules.get(extension.__module__)
+        source = getattr(module, '__file__', None)
+        if source is None:
+            return
+
+        info = {
+            'name': extension.name,
+            'module': extension.__module__,
+            'extension_type': extension.extension_type.name,
+            'load_order': extension.load_order,
+            'default_enabled': extension.default_enabled,
+            'replaces': list(extension.replaces),
+            'source': source,
+            'source_mtime': _mtime(source),
+        }
+        if self._extensions.get(entry_point) != info:
+            self._extensions[entry_point] = info
+            self._modified = True
+
+    def save(self):
+        """Write the index to disk if it has been modified."""
+        if self._path is None or not self._modified:
+            return
+
+        content = {
+            'version': ENTRY_POINT_INDEX_VERSION,
+            'paths': self._paths,
+            'sources': self._sources,
+            'entry_points': self._entry_points,
+            'extensions': self._extensions,
+        }
+        try:
+            directory = os.path.dirname(self._path)
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temporary file and rename it to not expose half written
+            # files to concurrently starting applications
+            with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as f:
+                json.dump(content, f)
+            os.replace(f.name, self._path)
+            self._modified = False
+        except OSError as e:
+            logger.debug('Could not write entry point index {path}: {msg}'.format(
+                path=self._path, msg=str(e)))
+
+    def _load(self):
+        self._loaded = True
+        content = self._read()
+        paths = _site_packages_paths()
+        if content is not None and self._is_up_to_date(content, paths):
+            self._paths = paths
+            self._sources = content['sources']
+            self._entry_points = content['entry_points']
+            self._extensions = content['extensions']
+        else:
+            self._scan(paths)
+            if content is not None:
+                self._extensions = content.get('extensions', {})
+            self._modified = True
+
+    def _read(self):
+        if self._path is None:
+            return None
+        try:
+            with open(self._path, 'r') as f:
+                content = json.load(f)
+            if content.get('version') == ENTRY_POINT_INDEX_VERSION:
+                return content
+        except (OSError, ValueError, AttributeError, KeyError) as e:
+            logger.debug('Could not read entry point index {path}: {msg}'.format(
+                path=self._path, msg=str(e)))
+        return None
+
+    def _is_up_to_date(self, content, paths):
+        if content['paths'] != paths:
+            return False
+        return all(_mtime(path) == mtime for path, mtime in content['sources'].items())
+
+    def _scan(self, paths):
+        config = configparser.ConfigParser()
+        self._paths = paths
+        self._sources = {}
+        for path in paths:
+            _find_entry_points(path, config, self._sources)
+        self._entry_points = {
+            section: dict(config[section])
+            for section in config.sections()
+        }
+
+
+class LazyExtension(object):
+    """
+    Stand-in for an extension that has not been imported yet.
+
+    The attributes that are stored in the entry point index are available directly and
+    everything else is taken from the real extension, which is imported on first use.
+    """
+
+    def __init__(self, entry_point, info, index):
+        self.__dict__.update(
+            {
+                '_entry_point': entry_point,
+                '_index': index,
+                '_extension': None,
+                '_attributes': {},
+                'name': info['name'],
+                '__module__': info['module'],
+                'extension_type': ExtensionType[info['extension_type']],
+                'load_order': info['load_order'],
+                'default_enabled': info['default_enabled'],
+                'replaces': info['replaces'],
+            })
+
+    @property
+    def entry_point(self):
+        return self._entry_point
+
+    @property
+    def is_resolved(self):
+        return self._extension is not None
+
+    def resolve(self):
+        """
+        Import the extension.
+
+        :return: the extension class
+        """
+        if self._extension is None:
+            logger.debug('Importing lazily registered extension {name}'.format(name=self.name))
+            with startup_profiler.section('import {entry_point}'.format(
+                    entry_point=self._entry_point)):
+                extension = load_entry_point(self._entry_point)
+            for name, value in self._attributes.items():
+                setattr(extension, name, value)
+            self.__dict__['_extension'] = extension
+            self._index.add_extension(self._entry_point, extension)
+            self._index.save()
+        return self._extension
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name, value):
+        self.__dict__[name] = value
+        if self._extension is None:
+            self._attributes[name] = value
+        else:
+            setattr(self._extension, name, value)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return 'LazyExtension({entry_point})'.format(entry_point=self._entry_point)
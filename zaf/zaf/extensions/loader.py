@@ -1,3 +1,4 @@
+from zaf.builtin.startup.profiler import startup_profiler
 from zaf.commands import COMMAND, COMMANDS
 from zaf.config.options import ConfigOption, handle_duplicate_config_options
 from zaf.extensions import ALL_EXTENSIONS, DISABLEABLE_EXTENSIONS, ENABLED_EXTENSIONS, \
@@ -41,37 +42,53 @@ class ExtensionLoader(object):
         main_config_options = self._initial_config_options()
         commands_with_config_options = {}
 
-        self._find_addons(entry_points)
-        self._enable_always_enabled_extensions()
-        self._add_extensions_config_options(
-            main_config_options, commands_with_config_options, self.ALWAYS_ENABLED_START,
-            self.ALWAYS_ENABLED_END)
-        self._initialize_framework_extensions(
-            main_config_options, commands_with_config_options, self.PLUGIN_PATH_START,
-            self.PLUGIN_PATH_END)
-
-        self._find_plugins()
-        self._add_extension_enabled_config_options(main_config_options)
-        self._initialize_framework_extensions(
-            main_config_options, commands_with_config_options, self.DISABLE_START, self.DISABLE_END)
-        self._enable_rest_of_extensions()
-
-        self._add_extensions_config_options(
-            main_config_options, commands_with_config_options, self.REST_START)
-
-        self._initialize_framework_extensions(
-            main_config_options, commands_with_config_options, self.REST_START)
+        with startup_profiler.section('find_addons'):
+            self._find_addons(entry_points)
+        with startup_profiler.section('enable_extensions'):
+            self._enable_always_enabled_extensions()
+        with startup_profiler.section('add_config_options'):
+            self._add_extensions_config_options(
+                main_config_options, commands_with_config_options, self.ALWAYS_ENABLED_START,
+                self.ALWAYS_ENABLED_END)
+        with startup_profiler.section('initialize_framework_extensions'):
+            self._initialize_framework_extensions(
+                main_config_options, commands_with_config_options, self.PLUGIN_PATH_START,
+                self.PLUGIN_PATH_END)
+
+        with startup_profiler.section('find_plugins'):
+            self._find_plugins()
+        with startup_profiler.section('add_config_options'):
+            self._add_extension_enabled_config_options(main_config_options)
+        with startup_profiler.section('initialize_framework_extensions'):
+            self._initialize_framework_extensions(
+                main_config_options, commands_with_config_options, self.DISABLE_START,
+                self.DISABLE_END)
+        with startup_profiler.section('enable_extensions'):
+            self._enable_rest_of_extensions()
+
+        with startup_profiler.section('add_config_options'):
+            self._add_extensions_config_options(
+                main_config_options, commands_with_config_options, self.REST_START)
+
+        with startup_profiler.section('initialize_framework_extensions'):
+            self._initialize_framework_extensions(
+                main_config_options, commands_with_config_options, self.REST_START)
 
         self.config.log_config()
 
-        command = self._select_command(commands_with_config_options.keys())
+        with startup_profiler.section('select_command'):
+            command = self._select_command(commands_with_config_options.keys())
 
         if command is not None:
-            self.messagebus.define_endpoints_and_messages(
-                self.extension_manager.get_endpoints_and_messages(command))
-            self.extension_manager.initialize_command_extensions(self.config, command)
-            self.extension_manager.register_components(self.component_manager)
-            self.extension_manager.register_dispatchers(self.messagebus)
+            with startup_profiler.section('define_endpoints_and_messages'):
+                self.messagebus.define_endpoints_and_messages(
+                    self.extension_manager.get_endpoints_and_messages(command))
+            with startup_profiler.section('initialize_command_extensions'):
+                self.extension_manager.initialize_command_extensions(self.config, command)
+            with startup_profiler.section('register_components'):
+                self.extension_manager.register_components(self.component_manager)
+            with startup_profiler.section('register_dispatchers'):
+                self.extension_manager.register_dispatchers(self.messagebus)
             self.component_manager.log_components_info()
         else:
             raise Exception('Error: No extension selected the command')
@@ -188,20 +205,25 @@ class ExtensionLoader(object):
         """
         for extension in self.extension_manager.framework_extensions(
                 load_order_start=load_order_start, load_order_end=load_order_end):
-
-            extension_instances = self.extension_manager.initialize_framework_extension(
-                extension, self.config)
-            if hasattr(extension, 'get_config'):
-                for extension_instance in extension_instances:
-                    extension_config = extension_instance.get_config(
-                        self.config, main_config_options, commands_with_config_options)
-
-                    if isinstance(extension_config, ExtensionConfig):
-                        extension_config = [extension_config]
-
-                    for config in extension_config:
-                        source = config.source if config.source else extension.name
-                        self.config.update_config(config.config, config.priority, source)
+            with startup_profiler.section(extension.name):
+                self._initialize_framework_extension(
+                    extension, main_config_options, commands_with_config_options)
+
+    def _initialize_framework_extension(
+            self, extension, main_config_options, commands_with_config_options):
+        extension_instances = self.extension_manager.initialize_framework_extension(
+            extension, self.config)
+        if hasattr(extension, 'get_config'):
+            for extension_instance in extension_instances:
+                extension_config = extension_instance.get_config(
+                    self.config, main_config_options, commands_with_config_options)
+
+                if isinstance(extension_config, ExtensionConfig):
+                    extension_config = [extension_config]
+
+                for config in extension_config:
+                    source = config.source if config.source else extension.name
+                    self.config.update_config(config.config, config.priority, source)
 
     def _find_plugins(self):
         """
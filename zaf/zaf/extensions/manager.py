@@ -1,19 +1,18 @@
-import configparser
 import copy
-import functools
 import glob
 import inspect
 import logging
 import os
 import sys
 from collections import OrderedDict, defaultdict
-from importlib import import_module
 
+from zaf.builtin.startup.profiler import startup_profiler
 from zaf.config.options import ConfigOptionId
 from zaf.messages.decorator import get_dispatcher_descriptors
 from zaf.utils.pythonloader import load_module_or_package, load_submodules_and_subpackages
 from zaf.utils.subgrouplist import eval_subgroup_list
 
+from .entrypoints import EntryPointIndex, LazyExtension, default_index_path, load_entry_point
 from .extension import ExtensionType, is_concrete_extension
 
 logger = logging.getLogger(__name__)
@@ -44,41 +43,30 @@ class InvalidDispatcherEntityError(Exception):
     pass
 
 
-def _find_entry_points(path, config):
-
-    def _follow_egg_link(egg_link_path):
-        with open(egg_link_path, 'r') as f:
-            egg_info_path = f.readline().strip()
-            egg_info_paths = map(
-                functools.partial(os.path.join, egg_info_path), os.listdir(egg_info_path))
-            return filter(lambda p: p.endswith('.egg-info'), egg_info_paths)
-
-    paths = list(map(functools.partial(os.path.join, path), os.listdir(path)))
-    all_infos = list(filter(lambda p: p.endswith('.dist-info') or p.endswith('.egg-info'), paths))
-    for egg_link_path in filter(lambda p: p.endswith('.egg-link'), paths):
-        all_infos.extend(_follow_egg_link(egg_link_path))
-
-    for f in [f for f in all_infos if os.path.exists(f)]:
-        config.read(os.path.join(f, 'entry_points.txt'))
-
-
-def _load_entry_point(entry_point):
-    module_name, attr = entry_point.split(':')
-    module = import_module(module_name)
-    try:
-        return getattr(module, attr)
-    except AttributeError as e:
-        raise ImportError(str(e))
+def _find_extensions_by_namespace(namespace, index):
+    """
+    Find the extensions that are registered as entry points in the namespace.
 
+    Extensions that are known by the index are registered lazily and are not
+    imported until they are used.
 
-def _find_extensions_by_namespace(namespace):
-    config = configparser.ConfigParser()
-    for path in filter(lambda path: 'site-package' in path, sys.path):
-        _find_entry_points(path, config)
-    try:
-        return {_load_entry_point(entry_point) for entry_point in config[namespace].values()}
-    except KeyError:
-        return set()
+    :param namespace: the entry point namespace
+    :param index: the EntryPointIndex to use
+    :return: list of extensions
+    """
+    extensions = []
+    for entry_point in OrderedDict.fromkeys(index.entry_points(namespace)):
+        info = index.extension_info(entry_point)
+        if info is not None:
+            extensions.append(LazyExtension(entry_point, info, index))
+        else:
+            with startup_profiler.section('import {entry_point}'.format(entry_point=entry_point)):
+                extension = load_entry_point(entry_point)
+            index.add_extension(entry_point, extension)
+            if extension not in extensions:
+                extensions.append(extension)
+    index.save()
+    return extensions
 
 
 def _find_extensions_by_inspection(inspectables):
@@ -115,13 +103,21 @@ def _is_extension_active(filtered_config, extension):
 
 class ExtensionManager(object):
 
-    def __init__(self):
+    def __init__(self, entry_point_index=None):
+        """
+        Create a new extension manager.
+
+        :param entry_point_index: the EntryPointIndex to find addons with,
+                                  if None the index in the default location is used
+        """
         self._all_extensions = []
         self._all_dispatchers = []
         self._enabled_extensions = []
         self._entity_per_instance = defaultdict(None)
         self.command_extension_instances = []
         self.framework_extension_instances = []
+        self._entry_point_index = entry_point_index if entry_point_index is not None \
+            else EntryPointIndex(default_index_path())
 
     def extensions_with_name(self, name):
         return [extension for extension in self._all_extensions if extension.name == name]
@@ -139,6 +135,10 @@ class ExtensionManager(object):
 
         :param extension: the extension to enable
         """
+        if isinstance(extension, LazyExtension):
+            resolved = extension.resolve()
+            self._all_extensions[self._all_extensions.index(extension)] = resolved
+            extension = resolved
         self._enabled_extensions.append(extension)
 
     def enable_all_extensions(self):
@@ -156,7 +156,7 @@ class ExtensionManager(object):
 
         :param namespace: the namespace to use when looking for addons
         """
-        for addon in _find_extensions_by_namespace(namespace):
+        for addon in _find_extensions_by_namespace(namespace, self._entry_point_index):
             addon.namespace = namespace
             self._all_extensions.append(addon)
 
@@ -182,8 +182,9 @@ class ExtensionManager(object):
             packages.append(package)
 
         for package in packages:
-            root = load_module_or_package(package)
-            extensions = _find_extensions_by_inspection(load_submodules_and_subpackages(root))
+            with startup_profiler.section('import {package}'.format(package=package)):
+                root = load_module_or_package(package)
+                extensions = _find_extensions_by_inspection(load_submodules_and_subpackages(root))
             for extension in extensions:
                 self._all_extensions.append(extension)
 
@@ -429,6 +430,8 @@ class ExtensionManager(object):
                     additional_kwargs = {}
                     if descriptor.max_workers is not None:
                         additional_kwargs['max_workers'] = descriptor.max_workers
+                    if descriptor.batch:
+                        additional_kwargs['batch'] = descriptor.batch
 
                     dispatcher = descriptor.dispatcher_constructor(
                         messagebus, method, priority=descriptor.priority, **additional_kwargs)
@@ -0,0 +1,126 @@
+import os
+import sys
+import tempfile
+import unittest
+from textwrap import dedent
+from unittest.mock import ANY, patch
+
+from ..entrypoints import EntryPointIndex, LazyExtension
+from ..extension import ExtensionType
+from ..manager import ExtensionManager
+
+ADDON_MODULE = 'zaf_entry_point_index_test_addon'
+
+ADDON_SOURCE = dedent(
+    """
+    from zaf.extensions.extension import AbstractExtension, FrameworkExtension
+
+
+    @FrameworkExtension('indexedaddon', load_order=42, default_enabled=False)
+    class IndexedAddon(AbstractExtension):
+        pass
+    """)
+
+ENTRY_POINTS = dedent(
+    """
+    [zaf.index_test_addons]
+    indexedaddon = {module}:IndexedAddon
+    """.format(module=ADDON_MODULE))
+
+
+class TestEntryPointIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.tmp.name, 'cache', 'entry_points.json')
+        self.source_dir = os.path.join(self.tmp.name, 'src')
+        self.site_packages = os.path.join(self.tmp.name, 'site-packages')
+        os.makedirs(self.source_dir)
+        dist_info = os.path.join(self.site_packages, 'indexedaddon-1.0.dist-info')
+        os.makedirs(dist_info)
+        with open(os.path.join(self.source_dir, ADDON_MODULE + '.py'), 'w') as f:
+            f.write(ADDON_SOURCE)
+        with open(os.path.join(dist_info, 'entry_points.txt'), 'w') as f:
+            f.write(ENTRY_POINTS)
+
+        self.sys_path = patch.object(sys, 'path', [self.source_dir, self.site_packages] + sys.path)
+        self.sys_path.start()
+
+    def tearDown(self):
+        self.sys_path.stop()
+        sys.modules.pop(ADDON_MODULE, None)
+        self.tmp.cleanup()
+
+    def find_addons(self):
+        em = ExtensionManager(EntryPointIndex(self.index_path))
+        em.find_addons('zaf.index_test_addons')
+        return em
+
+    def test_first_lookup_imports_the_extension_and_writes_the_index(self):
+        em = self.find_addons()
+        self.assertIn(ADDON_MODULE, sys.modules)
+        self.assertEqual(em.all_extensions[0].__name__, 'IndexedAddon')
+        self.assertTrue(os.path.exists(self.index_path))
+
+    def test_extensions_in_index_are_registered_without_being_imported(self):
+        self.find_addons()
+        sys.modules.pop(ADDON_MODULE)
+
+        em = self.find_addons()
+        extension = em.all_extensions[0]
+        self.assertIsInstance(extension, LazyExtension)
+        self.assertEqual(extension.name, 'indexedaddon')
+        self.assertEqual(extension.load_order, 42)
+        self.assertEqual(extension.extension_type, ExtensionType.FRAMEWORK)
+        self.assertFalse(extension.default_enabled)
+        self.assertEqual(extension.namespace, 'zaf.index_test_addons')
+        self.assertNotIn(ADDON_MODULE, sys.modules)
+
+    def test_enabling_a_lazy_extension_imports_it(self):
+        self.find_addons()
+        sys.modules.pop(ADDON_MODULE)
+
+        em = self.find_addons()
+        em.enable_all_extensions()
+        self.assertIn(ADDON_MODULE, sys.modules)
+        extension = em.enabled_extensions[0]
+        self.assertEqual(extension.__name__, 'IndexedAddon')
+        self.assertEqual(extension.namespace, 'zaf.index_test_addons')
+        self.assertEqual(em.all_extensions, [extension])
+
+    def test_index_is_rescanned_when_site_packages_changes(self):
+        index = EntryPointIndex(self.index_path)
+        self.assertEqual(len(index.entry_points('zaf.index_test_addons')), 1)
+        index.save()
+
+        os.makedirs(os.path.join(self.site_packages, 'other-1.0.dist-info'))
+        os.utime(self.site_packages, (0, 0))
+        with patch('zaf.extensions.entrypoints.EntryPointIndex._scan') as scan:
+            EntryPointIndex(self.index_path).entry_points('zaf.index_test_addons')
+            scan.assert_called_once_with(ANY)
+
+    def test_index_is_reused_when_nothing_has_changed(self):
+        index = EntryPointIndex(self.index_path)
+        index.entry_points('zaf.index_test_addons')
+        index.save()
+
+        with patch('zaf.extensions.entrypoints.EntryPointIndex._scan') as scan:
+            self.assertEqual(
+                EntryPointIndex(self.index_path).entry_points('zaf.index_test_addons'),
+                ['{module}:IndexedAddon'.format(module=ADDON_MODULE)])
+            scan.assert_not_called()
+
+    def test_extension_info_is_not_used_when_the_source_has_changed(self):
+        self.find_addons()
+        os.utime(os.path.join(self.source_dir, ADDON_MODULE + '.py'), (0, 0))
+
+        em = self.find_addons()
+        self.assertNotIsInstance(em.all_extensions[0], LazyExtension)
+
+    def test_unreadable_index_is_ignored(self):
+        os.makedirs(os.path.dirname(self.index_path))
+        with open(self.index_path, 'w') as f:
+            f.write('not json')
+
+        index = EntryPointIndex(self.index_path)
+        self.assertEqual(len(index.entry_points('zaf.index_test_addons')), 1)
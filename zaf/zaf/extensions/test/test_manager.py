@@ -14,6 +14,7 @@ from zaf.messages.dispatchers import CallbackDispatcher, ConcurrentDispatcher, \
 from zaf.messages.message import EndpointId, MessageId
 from zaf.utils.object import TypeComparator
 
+from ..entrypoints import EntryPointIndex
 from ..extension import AbstractExtension, ExtensionType, FrameworkExtension
 from ..manager import ExtensionManager, _find_extensions_by_inspection
 from .addons.testcommandaddon import TESTCOMMANDADDON_COMMAND
@@ -58,7 +59,7 @@ class TestFindExtensionsByInspection(unittest.TestCase):
 class TestExtensionManager(unittest.TestCase):
 
     def setUp(self):
-        self.em = ExtensionManager()
+        self.em = ExtensionManager(EntryPointIndex())
 
     def test_the_registry_is_initially_empty(self):
         self.assertEqual(self.em.command_extension_instances, [])
@@ -46,8 +46,8 @@ Both methods of setting up dispatchers may be combined in a single extension.
 
 import inspect
 
-from .dispatchers import CallbackDispatcher, ConcurrentDispatcher, SequentialDispatcher, \
-    ThreadPoolDispatcher
+from .dispatchers import AsyncioDispatcher, CallbackDispatcher, ConcurrentDispatcher, \
+    SequentialDispatcher, ThreadPoolDispatcher
 
 
 class DispatcherDescriptor(object):
@@ -61,7 +61,8 @@ class DispatcherDescriptor(object):
             entity_option_id=None,
             optional=False,
             max_workers=None,
-            priority=0):
+            priority=0,
+            batch=False):
         self.dispatcher_constructor = dispatcher_constructor
         self.message_ids = message_ids
         self.endpoint_ids = endpoint_ids
@@ -69,6 +70,7 @@ class DispatcherDescriptor(object):
         self.optional = optional
         self.max_workers = max_workers
         self.priority = priority
+        self.batch = batch
         self.entity = None
         self.active = True
 
@@ -89,6 +91,9 @@ class DispatcherDecorator(object):
 
     The max_workers parameter is only applicable for the threadpool_dispatcher decorator.
     It can be either a number or a ConfigOptionId that the extension uses.
+
+    The batch parameter is only applicable for the sequential_dispatcher and threadpool_dispatcher
+    decorators. If set, the decorated method is called with a MessageBatch instead of a Message.
     """
 
     def __init__(self, dispatcher_constructor):
@@ -101,13 +106,14 @@ class DispatcherDecorator(object):
             entity_option_id=None,
             optional=False,
             max_workers=None,
-            priority=0):
+            priority=0,
+            batch=False):
 
         def _decorator(function):
             _validate_function_argument(function)
             dispatcher_descriptor = DispatcherDescriptor(
                 self._dispatcher_constructor, message_ids, endpoint_ids, entity_option_id, optional,
-                max_workers, priority)
+                max_workers, priority, batch)
             try:
                 function._zaf_dispatcher_descriptors.append(dispatcher_descriptor)
             except AttributeError:
@@ -121,6 +127,7 @@ sequential_dispatcher = DispatcherDecorator(SequentialDispatcher)
 callback_dispatcher = DispatcherDecorator(CallbackDispatcher)
 concurrent_dispatcher = DispatcherDecorator(ConcurrentDispatcher)
 threadpool_dispatcher = DispatcherDecorator(ThreadPoolDispatcher)
+asyncio_dispatcher = DispatcherDecorator(AsyncioDispatcher)
 
 
 def get_dispatcher_descriptors(extension):
@@ -4,17 +4,22 @@ Dispatchers let you listen for events and requests on a messagebus, and call a h
 If several dispatchers are registered on the same message, they are called in order of priority, highest first.
 """
 import abc
+import asyncio
+import functools
+import inspect
 import logging
 import os
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait
 from queue import Queue
-from threading import RLock, Thread
+from threading import Lock, RLock, Thread
 
-from .message import Message
+from .message import Message, MessageBatch
 from .messagebus import NoSuchDispatcher, NoSuchEndpoint, NoSuchMessage
+from .tracing import MessageTracer
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
+tracer = MessageTracer(logger)
 
 
 class Dispatcher(metaclass=abc.ABCMeta):
@@ -23,7 +28,7 @@ class Dispatcher(metaclass=abc.ABCMeta):
     def __init__(self, messagebus, priority=0):
         self._messagebus = messagebus
         self._priority = priority
-        self._active_count = ActiveCount()
+        self._active_count = ActiveCount(messagebus.activity_changed)
         self._component_factory = messagebus.component_factory
         self._scope = self._component_factory.enter_scope('dispatcher', messagebus.scope)
 
@@ -44,7 +49,7 @@ class Dispatcher(metaclass=abc.ABCMeta):
         except (NoSuchMessage, NoSuchEndpoint) as e:
             if optional is False:
                 raise
-            logger.debug('Ignoring optional dispatcher: {msg}'.format(msg=str(e)))
+            logger.debug('Ignoring optional dispatcher: %s', e)
 
     def deregister(self, message_ids, endpoint_ids=None, entities=None):
         """
@@ -100,6 +105,17 @@ class Dispatcher(metaclass=abc.ABCMeta):
         """
         pass
 
+    def dispatch_batch(self, message_batch):
+        """
+        Triggered by the messagebus when a batch of messages is sent.
+
+        The default implementation dispatches the messages one by one.
+
+        :param message_batch: the MessageBatch object
+        """
+        for message in message_batch:
+            self.dispatch(message)
+
 
 class ThreadPoolDispatcher(Dispatcher):
     """
@@ -107,12 +123,18 @@ class ThreadPoolDispatcher(Dispatcher):
 
     This dispatcher has a pool of threads, allowing it to execute several handle_message at once.
     If all the threads are occupied, incoming messages are put in a queue.
+
+    A batch of messages is queued as a single work item and the messages in it are handled in order.
+    With batch=True, handle_message is called once per batch with a MessageBatch
+    instead of once per message. Single messages are then delivered as a batch of one.
     """
 
-    def __init__(self, messagebus, handle_message, max_workers=None, priority=0):
+    def __init__(self, messagebus, handle_message, max_workers=None, priority=0, batch=False):
         super().__init__(messagebus, priority)
         self._handle_message = handle_message
+        self._log_repr = None
         self._max_workers = max_workers
+        self._batch = batch
         self._executor = None
         self._stopped = True
 
@@ -131,16 +153,46 @@ class ThreadPoolDispatcher(Dispatcher):
         self._stopped = True
 
     def dispatch(self, message):
-        logger.debug(
-            "Adding message '{message_name}' to queue for '{handler}'".format(
-                message_name=message.message_id.name, handler=self.log_repr()))
+        if tracer.enabled:
+            logger.debug(
+                "Adding message '%s' to queue for '%s'", message.message_id.name,
+                self.log_repr())
+
+        if self._batch:
+            self._executor.submit(
+                self.execute_handle_message, MessageBatch.from_message(message))
+        else:
+            self._executor.submit(self.execute_handle_message, message)
+
+    def dispatch_batch(self, message_batch):
+        if tracer.enabled:
+            logger.debug(
+                "Adding batch of %s '%s' messages to queue for '%s'", len(message_batch),
+                message_batch.message_id.name, self.log_repr())
+
+        self._executor.submit(self.execute_handle_message_batch, message_batch)
+
+    def execute_handle_message_batch(self, message_batch):
+        if self._batch:
+            return self.execute_handle_message(message_batch)
 
-        self._executor.submit(self.execute_handle_message, message)
+        # The dispatcher must stay active between the messages, otherwise
+        # wait_for_not_active can return before the whole batch has been handled
+        self._active_count.increase()
+        try:
+            for message in message_batch:
+                try:
+                    self.execute_handle_message(message)
+                except Exception:
+                    # Already logged, and a failing message must not stop the rest of the batch
+                    pass
+        finally:
+            self._active_count.decrease()
 
     def execute_handle_message(self, message):
-        logger.debug(
-            "Receiving message '{message_name}' in '{handler}'".format(
-                message_name=message.message_id.name, handler=self.log_repr()))
+        if tracer.enabled:
+            logger.debug(
+                "Receiving message '%s' in '%s'", message.message_id.name, self.log_repr())
 
         # wrap with component factory must be closest to the real handle_message to be able to read
         # the requires decorator from it
@@ -159,14 +211,17 @@ class ThreadPoolDispatcher(Dispatcher):
         return self._executor._work_queue.qsize()
 
     def log_repr(self):
-        try:
-            return '{module}.{qualname}'.format(
-                module=self._handle_message.__module__, qualname=self._handle_message.__qualname__)
-        except Exception:
-            # Can fail if using a lambda as handle_message
-            # This should be fixed with a better log_repr implementation
-            # The exising one gives quite ugly and unreadable logs
-            return 'unknown'
+        if self._log_repr is None:
+            try:
+                self._log_repr = '{module}.{qualname}'.format(
+                    module=self._handle_message.__module__,
+                    qualname=self._handle_message.__qualname__)
+            except Exception:
+                # Can fail if using a lambda as handle_message
+                # This should be fixed with a better log_repr implementation
+                # The exising one gives quite ugly and unreadable logs
+                self._log_repr = 'unknown'
+        return self._log_repr
 
 
 class SequentialDispatcher(ThreadPoolDispatcher):
@@ -177,8 +232,9 @@ class SequentialDispatcher(ThreadPoolDispatcher):
     This ensures that messages are handled in the same order as they are received.
     """
 
-    def __init__(self, messagebus, handle_message, priority=0):
-        super().__init__(messagebus, handle_message, max_workers=1, priority=priority)
+    def __init__(self, messagebus, handle_message, priority=0, batch=False):
+        super().__init__(
+            messagebus, handle_message, max_workers=1, priority=priority, batch=batch)
 
 
 class CallbackDispatcher(Dispatcher):
@@ -192,12 +248,13 @@ class CallbackDispatcher(Dispatcher):
     def __init__(self, messagebus, handle_message, priority=0, wrap_with_thread=False):
         super().__init__(messagebus, priority)
         self._handle_message = handle_message
+        self._log_repr = None
         self._wrap_with_thread = wrap_with_thread
 
     def dispatch(self, message):
-        logger.debug(
-            "Dispatching message '{message_name}' to '{handler}'".format(
-                message_name=message.message_id.name, handler=self.log_repr()))
+        if tracer.enabled:
+            logger.debug(
+                "Dispatching message '%s' to '%s'", message.message_id.name, self.log_repr())
         # wrap with component factory must be closest to the real handle_message to be able to read
         # the requires decorator from it
         wrapped_handle_message = wrap_with_component_factory(
@@ -215,14 +272,17 @@ class CallbackDispatcher(Dispatcher):
         wrapped_handle_message(message)
 
     def log_repr(self):
-        try:
-            return '{module}.{qualname}'.format(
-                module=self._handle_message.__module__, qualname=self._handle_message.__qualname__)
-        except Exception:
-            # Can fail if using a lambda as handle_message
-            # This should be fixed with a better log_repr implementation
-            # The exising one gives quite ugly and unreadable logs
-            return 'unknown'
+        if self._log_repr is None:
+            try:
+                self._log_repr = '{module}.{qualname}'.format(
+                    module=self._handle_message.__module__,
+                    qualname=self._handle_message.__qualname__)
+            except Exception:
+                # Can fail if using a lambda as handle_message
+                # This should be fixed with a better log_repr implementation
+                # The exising one gives quite ugly and unreadable logs
+                self._log_repr = 'unknown'
+        return self._log_repr
 
 
 class ConcurrentDispatcher(CallbackDispatcher):
@@ -237,6 +297,178 @@ class ConcurrentDispatcher(CallbackDispatcher):
         super().__init__(messagebus, handle_message, priority, wrap_with_thread=True)
 
 
+class AsyncioDispatcher(Dispatcher):
+    """
+    A dispatcher that runs handle_message as a coroutine on an asyncio event loop.
+
+    By default all AsyncioDispatchers share one event loop that runs in its own thread.
+    This lets I/O bound handlers have many messages in flight at the same time
+    without occupying one thread each, but there is no guarantee about the order
+    in which the messages are completed.
+    handle_message is normally a coroutine function. The components that it requires
+    are created, and plain functions are called, in the default executor of the event loop
+    so that slow component constructors don't block the other coroutines on the loop.
+    """
+
+    def __init__(self, messagebus, handle_message, priority=0, loop=None):
+        super().__init__(messagebus, priority)
+        self._handle_message = handle_message
+        self._log_repr = None
+        self._loop = loop
+        # The futures of the scheduled messages and the tasks of the running coroutines
+        self._futures = set()
+        self._tasks = set()
+        self._futures_lock = Lock()
+
+    def start(self):
+        if self._loop is None:
+            self._loop = get_shared_event_loop()
+
+    def stop(self, timeout=10):
+        """
+        Wait for the messages that are being handled and cancel the ones that are still running.
+
+        The coroutines are waited for at most timeout seconds before they are cancelled.
+        Stop can't wait when it is called from the event loop thread and then only cancels them.
+        """
+        with self._futures_lock:
+            futures = list(self._futures)
+        if not futures or self._loop is None or not self._loop.is_running():
+            return
+
+        if self._is_in_event_loop_thread():
+            self._cancel_tasks()
+            return
+
+        _, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            logger.debug(
+                "Cancelling %s messages that are still handled by '%s'", len(not_done),
+                self.log_repr())
+            cancelled = asyncio.run_coroutine_threadsafe(self._cancel_tasks_and_wait(), self._loop)
+            wait([cancelled], timeout=timeout)
+
+    def _is_in_event_loop_thread(self):
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _cancel_tasks(self):
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        return tasks
+
+    async def _cancel_tasks_and_wait(self):
+        # Messages that were scheduled before this coroutine have started their tasks
+        # because the event loop runs the callbacks in order
+        await asyncio.gather(*self._cancel_tasks(), return_exceptions=True)
+
+    def _remove_future(self, future):
+        with self._futures_lock:
+            self._futures.discard(future)
+
+    def dispatch(self, message):
+        if tracer.enabled:
+            logger.debug(
+                "Scheduling message '%s' for '%s'", message.message_id.name, self.log_repr())
+
+        self.start()
+        # The message counts as active from the moment it is scheduled on the loop
+        self._active_count.increase()
+        future = asyncio.run_coroutine_threadsafe(self.execute_handle_message(message), self._loop)
+        with self._futures_lock:
+            self._futures.add(future)
+        future.add_done_callback(self._remove_future)
+
+    async def execute_handle_message(self, message):
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            if tracer.enabled:
+                logger.debug(
+                    "Receiving message '%s' in '%s'", message.message_id.name, self.log_repr())
+            try:
+                result = await self._call_handle_message(message)
+            except Exception as e:
+                logger.debug(
+                    "Error occured when handling message '%s' in handler '%s'",
+                    message.message_id.name,
+                    self.log_repr(),
+                    exc_info=True)
+                if message.future is not None:
+                    message.future.set_exception(e)
+            except asyncio.CancelledError:
+                if message.future is not None:
+                    message.future.cancel()
+                raise
+            else:
+                if message.future is not None:
+                    message.future.set_result(result)
+        finally:
+            self._tasks.discard(task)
+            self._active_count.decrease()
+
+    async def _call_handle_message(self, message):
+        # The message scope must be kept until the coroutine has completed,
+        # so wrap_with_component_factory can't be used here
+        loop = asyncio.get_running_loop()
+        message_scope = self._component_factory.enter_scope('message', self._scope)
+        call = None
+        try:
+            fixated_entities = []
+            if message.entity is not None:
+                fixated_entities.append(message.entity)
+            call = loop.run_in_executor(
+                None,
+                functools.partial(
+                    self._component_factory.call,
+                    self._handle_message,
+                    message_scope,
+                    message,
+                    fixated_entities=fixated_entities))
+            # Shielded so that a cancelled message doesn't exit the scope while
+            # its components are still being created in the executor
+            result = await asyncio.shield(call)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        finally:
+            if call is not None and not call.done():
+                await asyncio.wait([call])
+            await loop.run_in_executor(None, self._component_factory.exit_scope, message_scope)
+
+    def log_repr(self):
+        if self._log_repr is None:
+            try:
+                self._log_repr = '{module}.{qualname}'.format(
+                    module=self._handle_message.__module__,
+                    qualname=self._handle_message.__qualname__)
+            except Exception:
+                self._log_repr = 'unknown'
+        return self._log_repr
+
+
+_shared_event_loop = None
+_shared_event_loop_lock = Lock()
+
+
+def get_shared_event_loop():
+    """
+    Get the event loop that is shared by the AsyncioDispatchers.
+
+    The event loop is started in a daemon thread the first time it is requested.
+    """
+    global _shared_event_loop
+    with _shared_event_loop_lock:
+        if _shared_event_loop is None or _shared_event_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            Thread(target=loop.run_forever, name='zaf-asyncio-event-loop', daemon=True).start()
+            _shared_event_loop = loop
+        return _shared_event_loop
+
+
 def wrap_with_component_factory(handle_message, component_factory, parent_scope):
 
     def wrapped(message):
@@ -260,8 +492,9 @@ def wrap_with_exception_logging(handle_message, handler_name):
             return handle_message(message)
         except Exception:
             logger.debug(
-                "Error occured when handling message '{message}' in handler '{handler}'".format(
-                    message=message.message_id.name, handler=handler_name),
+                "Error occured when handling message '%s' in handler '%s'",
+                message.message_id.name,
+                handler_name,
                 exc_info=True)
             raise
 
@@ -301,10 +534,17 @@ def wrap_with_active_count(handle_message, active_count):
 
 
 class ActiveCount(object):
+    """
+    Keeps track of the number of messages that are currently being handled by a dispatcher.
+
+    If an idle callback is given it is called every time the count is decreased,
+    to let the MessageBus wake up anyone waiting for it to become inactive.
+    """
 
-    def __init__(self):
+    def __init__(self, idle_callback=None):
         self.lock = RLock()
         self._count = 0
+        self._idle_callback = idle_callback
 
     def increase(self):
         with self.lock:
@@ -313,6 +553,8 @@ class ActiveCount(object):
     def decrease(self):
         with self.lock:
             self._count -= 1
+        if self._idle_callback is not None:
+            self._idle_callback()
 
     def active_count(self):
         return self._count
@@ -84,3 +84,75 @@ class Message(object):
             isinstance(other, self.__class__) and self.message_id == other.message_id
             and self.endpoint == other.endpoint and self.data == other.data
             and self.entity == other.entity)
+
+
+class MessageBatch(object):
+    """
+    A batch of messages that is delivered to a dispatcher as a single unit.
+
+    All messages in a batch have the same message_id, endpoint and entity.
+    Iterating over the batch gives the Message objects in the order they were triggered.
+    """
+
+    def __init__(self, message_id, endpoint, entity=None, messages=(), future=None):
+        """
+        Create a MessageBatch object.
+
+        :param message_id: the MessageId object defining the messages
+        :param endpoint: the EndpointId object defining the endpoint
+        :param entity: the entity that the messages are sent for
+        :param messages: the Message objects in the batch
+        :param future: the future to execute this batch in, may be None
+        """
+        self._message_id = message_id
+        self._endpoint = endpoint
+        self._entity = entity
+        self._messages = tuple(messages)
+        self._future = future
+
+    @classmethod
+    def from_message(cls, message):
+        """Create a batch containing a single message, using the future of the message."""
+        return cls(message.message_id, message.endpoint, message.entity, [message], message.future)
+
+    @property
+    def message_id(self):
+        return self._message_id
+
+    @property
+    def entity(self):
+        return self._entity
+
+    @property
+    def endpoint(self):
+        return self._endpoint
+
+    @property
+    def messages(self):
+        return self._messages
+
+    @property
+    def future(self):
+        return self._future
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __repr__(self):
+        return 'MessageBatch: {{message_id: {name}, endpoint: {endpoint}, entity: {entity}, size: {size}}}'.format(
+            name=self.message_id.name,
+            endpoint=self.endpoint,
+            entity=self.entity,
+            size=len(self._messages))
+
+    def __str__(self):
+        return self.message_id.name
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, self.__class__) and self.message_id == other.message_id
+            and self.endpoint == other.endpoint and self.entity == other.entity
+            and self.messages == other.messages)
@@ -1,15 +1,17 @@
 import itertools
 import logging
 from collections import OrderedDict, defaultdict, namedtuple
-from threading import RLock
-from time import sleep, time
+from threading import Condition, RLock
+from time import monotonic
 
 from zaf.utils.future import Future, FuturesCollection
 
-from .message import Message
+from .message import Message, MessageBatch
+from .tracing import MessageTracer
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
+tracer = MessageTracer(logger)
 
 DispatcherState = namedtuple('DispatcherState', ['dispatcher', 'active_count', 'queue_count'])
 EndpointState = namedtuple('EndpointState', ['endpoint', 'dispatcher_states'])
@@ -35,6 +37,12 @@ class MessageBusTimeout(Exception):
     pass
 
 
+# Upper bound on how long wait_for_not_active sleeps between checks.
+# Dispatchers notify the MessageBus when they become idle so this only
+# matters for dispatchers that don't report their activity changes.
+WAIT_FOR_NOT_ACTIVE_MAX_INTERVAL = 0.1
+
+
 class MessageBus(object):
     """
     The MessageBus has knowledge about all defined EndPointIds and MessageIds.
@@ -50,6 +58,14 @@ class MessageBus(object):
         self.component_factory = component_factory
         self.scope = scope
 
+        # Pre-sorted dispatcher routes keyed on (message_id, endpoint_id, entity).
+        # The routes are invalidated whenever the registrations change.
+        self._event_routes = {}
+        self._request_routes = {}
+        self._routes_lock = RLock()
+
+        self._activity = Condition()
+
     def is_endpoint_defined(self, endpoint):
         """
         Check if an endpoint is defined.
@@ -136,7 +152,10 @@ class MessageBus(object):
         if endpoint_id in self._endpoints:
             if message_id not in self._messages:
                 self._messages[message_id] = MessageDispatcherRegistry(message_id)
-            self._messages[message_id].define_endpoint(endpoint_id)
+            try:
+                self._messages[message_id].define_endpoint(endpoint_id)
+            finally:
+                self._invalidate_routes()
         else:
             raise NoSuchEndpoint(
                 "Trying to define message '{message}' for unknown endpoint '{endpoint}'".format(
@@ -158,19 +177,19 @@ class MessageBus(object):
 
         for message_id in message_ids:
 
-            log_endpoint_part = 'all endpoints' if not endpoint_ids else "endpoints '{endpoints}'".format(
-                endpoints=','.join([id.name for id in endpoint_ids]))
-            log_entity_part = '' if not entities else " and entities '{entities}'".format(
-                entities=','.join(entities))
-            logger.debug(
-                "Registering dispatcher for message '{message}' for {endpoint_part}{entities_part}".
-                format(
-                    message=message_id.name,
-                    endpoint_part=log_endpoint_part,
-                    entities_part=log_entity_part))
+            if tracer.enabled:
+                logger.debug(
+                    "Registering dispatcher for message '%s' for %s%s", message_id.name,
+                    'all endpoints' if not endpoint_ids else "endpoints '{endpoints}'".format(
+                        endpoints=','.join([id.name for id in endpoint_ids])),
+                    '' if not entities else " and entities '{entities}'".format(
+                        entities=','.join(entities)))
 
             if message_id in self._messages:
-                self._messages[message_id].register(dispatcher, endpoint_ids, entities)
+                try:
+                    self._messages[message_id].register(dispatcher, endpoint_ids, entities)
+                finally:
+                    self._invalidate_routes()
             else:
                 raise NoSuchMessage(
                     "Trying to register dispatcher for unknown message '{message}'".format(
@@ -192,16 +211,21 @@ class MessageBus(object):
         endpoint_ids = endpoint_ids if endpoint_ids else []
 
         if message_ids is None:
-            logger.debug(
-                "Deregistering dispatcher '{dispatcher}' for all messages".format(
-                    dispatcher=dispatcher.log_repr()))
+            if tracer.enabled:
+                logger.debug(
+                    "Deregistering dispatcher '%s' for all messages", dispatcher.log_repr())
             deregistered = False
-            for registry in self._messages.values():
-                try:
-                    registry.deregister(dispatcher, endpoint_ids, entities)
-                    deregistered = True
-                except NoSuchDispatcher:
-                    pass
+            try:
+                for registry in self._messages.values():
+                    try:
+                        registry.deregister(dispatcher, endpoint_ids, entities)
+                        deregistered = True
+                    except NoSuchDispatcher:
+                        pass
+            finally:
+                self._invalidate_routes()
+
+            self.activity_changed()
 
             if not deregistered:
                 endpoints_string = ','.join(
@@ -213,14 +237,19 @@ class MessageBus(object):
             raise ValueError('deregister_dispatcher is not valid for empty list of message_ids')
         else:
             for message_id in message_ids:
-                logger.debug("Deregistering dispatcher for message '%s'", message_id.name)
+                if tracer.enabled:
+                    logger.debug("Deregistering dispatcher for message '%s'", message_id.name)
                 if message_id in self._messages:
-                    self._messages[message_id].deregister(dispatcher, endpoint_ids, entities)
+                    try:
+                        self._messages[message_id].deregister(dispatcher, endpoint_ids, entities)
+                    finally:
+                        self._invalidate_routes()
                 else:
                     raise NoSuchMessage(
                         "Trying to deregister dispatcher for unknown message '{message}'".format(
                             message=message_id.name))
 
+            self.activity_changed()
             return self.dispatcher_is_registered(dispatcher)
 
     def trigger_event(self, message_id, sender_endpoint_id, entity=None, data=None):
@@ -233,31 +262,45 @@ class MessageBus(object):
         :param sender_endpoint_id: The EndpointId of the endpoint that sent the message
         :param data: The message data
         """
-        logger.debug(
-            "Triggering event '{message}' from endpoint '{endpoint}'{entity_part}".format(
-                message=message_id.name,
-                endpoint=sender_endpoint_id.name,
-                entity_part='' if not entity else " for entity '{entity}'".format(entity=entity)))
-        if message_id in self._messages:
-            message_registry = self._messages[message_id]
-            dispatchers_and_messages = []
-            for endpoint in message_registry.endpoints:
-                if sender_endpoint_id == endpoint.endpoint_id:
-                    for dispatcher_entity, dispatchers in message_registry.dispatchers_for_endpoint(
-                            endpoint, None, entity).items():
-                        message = Message(
-                            message_id, sender_endpoint_id, entity
-                            if entity else dispatcher_entity, data)
-                        for dispatcher in dispatchers:
-                            dispatchers_and_messages.append((dispatcher, message))
-            for dispatcher, message in sorted(dispatchers_and_messages, key=lambda x: x[0].priority,
-                                              reverse=True):
-                dispatcher.dispatch(message)
+        if tracer.enabled:
+            logger.debug(
+                "Triggering event '%s' from endpoint '%s'%s", message_id.name,
+                sender_endpoint_id.name, _entity_log_part(entity))
+        dispatchers = self._event_routes.get((message_id, sender_endpoint_id, entity))
+        if dispatchers is None:
+            dispatchers = self._get_event_route(message_id, sender_endpoint_id, entity)
 
-        else:
-            raise NoSuchMessage(
-                "Trying to send unknown message '{message}' from endpoint '{endpoint}'".format(
-                    message=message_id.name, endpoint=sender_endpoint_id.name))
+        message = Message(message_id, sender_endpoint_id, entity, data)
+        for dispatcher in dispatchers:
+            dispatcher.dispatch(message)
+
+    def trigger_events(self, message_id, sender_endpoint_id, batch, entity=None):
+        """
+        Send a batch of messages that should trigger all applicable dispatchers.
+
+        Each dispatcher receives the whole batch as a single MessageBatch, which means
+        that the lookup and dispatch overhead is paid once per batch instead of once per message.
+        The order of the messages in the batch is preserved for each dispatcher.
+
+        :param message_id: the MessageId of the messages that should be sent
+        :param sender_endpoint_id: The EndpointId of the endpoint that sent the messages
+        :param batch: iterable with the data of each message
+        :param entity: The entity that the messages are sent for
+        """
+        if tracer.enabled:
+            logger.debug(
+                "Triggering batch of events '%s' from endpoint '%s'%s", message_id.name,
+                sender_endpoint_id.name, _entity_log_part(entity))
+        dispatchers = self._event_routes.get((message_id, sender_endpoint_id, entity))
+        if dispatchers is None:
+            dispatchers = self._get_event_route(message_id, sender_endpoint_id, entity)
+
+        message_batch = MessageBatch(
+            message_id, sender_endpoint_id, entity,
+            [Message(message_id, sender_endpoint_id, entity, data) for data in batch])
+        if message_batch:
+            for dispatcher in dispatchers:
+                dispatcher.dispatch_batch(message_batch)
 
     def send_request(self, message_id, receiver_endpoint_id=None, entity=None, data=None):
         """
@@ -272,33 +315,119 @@ class MessageBus(object):
         """
         futures = FuturesCollection()
 
-        log_endpoint_part = 'all endpoints' if not receiver_endpoint_id else "endpoint '{endpoint}'".format(
-            endpoint=receiver_endpoint_id.name)
-        logger.debug(
-            "Sending request '{message}' to {endpoint_part}{entity_part}".format(
-                message=message_id.name,
-                endpoint_part=log_endpoint_part,
-                entity_part='' if not entity else " for entity '{entity}'".format(entity=entity)))
-        if message_id in self._messages:
-            message_registry = self._messages[message_id]
-            dispatchers_and_messages = []
-            for endpoint in self._messages[message_id].endpoints:
-                if receiver_endpoint_id is None or receiver_endpoint_id == endpoint.endpoint_id:
-                    for dispatcher_entity, dispatchers in message_registry.dispatchers_for_endpoint(
-                            endpoint, entity, all_entities=entity is None).items():
-                        for dispatcher in dispatchers:
-                            future = Future()
-                            message = Message(
-                                message_id, receiver_endpoint_id, entity
-                                if entity else dispatcher_entity, data, future)
-                            dispatchers_and_messages.append((dispatcher, message))
-                            futures.append(future)
-            for dispatcher, message in sorted(dispatchers_and_messages, key=lambda x: x[0].priority,
-                                              reverse=True):
-                dispatcher.dispatch(message)
+        if tracer.enabled:
+            logger.debug(
+                "Sending request '%s' to %s%s", message_id.name, 'all endpoints'
+                if not receiver_endpoint_id else "endpoint '{endpoint}'".format(
+                    endpoint=receiver_endpoint_id.name), _entity_log_part(entity))
+        route = self._request_routes.get((message_id, receiver_endpoint_id, entity))
+        if route is None:
+            route = self._get_request_route(message_id, receiver_endpoint_id, entity)
+
+        dispatchers_and_entities, dispatch_order = route
+        messages = []
+        for dispatcher, dispatcher_entity in dispatchers_and_entities:
+            future = Future()
+            futures.append(future)
+            messages.append(
+                Message(
+                    message_id, receiver_endpoint_id, entity if entity else dispatcher_entity,
+                    data, future))
+        for index in dispatch_order:
+            dispatchers_and_entities[index][0].dispatch(messages[index])
 
         return futures
 
+    async def send_request_async(
+            self, message_id, receiver_endpoint_id=None, entity=None, data=None):
+        """
+        Awaitable variant of send_request.
+
+        The request is sent in the same way as with send_request but the
+        calling coroutine is suspended, instead of blocking its thread,
+        until all futures are resolved.
+
+        :param message_id: The MessageId of the request that should be sent
+        :param receiver_endpoint_id: The EndpointId of the recipients of the messages
+        :param entity: If given, only send request to the specified entity at endpoint
+        :param data: The message data
+        :return: the resolved FuturesCollection
+        """
+        futures = self.send_request(message_id, receiver_endpoint_id, entity, data)
+        return await futures.wait_async()
+
+    def _get_event_route(self, message_id, sender_endpoint_id, entity):
+        """
+        Get the dispatchers that should be triggered by an event, sorted by priority.
+
+        Events are delivered to the dispatchers registered for the specific entity
+        and to the dispatchers registered for the whole endpoint.
+
+        :return: tuple of dispatchers
+        """
+        with self._routes_lock:
+            key = (message_id, sender_endpoint_id, entity)
+            if key in self._event_routes:
+                return self._event_routes[key]
+
+            if message_id not in self._messages:
+                raise NoSuchMessage(
+                    "Trying to send unknown message '{message}' from endpoint '{endpoint}'".format(
+                        message=message_id.name, endpoint=sender_endpoint_id.name))
+
+            message_registry = self._messages[message_id]
+            dispatchers = []
+            for endpoint in message_registry.endpoints:
+                if sender_endpoint_id == endpoint.endpoint_id:
+                    for entity_dispatchers in message_registry.dispatchers_for_endpoint(
+                            endpoint, None, entity).values():
+                        dispatchers.extend(entity_dispatchers)
+
+            route = tuple(sorted(dispatchers, key=lambda d: d.priority, reverse=True))
+            self._event_routes[key] = route
+            return route
+
+    def _get_request_route(self, message_id, receiver_endpoint_id, entity):
+        """
+        Get the dispatchers that should receive a request, sorted by priority.
+
+        Requests without an entity are delivered to all dispatchers on the endpoint,
+        regardless of which entity they are registered for.
+
+        The futures of a request are kept in registration order, so the route holds
+        the dispatchers in that order together with the indices to dispatch them in.
+
+        :return: tuple of (dispatcher, entity) pairs and the dispatch order
+        """
+        with self._routes_lock:
+            key = (message_id, receiver_endpoint_id, entity)
+            if key in self._request_routes:
+                return self._request_routes[key]
+
+            dispatchers_and_entities = []
+            if message_id in self._messages:
+                message_registry = self._messages[message_id]
+                for endpoint in message_registry.endpoints:
+                    if receiver_endpoint_id is None or receiver_endpoint_id == endpoint.endpoint_id:
+                        for dispatcher_entity, dispatchers in message_registry.dispatchers_for_endpoint(
+                                endpoint, entity, all_entities=entity is None).items():
+                            for dispatcher in dispatchers:
+                                dispatchers_and_entities.append((dispatcher, dispatcher_entity))
+
+            dispatch_order = tuple(
+                sorted(
+                    range(len(dispatchers_and_entities)),
+                    key=lambda index: dispatchers_and_entities[index][0].priority,
+                    reverse=True))
+            route = (tuple(dispatchers_and_entities), dispatch_order)
+            self._request_routes[key] = route
+            return route
+
+    def _invalidate_routes(self):
+        with self._routes_lock:
+            self._event_routes = {}
+            self._request_routes = {}
+
     def has_registered_dispatchers(self, message, endpoint_id, entity=None):
         if message not in self._messages:
             return False
@@ -330,31 +459,43 @@ class MessageBus(object):
         :param endpoint_id: The EndpointId of the endpoint to wait for
         :param timeout: How long to wait in seconds
         """
-        start = time()
-        while self.is_active(endpoint_id):
-            if not (time() - start) < timeout:
-                msg_lines = []
-
-                for endpoint_state in self.get_state():
-                    active_dispatchers = [
-                        dispatcher_state for dispatcher_state in endpoint_state.dispatcher_states
-                        if dispatcher_state.active_count > 0 or dispatcher_state.queue_count > 0
-                    ]
-
-                    if active_dispatchers:
-                        msg_lines.append(
-                            '  {endpoint_name}:'.format(endpoint_name=endpoint_state.endpoint.name))
-                        for dispatcher_state in active_dispatchers:
-                            msg_lines.append(
-                                '    {name}: queue_count={queue}, active_count={active}'.format(
-                                    name=dispatcher_state.dispatcher,
-                                    queue=dispatcher_state.queue_count,
-                                    active=dispatcher_state.active_count))
-
-                raise MessageBusTimeout(
-                    'Waiting for MessageBus activity to stop timed out:\n{msg}'.format(
-                        msg='\n'.join(msg_lines)))
-            sleep(0.001)
+        deadline = monotonic() + timeout
+        with self._activity:
+            while self.is_active(endpoint_id):
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    raise MessageBusTimeout(
+                        'Waiting for MessageBus activity to stop timed out:\n{msg}'.format(
+                            msg='\n'.join(self._describe_active_dispatchers())))
+                self._activity.wait(min(remaining, WAIT_FOR_NOT_ACTIVE_MAX_INTERVAL))
+
+    def activity_changed(self):
+        """
+        Notify the MessageBus that a dispatcher may have become idle.
+
+        This wakes up all threads that are blocked in wait_for_not_active.
+        """
+        with self._activity:
+            self._activity.notify_all()
+
+    def _describe_active_dispatchers(self):
+        msg_lines = []
+        for endpoint_state in self.get_state():
+            active_dispatchers = [
+                dispatcher_state for dispatcher_state in endpoint_state.dispatcher_states
+                if dispatcher_state.active_count > 0 or dispatcher_state.queue_count > 0
+            ]
+
+            if active_dispatchers:
+                msg_lines.append(
+                    '  {endpoint_name}:'.format(endpoint_name=endpoint_state.endpoint.name))
+                for dispatcher_state in active_dispatchers:
+                    msg_lines.append(
+                        '    {name}: queue_count={queue}, active_count={active}'.format(
+                            name=dispatcher_state.dispatcher,
+                            queue=dispatcher_state.queue_count,
+                            active=dispatcher_state.active_count))
+        return msg_lines
 
     def get_state(self, endpoint_id=None):
         """
@@ -378,15 +519,15 @@ class MessageBus(object):
         :param endpoint_id: The EndpointId of the endpoint to check if active
         :return: True if specified/any endpoint is active, else False
         """
-        for state in self.get_state(endpoint_id):
-            if self._is_active(state):
-                return True
-        return False
-
-    def _is_active(self, endpoint_state):
-        for dispatcher_state in endpoint_state.dispatcher_states:
-            if dispatcher_state.active_count or dispatcher_state.queue_count:
-                return True
+        endpoint_ids = [endpoint_id] if endpoint_id else list(self._endpoints)
+        for endpoint_id in endpoint_ids:
+            if not self.is_endpoint_defined(endpoint_id):
+                raise NoSuchEndpoint(
+                    "Trying to get state for unknown endpoint '{endpoint}'".format(
+                        endpoint=endpoint_id.name))
+            for dispatcher in self._get_dispatchers_for_endpoint(endpoint_id):
+                if dispatcher.get_active_count() or dispatcher.get_queue_count():
+                    return True
         return False
 
     def _get_endpoint_state(self, endpoint_id):
@@ -411,12 +552,16 @@ class MessageBus(object):
 
     def _get_dispatchers_for_endpoint(self, endpoint_id):
         dispatchers = []
-        endpoints_and_messages = self.get_defined_endpoints_and_messages()
-        for message in endpoints_and_messages[endpoint_id]:
-            for endpoint in self._messages[message]._endpoints:
-                if endpoint._endpoint_id == endpoint_id:
-                    dispatchers += (list(endpoint._dispatchers.values()))
-        return [item for sublist in dispatchers for item in sublist]
+        for message_registry in self._messages.values():
+            for endpoint in message_registry.endpoints:
+                if endpoint.endpoint_id == endpoint_id:
+                    for entity_dispatchers in endpoint._dispatchers.values():
+                        dispatchers.extend(entity_dispatchers)
+        return dispatchers
+
+
+def _entity_log_part(entity):
+    return '' if not entity else " for entity '{entity}'".format(entity=entity)
 
 
 class MessageDispatcherRegistry(object):
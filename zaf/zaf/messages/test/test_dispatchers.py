@@ -1,12 +1,16 @@
+import asyncio
+import time
 import unittest
 from queue import Queue
+from threading import Event, Thread
+from unittest.mock import patch
 
 from zaf.component.decorator import component, requires
 from zaf.component.manager import ComponentManager
-from zaf.messages.dispatchers import QueueUnblockedException
+from zaf.messages.dispatchers import QueueUnblockedException, wrap_with_component_factory
 
-from ..dispatchers import CallbackDispatcher, ConcurrentDispatcher, LocalMessageQueue, \
-    MessageFilter, SequentialDispatcher, ThreadPoolDispatcher
+from ..dispatchers import AsyncioDispatcher, CallbackDispatcher, ConcurrentDispatcher, \
+    LocalMessageQueue, MessageFilter, SequentialDispatcher, ThreadPoolDispatcher
 from .utils import create_messagebus, defined_endpoint, defined_endpoint2, defined_message, \
     defined_message2, defined_message3, notdefined_endpoint, notdefined_message
 
@@ -57,6 +61,28 @@ class TestSequentialDispatcher(unittest.TestCase):
         dispatcher = SequentialDispatcher(messagebus, handle_message)
         self.assertRaises(Exception, dispatcher.register, [])
 
+    def test_wait_for_not_active_is_woken_up_when_handle_message_completes(self):
+        messagebus = create_messagebus()
+        handler_started = Event()
+        release_handler = Event()
+
+        def handle_message(message):
+            handler_started.set()
+            release_handler.wait(timeout=5)
+
+        dispatcher = SequentialDispatcher(messagebus, handle_message)
+        try:
+            dispatcher.register([defined_message])
+            messagebus.trigger_event(defined_message, defined_endpoint)
+            self.assertTrue(handler_started.wait(timeout=1))
+            with patch('zaf.messages.messagebus.WAIT_FOR_NOT_ACTIVE_MAX_INTERVAL', 60):
+                start = time.monotonic()
+                release_handler.set()
+                messagebus.wait_for_not_active(timeout=30)
+                self.assertLess(time.monotonic() - start, 5)
+        finally:
+            dispatcher.destroy()
+
     def test_that_dispatcher_can_be_created_with_lambda(self):
         messagebus = create_messagebus()
         dispatcher = SequentialDispatcher(messagebus, lambda message: None)
@@ -92,6 +118,81 @@ class TestSequentialDispatcher(unittest.TestCase):
         finally:
             dispatcher.destroy()
 
+    def test_batch_of_messages_triggers_handle_message_for_each_message_in_order(self):
+        messagebus = create_messagebus()
+        received_messages = Queue()
+
+        def handle_message(message):
+            received_messages.put(message)
+
+        dispatcher = SequentialDispatcher(messagebus, handle_message)
+        try:
+            dispatcher.register(message_ids=[defined_message])
+            messagebus.trigger_events(defined_message, defined_endpoint, ['data1', 'data2'])
+            self.assertEqual(received_messages.get(timeout=1).data, 'data1')
+            self.assertEqual(received_messages.get(timeout=1).data, 'data2')
+        finally:
+            dispatcher.destroy()
+
+    def test_batch_of_messages_triggers_handle_message_once_in_batch_mode(self):
+        messagebus = create_messagebus()
+        received_batches = Queue()
+
+        def handle_message(message_batch):
+            received_batches.put([message.data for message in message_batch])
+
+        dispatcher = SequentialDispatcher(messagebus, handle_message, batch=True)
+        try:
+            dispatcher.register(message_ids=[defined_message])
+            messagebus.trigger_events(defined_message, defined_endpoint, ['data1', 'data2'])
+            messagebus.trigger_event(defined_message, defined_endpoint, data='data3')
+            self.assertEqual(received_batches.get(timeout=1), ['data1', 'data2'])
+            self.assertEqual(received_batches.get(timeout=1), ['data3'])
+        finally:
+            dispatcher.destroy()
+
+    def test_wait_for_not_active_waits_for_the_whole_batch(self):
+        messagebus = create_messagebus()
+        received_messages = []
+
+        def handle_message(message):
+            received_messages.append(message.data)
+
+        def slow_wrap_with_component_factory(*args):
+            # Widens the gap between the messages in the batch
+            time.sleep(0.05)
+            return wrap_with_component_factory(*args)
+
+        dispatcher = SequentialDispatcher(messagebus, handle_message)
+        try:
+            dispatcher.register(message_ids=[defined_message])
+            data = ['data{index}'.format(index=index) for index in range(5)]
+            with patch(
+                    'zaf.messages.dispatchers.wrap_with_component_factory',
+                    side_effect=slow_wrap_with_component_factory):
+                messagebus.trigger_events(defined_message, defined_endpoint, data)
+                messagebus.wait_for_not_active(timeout=5)
+                self.assertEqual(received_messages, data)
+        finally:
+            dispatcher.destroy()
+
+    def test_failing_message_in_batch_does_not_stop_the_rest_of_the_batch(self):
+        messagebus = create_messagebus()
+        received_messages = Queue()
+
+        def handle_message(message):
+            if message.data == 'fail':
+                raise Exception('failing message')
+            received_messages.put(message)
+
+        dispatcher = SequentialDispatcher(messagebus, handle_message)
+        try:
+            dispatcher.register(message_ids=[defined_message])
+            messagebus.trigger_events(defined_message, defined_endpoint, ['fail', 'data'])
+            self.assertEqual(received_messages.get(timeout=1).data, 'data')
+        finally:
+            dispatcher.destroy()
+
     def test_multiple_messages_triggers_handle_message(self):
         messagebus = create_messagebus()
         received_messages = Queue()
@@ -483,6 +584,21 @@ class TestCallbackDispatcher(unittest.TestCase):
         finally:
             dispatcher.destroy()
 
+    def test_batch_of_messages_triggers_handle_message_for_each_message(self):
+        messagebus = create_messagebus()
+        received_messages = []
+
+        def handle_message(message):
+            received_messages.append(message.data)
+
+        dispatcher = CallbackDispatcher(messagebus, handle_message)
+        try:
+            dispatcher.register(message_ids=[defined_message])
+            messagebus.trigger_events(defined_message, defined_endpoint, ['data1', 'data2'])
+            self.assertEqual(received_messages, ['data1', 'data2'])
+        finally:
+            dispatcher.destroy()
+
     def test_message_triggers_handle_message(self):
         messagebus = create_messagebus()
         received_messages = Queue()
@@ -559,6 +675,149 @@ class TestCallbackDispatcher(unittest.TestCase):
             dispatcher.destroy()
 
 
+class TestAsyncioDispatcher(unittest.TestCase):
+
+    def test_priority_is_passed_to_base_class(self):
+        messagebus = create_messagebus()
+
+        async def handle_message(message):
+            pass
+
+        dispatcher = AsyncioDispatcher(messagebus, handle_message, priority=-7)
+        self.assertEqual(dispatcher.priority, -7)
+
+    def test_message_triggers_coroutine_handle_message(self):
+        messagebus = create_messagebus()
+        received_messages = Queue()
+
+        async def handle_message(message):
+            await asyncio.sleep(0)
+            received_messages.put(message)
+
+        dispatcher = AsyncioDispatcher(messagebus, handle_message)
+        try:
+            dispatcher.register(message_ids=[defined_message])
+            messagebus.trigger_event(defined_message, defined_endpoint, data='data')
+            self.assertEqual(received_messages.get(timeout=1).data, 'data')
+        finally:
+            dispatcher.destroy()
+
+    def test_request_returns_result_of_coroutine_in_future(self):
+        messagebus = create_messagebus()
+
+        async def handle_message(message):
+            await asyncio.sleep(0)
+            return message.data
+
+        dispatcher = AsyncioDispatcher(messagebus, handle_message)
+        try:
+            dispatcher.register(message_ids=[defined_message])
+            futures = messagebus.send_request(defined_message, defined_endpoint, data='data')
+            self.assertEqual(futures[0].result(timeout=1), 'data')
+        finally:
+            dispatcher.destroy()
+
+    def test_request_stores_exception_from_coroutine_in_future(self):
+        messagebus = create_messagebus()
+
+        async def handle_message(message):
+            raise ValueError('failed')
+
+        dispatcher = AsyncioDispatcher(messagebus, handle_message)
+        try:
+            dispatcher.register(message_ids=[defined_message])
+            futures = messagebus.send_request(defined_message, defined_endpoint)
+            with self.assertRaises(ValueError):
+                futures[0].result(timeout=1)
+        finally:
+            dispatcher.destroy()
+
+    def test_many_messages_can_be_in_flight_at_the_same_time(self):
+        messagebus = create_messagebus()
+        number_of_messages = 200
+        started = []
+        events = {}
+
+        async def handle_message(message):
+            # The event is created in the event loop thread to be bound to the right loop
+            all_started = events.setdefault('all_started', asyncio.Event())
+            started.append(message)
+            if len(started) == number_of_messages:
+                all_started.set()
+            await asyncio.wait_for(all_started.wait(), timeout=5)
+            return len(started)
+
+        dispatcher = AsyncioDispatcher(messagebus, handle_message, loop=asyncio.new_event_loop())
+        loop_thread = Thread(target=dispatcher._loop.run_forever, daemon=True)
+        loop_thread.start()
+        try:
+            dispatcher.register(message_ids=[defined_message])
+            futures = [
+                messagebus.send_request(defined_message, defined_endpoint)
+                for _ in range(number_of_messages)
+            ]
+            for f in futures:
+                self.assertEqual(f[0].result(timeout=5), number_of_messages)
+        finally:
+            dispatcher.destroy()
+            dispatcher._loop.call_soon_threadsafe(dispatcher._loop.stop)
+            loop_thread.join(timeout=1)
+
+    def test_send_request_async_can_be_awaited_from_coroutine(self):
+        messagebus = create_messagebus()
+
+        async def handle_message(message):
+            await asyncio.sleep(0)
+            return message.data
+
+        dispatcher = AsyncioDispatcher(messagebus, handle_message)
+        try:
+            dispatcher.register(message_ids=[defined_message])
+
+            async def send():
+                return await messagebus.send_request_async(
+                    defined_message, defined_endpoint, data='data')
+
+            futures = asyncio.run(send())
+            self.assertEqual(futures[0].result(timeout=0), 'data')
+        finally:
+            dispatcher.destroy()
+
+    def test_wait_for_not_active_waits_for_coroutine_to_complete(self):
+        messagebus = create_messagebus()
+        completed = []
+
+        async def handle_message(message):
+            await asyncio.sleep(0.05)
+            completed.append(message)
+
+        dispatcher = AsyncioDispatcher(messagebus, handle_message)
+        try:
+            dispatcher.register(message_ids=[defined_message])
+            messagebus.trigger_event(defined_message, defined_endpoint)
+            messagebus.wait_for_not_active(timeout=5)
+            self.assertEqual(len(completed), 1)
+        finally:
+            dispatcher.destroy()
+
+    def test_stop_waits_for_coroutine_to_complete(self):
+        messagebus = create_messagebus()
+        completed = []
+
+        async def handle_message(message):
+            await asyncio.sleep(0.05)
+            completed.append(message)
+
+        dispatcher = AsyncioDispatcher(messagebus, handle_message)
+        try:
+            dispatcher.register(message_ids=[defined_message])
+            messagebus.trigger_event(defined_message, defined_endpoint)
+            dispatcher.stop(timeout=5)
+            self.assertEqual(len(completed), 1)
+        finally:
+            dispatcher.destroy()
+
+
 class TestDispatcherOnMethod(unittest.TestCase):
 
     def setUp(self):
@@ -884,6 +1143,66 @@ class TestComponentsOnHandlers(unittest.TestCase):
         finally:
             dispatcher.destroy()
 
+    def test_asyncio_dispatcher_creates_components_outside_of_the_event_loop(self):
+        messagebus = create_messagebus()
+        release = Event()
+        received_messages = Queue()
+
+        @component(scope='message')
+        class SlowComponent(object):
+
+            def __init__(self):
+                release.wait(timeout=5)
+
+        @requires(comp='SlowComponent')
+        async def slow_handle_message(message, comp):
+            received_messages.put('slow')
+
+        async def handle_message(message):
+            received_messages.put('fast')
+
+        slow_dispatcher = AsyncioDispatcher(messagebus, slow_handle_message)
+        dispatcher = AsyncioDispatcher(messagebus, handle_message)
+        try:
+            slow_dispatcher.register([defined_message])
+            dispatcher.register([defined_message])
+            messagebus.trigger_event(defined_message, defined_endpoint)
+            self.assertEqual(received_messages.get(timeout=1), 'fast')
+            release.set()
+            self.assertEqual(received_messages.get(timeout=1), 'slow')
+        finally:
+            release.set()
+            slow_dispatcher.destroy()
+            dispatcher.destroy()
+
+    def test_asyncio_dispatcher_stop_cancels_coroutine_and_exits_message_scope(self):
+        messagebus = create_messagebus()
+        exited = Event()
+
+        @component(scope='message')
+        class ExitedComponent(object):
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                exited.set()
+
+        @requires(comp='ExitedComponent')
+        async def handle_message(message, comp):
+            await asyncio.sleep(10)
+
+        dispatcher = AsyncioDispatcher(messagebus, handle_message)
+        try:
+            dispatcher.register([defined_message])
+            futures = messagebus.send_request(defined_message, defined_endpoint)
+            dispatcher.stop(timeout=0.1)
+            self.assertTrue(exited.is_set())
+            self.assertTrue(futures[0].cancelled())
+            self.assertEqual(dispatcher.get_active_count(), 0)
+        finally:
+            dispatcher.destroy()
+
 
 class TestThreadPoolDispatcherWithMultipleWorkers(unittest.TestCase):
 
@@ -1,6 +1,6 @@
 import unittest
 
-from ..message import Message
+from ..message import Message, MessageBatch
 from .utils import defined_endpoint, defined_endpoint2, defined_message, defined_message2, entity, \
     entity2
 
@@ -56,3 +56,23 @@ class TestMessage(unittest.TestCase):
                 'k': 'v',
                 'zaf': 'v3'
             }))
+
+
+class TestMessageBatch(unittest.TestCase):
+
+    def test_iterating_over_batch_gives_messages_in_order(self):
+        messages = [
+            Message(defined_message, defined_endpoint, entity, data='1'),
+            Message(defined_message, defined_endpoint, entity, data='2'),
+        ]
+        message_batch = MessageBatch(defined_message, defined_endpoint, entity, messages)
+        self.assertEqual(list(message_batch), messages)
+        self.assertEqual(len(message_batch), 2)
+
+    def test_batch_from_message_uses_the_message_future(self):
+        future = object()
+        message = Message(defined_message, defined_endpoint, entity, future=future)
+        message_batch = MessageBatch.from_message(message)
+        self.assertEqual(message_batch.entity, entity)
+        self.assertIs(message_batch.future, future)
+        self.assertEqual(list(message_batch), [message])
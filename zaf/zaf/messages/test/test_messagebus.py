@@ -1,12 +1,14 @@
 import re
 import unittest
 from textwrap import dedent
-from unittest.mock import Mock, call
+from threading import Thread
+from time import monotonic
+from unittest.mock import Mock, call, patch
 
 from zaf.component.factory import Factory
 from zaf.component.manager import ComponentManager
 
-from ..message import EndpointId, Message, MessageId
+from ..message import EndpointId, Message, MessageBatch, MessageId
 from ..messagebus import DispatcherState, EndpointAlreadyDefined, EndpointState, MessageBus, \
     MessageBusTimeout, NoSuchDispatcher, NoSuchEndpoint, NoSuchMessage
 from .utils import create_dispatcher, create_messagebus, data, defined_endpoint, \
@@ -270,6 +272,20 @@ class TestMessageTriggering(unittest.TestCase):
         self.messagebus.wait_for_not_active()
         self.assertEqual(self.messagebus.is_active.call_count, 3)
 
+    def test_messagebus_wait_is_woken_up_by_activity_changed(self):
+        results = [True, False]
+
+        def is_active(endpoint_id):
+            if results[0]:
+                Thread(target=self.messagebus.activity_changed).start()
+            return results.pop(0)
+
+        self.messagebus.is_active = is_active
+        with patch('zaf.messages.messagebus.WAIT_FOR_NOT_ACTIVE_MAX_INTERVAL', 60):
+            start = monotonic()
+            self.messagebus.wait_for_not_active(timeout=30)
+            self.assertLess(monotonic() - start, 5)
+
     def test_messagebus_wait_throws_exception_on_timeout(self):
         self.messagebus.is_active = Mock()
         self.messagebus.is_active.side_effect = [True]
@@ -338,6 +354,125 @@ class TestMessageTriggering(unittest.TestCase):
             self.messagebus.wait_for_not_active(notdefined_endpoint)
 
 
+class TestBatchTriggering(unittest.TestCase):
+
+    def setUp(self):
+        self.messagebus = create_messagebus()
+
+    def test_trigger_events_failed_message_id_is_not_defined(self):
+        self.assertRaises(
+            NoSuchMessage, self.messagebus.trigger_events, notdefined_message, defined_endpoint,
+            [data])
+
+    def test_dispatchers_receive_the_whole_batch_in_order_by_priority(self):
+        dispatcher1 = create_dispatcher(priority=-1)
+        dispatcher2 = create_dispatcher(priority=1)
+
+        manager = Mock()
+        manager.attach_mock(dispatcher1, 'a')
+        manager.attach_mock(dispatcher2, 'b')
+
+        self.messagebus.register_dispatcher(dispatcher1, [defined_message], [defined_endpoint])
+        self.messagebus.register_dispatcher(dispatcher2, [defined_message], [defined_endpoint])
+        self.messagebus.trigger_events(defined_message, defined_endpoint, ['data1', 'data2'])
+
+        expected_batch = MessageBatch(
+            defined_message, defined_endpoint, None, [
+                Message(defined_message, defined_endpoint, data='data1'),
+                Message(defined_message, defined_endpoint, data='data2'),
+            ])
+        self.assertEqual(
+            manager.mock_calls, [
+                call.b.dispatch_batch(expected_batch),
+                call.a.dispatch_batch(expected_batch),
+            ])
+
+    def test_batch_for_entity_has_entity_set_on_all_messages(self):
+        dispatcher = create_dispatcher()
+        self.messagebus.register_dispatcher(
+            dispatcher, [defined_message], [defined_endpoint], [entity])
+        self.messagebus.trigger_events(defined_message, defined_endpoint, [data], entity)
+
+        message_batch = dispatcher.dispatch_batch.call_args[0][0]
+        self.assertEqual(message_batch.entity, entity)
+        self.assertEqual(
+            list(message_batch), [Message(defined_message, defined_endpoint, entity, data)])
+
+    def test_empty_batch_is_not_dispatched(self):
+        dispatcher = create_dispatcher()
+        self.messagebus.register_dispatcher(dispatcher, [defined_message], [defined_endpoint])
+        self.messagebus.trigger_events(defined_message, defined_endpoint, [])
+        dispatcher.dispatch_batch.assert_not_called()
+
+
+class TestRoutingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.messagebus = create_messagebus()
+
+    def test_route_is_reused_for_repeated_events(self):
+        dispatcher = create_dispatcher()
+        self.messagebus.register_dispatcher(dispatcher, [defined_message], [defined_endpoint])
+        registry = self.messagebus._messages[defined_message]
+        registry.dispatchers_for_endpoint = Mock(wraps=registry.dispatchers_for_endpoint)
+
+        self.messagebus.trigger_event(defined_message, defined_endpoint, data=data)
+        self.messagebus.trigger_event(defined_message, defined_endpoint, data=data)
+
+        self.assertEqual(registry.dispatchers_for_endpoint.call_count, 1)
+        self.assertEqual(dispatcher.dispatch.call_count, 2)
+
+    def test_route_is_reused_for_repeated_requests(self):
+        dispatcher = create_dispatcher()
+        self.messagebus.register_dispatcher(dispatcher, [defined_message], [defined_endpoint])
+        registry = self.messagebus._messages[defined_message]
+        registry.dispatchers_for_endpoint = Mock(wraps=registry.dispatchers_for_endpoint)
+
+        self.messagebus.send_request(defined_message, defined_endpoint, data=data)
+        self.messagebus.send_request(defined_message, defined_endpoint, data=data)
+
+        self.assertEqual(registry.dispatchers_for_endpoint.call_count, 1)
+        self.assertEqual(dispatcher.dispatch.call_count, 2)
+
+    def test_dispatcher_registered_after_event_is_triggered_by_next_event(self):
+        dispatcher1 = create_dispatcher()
+        dispatcher2 = create_dispatcher()
+        self.messagebus.register_dispatcher(dispatcher1, [defined_message], [defined_endpoint])
+        self.messagebus.trigger_event(defined_message, defined_endpoint, data=data)
+
+        self.messagebus.register_dispatcher(dispatcher2, [defined_message], [defined_endpoint])
+        self.messagebus.trigger_event(defined_message, defined_endpoint, data=data)
+
+        self.assertEqual(dispatcher1.dispatch.call_count, 2)
+        self.assertEqual(dispatcher2.dispatch.call_count, 1)
+
+    def test_dispatcher_deregistered_after_request_is_not_triggered_by_next_request(self):
+        dispatcher1 = create_dispatcher()
+        dispatcher2 = create_dispatcher()
+        self.messagebus.register_dispatcher(dispatcher1, [defined_message], [defined_endpoint])
+        self.messagebus.register_dispatcher(dispatcher2, [defined_message], [defined_endpoint])
+        self.assertEqual(len(self.messagebus.send_request(defined_message, defined_endpoint)), 2)
+
+        self.messagebus.deregister_dispatcher(dispatcher2, [defined_message])
+        self.assertEqual(len(self.messagebus.send_request(defined_message, defined_endpoint)), 1)
+
+        self.assertEqual(dispatcher1.dispatch.call_count, 2)
+        self.assertEqual(dispatcher2.dispatch.call_count, 1)
+
+    def test_request_futures_are_in_registration_order_and_dispatched_by_priority(self):
+        dispatched = []
+        dispatcher1 = create_dispatcher(
+            lambda message: dispatched.append((1, message.future)), priority=-1)
+        dispatcher2 = create_dispatcher(
+            lambda message: dispatched.append((2, message.future)), priority=1)
+        self.messagebus.register_dispatcher(dispatcher1, [defined_message], [defined_endpoint])
+        self.messagebus.register_dispatcher(dispatcher2, [defined_message], [defined_endpoint])
+
+        futures = self.messagebus.send_request(defined_message, defined_endpoint)
+
+        self.assertEqual(dispatched, [(2, futures[1]), (1, futures[0])])
+
+
 class TestEntities(unittest.TestCase):
 
     def setUp(self):
@@ -0,0 +1,99 @@
+import io
+import logging
+import unittest
+from unittest.mock import patch
+
+from .. import tracing
+from ..tracing import MessageTracer, set_message_tracing, update_message_tracing
+from .utils import create_dispatcher, create_messagebus, data, defined_endpoint, defined_message
+
+
+class TestMessageTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.set_level('test', logging.DEBUG)
+        self.set_level('zaf.messages', logging.DEBUG)
+        self.parent = MessageTracer(logging.getLogger('test.tracing'))
+        self.child = MessageTracer(logging.getLogger('test.tracing.child'))
+        self.other = MessageTracer(logging.getLogger('test.tracingother'))
+
+    def tearDown(self):
+        set_message_tracing(True)
+
+    def set_level(self, logger_name, level):
+        logger = logging.getLogger(logger_name)
+        self.addCleanup(logger.setLevel, logger.level)
+        logger.setLevel(level)
+
+    def test_tracing_is_enabled_by_default(self):
+        self.assertTrue(self.parent.enabled)
+
+    def test_tracing_is_disabled_when_logger_is_not_enabled_for_debug(self):
+        self.set_level('test.tracing', logging.INFO)
+        self.assertFalse(self.parent.enabled)
+        self.assertFalse(self.child.enabled)
+        self.assertTrue(self.other.enabled)
+
+        logging.getLogger('test.tracing').setLevel(logging.DEBUG)
+        self.assertTrue(self.parent.enabled)
+
+    def test_tracing_is_disabled_when_no_handler_lets_debug_records_through(self):
+        self.addCleanup(
+            setattr, tracing, '_handlers_configured', tracing._handlers_configured)
+        for tracer in tracing._tracers:
+            self.addCleanup(setattr, tracer, 'handled', tracer.handled)
+
+        logger = logging.getLogger('test.tracing')
+        self.addCleanup(setattr, logger, 'propagate', logger.propagate)
+        logger.propagate = False
+        handler = logging.StreamHandler(io.StringIO())
+        handler.addFilter(lambda record: record.levelno >= logging.INFO)
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+
+        update_message_tracing()
+        self.assertFalse(self.parent.enabled)
+        self.assertFalse(self.child.enabled)
+
+        handler.filters.clear()
+        update_message_tracing()
+        self.assertTrue(self.parent.enabled)
+        self.assertTrue(self.child.enabled)
+
+    def test_disable_tracing_for_logger_also_disables_child_loggers(self):
+        set_message_tracing(False, ['test.tracing'])
+        self.assertFalse(self.parent.enabled)
+        self.assertFalse(self.child.enabled)
+        self.assertTrue(self.other.enabled)
+
+    def test_disable_tracing_for_child_logger_keeps_parent_logger_enabled(self):
+        set_message_tracing(False, ['test.tracing.child'])
+        self.assertTrue(self.parent.enabled)
+        self.assertFalse(self.child.enabled)
+
+    def test_messagebus_does_not_log_messages_when_tracing_is_disabled(self):
+        messagebus = create_messagebus()
+        dispatcher = create_dispatcher()
+        messagebus.register_dispatcher(dispatcher, [defined_message], [defined_endpoint])
+
+        set_message_tracing(False, ['zaf.messages'])
+        with patch('zaf.messages.messagebus.logger') as logger:
+            messagebus.trigger_event(defined_message, defined_endpoint, data=data)
+            messagebus.send_request(defined_message, defined_endpoint, data=data)
+            logger.debug.assert_not_called()
+        dispatcher.dispatch.assert_called()
+
+    def test_messagebus_does_not_log_messages_above_debug_level(self):
+        messagebus = create_messagebus()
+        self.set_level('zaf.messages', logging.INFO)
+        with patch('zaf.messages.messagebus.logger') as logger:
+            messagebus.trigger_event(defined_message, defined_endpoint, data=data)
+            logger.debug.assert_not_called()
+
+    def test_messagebus_logs_messages_when_tracing_is_enabled(self):
+        messagebus = create_messagebus()
+        with patch('zaf.messages.messagebus.logger') as logger:
+            messagebus.trigger_event(defined_message, defined_endpoint, data=data)
+            logger.debug.assert_called_once_with(
+                "Triggering event '%s' from endpoint '%s'%s", defined_message.name,
+                defined_endpoint.name, '')
@@ -0,0 +1,108 @@
+"""
+Switch for the per message debug logging in the messaging layer.
+
+The MessageBus and the dispatchers log every message that passes through them on debug level.
+Tracing follows the effective level of the logger, so no log records are created and no
+strings are built for the messages when the logger is not enabled for debug.
+
+In zaf applications the root logger is always at debug level and the filtering is done by
+the filters of the handlers. When the logging extensions have configured the handlers they
+call :func:`update_message_tracing`, and tracing is then only enabled for loggers where at least
+one of the handlers lets debug records through. Tracing can also be disabled explicitly for a
+logger.
+
+Example of disabling tracing for the whole messaging layer:
+
+.. code-block:: python
+
+    set_message_tracing(False, ['zaf.messages'])
+
+"""
+
+import logging
+
+_tracers = []
+_handlers_configured = False
+
+
+class MessageTracer(object):
+    """
+    Keeps track of if per message debug logging is enabled for a logger.
+
+    The enabled attribute is meant to be checked before logging in hot paths.
+
+    .. code-block:: python
+
+        if tracer.enabled:
+            logger.debug("Dispatching message '%s'", message.message_id.name)
+    """
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.traced = True
+        self.handled = _is_debug_handled(logger) if _handlers_configured else True
+        _tracers.append(self)
+
+    @property
+    def enabled(self):
+        # isEnabledFor is cached by the logging module and the cache is cleared
+        # when a log level is changed, so level changes are picked up here
+        return self.traced and self.handled and self.logger.isEnabledFor(logging.DEBUG)
+
+
+def set_message_tracing(enabled, logger_names=None):
+    """
+    Enable or disable message tracing.
+
+    :param enabled: True to enable tracing, False to disable it
+    :param logger_names: The names of the loggers to change, including all child loggers.
+                         If None the tracing is changed for all loggers.
+    """
+    for tracer in _tracers:
+        if logger_names is None or _matches(tracer.logger.name, logger_names):
+            tracer.traced = enabled
+
+
+def update_message_tracing():
+    """
+    Check for all loggers if debug records are let through by the configured log handlers.
+
+    This should be called when the log handlers have been configured.
+    Until it has been called tracing is only decided by the level of the loggers.
+    """
+    global _handlers_configured
+    _handlers_configured = True
+    for tracer in _tracers:
+        tracer.handled = _is_debug_handled(tracer.logger)
+
+
+def _is_debug_handled(logger):
+    """
+    Check if any of the handlers of the logger or its parents would handle a debug record.
+
+    The levels of the handlers are not checked because handlers of log files that rotate on
+    scopes change their level when the scopes are entered and exited.
+    NullHandlers don't write the records anywhere.
+    """
+    record = logging.LogRecord(logger.name, logging.DEBUG, __file__, 0, '', None, None)
+    current = logger
+    found = False
+    while current is not None:
+        for handler in current.handlers:
+            found = True
+            if not isinstance(handler, logging.NullHandler) and handler.filter(record):
+                return True
+        if not current.propagate:
+            break
+        current = current.parent
+
+    # Like in the logging module the last resort handler is only used if there are no handlers
+    return not found and logging.lastResort is not None and \
+        logging.lastResort.level <= logging.DEBUG
+
+
+def _matches(name, logger_names):
+    for logger_name in logger_names:
+        if logger_name == '' or name == logger_name or name.startswith(logger_name + '.'):
+            return True
+    return False
@@ -1,3 +1,4 @@
+import asyncio
 import collections
 import concurrent.futures
 from concurrent.futures.thread import _WorkItem
@@ -28,3 +29,13 @@ class FuturesCollection(collections.UserList):
         """Block until all futures in the collection are resolved."""
         list(self.as_completed(timeout))
         return self
+
+    async def wait_async(self):
+        """
+        Await until all futures in the collection are resolved.
+
+        This doesn't block the thread running the event loop.
+        """
+        await asyncio.gather(
+            *[asyncio.wrap_future(future) for future in self.data], return_exceptions=True)
+        return self
@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from unittest.mock import MagicMock
 
@@ -95,3 +96,20 @@ class TestFuturesCollection(unittest.TestCase):
         fc = FuturesCollection((f1, ))
         f1.run(MagicMock())
         fc.wait()
+
+
+class TestFuturesCollectionWaitAsync(unittest.TestCase):
+
+    def test_wait_async_returns_when_all_futures_are_resolved(self):
+        first = Future()
+        second = Future()
+        collection = FuturesCollection([first, second])
+
+        async def wait():
+            asyncio.get_running_loop().call_soon(first.set_result, 1)
+            asyncio.get_running_loop().call_soon(second.set_exception, Exception())
+            return await collection.wait_async()
+
+        self.assertIs(asyncio.run(wait()), collection)
+        self.assertTrue(first.done())
+        self.assertTrue(second.done())